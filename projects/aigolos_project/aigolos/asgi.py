@@ -9,3 +9,9 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aigolos.settings')
 
 application = get_asgi_application()
 
+# Load models in the background so the first request is not a cold start
+from django.conf import settings  # noqa: E402
+
+if settings.WARMUP_ON_START:
+    from core.services.warmup import start_warmup
+    start_warmup()
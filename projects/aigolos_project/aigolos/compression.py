@@ -0,0 +1,189 @@
+"""
+Response compression codecs for CompressionMiddleware.
+
+gzip is always available; Brotli (``brotli``) and Zstandard (``zstandard``)
+are used when installed. Every codec can compress a whole body or a stream of
+chunks, flushing after each chunk so streamed responses reach the client as
+they are produced.
+"""
+
+import hashlib
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger('aigolos')
+
+
+class GzipCodec:
+    """gzip via zlib (no intermediate file object)."""
+    
+    name = 'gzip'
+    
+    def __init__(self, level: int = 6):
+        self.level = level
+    
+    def compress(self, data: bytes) -> bytes:
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+    
+    def stream(self):
+        return _ZlibStream(zlib.compressobj(self.level, zlib.DEFLATED, 31))
+
+
+class _ZlibStream:
+    def __init__(self, compressor):
+        self.compressor = compressor
+    
+    def compress(self, chunk: bytes) -> bytes:
+        return self.compressor.compress(chunk) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+    
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+class BrotliCodec:
+    """Brotli (requires ``brotli``)."""
+    
+    name = 'br'
+    
+    def __init__(self, level: int = 4):
+        import brotli
+        self._brotli = brotli
+        self.level = level
+    
+    def compress(self, data: bytes) -> bytes:
+        return self._brotli.compress(data, quality=self.level)
+    
+    def stream(self):
+        return _BrotliStream(self._brotli.Compressor(quality=self.level))
+
+
+class _BrotliStream:
+    def __init__(self, compressor):
+        self.compressor = compressor
+    
+    def compress(self, chunk: bytes) -> bytes:
+        return self.compressor.process(chunk) + self.compressor.flush()
+    
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+class ZstdCodec:
+    """Zstandard (requires ``zstandard``)."""
+    
+    name = 'zstd'
+    
+    def __init__(self, level: int = 3):
+        import zstandard
+        self._zstd = zstandard
+        self.level = level
+    
+    def compress(self, data: bytes) -> bytes:
+        # ZstdCompressor instances must not be shared between threads
+        return self._zstd.ZstdCompressor(level=self.level).compress(data)
+    
+    def stream(self):
+        return _ZstdStream(self._zstd, self._zstd.ZstdCompressor(level=self.level).compressobj())
+
+
+class _ZstdStream:
+    def __init__(self, zstd, compressor):
+        self._flush_block = zstd.COMPRESSOBJ_FLUSH_BLOCK
+        self.compressor = compressor
+    
+    def compress(self, chunk: bytes) -> bytes:
+        return self.compressor.compress(chunk) + self.compressor.flush(self._flush_block)
+    
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+CODECS = {
+    'gzip': GzipCodec,
+    'br': BrotliCodec,
+    'zstd': ZstdCodec,
+}
+
+
+def load_codecs(encodings: List[str], levels: Dict[str, int]) -> Dict[str, object]:
+    """Instantiate codecs in preference order, skipping unknown or unavailable ones."""
+    codecs = {}
+    for encoding in encodings:
+        codec_class = CODECS.get(encoding)
+        if codec_class is None:
+            logger.warning(f"Unknown compression encoding: {encoding}")
+            continue
+        level = levels.get(encoding)
+        try:
+            codecs[encoding] = codec_class(level) if level is not None else codec_class()
+        except ImportError:
+            logger.info(f"Compression encoding {encoding} not available (library not installed)")
+    return codecs
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {encoding: q}."""
+    accepted = {}
+    for part in header.split(','):
+        encoding, _, params = part.strip().partition(';')
+        encoding = encoding.strip().lower()
+        if not encoding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[encoding] = q
+    return accepted
+
+
+def choose_encoding(header: str, available: List[str]) -> Optional[str]:
+    """Pick the encoding with the highest client q-value, ties broken by server preference."""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressedCache:
+    """Thread-safe LRU of compressed bodies keyed by encoding and content digest."""
+    
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[str, bytes], bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(encoding: str, content: bytes) -> Tuple[str, bytes]:
+        return encoding, hashlib.blake2b(content, digest_size=16).digest()
+    
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value: bytes):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
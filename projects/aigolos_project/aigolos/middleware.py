@@ -5,18 +5,23 @@ Custom middleware for AIGolos.
 import logging
 import time
 import uuid
+from django.utils.cache import patch_vary_headers
 from django.utils.deprecation import MiddlewareMixin
-from django.core.cache import cache
-from django.utils import timezone
-from datetime import timedelta
+from aigolos.compression import CompressedCache, choose_encoding, load_codecs
+from aigolos.telemetry import SecurityEvent, SecurityTelemetry, find_suspicious_pattern
 
 logger = logging.getLogger('aigolos')
-security_logger = logging.getLogger('security')
 
 
 class LoggingMiddleware(MiddlewareMixin):
     """Middleware for logging requests and errors."""
     
+    def __init__(self, get_response=None):
+        super().__init__(get_response)
+        from django.conf import settings
+        self.telemetry = SecurityTelemetry(run_async=settings.SECURITY_TELEMETRY_ASYNC)
+        self.scan_max_body = settings.SECURITY_SCAN_MAX_BODY
+    
     def process_request(self, request):
         """Log request start time and add correlation ID."""
         request._start_time = time.time()
@@ -41,7 +46,7 @@ class LoggingMiddleware(MiddlewareMixin):
             try:
                 from core.metrics import MetricsCollector
                 MetricsCollector.record_api_request(
-                    request.path,
+                    self._get_route(request),
                     request.method,
                     response.status_code,
                     duration
@@ -64,51 +69,40 @@ class LoggingMiddleware(MiddlewareMixin):
         return None
     
     def _check_suspicious_activity(self, request, response):
-        """Check and log suspicious activity."""
-        ip_address = self._get_client_ip(request)
-        user = request.user if hasattr(request, 'user') and request.user.is_authenticated else None
-        
-        # Check for failed authentication attempts
-        if response.status_code == 401 or response.status_code == 403:
-            cache_key = f'failed_auth_{ip_address}'
-            failed_count = cache.get(cache_key, 0) + 1
-            cache.set(cache_key, failed_count, 3600)  # 1 hour
-            
-            if failed_count >= 5:
-                correlation_id = getattr(request, 'correlation_id', 'N/A')
-                security_logger.warning(
-                    f"[{correlation_id}] Suspicious activity: Multiple failed auth attempts - "
-                    f"IP: {ip_address}, Count: {failed_count}, Path: {request.path}",
-                    extra={'correlation_id': correlation_id, 'ip_address': ip_address}
-                )
-        
-        # Check for rate limiting violations
-        if response.status_code == 429:
-            correlation_id = getattr(request, 'correlation_id', 'N/A')
-            security_logger.warning(
-                f"[{correlation_id}] Rate limit exceeded - IP: {ip_address}, "
-                f"User: {user.username if user else 'Anonymous'}, Path: {request.path}",
-                extra={'correlation_id': correlation_id, 'ip_address': ip_address}
-            )
+        """Check for suspicious activity (cheap checks only; events are handled off the request path)."""
+        status_code = response.status_code
+        if status_code in (401, 403):
+            kind = 'failed_auth'
+        elif status_code == 429:
+            kind = 'rate_limited'
+        elif status_code == 400 and request.META.get('CONTENT_TYPE', '').startswith('multipart/'):
+            kind = 'invalid_upload'
+        else:
+            kind = None
         
-        # Check for invalid file uploads
-        if response.status_code == 400 and 'audio' in request.path:
-            security_logger.warning(
-                f"Invalid file upload attempt - IP: {ip_address}, "
-                f"User: {user.username if user else 'Anonymous'}"
-            )
+        pattern = find_suspicious_pattern(request, self.scan_max_body)
+        if kind is None and pattern is None:
+            return
         
-        # Check for SQL injection patterns (basic check)
-        suspicious_patterns = ['union select', 'drop table', ';--', 'exec(', 'script>']
-        query_string = str(request.GET) + str(request.POST)
-        for pattern in suspicious_patterns:
-            if pattern.lower() in query_string.lower():
-                security_logger.error(
-                    f"Potential SQL injection attempt - IP: {ip_address}, "
-                    f"User: {user.username if user else 'Anonymous'}, "
-                    f"Pattern: {pattern}, Path: {request.path}"
-                )
-                break
+        user = getattr(request, 'user', None)
+        username = user.username if user is not None and user.is_authenticated else None
+        event_args = {
+            'ip_address': self._get_client_ip(request),
+            'path': request.path,
+            'username': username,
+            'correlation_id': getattr(request, 'correlation_id', 'N/A'),
+        }
+        if kind is not None:
+            self.telemetry.submit(SecurityEvent(kind, **event_args))
+        if pattern is not None:
+            self.telemetry.submit(SecurityEvent('injection', pattern=pattern, **event_args))
+    
+    def _get_route(self, request):
+        """URL pattern of the request (IDs in paths would create a series per object)."""
+        resolver_match = getattr(request, 'resolver_match', None)
+        if resolver_match is None:
+            return 'unmatched'
+        return '/' + resolver_match.route
     
     def _get_client_ip(self, request):
         """Get client IP address."""
@@ -144,31 +138,94 @@ class SecurityHeadersMiddleware(MiddlewareMixin):
 
 
 class CompressionMiddleware(MiddlewareMixin):
-    """Middleware for compressing responses."""
+    """
+    Middleware for compressing responses.
+    
+    Uses the best encoding the client accepts (``COMPRESSION_ENCODINGS``, by
+    default zstd, br, gzip - whichever libraries are installed) at the levels
+    in ``COMPRESSION_LEVELS``. Streaming responses are compressed chunk by
+    chunk. Compressed HTML, CSS and JavaScript are cached by content, so
+    repeated template output is compressed once.
+    """
+    
+    COMPRESSIBLE_TYPES = (
+        'text/html', 'text/css', 'text/plain', 'text/csv',
+        'application/javascript', 'application/json', 'image/svg+xml',
+    )
+    CACHEABLE_TYPES = ('text/html', 'text/css', 'application/javascript')
+    
+    def __init__(self, get_response=None):
+        super().__init__(get_response)
+        from django.conf import settings
+        self.codecs = load_codecs(settings.COMPRESSION_ENCODINGS, settings.COMPRESSION_LEVELS)
+        self.min_size = settings.COMPRESSION_MIN_SIZE
+        self.cache = CompressedCache(settings.COMPRESSION_CACHE_SIZE)
     
     def process_response(self, request, response):
         """Compress response if applicable."""
         # Skip compression if already compressed or if Content-Encoding is set
-        if response.get('Content-Encoding'):
+        if response.get('Content-Encoding') or not self.codecs:
             return response
         
         # Only compress text-based content
         content_type = response.get('Content-Type', '')
-        if any(ct in content_type for ct in ['text/html', 'text/css', 'application/javascript', 'application/json']):
-            # Check if client supports gzip
-            accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
-            if 'gzip' in accept_encoding:
-                try:
-                    content = response.content
-                    if len(content) > 200:  # Only compress if > 200 bytes
-                        import gzip
-                        compressed_content = gzip.compress(content)
-                        response.content = compressed_content
-                        response['Content-Encoding'] = 'gzip'
-                        response['Content-Length'] = str(len(compressed_content))
-                except (AttributeError, TypeError):
-                    # Skip compression if content is not bytes
-                    pass
+        if not any(ct in content_type for ct in self.COMPRESSIBLE_TYPES):
+            return response
+        
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), list(self.codecs))
+        if encoding is None:
+            return response
+        codec = self.codecs[encoding]
         
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._compress_async_stream(codec, response.streaming_content)
+            else:
+                response.streaming_content = self._compress_stream(codec, response.streaming_content)
+            del response['Content-Length']
+        else:
+            content = response.content
+            if len(content) < self.min_size:  # Not worth the overhead
+                return response
+            cacheable = any(ct in content_type for ct in self.CACHEABLE_TYPES)
+            compressed = self._compress(codec, content, cacheable)
+            if len(compressed) >= len(content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        
+        response['Content-Encoding'] = encoding
+        # The compressed body differs byte for byte, so a strong ETag must become weak
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
         return response
-
+    
+    def _compress(self, codec, content, cacheable):
+        if not cacheable:
+            return codec.compress(content)
+        key = self.cache.key(codec.name, content)
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = codec.compress(content)
+            self.cache.set(key, compressed)
+        return compressed
+    
+    @staticmethod
+    def _compress_stream(codec, chunks):
+        stream = codec.stream()
+        for chunk in chunks:
+            data = stream.compress(chunk)
+            if data:
+                yield data
+        yield stream.finish()
+    
+    @staticmethod
+    async def _compress_async_stream(codec, chunks):
+        stream = codec.stream()
+        async for chunk in chunks:
+            data = stream.compress(chunk)
+            if data:
+                yield data
+        yield stream.finish()
@@ -105,6 +105,65 @@ if REDIS_URL and not DEBUG:
         'TIMEOUT': 300,
     }
 
+# Content-addressed result cache for ASR/TTS/LLM (see core/result_cache.py)
+RESULT_CACHE_ENABLED = os.getenv('RESULT_CACHE_ENABLED', 'True').lower() == 'true'
+RESULT_CACHE_TIMEOUT = int(os.getenv('RESULT_CACHE_TIMEOUT', str(7 * 86400)))  # 7 days
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv('RESULT_CACHE_MAX_ENTRIES', '10000'))
+CACHES['results'] = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'aigolos-results',
+    'TIMEOUT': RESULT_CACHE_TIMEOUT,
+    'OPTIONS': {
+        'MAX_ENTRIES': RESULT_CACHE_MAX_ENTRIES,  # LRU eviction beyond this
+    }
+}
+if REDIS_URL and not DEBUG:
+    # Configure Redis with maxmemory-policy allkeys-lru for size-bounded eviction
+    CACHES['results'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'KEY_PREFIX': 'aigolos:results',
+        'TIMEOUT': RESULT_CACHE_TIMEOUT,
+    }
+
+# Metrics counters (see core/metrics.py); never expire, never culled
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '10'))  # seconds
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')  # bearer token for /api/metrics/ (else staff only)
+CACHES['metrics'] = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'aigolos-metrics',
+    'TIMEOUT': None,
+    'OPTIONS': {
+        'MAX_ENTRIES': 100000,
+    }
+}
+if REDIS_URL and not DEBUG:
+    # Shared by all workers; INCRBY keeps concurrent flushes atomic
+    CACHES['metrics'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'KEY_PREFIX': 'aigolos:metrics',
+        'TIMEOUT': None,
+    }
+
+# Security telemetry (aigolos.middleware.LoggingMiddleware)
+SECURITY_TELEMETRY_ASYNC = os.getenv('SECURITY_TELEMETRY_ASYNC', 'True').lower() == 'true'  # handle events on a background thread
+SECURITY_SCAN_MAX_BODY = int(os.getenv('SECURITY_SCAN_MAX_BODY', '65536'))  # larger bodies are not scanned
+
+# Response compression (aigolos.middleware.CompressionMiddleware)
+# Server preference order; br and zstd are used only if `brotli` / `zstandard` are installed
+COMPRESSION_ENCODINGS = [e.strip() for e in os.getenv('COMPRESSION_ENCODINGS', 'zstd,br,gzip').split(',') if e.strip()]
+COMPRESSION_LEVELS = {
+    'gzip': int(os.getenv('COMPRESSION_GZIP_LEVEL', '6')),
+    'br': int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4')),
+    'zstd': int(os.getenv('COMPRESSION_ZSTD_LEVEL', '3')),
+}
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '200'))  # bytes
+COMPRESSION_CACHE_SIZE = int(os.getenv('COMPRESSION_CACHE_SIZE', '128'))  # compressed bodies kept in memory
+
+# Full-text search (see core/search.py); changing the PostgreSQL config needs the index rebuilt
+SEARCH_CONFIG = os.getenv('SEARCH_CONFIG', 'simple')
+
 # WhiteNoise for static files
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
@@ -401,14 +460,70 @@ ASR_MODEL_NAME = os.getenv('ASR_MODEL_NAME', 'large-v3')
 ASR_DEVICE = os.getenv('ASR_DEVICE', 'cpu')
 ASR_COMPUTE_TYPE = os.getenv('ASR_COMPUTE_TYPE', 'int8')
 
+# Chunked transcription of long audio
+ASR_CHUNK_SECONDS = float(os.getenv('ASR_CHUNK_SECONDS', '30'))
+ASR_CHUNK_WORKERS = int(os.getenv('ASR_CHUNK_WORKERS', '1'))  # chunks transcribed in parallel
+
+# ASR worker pool (python manage.py run_asr_workers)
+# When ASR_WORKER_ADDRESS is set, web workers hand audio off to the pool
+# instead of loading their own Whisper model.
+ASR_WORKER_ADDRESS = os.getenv('ASR_WORKER_ADDRESS', '')  # e.g. 127.0.0.1:8765
+ASR_WORKER_AUTHKEY = os.getenv('ASR_WORKER_AUTHKEY', SECRET_KEY)
+ASR_WORKERS = int(os.getenv('ASR_WORKERS', str(os.cpu_count() or 2)))
+ASR_WORKER_TIMEOUT = int(os.getenv('ASR_WORKER_TIMEOUT', '600'))  # seconds
+# Clips combined into one task only while every worker is busy; each clip is
+# still transcribed on its own, so 1 (no combining) is the default
+ASR_BATCH_SIZE = int(os.getenv('ASR_BATCH_SIZE', '1'))
+ASR_BATCH_MAX_BYTES = int(os.getenv('ASR_BATCH_MAX_BYTES', str(1024 * 1024)))  # 1MB
+
 LLM_BACKEND = os.getenv('LLM_BACKEND', 'ollama')
 LLM_MODEL_NAME = os.getenv('LLM_MODEL_NAME', 'qwen2.5:7b')
 OLLAMA_BASE_URL = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
+# Several Ollama servers (comma-separated); requests go to the least-loaded one
+OLLAMA_BASE_URLS = [url.strip() for url in os.getenv('OLLAMA_BASE_URLS', '').split(',') if url.strip()]
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', '60'))  # seconds per request
+LLM_CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', '5'))
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '4'))  # concurrent requests per model per available backend
+LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', '30'))  # max wait for a free slot
+LLM_RETRIES = int(os.getenv('LLM_RETRIES', '2'))  # retries on connection errors
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv('LLM_POOL_MAX_CONNECTIONS', '20'))  # per backend
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv('LLM_POOL_MAX_KEEPALIVE', '10'))
+LLM_KEEP_ALIVE = os.getenv('LLM_KEEP_ALIVE', '')  # how long Ollama keeps the model loaded, e.g. 30m or -1 (Ollama default 5m)
 LLM_MAX_TOKENS = int(os.getenv('LLM_MAX_TOKENS', '256'))
 LLM_TEMPERATURE = float(os.getenv('LLM_TEMPERATURE', '0.7'))
+# Conversation history sent with each chat turn
+LLM_CONTEXT_TOKENS = int(os.getenv('LLM_CONTEXT_TOKENS', '2048'))  # estimated token budget
+LLM_CONTEXT_MAX_MESSAGES = int(os.getenv('LLM_CONTEXT_MAX_MESSAGES', '50'))  # loaded on cache miss
+LLM_CONTEXT_SUMMARIZE = os.getenv('LLM_CONTEXT_SUMMARIZE', 'False') == 'True'  # summarize trimmed turns
+LLM_CONTEXT_CACHE_TIMEOUT = int(os.getenv('LLM_CONTEXT_CACHE_TIMEOUT', '3600'))  # seconds
 
 TTS_VOICE_NAME = os.getenv('TTS_VOICE_NAME', 'de_DE/thorsten/medium')
 TTS_MODEL_PATH = os.getenv('TTS_MODEL_PATH', '')
+# Extra voices loaded into the resident Piper engine at warm-up (comma-separated)
+TTS_PRELOAD_VOICES = [v for v in os.getenv('TTS_PRELOAD_VOICES', '').split(',') if v]
+TTS_STREAM_WORKERS = int(os.getenv('TTS_STREAM_WORKERS', '2'))  # sentences synthesized in parallel
+
+# Warm-up at process start (WSGI/ASGI entry points): load models and run a tiny
+# inference so the first request is not a cold start. Every server process loads
+# its own models, so it is opt-in; ASR is skipped when ASR_WORKER_ADDRESS is set.
+# /api/health/ready/ returns 503 until it has finished, and with WARMUP_STRICT
+# also while a service failed to warm up.
+WARMUP_ON_START = os.getenv('WARMUP_ON_START', 'False').lower() == 'true'
+WARMUP_STRICT = os.getenv('WARMUP_STRICT', 'True').lower() == 'true'
+WARMUP_SERVICES = [s.strip() for s in os.getenv('WARMUP_SERVICES', 'asr,llm,tts').split(',') if s.strip()]
+
+# Background ASR/TTS jobs (/api/asr/transcribe/async/, /api/tts/synthesize/async/)
+JOB_QUEUE_BACKEND = os.getenv('JOB_QUEUE_BACKEND', 'redis' if REDIS_URL else 'database')  # database or redis
+JOB_REDIS_URL = os.getenv('JOB_REDIS_URL', REDIS_URL)
+# Jobs run in separate worker processes (python manage.py run_job_workers). Worker
+# threads inside each web process (JOB_WORKERS > 0) are meant for development only:
+# inference then ties up the web workers again
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '0'))
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '1.0'))  # seconds between checks when idle
+JOB_TIMEOUT = int(os.getenv('JOB_TIMEOUT', '900'))  # running jobs older than this are requeued
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+JOB_MAX_QUEUED_PER_USER = int(os.getenv('JOB_MAX_QUEUED_PER_USER', '20'))
+JOB_EVENTS_TIMEOUT = int(os.getenv('JOB_EVENTS_TIMEOUT', '90'))  # max length of a job event stream (capped at 100 s)
 
 SESSION_TIMEOUT = int(os.getenv('SESSION_TIMEOUT', '3600'))
 MAX_AUDIO_SIZE = int(os.getenv('MAX_AUDIO_SIZE', '10485760'))  # 10MB
@@ -0,0 +1,161 @@
+"""
+Security telemetry for LoggingMiddleware.
+
+The request path only does cheap checks: status code comparisons and one
+precompiled regex over the query string and bodies that were already read
+and are small. Anything found becomes an event; failed-auth counting
+(atomic cache increments) and logging happen on a background thread, so
+they add no latency to the response.
+"""
+
+import logging
+import queue
+import re
+import threading
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import unquote_plus
+
+from django.core.cache import cache
+
+security_logger = logging.getLogger('security')
+
+SUSPICIOUS_PATTERNS = ['union select', 'drop table', ';--', 'exec(', 'script>']
+SUSPICIOUS_RE = re.compile('|'.join(re.escape(p) for p in SUSPICIOUS_PATTERNS), re.IGNORECASE)
+
+# Only bodies of these types are scanned, never multipart uploads
+SCANNED_CONTENT_TYPES = ('application/x-www-form-urlencoded', 'application/json')
+
+FAILED_AUTH_WINDOW = 3600  # seconds
+FAILED_AUTH_THRESHOLD = 5
+
+
+@dataclass
+class SecurityEvent:
+    """Something suspicious seen on a request."""
+    kind: str  # failed_auth, rate_limited, invalid_upload, injection
+    ip_address: str
+    path: str
+    username: Optional[str] = None
+    correlation_id: str = 'N/A'
+    pattern: Optional[str] = None
+
+
+def find_suspicious_pattern(request, max_body: int) -> Optional[str]:
+    """
+    Return the first suspicious pattern in the request, if any.
+    
+    Scans the query string and, when the body has already been read by the
+    view (never forcing a read or multipart parsing), bodies of form/JSON
+    requests up to ``max_body`` bytes.
+    """
+    query_string = request.META.get('QUERY_STRING', '')
+    if query_string:
+        match = SUSPICIOUS_RE.search(unquote_plus(query_string))
+        if match:
+            return match.group(0).lower()
+    
+    body = getattr(request, '_body', None)
+    if not body or len(body) > max_body:
+        return None
+    content_type = request.META.get('CONTENT_TYPE', '')
+    if not content_type.startswith(SCANNED_CONTENT_TYPES):
+        return None
+    text = body.decode('utf-8', 'replace')
+    if content_type.startswith('application/x-www-form-urlencoded'):
+        text = unquote_plus(text)
+    match = SUSPICIOUS_RE.search(text)
+    return match.group(0).lower() if match else None
+
+
+def increment_failed_auth(ip_address: str) -> int:
+    """Count a failed authentication for an IP (atomic across processes)."""
+    key = f'failed_auth_{ip_address}'
+    cache.add(key, 0, FAILED_AUTH_WINDOW)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.add(key, 1, FAILED_AUTH_WINDOW)
+        return 1
+
+
+def handle_event(event: SecurityEvent):
+    """Count and log a security event."""
+    extra = {'correlation_id': event.correlation_id, 'ip_address': event.ip_address}
+    user = event.username or 'Anonymous'
+    
+    if event.kind == 'failed_auth':
+        failed_count = increment_failed_auth(event.ip_address)
+        if failed_count >= FAILED_AUTH_THRESHOLD:
+            security_logger.warning(
+                f"[{event.correlation_id}] Suspicious activity: Multiple failed auth attempts - "
+                f"IP: {event.ip_address}, Count: {failed_count}, Path: {event.path}",
+                extra=extra
+            )
+    elif event.kind == 'rate_limited':
+        security_logger.warning(
+            f"[{event.correlation_id}] Rate limit exceeded - IP: {event.ip_address}, "
+            f"User: {user}, Path: {event.path}",
+            extra=extra
+        )
+    elif event.kind == 'invalid_upload':
+        security_logger.warning(
+            f"Invalid file upload attempt - IP: {event.ip_address}, User: {user}"
+        )
+    elif event.kind == 'injection':
+        security_logger.error(
+            f"Potential SQL injection attempt - IP: {event.ip_address}, "
+            f"User: {user}, Pattern: {event.pattern}, Path: {event.path}"
+        )
+
+
+class SecurityTelemetry:
+    """Hands security events to a background thread (or handles them inline)."""
+    
+    def __init__(self, run_async: bool = True, max_queue: int = 10000):
+        self.run_async = run_async
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+    
+    def submit(self, event: SecurityEvent):
+        """Record an event without blocking the request."""
+        if not self.run_async:
+            self._handle(event)
+            return
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # Never slow requests down; drops are counted instead
+            self.dropped += 1
+    
+    def drain(self):
+        """Wait until queued events are handled (tests, shutdown)."""
+        if self._thread is not None:
+            self._queue.join()
+    
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='security-telemetry', daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            try:
+                self._handle(event)
+            finally:
+                self._queue.task_done()
+    
+    @staticmethod
+    def _handle(event: SecurityEvent):
+        try:
+            handle_event(event)
+        except Exception as e:
+            security_logger.error(f"Failed to handle security event {event.kind}: {e}")
@@ -31,3 +31,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aigolos.settings')
 
 application = get_wsgi_application()
+
+# Load models in the background so the first request is not a cold start
+from django.conf import settings  # noqa: E402
+
+if settings.WARMUP_ON_START:
+    from core.services.warmup import start_warmup
+    start_warmup()
@@ -3,14 +3,14 @@ Admin configuration for ASR app.
 """
 
 from django.contrib import admin
-from .models import Transcription
+from .models import Transcription, TranscriptionSegment
 
 
 @admin.register(Transcription)
 class TranscriptionAdmin(admin.ModelAdmin):
     """Admin interface for Transcription model."""
-    list_display = ('user', 'text_preview', 'language', 'created_at')
-    list_filter = ('language', 'created_at')
+    list_display = ('user', 'text_preview', 'language', 'status', 'created_at')
+    list_filter = ('language', 'status', 'created_at')
     search_fields = ('user__username', 'text')
     readonly_fields = ('created_at',)
     ordering = ('-created_at',)
@@ -20,3 +20,11 @@ class TranscriptionAdmin(admin.ModelAdmin):
         return obj.text[:50] + '...' if len(obj.text) > 50 else obj.text
     text_preview.short_description = 'Text'
 
+
+
+@admin.register(TranscriptionSegment)
+class TranscriptionSegmentAdmin(admin.ModelAdmin):
+    """Admin interface for TranscriptionSegment model."""
+    list_display = ('transcription', 'index', 'start', 'end', 'text')
+    search_fields = ('text',)
+    ordering = ('transcription', 'index')
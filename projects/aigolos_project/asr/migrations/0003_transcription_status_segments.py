@@ -0,0 +1,71 @@
+# Generated by Django 4.2.30 on 2026-10-18 00:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("asr", "0002_transcription_trans_user_created_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transcription",
+            name="duration",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="transcription",
+            name="progress",
+            field=models.FloatField(default=1.0),
+        ),
+        migrations.AddField(
+            model_name="transcription",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("processing", "Processing"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                default="completed",
+                max_length=20,
+            ),
+        ),
+        migrations.CreateModel(
+            name="TranscriptionSegment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("index", models.PositiveIntegerField()),
+                ("start", models.FloatField()),
+                ("end", models.FloatField()),
+                ("text", models.TextField()),
+                (
+                    "transcription",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="segments",
+                        to="asr.transcription",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Transcription segment",
+                "verbose_name_plural": "Transcription segments",
+                "db_table": "transcription_segments",
+                "ordering": ["index"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="transcriptionsegment",
+            constraint=models.UniqueConstraint(
+                fields=("transcription", "index"), name="trans_segment_index_uniq"
+            ),
+        ),
+    ]
@@ -12,10 +12,19 @@ logger = logging.getLogger('asr')
 class Transcription(models.Model):
     """Model for storing transcriptions."""
     
+    STATUS_CHOICES = [
+        ('processing', 'Processing'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='transcriptions')
     audio_file = models.FileField(upload_to='transcriptions/')
     text = models.TextField()
     language = models.CharField(max_length=10, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='completed')
+    progress = models.FloatField(default=1.0)
+    duration = models.FloatField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -31,3 +40,25 @@ class Transcription(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.created_at}"
 
+
+
+class TranscriptionSegment(models.Model):
+    """Timestamped segment of a (chunked) transcription."""
+    
+    transcription = models.ForeignKey(Transcription, on_delete=models.CASCADE, related_name='segments')
+    index = models.PositiveIntegerField()
+    start = models.FloatField()
+    end = models.FloatField()
+    text = models.TextField()
+    
+    class Meta:
+        db_table = 'transcription_segments'
+        verbose_name = 'Transcription segment'
+        verbose_name_plural = 'Transcription segments'
+        ordering = ['index']
+        constraints = [
+            models.UniqueConstraint(fields=['transcription', 'index'], name='trans_segment_index_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.transcription_id} [{self.start:.1f}-{self.end:.1f}] {self.text[:50]}"
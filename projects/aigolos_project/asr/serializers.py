@@ -4,7 +4,7 @@ Serializers for ASR app.
 
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
-from .models import Transcription
+from .models import Transcription, TranscriptionSegment
 
 
 class TranscriptionRequestSerializer(serializers.Serializer):
@@ -29,6 +29,15 @@ class TranscriptionSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Transcription
-        fields = ('id', 'text', 'language', 'created_at')
-        read_only_fields = ('id', 'created_at')
+        fields = ('id', 'text', 'language', 'status', 'progress', 'duration', 'created_at')
+        read_only_fields = ('id', 'status', 'progress', 'duration', 'created_at')
+
+
+class TranscriptionSegmentSerializer(serializers.ModelSerializer):
+    """Serializer for TranscriptionSegment model."""
+    
+    class Meta:
+        model = TranscriptionSegment
+        fields = ('index', 'start', 'end', 'text')
+        read_only_fields = fields
 
@@ -9,6 +9,9 @@ app_name = 'asr'
 
 urlpatterns = [
     path('transcribe/', views.transcribe_view, name='transcribe'),
+    path('transcribe/chunked/', views.transcribe_chunked_view, name='transcribe_chunked'),
+    path('transcribe/async/', views.transcribe_async_view, name='transcribe_async'),
+    path('transcriptions/<int:pk>/segments/', views.transcription_segments_view, name='transcription_segments'),
     path('history/', views.TranscriptionListView.as_view(), name='history'),
 ]
 
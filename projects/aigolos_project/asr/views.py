@@ -6,20 +6,25 @@ import logging
 from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from django.core.files.base import ContentFile
 from django.core.exceptions import ValidationError
 from django.core.cache import cache
 from core.services import asr_service
 from core.validators import validate_audio_file
-from core.throttles import ASRThrottle
-from core.exceptions import ASRServiceError
-from core.view_services import ASRViewService
+from core.throttles import ASRThrottle, JobSubmitThrottle
+from core.exceptions import ASRServiceError, JobQueueFullError
+from core.serializers import JobSerializer, TranscriptionJobRequestSerializer
+from core.view_services import ASRViewService, JobViewService
 from core.base_views import BaseAPIViewMixin
 from core.filters import TranscriptionFilter
 from .models import Transcription
-from .serializers import TranscriptionSerializer, TranscriptionRequestSerializer
+from .serializers import (
+    TranscriptionSerializer,
+    TranscriptionRequestSerializer,
+    TranscriptionSegmentSerializer,
+)
 
 logger = logging.getLogger('asr')
 
@@ -88,14 +93,134 @@ def transcribe_view(request):
         return BaseAPIViewMixin().handle_generic_error(e, "Internal server error")
 
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+@throttle_classes([ASRThrottle])
+def transcribe_chunked_view(request):
+    """
+    Start chunked transcription of long audio.
+    
+    Returns immediately (202) with the transcription id; poll
+    ``transcriptions/<id>/segments/`` for progress and partial segments.
+    
+    Rate limited to 20 requests per hour per user.
+    """
+    try:
+        if 'audio' not in request.FILES:
+            return Response(
+                {'error': 'No audio file provided.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        request_serializer = TranscriptionRequestSerializer(data=request.data)
+        if not request_serializer.is_valid():
+            return Response(
+                request_serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        transcription = ASRViewService.start_chunked_transcription(
+            user=request.user,
+            audio_file=request.FILES['audio'],
+            language=request_serializer.validated_data.get('language')
+        )
+        
+        serializer = TranscriptionSerializer(transcription)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+        
+    except JobQueueFullError as e:
+        return Response({'error': str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    except ValidationError as e:
+        return BaseAPIViewMixin().handle_validation_error({'error': str(e)})
+    except Exception as e:
+        return BaseAPIViewMixin().handle_generic_error(e, "Internal server error")
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+@throttle_classes([JobSubmitThrottle])
+def transcribe_async_view(request):
+    """
+    Queue transcription as a background job.
+    
+    Returns immediately (202) with the job; poll ``/api/jobs/<id>/`` or
+    subscribe to ``/api/jobs/<id>/events/`` for the result.
+    
+    Rate limited to 200 requests per hour per user.
+    """
+    try:
+        if 'audio' not in request.FILES:
+            return Response(
+                {'error': 'No audio file provided.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        request_serializer = TranscriptionJobRequestSerializer(data=request.data, context={'request': request})
+        if not request_serializer.is_valid():
+            return Response(
+                request_serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        job = JobViewService.submit_transcription(
+            user=request.user,
+            audio_file=request.FILES['audio'],
+            language=request_serializer.validated_data.get('language'),
+            priority=request_serializer.validated_data['priority']
+        )
+        
+        serializer = JobSerializer(job, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+        
+    except JobQueueFullError as e:
+        return Response({'error': str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    except ValidationError as e:
+        return BaseAPIViewMixin().handle_validation_error({'error': str(e)})
+    except Exception as e:
+        return BaseAPIViewMixin().handle_generic_error(e, "Internal server error")
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def transcription_segments_view(request, pk):
+    """
+    Get progress and segments of a transcription.
+    
+    Pass ``?after=<index>`` to receive only segments newer than the last one
+    already seen.
+    """
+    transcription = Transcription.objects.filter(id=pk, user=request.user).first()
+    if not transcription:
+        return Response(
+            {'error': 'Transcription not found.'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    try:
+        after = int(request.query_params.get('after', -1))
+    except ValueError:
+        return Response(
+            {'error': 'after must be an integer.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    segments = transcription.segments.filter(index__gt=after)
+    return Response({
+        'id': transcription.id,
+        'status': transcription.status,
+        'progress': transcription.progress,
+        'language': transcription.language,
+        'segments': TranscriptionSegmentSerializer(segments, many=True).data,
+    })
+
+
 class TranscriptionListView(generics.ListAPIView):
     """List user transcriptions with filtering, searching, and sorting."""
     serializer_class = TranscriptionSerializer
     permission_classes = [permissions.IsAuthenticated]
     throttle_classes = [ASRThrottle]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]  # `search` uses the full-text index
     filterset_class = TranscriptionFilter
-    search_fields = ['text', 'language']
     ordering_fields = ['created_at', 'language']
     ordering = ['-created_at']  # Default ordering
     
@@ -0,0 +1,285 @@
+"""
+Benchmark: API latency and throughput under concurrent load.
+
+Drives the transcribe, chat and synthesize endpoints and the history lists
+through the full Django stack in-process (middleware, auth, throttling, ORM,
+storage), with stub ASR/TTS models and a fake Ollama server simulating model
+latency (``benchmarks.stubs``). Each endpoint gets ``--requests`` requests from
+``--concurrency`` threads, one user each, against a scratch SQLite database.
+Reports p50/p95/p99 latency, requests per second, errors and SQL queries per
+request. Results can be saved as JSON and compared with an earlier run.
+
+Usage:
+    python -m benchmarks.api_load [--requests 200] [--concurrency 8] \
+        [--asr-latency 0.2] [--llm-token-delay 0.01] [--tts-latency 0.1] \
+        [--endpoints chat,conversations] [--output results.json] \
+        [--compare baseline.json]
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aigolos.settings')
+
+from django.conf import settings  # noqa: E402
+
+# Never touch the project database or media: use scratch copies
+WORKDIR = Path(tempfile.mkdtemp(prefix='api_bench_'))
+settings.DATABASES['default'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': str(WORKDIR / 'bench.sqlite3'),
+    'OPTIONS': {'timeout': 30},
+}
+settings.MEDIA_ROOT = str(WORKDIR / 'media')
+settings.DEBUG = False
+settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+# Keep throttles in the request path, with rates the benchmark cannot reach
+settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] = {
+    scope: '1000000/hour' for scope in settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+}
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.files.uploadedfile import SimpleUploadedFile  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from asr.models import Transcription  # noqa: E402
+from benchmarks import stubs  # noqa: E402
+from core.throttles import ASRThrottle, LLMThrottle, TTSThrottle  # noqa: E402
+from llm.models import Conversation, Message  # noqa: E402
+
+User = get_user_model()
+
+for throttle in (ASRThrottle, LLMThrottle, TTSThrottle):
+    throttle.rate = '1000000/hour'
+
+TEXT = "The quick brown fox jumps over the lazy dog. " * 4
+
+
+class Worker:
+    """One simulated user: a logged-in client and the conversation it chats in."""
+    
+    def __init__(self, user):
+        self.user = user
+        self.client = Client()
+        self.client.force_login(user)
+        self.conversation_id = None
+        self.sequence = 0
+
+
+def transcribe(worker: Worker):
+    audio = stubs.make_wav(1.0, seed=worker.user.id * 100000 + worker.sequence)
+    return worker.client.post('/api/asr/transcribe/', {
+        'audio': SimpleUploadedFile('bench.wav', audio, content_type='audio/wav'),
+        'language': 'en',
+    })
+
+
+def chat(worker: Worker):
+    data = {'message': f'Benchmark question number {worker.sequence}?'}
+    if worker.conversation_id:
+        data['conversation_id'] = worker.conversation_id
+    response = worker.client.post('/api/llm/chat/', data, content_type='application/json')
+    if response.status_code == 200:
+        worker.conversation_id = response.json()['conversation_id']
+    return response
+
+
+def synthesize(worker: Worker):
+    return worker.client.post(
+        '/api/tts/synthesize/',
+        {'text': f'Benchmark sentence number {worker.sequence} for speech.'},
+        content_type='application/json'
+    )
+
+
+def transcriptions(worker: Worker):
+    return worker.client.get('/api/asr/history/')
+
+
+def conversations(worker: Worker):
+    return worker.client.get('/api/llm/conversations/')
+
+
+ENDPOINTS = {
+    'transcribe': transcribe,
+    'chat': chat,
+    'synthesize': synthesize,
+    'transcriptions': transcriptions,
+    'conversations': conversations,
+}
+
+
+def seed(users: int, rows: int, messages: int):
+    """Create one user per worker with history rows for the list endpoints."""
+    call_command('migrate', verbosity=0)
+    created = []
+    for u in range(users):
+        user = User.objects.create(username=f'bench{u}', email=f'bench{u}@example.com')
+        Transcription.objects.bulk_create(
+            [Transcription(user=user, audio_file='transcriptions/bench.wav', text=TEXT, language='en')
+             for _ in range(rows)],
+            batch_size=1000
+        )
+        convs = Conversation.objects.bulk_create(
+            [Conversation(user=user, title=f'Conversation {c}') for c in range(rows)],
+            batch_size=1000
+        )
+        Message.objects.bulk_create(
+            [Message(conversation=conv, role='user' if m % 2 == 0 else 'assistant', content=TEXT)
+             for conv in convs for m in range(messages)],
+            batch_size=1000
+        )
+        created.append(user)
+    return created
+
+
+def percentile(samples, p: float) -> float:
+    """Nearest-rank percentile of sorted samples."""
+    if not samples:
+        return 0.0
+    return samples[max(0, math.ceil(p / 100 * len(samples)) - 1)]
+
+
+def run_endpoint(name: str, workers, requests: int) -> dict:
+    """Send ``requests`` requests spread over the workers; return latency stats."""
+    request = ENDPOINTS[name]
+    latencies, queries, errors = [], [], []
+    lock = threading.Lock()
+    
+    def worker_loop(worker: Worker, count: int):
+        for _ in range(count):
+            worker.sequence += 1
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = request(worker)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                response.close()
+                elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                queries.append(len(captured))
+                if response.status_code >= 400:
+                    errors.append(response.status_code)
+        connection.close()
+    
+    shares = [requests // len(workers) + (i < requests % len(workers)) for i in range(len(workers))]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(workers)) as pool:
+        for future in [pool.submit(worker_loop, w, n) for w, n in zip(workers, shares) if n]:
+            future.result()
+    wall = time.perf_counter() - started
+    
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'error_statuses': sorted(set(errors)),
+        'rps': round(len(latencies) / wall, 2),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else 0.0,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_results(results: dict, baseline: dict = None):
+    header = f"{'endpoint':<16} {'req':>6} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8}"
+    if baseline:
+        header += f" {'Δp95':>8} {'Δrps':>8}"
+    print(header)
+    for name, r in results.items():
+        line = (
+            f"{name:<16} {r['requests']:>6} {r['errors']:>5} {r['rps']:>8.1f} "
+            f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['queries_per_request']:>8.1f}"
+        )
+        before = (baseline or {}).get(name)
+        if before:
+            line += f" {change(before['p95_ms'], r['p95_ms']):>8} {change(before['rps'], r['rps']):>8}"
+        print(line)
+
+
+def change(before: float, after: float) -> str:
+    if not before:
+        return '-'
+    return f"{(after - before) / before * 100:+.0f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients (one user each)')
+    parser.add_argument('--endpoints', type=str, default=','.join(ENDPOINTS))
+    parser.add_argument('--asr-latency', type=float, default=0.2, help='Seconds per transcription')
+    parser.add_argument('--llm-token-delay', type=float, default=0.01, help='Seconds per generated token')
+    parser.add_argument('--tts-latency', type=float, default=0.1, help='Seconds per synthesis')
+    parser.add_argument('--rows', type=int, default=200, help='History rows per user (list endpoints)')
+    parser.add_argument('--messages', type=int, default=10, help='Messages per seeded conversation')
+    parser.add_argument('--output', type=str, help='Write results to this JSON file')
+    parser.add_argument('--compare', type=str, help='JSON results of an earlier run to compare with')
+    args = parser.parse_args()
+    
+    names = [name.strip() for name in args.endpoints.split(',') if name.strip()]
+    unknown = set(names) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+    
+    # Request logs would swamp the table (and the log files)
+    logging.disable(logging.INFO)
+    ollama = stubs.install(args.asr_latency, args.llm_token_delay, args.tts_latency)
+    try:
+        users = seed(args.concurrency, args.rows, args.messages)
+        workers = [Worker(user) for user in users]
+        results = {name: run_endpoint(name, workers, args.requests) for name in names}
+    finally:
+        ollama.stop()
+        shutil.rmtree(WORKDIR, ignore_errors=True)
+    
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    print_results(results, baseline)
+    
+    if args.output:
+        report = {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'config': vars(args),
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: temp-file vs in-memory audio path in ASRService.transcribe.
+
+Compares the old path (read upload into bytes, write NamedTemporaryFile,
+decode from disk, unlink) with the new one (decode straight from the upload's
+file handle) on synthetic 1, 10 and 60 minute clips. Model inference is
+excluded so only the audio handling cost is measured.
+
+Usage:
+    python -m benchmarks.asr_audio_path [--minutes 1 10 60] [--repeat 3]
+"""
+
+import argparse
+import io
+import math
+import os
+import struct
+import tempfile
+import time
+import tracemalloc
+import wave
+from pathlib import Path
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aigolos.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from core.services.asr_service import decode_audio  # noqa: E402
+
+
+def make_clip(minutes: float, rate: int = 16000) -> bytes:
+    """Build a mono 16-bit WAV clip with a 440 Hz tone."""
+    period = [int(8000 * math.sin(2 * math.pi * 440 * i / rate)) for i in range(rate)]
+    second = struct.pack(f'<{rate}h', *period)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(second * int(minutes * 60))
+    return buffer.getvalue()
+
+
+def old_path(upload: io.BytesIO):
+    """Baseline: copy upload to bytes, write a temp file, decode from disk."""
+    audio_data = upload.read()
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
+        tmp_file.write(audio_data)
+        tmp_path = tmp_file.name
+    try:
+        with open(tmp_path, 'rb') as f:
+            return decode_audio(f)
+    finally:
+        Path(tmp_path).unlink(missing_ok=True)
+
+
+def new_path(upload: io.BytesIO):
+    """In-memory: decode straight from the upload handle."""
+    return decode_audio(upload)
+
+
+def measure(func, clip: bytes, repeat: int):
+    """Return (best seconds, peak traced MB) for func over fresh uploads."""
+    best = float('inf')
+    for _ in range(repeat):
+        upload = io.BytesIO(clip)
+        start = time.perf_counter()
+        func(upload)
+        best = min(best, time.perf_counter() - start)
+    
+    tracemalloc.start()
+    func(io.BytesIO(clip))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--minutes', type=float, nargs='+', default=[1, 10, 60])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    print(f"{'clip':>8} {'size MB':>8} {'old s':>8} {'new s':>8} {'old MB':>8} {'new MB':>8} {'speedup':>8}")
+    for minutes in args.minutes:
+        clip = make_clip(minutes)
+        old_time, old_peak = measure(old_path, clip, args.repeat)
+        new_time, new_peak = measure(new_path, clip, args.repeat)
+        print(
+            f"{minutes:>6g}m {len(clip) / 1024 / 1024:>8.1f} {old_time:>8.3f} {new_time:>8.3f} "
+            f"{old_peak:>8.1f} {new_peak:>8.1f} {old_time / new_time:>7.2f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
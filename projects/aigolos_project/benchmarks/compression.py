@@ -0,0 +1,97 @@
+"""
+Benchmark: CPU cost of response compression per MB.
+
+Compares the former middleware path (``gzip.compress`` at its default level 9)
+with the codecs used by CompressionMiddleware at their configured levels
+(gzip, and br/zstd if installed), plus the cached path for repeated template
+output. Payloads are a JSON transcription list and an HTML page.
+
+Usage:
+    python -m benchmarks.compression [--size-kb 64 512] [--repeat 20]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aigolos.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from aigolos.compression import CompressedCache, load_codecs  # noqa: E402
+
+
+def json_payload(size_kb: int) -> bytes:
+    items = []
+    body = b''
+    while len(body) < size_kb * 1024:
+        index = len(items)
+        items.append({
+            'id': index,
+            'text': f"Transcription number {index}: the meeting covered budget item {index % 17}.",
+            'language': 'en',
+            'created_at': f'2025-11-{index % 28 + 1:02d}T10:{index % 60:02d}:00Z',
+        })
+        if index % 100 == 0:
+            body = json.dumps({'count': len(items), 'results': items}).encode()
+    return json.dumps({'count': len(items), 'results': items}).encode()
+
+
+def html_payload(size_kb: int) -> bytes:
+    row = '<tr><td class="id">{0}</td><td class="text">Conversation {0}</td><td>2025-11-08</td></tr>\n'
+    rows = []
+    while sum(map(len, rows)) < size_kb * 1024:
+        rows.append(row.format(len(rows)))
+    return f"<html><body><table>{''.join(rows)}</table></body></html>".encode()
+
+
+def cpu_per_mb(func, payload: bytes, repeat: int):
+    """Return (CPU ms per MB of input, compressed size ratio)."""
+    start = time.process_time()
+    for _ in range(repeat):
+        output = func(payload)
+    elapsed = time.process_time() - start
+    mb = len(payload) * repeat / 1024 / 1024
+    return elapsed * 1000 / mb, len(output) / len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size-kb', type=int, nargs='+', default=[64, 512])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    
+    codecs = load_codecs(settings.COMPRESSION_ENCODINGS, settings.COMPRESSION_LEVELS)
+    cache = CompressedCache()
+    
+    def cached_gzip(payload):
+        key = cache.key('gzip', payload)
+        value = cache.get(key)
+        if value is None:
+            value = codecs['gzip'].compress(payload)
+            cache.set(key, value)
+        return value
+    
+    candidates = [('gzip -9 (old)', gzip.compress)]
+    candidates += [
+        (f'{name} level {codec.level}', codec.compress) for name, codec in codecs.items()
+    ]
+    candidates.append(('gzip cached (html)', cached_gzip))
+    
+    print(f"{'payload':<14} {'codec':<22} {'CPU ms/MB':>10} {'ratio':>7}")
+    for size_kb in args.size_kb:
+        for kind, payload in (('json', json_payload(size_kb)), ('html', html_payload(size_kb))):
+            for name, func in candidates:
+                if 'cached' in name and kind != 'html':
+                    continue
+                ms, ratio = cpu_per_mb(func, payload, args.repeat)
+                print(f"{kind} {size_kb:>5}KB   {name:<22} {ms:>10.2f} {ratio:>7.3f}")
+
+
+if __name__ == '__main__':
+    main()
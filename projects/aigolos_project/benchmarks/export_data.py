@@ -0,0 +1,156 @@
+"""
+Benchmark: list-building vs streaming export_data.
+
+Generates a dataset in a temporary SQLite database, then exports it with the
+old exporter (full lists per user, ``json.dump(indent=2)``, users in series)
+and with the streaming exporter, serially and across a process pool. Reports
+wall time and peak traced memory of the exporting process (pool workers are
+separate processes, so only their wall time is shown).
+
+Usage:
+    python -m benchmarks.export_data [--users 20] [--transcriptions 2000] \
+        [--conversations 200] [--messages 20] [--workers 4]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from io import StringIO
+from pathlib import Path
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aigolos.settings')
+
+from django.conf import settings  # noqa: E402
+
+# Never touch the project database: point the default connection at a scratch file
+WORKDIR = Path(tempfile.mkdtemp(prefix='export_bench_'))
+settings.DATABASES['default'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': str(WORKDIR / 'bench.sqlite3'),
+}
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from asr.models import Transcription  # noqa: E402
+from llm.models import Conversation, Message  # noqa: E402
+from tts.models import Synthesis  # noqa: E402
+
+User = get_user_model()
+
+TEXT = "The quick brown fox jumps over the lazy dog. " * 6
+
+
+def generate(users: int, transcriptions: int, conversations: int, messages: int):
+    """Fill the scratch database (bulk inserts, no signals)."""
+    call_command('migrate', verbosity=0)
+    for u in range(users):
+        user = User.objects.create(username=f'bench{u}', email=f'bench{u}@example.com')
+        Transcription.objects.bulk_create(
+            [Transcription(user=user, audio_file='transcriptions/bench.wav', text=TEXT, language='en')
+             for _ in range(transcriptions)],
+            batch_size=1000
+        )
+        Synthesis.objects.bulk_create(
+            [Synthesis(user=user, text=TEXT, voice='bench') for _ in range(transcriptions // 10)],
+            batch_size=1000
+        )
+        convs = Conversation.objects.bulk_create(
+            [Conversation(user=user, title=f'Conversation {c}') for c in range(conversations)],
+            batch_size=1000
+        )
+        Message.objects.bulk_create(
+            [Message(conversation=conv, role='user' if m % 2 == 0 else 'assistant', content=TEXT)
+             for conv in convs for m in range(messages)],
+            batch_size=1000
+        )
+
+
+def legacy_export(output_dir: Path):
+    """Baseline: the former exporter - full lists per user, indented json.dump, serial."""
+    for user in User.objects.all():
+        user_dir = output_dir / user.username
+        user_dir.mkdir(parents=True, exist_ok=True)
+        trans_data = [
+            {'id': t.id, 'text': t.text, 'language': t.language, 'created_at': t.created_at.isoformat()}
+            for t in Transcription.objects.filter(user=user)
+        ]
+        with open(user_dir / 'transcriptions.json', 'w', encoding='utf-8') as f:
+            json.dump(trans_data, f, indent=2, ensure_ascii=False)
+        conv_data = [
+            {
+                'id': c.id,
+                'title': c.title,
+                'messages': [
+                    {'role': m.role, 'content': m.content, 'created_at': m.created_at.isoformat()}
+                    for m in c.messages.all()
+                ],
+                'created_at': c.created_at.isoformat(),
+                'updated_at': c.updated_at.isoformat(),
+            }
+            for c in Conversation.objects.filter(user=user).prefetch_related('messages')
+        ]
+        with open(user_dir / 'conversations.json', 'w', encoding='utf-8') as f:
+            json.dump(conv_data, f, indent=2, ensure_ascii=False)
+        synth_data = [
+            {'id': s.id, 'text': s.text, 'voice': s.voice, 'created_at': s.created_at.isoformat()}
+            for s in Synthesis.objects.filter(user=user)
+        ]
+        with open(user_dir / 'syntheses.json', 'w', encoding='utf-8') as f:
+            json.dump(synth_data, f, indent=2, ensure_ascii=False)
+
+
+def streaming_export(output_dir: Path, workers: int = 1, **options):
+    call_command('export_data', output=str(output_dir), workers=workers, stdout=StringIO(), **options)
+
+
+def measure(name: str, func, trace: bool = True):
+    """Run func into a fresh directory; print seconds, peak MB and output size."""
+    output_dir = WORKDIR / name
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    func(output_dir)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024 if trace else None
+    if trace:
+        tracemalloc.stop()
+    size = sum(p.stat().st_size for p in output_dir.rglob('*') if p.is_file()) / 1024 / 1024
+    peak_text = f"{peak:>8.1f}" if peak is not None else f"{'-':>8}"
+    print(f"{name:<24} {elapsed:>8.2f} {peak_text} {size:>9.1f}")
+    shutil.rmtree(output_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--transcriptions', type=int, default=2000)
+    parser.add_argument('--conversations', type=int, default=200)
+    parser.add_argument('--messages', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    
+    try:
+        generate(args.users, args.transcriptions, args.conversations, args.messages)
+        print(f"{'exporter':<24} {'s':>8} {'peak MB':>8} {'output MB':>9}")
+        measure('legacy', legacy_export)
+        measure('streaming json', streaming_export)
+        measure('streaming jsonl+gzip', lambda d: streaming_export(d, format='jsonl', compress='gzip'))
+        measure(
+            f'streaming x{args.workers} workers',
+            lambda d: streaming_export(d, workers=args.workers),
+            trace=False
+        )
+    finally:
+        shutil.rmtree(WORKDIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
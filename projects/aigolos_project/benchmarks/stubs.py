@@ -0,0 +1,81 @@
+"""
+Stub model backends for benchmarks.
+
+Replace the ASR and TTS models with stand-ins that only sleep for a
+configurable latency, so benchmarks measure the web stack (views, ORM,
+caching, storage) with realistic model wait times but without GPUs or model
+downloads. The LLM is served by the fake Ollama server, so requests still go
+through the HTTP client, concurrency limits and retries.
+"""
+
+import struct
+import time
+from typing import Optional
+
+from tests.fakes.ollama import FakeOllamaServer
+
+SAMPLE_RATE = 16000
+
+
+def make_wav(seconds: float = 1.0, seed: int = 0) -> bytes:
+    """Mono 16-bit WAV; ``seed`` varies the samples so result caches miss."""
+    frames = int(seconds * SAMPLE_RATE)
+    samples = struct.pack(f'<{frames}h', *((seed * 7919 + i * 31) % 2048 - 1024 for i in range(frames)))
+    return (
+        b'RIFF' + struct.pack('<I', 36 + len(samples)) + b'WAVE'
+        + b'fmt ' + struct.pack('<IHHIIHH', 16, 1, 1, SAMPLE_RATE, SAMPLE_RATE * 2, 2, 16)
+        + b'data' + struct.pack('<I', len(samples)) + samples
+    )
+
+
+class StubASR:
+    """Whisper stand-in: fixed latency plus a per-second-of-audio cost."""
+    
+    def __init__(self, latency: float = 0.2, per_second: float = 0.0):
+        self.latency = latency
+        self.per_second = per_second
+    
+    def transcribe(self, audio_data, language: Optional[str] = None):
+        if not isinstance(audio_data, (bytes, bytearray)):
+            audio_data = audio_data.read()
+        seconds = max(0, len(audio_data) - 44) / (SAMPLE_RATE * 2)
+        time.sleep(self.latency + self.per_second * seconds)
+        return 'stub transcription of the benchmark audio', language or 'en'
+
+
+class StubTTS:
+    """Piper stand-in: fixed latency plus a per-character cost, returns silence."""
+    
+    def __init__(self, latency: float = 0.1, per_char: float = 0.0):
+        self.latency = latency
+        self.per_char = per_char
+    
+    def synthesize(self, text: str, voice: Optional[str] = None) -> bytes:
+        time.sleep(self.latency + self.per_char * len(text))
+        return make_wav(0.05 * max(1, len(text.split())))
+
+
+def install(asr_latency: float = 0.2, llm_token_delay: float = 0.01, tts_latency: float = 0.1) -> FakeOllamaServer:
+    """
+    Swap the global services' models for stubs.
+    
+    Returns:
+        The started fake Ollama server (stop it when done)
+    """
+    from core.services import asr_service, llm_service, tts_service
+    
+    asr = StubASR(asr_latency)
+    asr_service._worker_client = None
+    asr_service.transcribe = asr.transcribe
+    
+    tts_service.synthesize = StubTTS(tts_latency).synthesize
+    
+    ollama = FakeOllamaServer(
+        reply="This is a stubbed answer from the benchmark language model.",
+        token_delay=llm_token_delay
+    ).start()
+    llm_service.close()
+    llm_service.base_url = ollama.url
+    llm_service.base_urls = []
+    llm_service._router = None
+    return ollama
@@ -4,6 +4,7 @@ Base view classes for common functionality.
 
 from rest_framework.response import Response
 from rest_framework import status
+from core.exceptions import LLMBusyError
 import logging
 
 logger = logging.getLogger('core')
@@ -14,6 +15,14 @@ class BaseAPIViewMixin:
     
     def handle_service_error(self, error, error_message: str = "Service error"):
         """Handle service errors consistently."""
+        if isinstance(error, LLMBusyError):
+            # Overloaded, not broken: ask the client to retry
+            logger.warning(f"{error_message}: {error}")
+            return Response(
+                {'error': str(error)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': '5'}
+            )
         logger.error(f"{error_message}: {error}", exc_info=True)
         return Response(
             {'error': str(error)},
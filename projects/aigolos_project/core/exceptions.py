@@ -18,11 +18,21 @@ class LLMServiceError(AIGolosException):
     pass
 
 
+class LLMBusyError(LLMServiceError):
+    """Exception raised when no LLM slot frees up within the queue timeout."""
+    pass
+
+
 class TTSServiceError(AIGolosException):
     """Exception raised by TTS service."""
     pass
 
 
+class JobQueueFullError(AIGolosException):
+    """Exception raised when a user has too many queued jobs."""
+    pass
+
+
 class ValidationError(AIGolosException):
     """Exception for validation errors."""
     pass
@@ -6,7 +6,8 @@ from rest_framework import filters
 from django_filters import rest_framework as django_filters
 from django.db import models
 from asr.models import Transcription
-from llm.models import Conversation
+from llm.models import Conversation, Message
+from core.search import get_search_backend
 
 
 class TranscriptionFilter(django_filters.FilterSet):
@@ -22,8 +23,8 @@ class TranscriptionFilter(django_filters.FilterSet):
         fields = ['language', 'created_after', 'created_before', 'search']
     
     def filter_search(self, queryset, name, value):
-        """Search in transcription text."""
-        return queryset.filter(text__icontains=value)
+        """Search in transcription text (full-text index)."""
+        return queryset.filter(id__in=get_search_backend().matching_ids('transcription', value))
 
 
 class ConversationFilter(django_filters.FilterSet):
@@ -41,9 +42,13 @@ class ConversationFilter(django_filters.FilterSet):
         fields = ['title', 'created_after', 'created_before', 'updated_after', 'updated_before', 'search']
     
     def filter_search(self, queryset, name, value):
-        """Search in conversation title and messages."""
+        """Search in conversation title and messages (full-text index)."""
+        # Subquery of matching conversations - no join over all messages, no DISTINCT
+        matching_messages = Message.objects.filter(
+            id__in=get_search_backend().matching_ids('message', value)
+        ).values('conversation_id')
         return queryset.filter(
             models.Q(title__icontains=value) |
-            models.Q(messages__content__icontains=value)
-        ).distinct()
+            models.Q(id__in=matching_messages)
+        )
 
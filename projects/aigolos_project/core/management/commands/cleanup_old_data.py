@@ -5,9 +5,7 @@ Management command to clean up old transcriptions, conversations, and syntheses.
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
-from asr.models import Transcription
-from llm.models import Conversation
-from tts.models import Synthesis
+from core.services.retention_service import RetentionCleaner
 import logging
 
 logger = logging.getLogger('core')
@@ -28,6 +26,24 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be deleted without actually deleting',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows deleted per transaction (default: 1000)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Threads deleting audio files (default: 8)',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.0,
+            help='Seconds to sleep between batches, to limit load during business hours (default: 0)',
+        )
 
     def handle(self, *args, **options):
         days = options['days']
@@ -36,52 +52,30 @@ class Command(BaseCommand):
 
         self.stdout.write(f"Cleaning up records older than {days} days (before {cutoff_date})")
 
-        # Clean up transcriptions
-        transcriptions = Transcription.objects.filter(created_at__lt=cutoff_date)
-        trans_count = transcriptions.count()
-        if dry_run:
-            self.stdout.write(f"Would delete {trans_count} transcriptions")
-        else:
-            # Delete associated files first
-            for trans in transcriptions:
-                try:
-                    if trans.audio_file:
-                        trans.audio_file.delete(save=False)
-                except Exception as e:
-                    logger.warning(f"Failed to delete audio file for transcription {trans.id}: {e}")
-            deleted = transcriptions.delete()[0]
-            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} transcriptions"))
-
-        # Clean up conversations (only empty or very old)
-        conversations = Conversation.objects.filter(
-            created_at__lt=cutoff_date,
-            messages__isnull=True
-        ).distinct()
-        conv_count = conversations.count()
-        if dry_run:
-            self.stdout.write(f"Would delete {conv_count} empty conversations")
-        else:
-            deleted = conversations.delete()[0]
-            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} conversations"))
-
-        # Clean up syntheses
-        syntheses = Synthesis.objects.filter(created_at__lt=cutoff_date)
-        synth_count = syntheses.count()
-        if dry_run:
-            self.stdout.write(f"Would delete {synth_count} syntheses")
-        else:
-            # Delete associated files first
-            for synth in syntheses:
-                try:
-                    if synth.audio_file:
-                        synth.audio_file.delete(save=False)
-                except Exception as e:
-                    logger.warning(f"Failed to delete audio file for synthesis {synth.id}: {e}")
-            deleted = syntheses.delete()[0]
-            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} syntheses"))
+        cleaner = RetentionCleaner(
+            cutoff_date,
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            pause=options['pause']
+        )
 
         if dry_run:
+            self.stdout.write(f"Would delete {cleaner.old_transcriptions().count()} transcriptions")
+            self.stdout.write(f"Would delete {cleaner.old_empty_conversations().count()} empty conversations")
+            self.stdout.write(f"Would delete {cleaner.old_syntheses().count()} syntheses")
             self.stdout.write(self.style.WARNING("Dry run completed. Use without --dry-run to actually delete."))
-        else:
-            self.stdout.write(self.style.SUCCESS("Cleanup completed successfully!"))
+            return
+
+        with cleaner:
+            transcriptions = cleaner.purge_transcriptions()
+            conversations = cleaner.purge_empty_conversations()
+            syntheses = cleaner.purge_syntheses()
 
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {transcriptions.deleted} transcriptions ({transcriptions.files_deleted} audio files)"
+        ))
+        self.stdout.write(self.style.SUCCESS(f"Deleted {conversations.deleted} conversations"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {syntheses.deleted} syntheses ({syntheses.files_deleted} audio files)"
+        ))
+        self.stdout.write(self.style.SUCCESS("Cleanup completed successfully!"))
@@ -2,21 +2,28 @@
 Management command to export user data.
 """
 
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
-from asr.models import Transcription
-from llm.models import Conversation, Message
-from tts.models import Synthesis
-import json
-import csv
+from django.db import connections
+from core.services.export_service import (
+    COMPRESSIONS,
+    DEFAULT_CHUNK_SIZE,
+    FORMATS,
+    ExportCheckpoint,
+    export_user,
+    init_export_worker,
+)
 from pathlib import Path
-from datetime import datetime
+import logging
+
+logger = logging.getLogger('core')
 
 User = get_user_model()
 
 
 class Command(BaseCommand):
-    help = 'Export user data to JSON'
+    help = 'Export user data to JSON, JSON Lines or CSV'
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -33,122 +40,90 @@ class Command(BaseCommand):
         parser.add_argument(
             '--format',
             type=str,
-            choices=['json', 'csv', 'both'],
+            choices=FORMATS,
             default='json',
-            help='Export format: json, csv, or both (default: json)',
+            help='Export format: json, jsonl, csv, or both (json and csv) (default: json)',
+        )
+        parser.add_argument(
+            '--compress',
+            type=str,
+            choices=COMPRESSIONS,
+            default='none',
+            help='Compress files with gzip, or write one zip archive per user (default: none)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of processes exporting users in parallel (default: 1)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Rows fetched per database round trip (default: {DEFAULT_CHUNK_SIZE})',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Skip users finished by a previous run into the same output directory',
         )
 
     def handle(self, *args, **options):
         username = options['username']
         output_dir = Path(options['output'])
-        output_dir.mkdir(exist_ok=True)
+        output_dir.mkdir(parents=True, exist_ok=True)
 
         export_format = options['format']
-        
+        compress = options['compress']
+        chunk_size = options['chunk_size']
+
+        users = User.objects.order_by('id')
         if username:
-            try:
-                user = User.objects.get(username=username)
-                self.export_user_data(user, output_dir, export_format)
-            except User.DoesNotExist:
+            users = users.filter(username=username)
+            if not users.exists():
                 self.stdout.write(self.style.ERROR(f"User '{username}' not found"))
-        else:
-            # Export all users
-            for user in User.objects.all():
-                self.export_user_data(user, output_dir, export_format)
-
-        self.stdout.write(self.style.SUCCESS(f"Export completed to {output_dir}"))
+                return
 
-    def export_user_data(self, user, output_dir, export_format='json'):
-        """Export data for a single user."""
-        user_dir = Path(output_dir) / user.username
-        user_dir.mkdir(parents=True, exist_ok=True)
+        checkpoint = ExportCheckpoint(output_dir, {'format': export_format, 'compress': compress})
+        done = checkpoint.load() if options['resume'] else set()
+        user_ids = [user_id for user_id in users.values_list('id', flat=True) if user_id not in done]
+        if done:
+            self.stdout.write(f"Resuming: {len(done)} users already exported")
 
-        # Export transcriptions
-        transcriptions = Transcription.objects.filter(user=user)
-        trans_data = []
-        for trans in transcriptions:
-            trans_data.append({
-                'id': trans.id,
-                'text': trans.text,
-                'language': trans.language,
-                'created_at': trans.created_at.isoformat(),
-            })
-        
-        # Export transcriptions
-        if export_format in ['json', 'both']:
-            with open(user_dir / 'transcriptions.json', 'w', encoding='utf-8') as f:
-                json.dump(trans_data, f, indent=2, ensure_ascii=False)
-        
-        if export_format in ['csv', 'both']:
-            if trans_data:
-                with open(user_dir / 'transcriptions.csv', 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.DictWriter(f, fieldnames=['id', 'text', 'language', 'created_at'])
-                    writer.writeheader()
-                    writer.writerows(trans_data)
-
-        # Export conversations
-        conversations = Conversation.objects.filter(user=user).prefetch_related('messages')
-        conv_data = []
-        for conv in conversations:
-            messages = []
-            for msg in conv.messages.all():
-                messages.append({
-                    'role': msg.role,
-                    'content': msg.content,
-                    'created_at': msg.created_at.isoformat(),
-                })
-            conv_data.append({
-                'id': conv.id,
-                'title': conv.title,
-                'messages': messages,
-                'created_at': conv.created_at.isoformat(),
-                'updated_at': conv.updated_at.isoformat(),
-            })
-        
-        # Export conversations
-        if export_format in ['json', 'both']:
-            with open(user_dir / 'conversations.json', 'w', encoding='utf-8') as f:
-                json.dump(conv_data, f, indent=2, ensure_ascii=False)
-        
-        if export_format in ['csv', 'both']:
-            if conv_data:
-                # Flatten conversations for CSV
-                csv_data = []
-                for conv in conv_data:
-                    csv_data.append({
-                        'id': conv['id'],
-                        'title': conv['title'],
-                        'message_count': len(conv['messages']),
-                        'created_at': conv['created_at'],
-                        'updated_at': conv['updated_at'],
-                    })
-                with open(user_dir / 'conversations.csv', 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.DictWriter(f, fieldnames=['id', 'title', 'message_count', 'created_at', 'updated_at'])
-                    writer.writeheader()
-                    writer.writerows(csv_data)
+        args = (str(output_dir), export_format, compress, chunk_size)
+        failed = 0
+        if options['workers'] > 1 and len(user_ids) > 1:
+            # Forked workers must not share the parent's database connection
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=init_export_worker) as pool:
+                futures = {pool.submit(export_user, user_id, *args): user_id for user_id in user_ids}
+                for future in as_completed(futures):
+                    failed += not self._finish(checkpoint, futures[future], future.result, export_format)
+        else:
+            for user_id in user_ids:
+                failed += not self._finish(checkpoint, user_id, lambda: export_user(user_id, *args), export_format)
 
-        # Export syntheses
-        syntheses = Synthesis.objects.filter(user=user)
-        synth_data = []
-        for synth in syntheses:
-            synth_data.append({
-                'id': synth.id,
-                'text': synth.text,
-                'voice': synth.voice,
-                'created_at': synth.created_at.isoformat(),
-            })
-        
-        # Export syntheses
-        if export_format in ['json', 'both']:
-            with open(user_dir / 'syntheses.json', 'w', encoding='utf-8') as f:
-                json.dump(synth_data, f, indent=2, ensure_ascii=False)
-        
-        if export_format in ['csv', 'both']:
-            if synth_data:
-                with open(user_dir / 'syntheses.csv', 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.DictWriter(f, fieldnames=['id', 'text', 'voice', 'created_at'])
-                    writer.writeheader()
-                    writer.writerows(synth_data)
+        if failed:
+            self.stdout.write(self.style.ERROR(
+                f"Export of {failed} users failed; run again with --resume to retry them"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Export completed to {output_dir}"))
 
-        self.stdout.write(f"Exported data for user: {user.username} (format: {export_format})")
+    def _finish(self, checkpoint, user_id, result, export_format):
+        """Collect one user's export result and checkpoint it."""
+        try:
+            counts = result()
+        except Exception as e:
+            logger.error(f"Export of user {user_id} failed: {e}", exc_info=True)
+            self.stdout.write(self.style.ERROR(f"Export of user {user_id} failed: {e}"))
+            return False
 
+        checkpoint.mark_done(user_id)
+        self.stdout.write(
+            f"Exported data for user: {counts['username']} (format: {export_format}, "
+            f"{counts['transcriptions']} transcriptions, {counts['conversations']} conversations, "
+            f"{counts['syntheses']} syntheses)"
+        )
+        return True
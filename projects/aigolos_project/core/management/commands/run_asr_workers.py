@@ -0,0 +1,54 @@
+"""
+Management command to run the shared ASR worker pool.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.services.asr_workers import ASRWorkerPool, ASRWorkerServer
+import logging
+
+logger = logging.getLogger('core')
+
+
+class Command(BaseCommand):
+    help = 'Run ASR worker processes that serve transcriptions to web workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--address',
+            type=str,
+            default=settings.ASR_WORKER_ADDRESS or '127.0.0.1:8765',
+            help='host:port or socket path to listen on (default: ASR_WORKER_ADDRESS)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.ASR_WORKERS,
+            help='Number of worker processes, one model per process (default: ASR_WORKERS)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.ASR_BATCH_SIZE,
+            help='Short clips per task while all workers are busy (default: ASR_BATCH_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        pool = ASRWorkerPool(
+            max_workers=options['workers'],
+            batch_size=options['batch_size']
+        )
+        server = ASRWorkerServer(pool, options['address'], settings.ASR_WORKER_AUTHKEY.encode())
+
+        self.stdout.write(self.style.SUCCESS(
+            f"ASR worker pool listening on {options['address']} "
+            f"({options['workers']} workers, batch size {options['batch_size']})"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            pool.shutdown()
+            self.stdout.write("ASR worker pool stopped")
@@ -0,0 +1,49 @@
+"""
+Management command to run background job workers.
+"""
+
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.services.job_queue import RedisJobQueue, get_job_queue
+from core.services.job_workers import JobWorkerPool
+import logging
+
+logger = logging.getLogger('core')
+
+
+class Command(BaseCommand):
+    help = 'Run worker threads that process queued ASR/TTS jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Number of worker threads (default: 2)',
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Re-add all queued jobs to the Redis queue before starting',
+        )
+
+    def handle(self, *args, **options):
+        queue = get_job_queue()
+        if options['rebuild'] and isinstance(queue, RedisJobQueue):
+            self.stdout.write(f"Re-queued {queue.rebuild()} jobs")
+
+        pool = JobWorkerPool(options['workers'], queue).start()
+        self.stdout.write(self.style.SUCCESS(
+            f"Job workers running ({options['workers']} threads, {type(queue).__name__})"
+        ))
+        try:
+            # Periodically requeue jobs whose worker died
+            while True:
+                time.sleep(max(60, settings.JOB_TIMEOUT / 4))
+                pool.requeue_stale()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stdout.write("Stopping job workers (waiting for running jobs)")
+            pool.stop()
@@ -0,0 +1,57 @@
+"""
+Management command to warm up models and report readiness.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from core.services.warmup import FAILED, Warmup, default_steps
+import logging
+
+logger = logging.getLogger('core')
+
+
+class Command(BaseCommand):
+    help = 'Load ASR/LLM/TTS models and run a tiny inference for each (e.g. at image build or before rollout)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--services',
+            type=str,
+            default='',
+            help='Comma-separated services to warm (default: WARMUP_SERVICES)',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=None,
+            help='Give up after this many seconds',
+        )
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            help='Exit with an error if any service fails to warm up',
+        )
+
+    def handle(self, *args, **options):
+        steps = default_steps()
+        if options['services']:
+            wanted = [name.strip() for name in options['services'].split(',') if name.strip()]
+            unknown = set(wanted) - set(steps)
+            if unknown:
+                raise CommandError(f"Unknown or disabled services: {', '.join(sorted(unknown))}")
+            steps = {name: steps[name] for name in wanted}
+
+        warmup = Warmup(steps, strict=False).start()
+        if not warmup.wait(options['timeout']):
+            raise CommandError(f"Warm-up did not finish within {options['timeout']}s")
+
+        failed = []
+        for name, status in warmup.report().items():
+            line = f"{name}: {status['state']} ({status['seconds']}s) {status['detail']}"
+            if status['state'] == FAILED:
+                failed.append(name)
+                self.stdout.write(self.style.WARNING(line))
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
+
+        if failed and options['strict']:
+            raise CommandError(f"Warm-up failed: {', '.join(failed)}")
@@ -1,16 +1,206 @@
 """
 Metrics collection for monitoring.
+
+Request latencies and counters are aggregated in-process (a dict update under
+a lock, about a microsecond per request). A background thread flushes them to
+the ``metrics`` cache every ``METRICS_FLUSH_INTERVAL`` seconds with atomic
+increments (Redis ``INCRBY`` in production), so concurrent workers never
+overwrite each other. Each series is listed for export under its own slot
+key, taken with an atomic increment, so concurrent registrations don't drop
+series either.
+
+Latencies are kept as cumulative histograms, which gives p50/p95/p99 per
+endpoint and is exported in Prometheus text format by ``render_prometheus``.
 """
 
+import atexit
 import logging
+import threading
 import time
-from django.core.cache import cache
+from bisect import bisect_left
+from django.conf import settings
+from django.core.cache import cache, caches
 from django.utils import timezone
 from datetime import timedelta
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 
 logger = logging.getLogger('core')
 
+# Histogram bucket upper bounds in seconds (the last, implicit bucket is +Inf)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Histogram row layout: count, errors, sum (microseconds), then one count per bucket
+_COUNT, _ERRORS, _SUM_US, _BUCKETS = 0, 1, 2, 3
+_HISTOGRAM_FIELDS = ['count', 'errors', 'sum_us'] + [f'b{i}' for i in range(len(LATENCY_BUCKETS) + 1)]
+
+RESULT_CACHE_KINDS = ('asr', 'llm', 'tts')
+
+
+def _metrics_cache():
+    return caches['metrics']
+
+
+def _series_key(name: str, labels: Tuple[str, ...]) -> str:
+    return f"metrics:{name}:{'|'.join(labels)}"
+
+
+def _incr(key: str, value: int) -> int:
+    """Atomically add to a counter in the metrics cache; returns the new value."""
+    metrics_cache = _metrics_cache()
+    metrics_cache.add(key, 0, None)
+    try:
+        return metrics_cache.incr(key, value)
+    except ValueError:
+        # Evicted between add and incr
+        metrics_cache.set(key, value, None)
+        return value
+
+
+class MetricsBuffer:
+    """In-process counters and histograms, flushed to the shared cache periodically."""
+    
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, Tuple[str, ...]], List[int]] = {}
+        self._counters: Dict[Tuple[str, Tuple[str, ...]], int] = {}
+        self._thread = None
+        self._thread_lock = threading.Lock()
+    
+    def observe(self, name: str, labels: Tuple[str, ...], seconds: float, error: bool = False):
+        """Record one observation (e.g. a request duration) in a histogram."""
+        bucket = bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            row = self._histograms.get((name, labels))
+            if row is None:
+                row = self._histograms[(name, labels)] = [0] * len(_HISTOGRAM_FIELDS)
+            row[_COUNT] += 1
+            row[_ERRORS] += error
+            row[_SUM_US] += int(seconds * 1_000_000)
+            row[_BUCKETS + bucket] += 1
+        self._ensure_thread()
+    
+    def increment(self, name: str, labels: Tuple[str, ...], value: int = 1):
+        """Increment a counter."""
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        self._ensure_thread()
+    
+    def _ensure_thread(self):
+        # Not alive in a forked worker either, which starts its own
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='metrics-flush', daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+    
+    def flush(self):
+        """Push buffered values to the metrics cache with atomic increments."""
+        with self._lock:
+            histograms, self._histograms = self._histograms, {}
+            counters, self._counters = self._counters, {}
+        
+        try:
+            for (name, labels), row in histograms.items():
+                key = _series_key(name, labels)
+                for field, value in zip(_HISTOGRAM_FIELDS, row):
+                    if value:
+                        _incr(f'{key}:{field}', value)
+                self._register(name, labels)
+            for (name, labels), value in counters.items():
+                _incr(_series_key(name, labels), value)
+                self._register(name, labels)
+        except Exception as e:
+            logger.warning(f"Failed to flush metrics: {e}")
+    
+    @staticmethod
+    def _register(name: str, labels: Tuple[str, ...]):
+        """
+        List a series for export unless it already is.
+        
+        The series gets the next slot of the metric's index (an atomic
+        increment) and its labels are stored under that slot's own key. Two
+        processes registering the same series at once may both take a slot;
+        readers drop the duplicate. Checked on every flush, so a series whose
+        entry was evicted is listed again.
+        """
+        metrics_cache = _metrics_cache()
+        marker = f'{_series_key(name, labels)}:listed'
+        if metrics_cache.get(marker):
+            return
+        slot = _incr(f'metrics:{name}:series:count', 1)
+        metrics_cache.set(f'metrics:{name}:series:{slot}', list(labels), None)
+        metrics_cache.set(marker, True, None)
+    
+    def reset(self):
+        """Forget buffered values (after clearing the cache)."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+_buffer = MetricsBuffer(settings.METRICS_FLUSH_INTERVAL)
+atexit.register(_buffer.flush)
+
+
+def flush_metrics():
+    """Push this process's buffered metrics to the shared cache."""
+    _buffer.flush()
+
+
+def _read_histogram(name: str, labels: Iterable[str]) -> Optional[Dict[str, int]]:
+    """Read a histogram series from the metrics cache."""
+    key = _series_key(name, tuple(labels))
+    values = _metrics_cache().get_many([f'{key}:{field}' for field in _HISTOGRAM_FIELDS])
+    if not values:
+        return None
+    return {field: values.get(f'{key}:{field}', 0) for field in _HISTOGRAM_FIELDS}
+
+
+def _series(name: str) -> List[Tuple[str, ...]]:
+    """Label tuples of a metric's registered series."""
+    metrics_cache = _metrics_cache()
+    count = metrics_cache.get(f'metrics:{name}:series:count', 0)
+    slots = metrics_cache.get_many([f'metrics:{name}:series:{slot}' for slot in range(1, count + 1)])
+    return list(dict.fromkeys(tuple(labels) for labels in slots.values()))
+
+
+def histogram_quantile(quantile: float, histogram: Dict[str, int]) -> float:
+    """Estimate a quantile from bucket counts (linear within a bucket, like Prometheus)."""
+    total = histogram['count']
+    if not total:
+        return 0.0
+    rank = quantile * total
+    cumulative = 0
+    lower = 0.0
+    for i, upper in enumerate(LATENCY_BUCKETS):
+        in_bucket = histogram[f'b{i}']
+        if cumulative + in_bucket >= rank and in_bucket:
+            return lower + (upper - lower) * (rank - cumulative) / in_bucket
+        cumulative += in_bucket
+        lower = upper
+    return LATENCY_BUCKETS[-1]
+
+
+def _summarize(histogram: Dict[str, int]) -> Dict[str, Any]:
+    count = histogram['count']
+    return {
+        'count': count,
+        'avg_duration': histogram['sum_us'] / 1_000_000 / max(count, 1),
+        'errors': histogram['errors'],
+        'error_rate': histogram['errors'] / max(count, 1),
+        'p50': histogram_quantile(0.5, histogram),
+        'p95': histogram_quantile(0.95, histogram),
+        'p99': histogram_quantile(0.99, histogram),
+    }
+
 
 class MetricsCollector:
     """Collect application metrics."""
@@ -18,36 +208,70 @@ class MetricsCollector:
     @staticmethod
     def record_api_request(endpoint: str, method: str, status_code: int, duration: float):
         """Record API request metrics."""
-        cache_key = f'metrics:api:{endpoint}:{method}'
-        data = cache.get(cache_key, {'count': 0, 'total_duration': 0, 'errors': 0})
-        data['count'] += 1
-        data['total_duration'] += duration
-        if status_code >= 400:
-            data['errors'] += 1
-        cache.set(cache_key, data, 3600)  # 1 hour
+        _buffer.observe('api', (endpoint, method), duration, status_code >= 400)
     
     @staticmethod
     def get_api_metrics(endpoint: str = None, method: str = None) -> Dict[str, Any]:
-        """Get API metrics."""
+        """Get API metrics (count, average, error rate and latency percentiles)."""
         if endpoint and method:
-            cache_key = f'metrics:api:{endpoint}:{method}'
-            data = cache.get(cache_key, {})
-            if data:
-                return {
-                    'count': data.get('count', 0),
-                    'avg_duration': data.get('total_duration', 0) / max(data.get('count', 1), 1),
-                    'errors': data.get('errors', 0),
-                    'error_rate': data.get('errors', 0) / max(data.get('count', 1), 1)
-                }
+            flush_metrics()
+            histogram = _read_histogram('api', (endpoint, method))
+            if histogram:
+                return _summarize(histogram)
         return {}
     
+    @staticmethod
+    def record_cache_event(kind: str, hit: bool):
+        """Record result cache hit or miss."""
+        _buffer.increment('result_cache', (kind, 'hits' if hit else 'misses'))
+    
+    @staticmethod
+    def get_cache_metrics(kind: str) -> Dict[str, Any]:
+        """Get result cache hit/miss metrics."""
+        flush_metrics()
+        metrics_cache = _metrics_cache()
+        hits = metrics_cache.get(_series_key('result_cache', (kind, 'hits')), 0)
+        misses = metrics_cache.get(_series_key('result_cache', (kind, 'misses')), 0)
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / max(hits + misses, 1),
+        }
+    
+    @staticmethod
+    def record_pipeline_timings(timings: Dict[str, float]):
+        """Record per-stage timings of a voice pipeline run."""
+        for stage, seconds in timings.items():
+            _buffer.observe('pipeline', (stage,), seconds)
+    
+    @staticmethod
+    def get_pipeline_metrics() -> Dict[str, Any]:
+        """Get voice pipeline stage timings (average and percentiles)."""
+        flush_metrics()
+        stages = {}
+        for (stage,) in _series('pipeline'):
+            histogram = _read_histogram('pipeline', (stage,))
+            if histogram:
+                summary = _summarize(histogram)
+                stages[stage] = {
+                    key: summary[key] for key in ('avg_duration', 'p50', 'p95', 'p99')
+                }
+        total = _read_histogram('pipeline', ('total',))
+        return {
+            'count': total['count'] if total else 0,
+            'stages': stages,
+        }
+    
     @staticmethod
     def record_user_activity(user_id: int, activity_type: str):
         """Record user activity."""
         today = timezone.now().date()
         cache_key = f'metrics:user:{user_id}:{today}:{activity_type}'
-        count = cache.get(cache_key, 0) + 1
-        cache.set(cache_key, count, 86400)  # 24 hours
+        cache.add(cache_key, 0, 86400)  # 24 hours
+        try:
+            cache.incr(cache_key)
+        except ValueError:
+            cache.set(cache_key, 1, 86400)
     
     @staticmethod
     def get_user_stats(user_id: int) -> Dict[str, Any]:
@@ -59,3 +283,65 @@ class MetricsCollector:
             'syntheses': cache.get(f'metrics:user:{user_id}:{today}:synthesis', 0),
         }
 
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(**labels) -> str:
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + '}'
+
+
+def _render_histogram(lines: List[str], metric: str, labels: Dict[str, str], histogram: Dict[str, int]):
+    cumulative = 0
+    for i, upper in enumerate(LATENCY_BUCKETS):
+        cumulative += histogram[f'b{i}']
+        lines.append(f'{metric}_bucket{_format_labels(**labels, le=upper)} {cumulative}')
+    lines.append(f'{metric}_bucket{_format_labels(**labels, le="+Inf")} {histogram["count"]}')
+    lines.append(f'{metric}_sum{_format_labels(**labels)} {histogram["sum_us"] / 1_000_000}')
+    lines.append(f'{metric}_count{_format_labels(**labels)} {histogram["count"]}')
+
+
+def render_prometheus() -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    flush_metrics()
+    lines = [
+        '# HELP aigolos_http_request_duration_seconds API request latency.',
+        '# TYPE aigolos_http_request_duration_seconds histogram',
+    ]
+    api_series = []
+    for endpoint, method in _series('api'):
+        histogram = _read_histogram('api', (endpoint, method))
+        if histogram:
+            api_series.append(({'endpoint': endpoint, 'method': method}, histogram))
+            _render_histogram(lines, 'aigolos_http_request_duration_seconds',
+                              {'endpoint': endpoint, 'method': method}, histogram)
+    
+    lines += [
+        '# HELP aigolos_http_request_errors_total API responses with status >= 400.',
+        '# TYPE aigolos_http_request_errors_total counter',
+    ]
+    for labels, histogram in api_series:
+        lines.append(f'aigolos_http_request_errors_total{_format_labels(**labels)} {histogram["errors"]}')
+    
+    lines += [
+        '# HELP aigolos_pipeline_stage_seconds Voice pipeline stage timings from request start.',
+        '# TYPE aigolos_pipeline_stage_seconds histogram',
+    ]
+    for (stage,) in _series('pipeline'):
+        histogram = _read_histogram('pipeline', (stage,))
+        if histogram:
+            _render_histogram(lines, 'aigolos_pipeline_stage_seconds', {'stage': stage}, histogram)
+    
+    lines += [
+        '# HELP aigolos_result_cache_requests_total Result cache lookups.',
+        '# TYPE aigolos_result_cache_requests_total counter',
+    ]
+    metrics_cache = _metrics_cache()
+    for kind in RESULT_CACHE_KINDS:
+        for outcome in ('hits', 'misses'):
+            value = metrics_cache.get(_series_key('result_cache', (kind, outcome)), 0)
+            lines.append(
+                f'aigolos_result_cache_requests_total{_format_labels(kind=kind, outcome=outcome)} {value}'
+            )
+    return '\n'.join(lines) + '\n'
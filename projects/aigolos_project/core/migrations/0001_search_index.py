@@ -0,0 +1,52 @@
+"""
+Full-text search indexes (see core/search.py).
+
+PostgreSQL: GIN expression indexes matching the queries of PostgresSearchBackend.
+SQLite: FTS5 tables, backfilled from existing rows.
+"""
+
+from django.db import migrations
+
+from core.search import SEARCH_KINDS, _search_config
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    for kind, spec in SEARCH_KINDS.items():
+        if connection.vendor == "postgresql":
+            schema_editor.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {spec['table']}_search_idx ON {spec['table']} "
+                f"USING GIN (to_tsvector('{_search_config()}', {spec['column']}))"
+            )
+        elif connection.vendor == "sqlite":
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {spec['fts_table']} "
+                f"USING fts5(content, tokenize='unicode61 remove_diacritics 2')"
+            )
+            schema_editor.execute(
+                f"INSERT INTO {spec['fts_table']}(rowid, content) "
+                f"SELECT id, {spec['column']} FROM {spec['table']}"
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    for kind, spec in SEARCH_KINDS.items():
+        if connection.vendor == "postgresql":
+            schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {spec['table']}_search_idx")
+        elif connection.vendor == "sqlite":
+            schema_editor.execute(f"DROP TABLE IF EXISTS {spec['fts_table']}")
+
+
+class Migration(migrations.Migration):
+    # Index builds don't lock the tables for writes on PostgreSQL
+    atomic = False
+    
+    dependencies = [
+        ("asr", "0003_transcription_status_segments"),
+        ("llm", "0002_conversation_conv_user_updated_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
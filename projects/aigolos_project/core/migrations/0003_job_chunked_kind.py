@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 01:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0002_job"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="job",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("transcription", "Transcription"),
+                    ("chunked", "Chunked transcription"),
+                    ("synthesis", "Synthesis"),
+                ],
+                max_length=20,
+            ),
+        ),
+    ]
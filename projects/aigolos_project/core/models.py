@@ -0,0 +1,55 @@
+"""
+Models for core app.
+"""
+
+from django.db import models
+from django.conf import settings
+
+
+class Job(models.Model):
+    """Background ASR/TTS job (see core.services.job_workers)."""
+    
+    KIND_CHOICES = [
+        ('transcription', 'Transcription'),
+        ('chunked', 'Chunked transcription'),
+        ('synthesis', 'Synthesis'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+        ('cancelled', 'Cancelled'),
+    ]
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='jobs')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    priority = models.SmallIntegerField(default=0)  # higher runs first
+    position = models.BigIntegerField(default=0)  # fair-share order within a priority
+    params = models.JSONField(default=dict)
+    result_id = models.PositiveIntegerField(null=True, blank=True)  # Transcription or Synthesis
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'jobs'
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', '-priority', 'position'], name='job_queue_idx'),
+            models.Index(fields=['user', 'status'], name='job_user_status_idx'),
+            models.Index(fields=['user', '-created_at'], name='job_user_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} #{self.id} ({self.status}) - {self.user_id}"
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in ('completed', 'failed', 'cancelled')
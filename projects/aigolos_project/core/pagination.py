@@ -0,0 +1,18 @@
+"""
+Pagination classes for API views.
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class MessageCursorPagination(CursorPagination):
+    """
+    Cursor pagination for conversation messages, newest first.
+    
+    Pages are found with an indexed range query instead of OFFSET, so loading
+    older messages costs the same however long the conversation is.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
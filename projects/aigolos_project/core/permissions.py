@@ -0,0 +1,20 @@
+"""
+Custom permissions for core app.
+"""
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+from rest_framework import permissions
+
+
+class MetricsPermission(permissions.BasePermission):
+    """Allow staff users, or scrapers sending ``METRICS_TOKEN`` as a bearer token."""
+    
+    def has_permission(self, request, view):
+        token = settings.METRICS_TOKEN
+        if token and constant_time_compare(
+            request.META.get('HTTP_AUTHORIZATION', ''),
+            f'Bearer {token}'
+        ):
+            return True
+        return bool(request.user and request.user.is_staff)
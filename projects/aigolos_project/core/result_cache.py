@@ -0,0 +1,203 @@
+"""
+Content-addressed cache for model results and media files.
+
+Results of ASR, TTS and deterministic LLM calls are keyed by a SHA-256 hash of
+the input plus the model parameters, so identical requests from any user are
+served without re-running the model. Entries live in the ``results`` cache
+(LRU-bounded by ``RESULT_CACHE_MAX_ENTRIES``; use Redis ``maxmemory-policy
+allkeys-lru`` in production).
+
+Media files are stored under their content hash, so repeated uploads and
+repeated syntheses share one file. Storing a file claims its name for a while
+(the row that will reference it is not saved yet), and storing and deleting a
+name take a short lock in the default cache, so cleanup never removes a file
+that is being reused.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from pathlib import PurePosixPath
+from typing import Any, BinaryIO, Callable, Iterable, Optional, Set, Union
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger('core')
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Seconds a media lock is held at most (a crashed holder cannot block forever)
+MEDIA_LOCK_SECONDS = 60
+# Seconds a stored media name stays claimed before a row must reference it
+MEDIA_CLAIM_SECONDS = 3600
+
+
+def content_hash(data: Union[bytes, str, BinaryIO]) -> str:
+    """SHA-256 hex digest of bytes, text or a file object (read in chunks, rewound)."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    if isinstance(data, (bytes, bytearray)):
+        return hashlib.sha256(data).hexdigest()
+    
+    digest = hashlib.sha256()
+    data.seek(0)
+    for chunk in iter(lambda: data.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    data.seek(0)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Cache of model results keyed by input hash and parameters."""
+    
+    def __init__(self, alias: str = 'results'):
+        self.alias = alias
+    
+    @property
+    def cache(self):
+        return caches[self.alias]
+    
+    @staticmethod
+    def make_key(kind: str, digest: str, params: Optional[dict] = None) -> str:
+        """Build cache key from result kind, input digest and model parameters."""
+        params_digest = hashlib.sha256(
+            json.dumps(params or {}, sort_keys=True, default=str).encode()
+        ).hexdigest()[:16]
+        return f'result:{kind}:{digest}:{params_digest}'
+    
+    def get(self, kind: str, digest: str, params: Optional[dict] = None) -> Any:
+        """Get cached result (None on miss) and record hit/miss metrics."""
+        if not settings.RESULT_CACHE_ENABLED:
+            return None
+        value = self.cache.get(self.make_key(kind, digest, params))
+        
+        from core.metrics import MetricsCollector
+        MetricsCollector.record_cache_event(kind, hit=value is not None)
+        return value
+    
+    def set(self, kind: str, digest: str, params: Optional[dict], value: Any):
+        """Store result."""
+        if settings.RESULT_CACHE_ENABLED:
+            self.cache.set(self.make_key(kind, digest, params), value)
+    
+    def get_or_compute(
+        self,
+        kind: str,
+        digest: str,
+        params: Optional[dict],
+        compute: Callable[[], Any]
+    ) -> Any:
+        """Return cached result or compute and cache it."""
+        value = self.get(kind, digest, params)
+        if value is None:
+            value = compute()
+            self.set(kind, digest, params, value)
+        return value
+    
+    def clear(self):
+        self.cache.clear()
+
+
+def store_media(content: Union[bytes, BinaryIO], directory: str, digest: str, extension: str) -> str:
+    """
+    Store media under its content hash and return the storage name.
+    
+    If a file with the same content already exists it is reused, so identical
+    uploads and syntheses are stored once.
+    """
+    extension = extension if extension.startswith('.') else f'.{extension}'
+    name = str(PurePosixPath(directory) / digest[:2] / f'{digest}{extension}')
+    locked = lock_media(name, wait=MEDIA_LOCK_SECONDS)
+    try:
+        cache.set(f'media:claim:{name}', True, MEDIA_CLAIM_SECONDS)
+        if default_storage.exists(name):
+            return name
+        
+        if isinstance(content, (bytes, bytearray)):
+            content = ContentFile(content)
+        else:
+            content.seek(0)
+        return default_storage.save(name, content)
+    finally:
+        if locked:
+            unlock_media(name)
+
+
+def lock_media(name: str, wait: float = 0.0) -> bool:
+    """
+    Take the lock on a media name, waiting up to ``wait`` seconds.
+    
+    Returns:
+        True if the lock was taken (release it with ``unlock_media``)
+    """
+    deadline = time.monotonic() + wait
+    while not cache.add(f'media:lock:{name}', True, MEDIA_LOCK_SECONDS):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def unlock_media(name: str):
+    cache.delete(f'media:lock:{name}')
+
+
+def media_claimed(name: str) -> bool:
+    """Whether ``store_media`` returned this name recently."""
+    return cache.get(f'media:claim:{name}') is not None
+
+
+def referenced_media(names: Iterable[str], model, field_name: str = 'audio_file', exclude_pk=None) -> Set[str]:
+    """
+    Return the names still referenced by rows of ``model`` or by active jobs.
+    
+    Queued and running jobs reference their uploaded audio before any
+    Transcription row does.
+    """
+    from core.models import Job
+    names = set(names)
+    rows = model.objects.filter(**{f'{field_name}__in': names})
+    if exclude_pk is not None:
+        rows = rows.exclude(pk=exclude_pk)
+    referenced = set(rows.values_list(field_name, flat=True))
+    referenced.update(
+        Job.objects.filter(status__in=('queued', 'running'), params__audio__in=names)
+        .values_list('params__audio', flat=True)
+    )
+    return referenced
+
+
+def delete_media_file(name: str) -> bool:
+    """Delete a media file unless ``store_media`` is storing or has just reused it."""
+    if not lock_media(name):
+        return False
+    try:
+        if media_claimed(name):
+            return False
+        default_storage.delete(name)
+        return True
+    except Exception as e:
+        logger.warning(f"Failed to delete audio file {name}: {e}")
+        return False
+    finally:
+        unlock_media(name)
+
+
+def delete_media_if_unreferenced(field_file, model, field_name: str = 'audio_file', exclude_pk=None) -> bool:
+    """
+    Delete a stored media file unless something still references it.
+    
+    Content-addressed media is shared between rows and users, so deleting one
+    Transcription/Synthesis must not remove the file from other rows, from
+    active jobs, or from an upload ``store_media`` has just reused it for.
+    """
+    if not field_file or referenced_media({field_file.name}, model, field_name, exclude_pk):
+        return False
+    return delete_media_file(field_file.name)
+
+
+result_cache = ResultCache()
@@ -0,0 +1,232 @@
+"""
+Full-text search over transcriptions and conversation messages.
+
+Backends, chosen by database vendor:
+
+* PostgreSQL - GIN expression indexes on ``to_tsvector(SEARCH_CONFIG, ...)``
+  (created by the ``core`` migration); the database keeps them current.
+* SQLite - FTS5 tables ``search_transcriptions`` / ``search_messages`` keyed
+  by the row ID, fed incrementally by the post_save/post_delete signals.
+* Others - ``icontains`` scans (no index).
+
+Search returns ranked hits with highlighted snippets; filters use
+``matching_ids`` as a subquery so list views don't join and de-duplicate.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger('core')
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+
+# Searchable kinds: source table, text column, FTS table and owner lookup
+SEARCH_KINDS = {
+    'transcription': {
+        'table': 'transcriptions',
+        'column': 'text',
+        'fts_table': 'search_transcriptions',
+        'owner_join': '',
+        'owner_column': 'src.user_id',
+        'extra_columns': 'NULL',
+    },
+    'message': {
+        'table': 'messages',
+        'column': 'content',
+        'fts_table': 'search_messages',
+        'owner_join': 'JOIN conversations c ON c.id = src.conversation_id',
+        'owner_column': 'c.user_id',
+        'extra_columns': 'src.conversation_id',
+    },
+}
+
+
+@dataclass
+class SearchHit:
+    """A ranked search result."""
+    kind: str
+    id: int
+    rank: float
+    snippet: str
+    conversation_id: Optional[int] = None
+
+
+def _search_config() -> str:
+    """Text search configuration name (validated - it is embedded in SQL)."""
+    config = settings.SEARCH_CONFIG
+    if not re.fullmatch(r'[a-z_]+', config):
+        raise ValueError(f"Invalid SEARCH_CONFIG: {config!r}")
+    return config
+
+
+class SearchBackend:
+    """Fallback backend: unindexed substring search."""
+    
+    def index(self, kind: str, object_id: int, text: str):
+        """Add or update a document (no-op unless the backend keeps its own index)."""
+    
+    def remove(self, kind: str, object_id: int):
+        """Remove a document (no-op unless the backend keeps its own index)."""
+    
+    def remove_many(self, kind: str, object_ids: List[int]):
+        """Remove documents in bulk."""
+        for object_id in object_ids:
+            self.remove(kind, object_id)
+    
+    def matching_ids(self, kind: str, query: str):
+        """Subquery of IDs of rows matching the query."""
+        spec = SEARCH_KINDS[kind]
+        return RawSQL(
+            f"SELECT id FROM {spec['table']} WHERE {spec['column']} LIKE %s",
+            [f'%{query}%']
+        )
+    
+    def search(self, kind: str, user_id: int, query: str, limit: int = 20) -> List[SearchHit]:
+        """Search a user's documents, best matches first."""
+        spec = SEARCH_KINDS[kind]
+        sql = (
+            f"SELECT src.id, 0, substr(src.{spec['column']}, 1, 200), {spec['extra_columns']} "
+            f"FROM {spec['table']} src {spec['owner_join']} "
+            f"WHERE {spec['owner_column']} = %s AND src.{spec['column']} LIKE %s "
+            f"ORDER BY src.created_at DESC LIMIT %s"
+        )
+        return self._fetch(kind, sql, [user_id, f'%{query}%', limit])
+    
+    @staticmethod
+    def _fetch(kind: str, sql: str, params: list) -> List[SearchHit]:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [
+                SearchHit(kind, row[0], float(row[1] or 0), row[2] or '', row[3])
+                for row in cursor.fetchall()
+            ]
+
+
+class PostgresSearchBackend(SearchBackend):
+    """tsvector search served by GIN expression indexes."""
+    
+    def _vector(self, column: str) -> str:
+        # Must match the indexed expression exactly for the GIN index to be used
+        return f"to_tsvector('{_search_config()}', {column})"
+    
+    def _query(self) -> str:
+        return f"websearch_to_tsquery('{_search_config()}', %s)"
+    
+    def matching_ids(self, kind: str, query: str):
+        spec = SEARCH_KINDS[kind]
+        return RawSQL(
+            f"SELECT id FROM {spec['table']} "
+            f"WHERE {self._vector(spec['column'])} @@ {self._query()}",
+            [query]
+        )
+    
+    def search(self, kind: str, user_id: int, query: str, limit: int = 20) -> List[SearchHit]:
+        spec = SEARCH_KINDS[kind]
+        vector = self._vector(f"src.{spec['column']}")
+        options = f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxFragments=2'
+        # Rank and limit first; headlines are only built for the returned rows
+        sql = (
+            f"SELECT hits.id, hits.rank, "
+            f"ts_headline('{_search_config()}', hits.body, {self._query()}, '{options}'), hits.extra "
+            f"FROM ("
+            f"SELECT src.id, src.{spec['column']} AS body, {spec['extra_columns']} AS extra, "
+            f"ts_rank({vector}, {self._query()}) AS rank "
+            f"FROM {spec['table']} src {spec['owner_join']} "
+            f"WHERE {vector} @@ {self._query()} AND {spec['owner_column']} = %s "
+            f"ORDER BY rank DESC LIMIT %s"
+            f") hits ORDER BY hits.rank DESC"
+        )
+        return self._fetch(kind, sql, [query, query, query, user_id, limit])
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """FTS5 search over index tables maintained from model signals."""
+    
+    @staticmethod
+    def fts_query(query: str) -> str:
+        """Turn user input into an FTS5 query: every term, as a quoted prefix."""
+        terms = re.findall(r'\w+', query)
+        return ' '.join(f'"{term}"*' for term in terms)
+    
+    def index(self, kind: str, object_id: int, text: str):
+        table = SEARCH_KINDS[kind]['fts_table']
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE rowid = %s", [object_id])
+            cursor.execute(f"INSERT INTO {table}(rowid, content) VALUES (%s, %s)", [object_id, text])
+    
+    def remove(self, kind: str, object_id: int):
+        table = SEARCH_KINDS[kind]['fts_table']
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE rowid = %s", [object_id])
+    
+    def remove_many(self, kind: str, object_ids: List[int]):
+        if not object_ids:
+            return
+        table = SEARCH_KINDS[kind]['fts_table']
+        placeholders = ', '.join(['%s'] * len(object_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE rowid IN ({placeholders})", list(object_ids))
+    
+    def matching_ids(self, kind: str, query: str):
+        table = SEARCH_KINDS[kind]['fts_table']
+        match = self.fts_query(query)
+        if not match:
+            return RawSQL("SELECT NULL WHERE 0", [])
+        return RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [match])
+    
+    def search(self, kind: str, user_id: int, query: str, limit: int = 20) -> List[SearchHit]:
+        spec = SEARCH_KINDS[kind]
+        table = spec['fts_table']
+        match = self.fts_query(query)
+        if not match:
+            return []
+        # bm25() is lower-is-better; negate it so higher rank means more relevant
+        sql = (
+            f"SELECT src.id, -bm25({table}), "
+            f"snippet({table}, 0, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '…', 16), "
+            f"{spec['extra_columns']} "
+            f"FROM {table} JOIN {spec['table']} src ON src.id = {table}.rowid {spec['owner_join']} "
+            f"WHERE {table} MATCH %s AND {spec['owner_column']} = %s "
+            f"ORDER BY bm25({table}) LIMIT %s"
+        )
+        return self._fetch(kind, sql, [match, user_id, limit])
+
+
+def get_search_backend() -> SearchBackend:
+    """Search backend for the default database."""
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    if connection.vendor == 'sqlite':
+        return SQLiteSearchBackend()
+    return SearchBackend()
+
+
+def index_document(kind: str, object_id: int, text: str):
+    """Update the search index for a row (errors are logged, never raised)."""
+    try:
+        get_search_backend().index(kind, object_id, text)
+    except Exception as e:
+        logger.warning(f"Failed to index {kind} {object_id} for search: {e}")
+
+
+def remove_document(kind: str, object_id: int):
+    """Remove a row from the search index (errors are logged, never raised)."""
+    try:
+        get_search_backend().remove(kind, object_id)
+    except Exception as e:
+        logger.warning(f"Failed to remove {kind} {object_id} from search index: {e}")
+
+
+def remove_documents(kind: str, object_ids: List[int]):
+    """Remove rows deleted in bulk (without signals) from the search index."""
+    try:
+        get_search_backend().remove_many(kind, object_ids)
+    except Exception as e:
+        logger.warning(f"Failed to remove {len(object_ids)} {kind} rows from search index: {e}")
@@ -0,0 +1,113 @@
+"""
+Serializers for core app.
+"""
+
+from django.urls import reverse
+from rest_framework import serializers
+from asr.serializers import TranscriptionRequestSerializer, TranscriptionSerializer
+from core.models import Job
+from tts.serializers import SynthesisSerializer, TTSRequestSerializer
+
+
+class VoiceRequestSerializer(TranscriptionRequestSerializer):
+    """Serializer for voice assistant request validation."""
+    
+    conversation_id = serializers.IntegerField(
+        required=False,
+        allow_null=True,
+        help_text="Optional conversation ID to continue existing conversation"
+    )
+    voice = serializers.CharField(
+        max_length=100,
+        required=False,
+        allow_blank=True,
+        allow_null=True,
+        help_text="Optional voice name for the spoken reply"
+    )
+
+
+class SearchRequestSerializer(serializers.Serializer):
+    """Serializer for full-text search query validation."""
+    
+    q = serializers.CharField(
+        max_length=500,
+        help_text="Search query"
+    )
+    type = serializers.ChoiceField(
+        choices=['transcription', 'message'],
+        default='transcription',
+        help_text="What to search: transcriptions or conversation messages"
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=100,
+        default=20,
+        help_text="Maximum number of results"
+    )
+
+
+class SearchHitSerializer(serializers.Serializer):
+    """Serializer for a ranked search result."""
+    
+    kind = serializers.CharField()
+    id = serializers.IntegerField()
+    rank = serializers.FloatField()
+    snippet = serializers.CharField()
+    conversation_id = serializers.IntegerField(allow_null=True)
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for background jobs, with the result once completed."""
+    
+    queue_ahead = serializers.SerializerMethodField()
+    result = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'kind', 'status', 'priority', 'queue_ahead', 'error',
+            'created_at', 'started_at', 'finished_at', 'result',
+        ]
+        read_only_fields = fields
+    
+    def get_queue_ahead(self, obj):
+        if obj.status != 'queued':
+            return None
+        from core.view_services import JobViewService
+        return JobViewService.queue_ahead(obj)
+    
+    def get_result(self, obj):
+        from core.view_services import JobViewService
+        result = JobViewService.result(obj)
+        if result is None:
+            return None
+        if obj.kind != 'synthesis':
+            return TranscriptionSerializer(result, context=self.context).data
+        data = SynthesisSerializer(result, context=self.context).data
+        data['audio_url'] = reverse('api:job_audio', args=[obj.id])
+        return data
+
+
+class JobPriorityMixin(serializers.Serializer):
+    """Optional job priority (raising it above 0 is reserved for staff)."""
+    
+    priority = serializers.IntegerField(
+        min_value=-10,
+        max_value=10,
+        default=0,
+        help_text="Higher runs first; non-staff users may only lower it"
+    )
+    
+    def validate_priority(self, value):
+        request = self.context.get('request')
+        if value > 0 and not (request and request.user.is_staff):
+            raise serializers.ValidationError("Only staff can raise job priority.")
+        return value
+
+
+class TranscriptionJobRequestSerializer(JobPriorityMixin, TranscriptionRequestSerializer):
+    """Serializer for queued transcription request validation."""
+
+
+class SynthesisJobRequestSerializer(JobPriorityMixin, TTSRequestSerializer):
+    """Serializer for queued synthesis request validation."""
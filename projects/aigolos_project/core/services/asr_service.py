@@ -2,24 +2,163 @@
 ASR Service - Speech Recognition using faster-whisper.
 """
 
+import io
 import logging
-from typing import Optional, Tuple
-from pathlib import Path
-import tempfile
+import wave
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
 from django.conf import settings
 from core.exceptions import ASRServiceError
 
 logger = logging.getLogger('core')
 
+# Whisper models expect 16 kHz mono audio
+SAMPLING_RATE = 16000
+
+
+def _decode_wav(source: BinaryIO, sampling_rate: int):
+    """Decode PCM WAV with the standard library (used when PyAV is unavailable)."""
+    import numpy as np
+    
+    with wave.open(source, 'rb') as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+    
+    if sample_width != 2:
+        raise ASRServiceError(f"Unsupported WAV sample width: {sample_width * 8} bits")
+    
+    audio = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    if rate != sampling_rate:
+        duration = len(audio) / rate
+        target = np.linspace(0, duration, int(duration * sampling_rate), endpoint=False)
+        audio = np.interp(target, np.arange(len(audio)) / rate, audio).astype(np.float32)
+    return audio
+
+
+def _encode_wav(samples, sampling_rate: int = SAMPLING_RATE) -> bytes:
+    """Encode float32 mono samples as 16-bit PCM WAV bytes."""
+    import numpy as np
+    
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2')
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sampling_rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+@dataclass
+class TranscribedSegment:
+    """Segment of a chunked transcription (times in seconds from audio start)."""
+    start: float
+    end: float
+    text: str
+    language: Optional[str]
+    progress: float
+
+
+def split_on_silence(
+    audio,
+    sampling_rate: int,
+    chunk_seconds: float,
+    search_seconds: float = 2.0
+) -> List[Tuple[int, int]]:
+    """
+    Split samples into chunks of about ``chunk_seconds``.
+    
+    Each cut is moved to the quietest 20 ms frame within ``search_seconds``
+    before the nominal boundary (a simple energy-based VAD), so chunks rarely
+    split words.
+    
+    Returns:
+        List of (start_sample, end_sample) pairs covering the whole audio
+    """
+    import numpy as np
+    
+    total = len(audio)
+    chunk = int(chunk_seconds * sampling_rate)
+    if total <= chunk:
+        return [(0, total)]
+    
+    frame = int(0.02 * sampling_rate)
+    search = int(search_seconds * sampling_rate)
+    bounds = []
+    start = 0
+    while total - start > chunk:
+        nominal = start + chunk
+        window_start = max(start + chunk // 2, nominal - search)
+        window = audio[window_start:nominal]
+        frames = len(window) // frame
+        if frames:
+            energy = np.square(window[:frames * frame].reshape(frames, frame)).mean(axis=1)
+            # Latest of the quietest frames, to keep chunks close to nominal length
+            quietest = frames - 1 - int(np.argmin(energy[::-1]))
+            cut = window_start + quietest * frame
+        else:
+            cut = nominal
+        bounds.append((start, cut))
+        start = cut
+    bounds.append((start, total))
+    return bounds
+
+
+def decode_audio(audio: Union[bytes, BinaryIO], sampling_rate: int = SAMPLING_RATE):
+    """
+    Decode audio in memory into mono float32 samples.
+    
+    Args:
+        audio: Audio file bytes or a readable file object (e.g. an upload)
+        sampling_rate: Target sampling rate
+        
+    Returns:
+        NumPy float32 array of samples
+        
+    Raises:
+        ASRServiceError: If the audio cannot be decoded
+    """
+    source = io.BytesIO(audio) if isinstance(audio, (bytes, bytearray)) else audio
+    try:
+        try:
+            from faster_whisper.audio import decode_audio as decode_with_av
+        except ImportError:
+            return _decode_wav(source, sampling_rate)
+        return decode_with_av(source, sampling_rate=sampling_rate)
+    except ASRServiceError:
+        raise
+    except Exception as e:
+        raise ASRServiceError(f"Failed to decode audio: {e}")
+
 
 class ASRService:
     """Service for speech recognition using faster-whisper."""
     
-    def __init__(self):
-        """Initialize ASR service."""
+    def __init__(self, use_workers: bool = True):
+        """
+        Initialize ASR service.
+        
+        Args:
+            use_workers: Hand audio off to the ASR worker pool when
+                ASR_WORKER_ADDRESS is configured (instead of loading the model
+                in this process)
+        """
         self.model = None
         self._model_loaded = False
         # Lazy loading: model will be loaded on first use
+        self._worker_client = None
+        if use_workers and settings.ASR_WORKER_ADDRESS:
+            from core.services.asr_workers import ASRWorkerClient
+            self._worker_client = ASRWorkerClient(
+                settings.ASR_WORKER_ADDRESS,
+                settings.ASR_WORKER_AUTHKEY.encode()
+            )
     
     def _initialize_model(self):
         """Initialize the Whisper model (lazy loading)."""
@@ -33,7 +172,8 @@ class ASRService:
             self.model = WhisperModel(
                 settings.ASR_MODEL_NAME,
                 device=settings.ASR_DEVICE,
-                compute_type=settings.ASR_COMPUTE_TYPE
+                compute_type=settings.ASR_COMPUTE_TYPE,
+                num_workers=settings.ASR_CHUNK_WORKERS
             )
             self._model_loaded = True
             logger.info("Whisper model loaded successfully")
@@ -46,16 +186,41 @@ class ASRService:
             self.model = None
             self._model_loaded = True  # Mark as loaded to prevent retries
     
+    def warm_up(self) -> str:
+        """
+        Load the model and run a tiny inference (one second of silence).
+        
+        Returns:
+            Short description of what was warmed
+            
+        Raises:
+            ASRServiceError: If the model is not available
+        """
+        if self._worker_client is not None:
+            return f"served by ASR worker pool at {settings.ASR_WORKER_ADDRESS}"
+        
+        self._initialize_model()
+        if self.model is None:
+            raise ASRServiceError("ASR model is not available. Install faster-whisper.")
+        
+        import numpy as np
+        segments, _ = self.model.transcribe(np.zeros(SAMPLING_RATE, dtype=np.float32), beam_size=1)
+        list(segments)
+        return f"{settings.ASR_MODEL_NAME} on {settings.ASR_DEVICE}"
+    
     def transcribe(
         self,
-        audio_data: bytes,
+        audio_data: Union[bytes, BinaryIO],
         language: Optional[str] = None
     ) -> Tuple[str, Optional[str]]:
         """
         Transcribe audio to text.
         
+        Audio is decoded in memory and passed to the model as samples, so no
+        temporary file is written.
+        
         Args:
-            audio_data: Audio file bytes
+            audio_data: Audio file bytes or a readable file object
             language: Optional language code
             
         Returns:
@@ -64,6 +229,12 @@ class ASRService:
         Raises:
             ASRServiceError: If transcription fails
         """
+        # Delegate to the shared worker pool if configured
+        if self._worker_client is not None:
+            if not isinstance(audio_data, (bytes, bytearray)):
+                audio_data = audio_data.read()
+            return self._worker_client.transcribe(audio_data, language)
+        
         # Lazy load model on first use
         if not self._model_loaded:
             self._initialize_model()
@@ -72,33 +243,118 @@ class ASRService:
             raise ASRServiceError("ASR model is not available. Install faster-whisper.")
         
         try:
-            # Save audio to temporary file
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-                tmp_file.write(audio_data)
-                tmp_path = tmp_file.name
+            audio = decode_audio(audio_data)
+            
+            # Transcribe
+            segments, info = self.model.transcribe(
+                audio,
+                language=language,
+                beam_size=5
+            )
+            
+            # Combine segments
+            text = " ".join([segment.text for segment in segments])
+            detected_language = info.language
+            
+            logger.info(f"Transcription completed. Language: {detected_language}")
+            return text.strip(), detected_language
             
-            try:
-                # Transcribe
-                segments, info = self.model.transcribe(
-                    tmp_path,
-                    language=language,
-                    beam_size=5
+        except ASRServiceError:
+            raise
+        except Exception as e:
+            logger.error(f"Transcription failed: {e}", exc_info=True)
+            raise ASRServiceError(f"Transcription failed: {e}")
+    
+    def transcribe_segments(
+        self,
+        audio_data: Union[bytes, BinaryIO],
+        language: Optional[str] = None,
+        chunk_seconds: Optional[float] = None,
+        parallel: Optional[int] = None
+    ) -> Iterator[TranscribedSegment]:
+        """
+        Transcribe long audio chunk by chunk, yielding segments as they are ready.
+        
+        The audio is split at quiet points into chunks of about ``chunk_seconds``;
+        up to ``parallel`` chunks are in flight at a time (CTranslate2 runs them
+        on separate model workers, see ASR_CHUNK_WORKERS), and segments are
+        yielded in order with timestamps relative to the start of the audio.
+        When the ASR worker pool is configured, chunks are sent to it as WAV
+        clips and each chunk comes back as a single segment.
+        
+        Args:
+            audio_data: Audio file bytes or a readable file object
+            language: Optional language code
+            chunk_seconds: Target chunk length (default: ASR_CHUNK_SECONDS)
+            parallel: Chunks transcribed concurrently (default: ASR_CHUNK_WORKERS)
+            
+        Yields:
+            TranscribedSegment with ``progress`` (0..1) of audio processed so far
+            
+        Raises:
+            ASRServiceError: If transcription fails
+        """
+        if self._worker_client is None:
+            if not self._model_loaded:
+                self._initialize_model()
+            
+            if self.model is None:
+                raise ASRServiceError("ASR model is not available. Install faster-whisper.")
+        
+        chunk_seconds = chunk_seconds or settings.ASR_CHUNK_SECONDS
+        parallel = parallel or settings.ASR_CHUNK_WORKERS
+        
+        audio = decode_audio(audio_data)
+        duration = len(audio) / SAMPLING_RATE
+        bounds = split_on_silence(audio, SAMPLING_RATE, chunk_seconds)
+        
+        def run_chunk(bound):
+            """Transcribe one chunk into (start, end, text) tuples and the language."""
+            start, end = bound
+            if self._worker_client is not None:
+                text, detected_language = self._worker_client.transcribe(
+                    _encode_wav(audio[start:end]), language
                 )
+                return [(0.0, (end - start) / SAMPLING_RATE, text)], detected_language
+            segments, info = self.model.transcribe(
+                audio[start:end],
+                language=language,
+                beam_size=5
+            )
+            # Segments are generated lazily; consume them in the worker thread
+            return [(segment.start, segment.end, segment.text) for segment in segments], info.language
+        
+        try:
+            with ThreadPoolExecutor(max_workers=parallel) as executor:
+                # Submit chunks as earlier ones finish, so at most ``parallel``
+                # chunks (and their results) are held at a time
+                remaining = iter(bounds)
+                in_flight = deque()
+                for bound in remaining:
+                    in_flight.append((bound, executor.submit(run_chunk, bound)))
+                    if len(in_flight) >= parallel:
+                        break
                 
-                # Combine segments
-                text = " ".join([segment.text for segment in segments])
-                detected_language = info.language
-                
-                logger.info(f"Transcription completed. Language: {detected_language}")
-                return text.strip(), detected_language
-                
-            finally:
-                # Clean up temporary file
-                Path(tmp_path).unlink(missing_ok=True)
-                
+                while in_flight:
+                    (start, end), future = in_flight.popleft()
+                    segments, detected_language = future.result()
+                    bound = next(remaining, None)
+                    if bound is not None:
+                        in_flight.append((bound, executor.submit(run_chunk, bound)))
+                    
+                    offset = start / SAMPLING_RATE
+                    progress = end / len(audio) if len(audio) else 1.0
+                    for segment_start, segment_end, text in segments:
+                        yield TranscribedSegment(
+                            start=offset + segment_start,
+                            end=offset + segment_end,
+                            text=text.strip(),
+                            language=detected_language,
+                            progress=progress
+                        )
+            logger.info(f"Chunked transcription completed ({len(bounds)} chunks, {duration:.1f}s)")
         except ASRServiceError:
             raise
         except Exception as e:
-            logger.error(f"Transcription failed: {e}", exc_info=True)
+            logger.error(f"Chunked transcription failed: {e}", exc_info=True)
             raise ASRServiceError(f"Transcription failed: {e}")
-
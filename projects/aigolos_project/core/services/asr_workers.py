@@ -0,0 +1,270 @@
+"""
+ASR worker pool - shared faster-whisper models outside the web workers.
+
+A pool of worker processes each loads the Whisper model once and serves
+transcription requests from a queue. Each clip is sent to an idle worker as
+its own task; only when every worker is busy are short clips that queued up
+meanwhile combined into one task (up to ``ASR_BATCH_SIZE``, 1 by default).
+
+The pool is exposed to web workers through ``ASRWorkerServer`` (started with
+``python manage.py run_asr_workers``); ``ASRService`` hands audio off to it via
+``ASRWorkerClient`` when ``ASR_WORKER_ADDRESS`` is configured.
+"""
+
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing.connection import Client, Listener
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from core.exceptions import ASRServiceError
+
+logger = logging.getLogger('core')
+
+# Per-process ASR service used inside worker processes
+_worker_service = None
+
+
+def _init_worker():
+    """Load the Whisper model once per worker process."""
+    global _worker_service
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aigolos.settings')
+        django.setup()
+    
+    from core.services.asr_service import ASRService
+    _worker_service = ASRService(use_workers=False)
+    _worker_service._initialize_model()
+    logger.info(f"ASR worker {os.getpid()} ready")
+
+
+def _transcribe_batch(items: List[Tuple[bytes, Optional[str]]]) -> List[dict]:
+    """Transcribe a batch of clips with the process-local model."""
+    if _worker_service is None:
+        _init_worker()
+    
+    results = []
+    for audio_data, language in items:
+        try:
+            text, detected_language = _worker_service.transcribe(audio_data, language)
+            results.append({'text': text, 'language': detected_language})
+        except ASRServiceError as e:
+            results.append({'error': str(e)})
+    return results
+
+
+@dataclass
+class _PendingRequest:
+    """Queued transcription request."""
+    audio_data: bytes
+    language: Optional[str]
+    future: Future = field(default_factory=Future)
+
+
+def parse_worker_address(address: str):
+    """Parse ``host:port`` into a tuple, otherwise treat it as a socket path."""
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit():
+        return host or '127.0.0.1', int(port)
+    return address
+
+
+class ASRWorkerPool:
+    """Process pool of ASR workers with a request queue."""
+    
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        batch_max_bytes: Optional[int] = None,
+        executor=None
+    ):
+        """
+        Initialize worker pool.
+        
+        Args:
+            max_workers: Number of worker processes (one model per process)
+            batch_size: Maximum number of short clips per task when all workers are busy
+            batch_max_bytes: Clips larger than this are never batched
+            executor: Optional executor (defaults to a ProcessPoolExecutor)
+        """
+        self.max_workers = max_workers or settings.ASR_WORKERS
+        self.batch_size = batch_size or settings.ASR_BATCH_SIZE
+        self.batch_max_bytes = batch_max_bytes or settings.ASR_BATCH_MAX_BYTES
+        self._executor = executor or ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker
+        )
+        self._queue = queue.Queue()
+        # One slot per worker: a task is only handed out when a worker is idle
+        self._slots = threading.Semaphore(self.max_workers)
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._dispatcher.start()
+    
+    def submit(self, audio_data: bytes, language: Optional[str] = None) -> Future:
+        """Queue a clip for transcription; the future resolves to (text, language)."""
+        request = _PendingRequest(audio_data, language)
+        self._queue.put(request)
+        return request.future
+    
+    def transcribe(
+        self,
+        audio_data: bytes,
+        language: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> Tuple[str, Optional[str]]:
+        """Transcribe a clip and wait for the result."""
+        return self.submit(audio_data, language).result(timeout=timeout)
+    
+    def shutdown(self):
+        """Stop dispatching and shut down worker processes."""
+        self._queue.put(None)
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+    
+    def _is_short(self, request: _PendingRequest) -> bool:
+        return len(request.audio_data) <= self.batch_max_bytes
+    
+    def _dispatch_loop(self):
+        """Hand clips to idle workers, combining short ones only while all are busy."""
+        pending = None
+        while True:
+            request = pending or self._queue.get()
+            pending = None
+            if request is None:
+                return
+            
+            waited = not self._slots.acquire(blocking=False)
+            if waited:
+                self._slots.acquire()
+            
+            batch = [request]
+            stop = False
+            if waited and self._is_short(request):
+                # Clips that queued up while every worker was busy share this task
+                while len(batch) < self.batch_size:
+                    try:
+                        request = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if request is None:
+                        stop = True
+                        break
+                    if not self._is_short(request):
+                        pending = request
+                        break
+                    batch.append(request)
+            self._dispatch(batch)
+            if stop:
+                return
+    
+    def _dispatch(self, batch: List[_PendingRequest]):
+        """Submit a batch to the executor and resolve request futures on completion."""
+        items = [(request.audio_data, request.language) for request in batch]
+        try:
+            task = self._executor.submit(_transcribe_batch, items)
+        except Exception as e:
+            self._slots.release()
+            for request in batch:
+                request.future.set_exception(ASRServiceError(f"ASR worker pool unavailable: {e}"))
+            return
+        
+        def resolve(task):
+            self._slots.release()
+            try:
+                results = task.result()
+            except Exception as e:
+                logger.error(f"ASR worker batch failed: {e}", exc_info=True)
+                for request in batch:
+                    request.future.set_exception(ASRServiceError(f"Transcription failed: {e}"))
+                return
+            for request, result in zip(batch, results):
+                if 'error' in result:
+                    request.future.set_exception(ASRServiceError(result['error']))
+                else:
+                    request.future.set_result((result['text'], result['language']))
+        
+        task.add_done_callback(resolve)
+
+
+class ASRWorkerServer:
+    """Serve an ASRWorkerPool to web workers over a local socket."""
+    
+    def __init__(self, pool: ASRWorkerPool, address: str, authkey: bytes):
+        self.pool = pool
+        self.listener = Listener(parse_worker_address(address), authkey=authkey)
+        self.timeout = settings.ASR_WORKER_TIMEOUT
+    
+    @property
+    def address(self):
+        return self.listener.address
+    
+    def serve_forever(self):
+        """Accept connections, one handler thread per web worker connection."""
+        while True:
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                return
+            except Exception as e:
+                logger.warning(f"ASR worker server rejected connection: {e}")
+                continue
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+    
+    def close(self):
+        self.listener.close()
+    
+    def _handle(self, conn):
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    text, language = self.pool.transcribe(
+                        request['audio'], request.get('language'), timeout=self.timeout
+                    )
+                    conn.send({'text': text, 'language': language})
+                except Exception as e:
+                    conn.send({'error': str(e)})
+
+
+class ASRWorkerClient:
+    """Client used by web workers to hand audio off to the ASR worker pool."""
+    
+    def __init__(self, address: str, authkey: bytes):
+        self.address = parse_worker_address(address)
+        self.authkey = authkey
+        self._local = threading.local()
+    
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or conn.closed:
+            conn = Client(self.address, authkey=self.authkey)
+            self._local.conn = conn
+        return conn
+    
+    def transcribe(
+        self,
+        audio_data: bytes,
+        language: Optional[str] = None
+    ) -> Tuple[str, Optional[str]]:
+        """Send audio to the worker pool and wait for the transcription."""
+        try:
+            conn = self._connection()
+            conn.send({'audio': audio_data, 'language': language})
+            result = conn.recv()
+        except (OSError, EOFError) as e:
+            self._local.conn = None
+            raise ASRServiceError(f"ASR worker pool unavailable: {e}")
+        
+        if 'error' in result:
+            raise ASRServiceError(result['error'])
+        return result['text'], result['language']
@@ -0,0 +1,289 @@
+"""
+Streaming export of user data.
+
+Rows are read with ``.values().iterator(chunk_size=...)`` and written record
+by record, so memory use stays flat however much a user has. Each file is
+written under a ``.partial`` name and renamed when complete; a failed export
+removes its partial files. ``export_user``
+is a module-level function so the export command can run users in a process
+pool; ``ExportCheckpoint`` records finished users so an interrupted export
+can resume.
+"""
+
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from django.db.models import Count
+
+logger = logging.getLogger('core')
+
+FORMATS = ['json', 'jsonl', 'csv', 'both']
+COMPRESSIONS = ['none', 'gzip', 'zip']
+DEFAULT_CHUNK_SIZE = 2000
+
+TRANSCRIPTION_FIELDS = ['id', 'text', 'language', 'created_at']
+CONVERSATION_FIELDS = ['id', 'title', 'message_count', 'created_at', 'updated_at']
+MESSAGE_FIELDS = ['conversation_id', 'role', 'content', 'created_at']
+SYNTHESIS_FIELDS = ['id', 'text', 'voice', 'created_at']
+
+
+def _isoformat(row: Dict[str, Any]) -> Dict[str, Any]:
+    for key in ('created_at', 'updated_at'):
+        if row.get(key) is not None:
+            row[key] = row[key].isoformat()
+    return row
+
+
+class RecordWriter:
+    """Write records incrementally as a JSON array, JSON Lines or CSV."""
+    
+    def __init__(self, stream, fmt: str, fieldnames: Optional[List[str]] = None):
+        self.stream = stream
+        self.fmt = fmt
+        self.count = 0
+        self._csv = csv.DictWriter(stream, fieldnames=fieldnames, extrasaction='ignore') if fmt == 'csv' else None
+    
+    def write(self, record: Dict[str, Any]):
+        if self.fmt == 'json':
+            self.stream.write(('[\n  ' if self.count == 0 else ',\n  ') + json.dumps(record, ensure_ascii=False))
+        elif self.fmt == 'jsonl':
+            self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        else:
+            if self.count == 0:
+                self._csv.writeheader()
+            self._csv.writerow(record)
+        self.count += 1
+    
+    def close(self):
+        if self.fmt == 'json':
+            self.stream.write('\n]\n' if self.count else '[]\n')
+
+
+class ExportTarget:
+    """Destination of one user's files: a directory (optionally gzipped files) or a zip archive."""
+    
+    def __init__(self, output_dir: Path, username: str, compress: str = 'none'):
+        self.compress = compress
+        if compress == 'zip':
+            self.path = Path(output_dir) / f'{username}.zip'
+            self._partial = self.path.with_name(self.path.name + '.partial')
+            self._archive = zipfile.ZipFile(self._partial, 'w', compression=zipfile.ZIP_DEFLATED)
+        else:
+            self.path = Path(output_dir) / username
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._archive = None
+    
+    def write(self, name: str, records: Iterable[Dict[str, Any]], fmt: str,
+              fieldnames: Optional[List[str]] = None, skip_empty: bool = False) -> int:
+        """
+        Write records to a file, returning the number written.
+        
+        With ``skip_empty`` no file is left behind when there are no records.
+        """
+        if self._archive is not None:
+            with self._archive.open(name, 'w') as raw:
+                stream = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+                count = self._write(stream, records, fmt, fieldnames)
+                stream.flush()
+                stream.detach()
+            return count
+        
+        if self.compress == 'gzip':
+            name += '.gz'
+        final = self.path / name
+        partial = final.with_name(final.name + '.partial')
+        if self.compress == 'gzip':
+            stream = gzip.open(partial, 'wt', encoding='utf-8', newline='')
+        else:
+            stream = open(partial, 'w', encoding='utf-8', newline='')
+        try:
+            with stream:
+                count = self._write(stream, records, fmt, fieldnames)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+        
+        if count == 0 and skip_empty:
+            partial.unlink()
+        else:
+            os.replace(partial, final)
+        return count
+    
+    @staticmethod
+    def _write(stream, records, fmt, fieldnames) -> int:
+        writer = RecordWriter(stream, fmt, fieldnames)
+        for record in records:
+            writer.write(record)
+        writer.close()
+        return writer.count
+    
+    def close(self, commit: bool = True):
+        """Finish the archive, or discard it with ``commit=False`` (the export failed)."""
+        if self._archive is None:
+            return
+        try:
+            self._archive.close()
+        finally:
+            if not commit:
+                self._partial.unlink(missing_ok=True)
+        if commit:
+            os.replace(self._partial, self.path)
+
+
+def _conversations_with_messages(user_id: int, chunk_size: int) -> Iterator[Dict[str, Any]]:
+    """Conversations with nested messages, merged from two ordered streams (two queries in total)."""
+    from llm.models import Conversation, Message
+    
+    conversations = Conversation.objects.filter(user_id=user_id).order_by('id').values(
+        'id', 'title', 'created_at', 'updated_at'
+    ).iterator(chunk_size=chunk_size)
+    messages = Message.objects.filter(conversation__user_id=user_id).order_by(
+        'conversation_id', 'created_at', 'id'
+    ).values(*MESSAGE_FIELDS).iterator(chunk_size=chunk_size)
+    
+    message = next(messages, None)
+    for conversation in conversations:
+        nested = []
+        while message is not None and message['conversation_id'] == conversation['id']:
+            message.pop('conversation_id')
+            nested.append(_isoformat(message))
+            message = next(messages, None)
+        conversation = _isoformat(conversation)
+        yield {
+            'id': conversation['id'],
+            'title': conversation['title'],
+            'messages': nested,
+            'created_at': conversation['created_at'],
+            'updated_at': conversation['updated_at'],
+        }
+
+
+def export_user(
+    user_id: int,
+    output_dir: str,
+    export_format: str = 'json',
+    compress: str = 'none',
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Dict[str, Any]:
+    """
+    Export one user's transcriptions, conversations and syntheses.
+    
+    JSON and JSON Lines nest messages in their conversation; CSV writes
+    conversations (with message counts) and messages to separate files.
+    
+    Args:
+        user_id: ID of the user to export
+        output_dir: Output directory
+        export_format: json, jsonl, csv or both (json and csv)
+        compress: none, gzip or zip (one archive per user)
+        chunk_size: Rows fetched per database round trip
+    
+    Returns:
+        Dict with the username and the number of exported records per type
+    """
+    from django.contrib.auth import get_user_model
+    from asr.models import Transcription
+    from llm.models import Conversation, Message
+    from tts.models import Synthesis
+    
+    user = get_user_model().objects.only('username').get(id=user_id)
+    formats = ['json', 'csv'] if export_format == 'both' else [export_format]
+    counts = {}
+    
+    target = ExportTarget(Path(output_dir), user.username, compress)
+    try:
+        for fmt in formats:
+            # CSV files are only written when there are rows
+            skip_empty = fmt == 'csv'
+            
+            counts['transcriptions'] = target.write(
+                f'transcriptions.{fmt}',
+                (_isoformat(row) for row in Transcription.objects.filter(user_id=user_id).order_by('id').values(
+                    *TRANSCRIPTION_FIELDS
+                ).iterator(chunk_size=chunk_size)),
+                fmt, TRANSCRIPTION_FIELDS, skip_empty
+            )
+            
+            if fmt == 'csv':
+                counts['conversations'] = target.write(
+                    'conversations.csv',
+                    (_isoformat(row) for row in Conversation.objects.filter(user_id=user_id).order_by('id').annotate(
+                        message_count=Count('messages')
+                    ).values(*CONVERSATION_FIELDS).iterator(chunk_size=chunk_size)),
+                    fmt, CONVERSATION_FIELDS, skip_empty
+                )
+                counts['messages'] = target.write(
+                    'messages.csv',
+                    (_isoformat(row) for row in Message.objects.filter(conversation__user_id=user_id).order_by(
+                        'conversation_id', 'created_at', 'id'
+                    ).values(*MESSAGE_FIELDS).iterator(chunk_size=chunk_size)),
+                    fmt, MESSAGE_FIELDS, skip_empty
+                )
+            else:
+                counts['conversations'] = target.write(
+                    f'conversations.{fmt}',
+                    _conversations_with_messages(user_id, chunk_size),
+                    fmt
+                )
+            
+            counts['syntheses'] = target.write(
+                f'syntheses.{fmt}',
+                (_isoformat(row) for row in Synthesis.objects.filter(user_id=user_id).order_by('id').values(
+                    *SYNTHESIS_FIELDS
+                ).iterator(chunk_size=chunk_size)),
+                fmt, SYNTHESIS_FIELDS, skip_empty
+            )
+    except BaseException:
+        target.close(commit=False)
+        raise
+    target.close()
+    
+    return {'username': user.username, **counts}
+
+
+def init_export_worker():
+    """Process pool initializer: set up Django in spawned workers."""
+    import django
+    from django.apps import apps
+    
+    if not apps.ready:
+        django.setup()
+
+
+class ExportCheckpoint:
+    """Record of users already exported, so an interrupted export can resume."""
+    
+    FILENAME = '.export_checkpoint.json'
+    
+    def __init__(self, output_dir: Path, options: Dict[str, Any]):
+        self.path = Path(output_dir) / self.FILENAME
+        self.options = options
+        self.done = set()
+    
+    def load(self) -> set:
+        """Load finished user IDs (ignored if the export options changed)."""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self.done
+        if data.get('options') != self.options:
+            logger.warning("Export checkpoint was written with different options; starting over")
+            return self.done
+        self.done = set(data.get('done', []))
+        return self.done
+    
+    def mark_done(self, user_id: int):
+        """Record a finished user (written atomically)."""
+        self.done.add(user_id)
+        partial = self.path.with_name(self.path.name + '.partial')
+        with open(partial, 'w', encoding='utf-8') as f:
+            json.dump({'options': self.options, 'done': sorted(self.done)}, f)
+        os.replace(partial, self.path)
@@ -0,0 +1,225 @@
+"""
+Job queue backends.
+
+Jobs live in the ``jobs`` table, which holds their status and results. The
+queue decides which queued job a worker runs next:
+
+- ``DatabaseJobQueue`` (default) claims jobs straight from the table. Works
+  across processes without extra services; idle workers poll.
+- ``RedisJobQueue`` (``JOB_QUEUE_BACKEND=redis``) keeps the order in a sorted
+  set. Idle workers block on it instead of polling the database. A worker
+  that dies between popping an id and claiming the job loses the entry; the
+  stale-job sweep re-adds queued jobs missing from the set.
+
+Order: higher ``priority`` first, then ``position``. The position is a
+virtual start time that gives per-user fairness: a user's new job goes
+behind that user's own queued jobs, or at the head of the queue if they
+have none. Users who submit many jobs therefore take turns with everyone
+else instead of blocking them. A job is claimed with a conditional
+``UPDATE`` (queued -> running), so two workers never run the same job.
+"""
+
+import logging
+import threading
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db.models import F, Max, Min
+from django.utils import timezone
+
+from core.models import Job
+
+logger = logging.getLogger('core')
+
+
+def next_position(user_id: int) -> int:
+    """Fair-share position for a new job of this user."""
+    queued = Job.objects.filter(status='queued')
+    own_last = queued.filter(user_id=user_id).aggregate(last=Max('position'))['last']
+    if own_last is not None:
+        return own_last + 1
+    head = queued.aggregate(head=Min('position'))['head']
+    return head if head is not None else 0
+
+
+def claim(job_id: int) -> Optional[Job]:
+    """Mark a queued job as running; None if another worker got it first."""
+    claimed = Job.objects.filter(id=job_id, status='queued').update(
+        status='running',
+        started_at=timezone.now(),
+        attempts=F('attempts') + 1
+    )
+    return Job.objects.get(id=job_id) if claimed else None
+
+
+class DatabaseJobQueue:
+    """Queue backed by the jobs table."""
+    
+    # Candidates fetched per claim attempt (others may be claimed concurrently)
+    CLAIM_BATCH = 10
+    
+    def __init__(self, poll_interval: float = 1.0):
+        self.poll_interval = poll_interval
+        # Wakes idle workers of this process when a job is pushed here
+        self._pushed = threading.Event()
+    
+    def push(self, job: Job):
+        """Make a saved job available to workers (call after commit)."""
+        self._pushed.set()
+    
+    def pop(self, timeout: Optional[float] = None) -> Optional[Job]:
+        """
+        Claim the next job, waiting up to ``timeout`` seconds for one.
+        
+        Returns:
+            The claimed job (status ``running``), or None on timeout
+        """
+        deadline = None if timeout is None else timezone.now() + timedelta(seconds=timeout)
+        while True:
+            self._pushed.clear()
+            job = self._claim_next()
+            if job is not None:
+                return job
+            
+            wait = self.poll_interval
+            if deadline is not None:
+                remaining = (deadline - timezone.now()).total_seconds()
+                if remaining <= 0:
+                    return None
+                wait = min(wait, remaining)
+            self._pushed.wait(wait)
+    
+    def _claim_next(self) -> Optional[Job]:
+        candidates = Job.objects.filter(status='queued').order_by(
+            '-priority', 'position', 'id'
+        ).values_list('id', flat=True)[:self.CLAIM_BATCH]
+        for job_id in candidates:
+            job = claim(job_id)
+            if job is not None:
+                return job
+        return None
+    
+    def remove(self, job: Job):
+        """Forget a job that will not run (cancelled)."""
+    
+    def requeue_stale(self, timeout: float, max_attempts: int) -> int:
+        """
+        Requeue jobs that have been running for too long (their worker died).
+        
+        Jobs that have already been tried ``max_attempts`` times are failed.
+        
+        Returns:
+            Number of jobs requeued
+        """
+        cutoff = timezone.now() - timedelta(seconds=timeout)
+        stale = Job.objects.filter(status='running', started_at__lt=cutoff)
+        failed = stale.filter(attempts__gte=max_attempts).update(
+            status='failed',
+            error='Job timed out',
+            finished_at=timezone.now()
+        )
+        requeued = list(stale.filter(attempts__lt=max_attempts))
+        for job in requeued:
+            if Job.objects.filter(id=job.id, status='running').update(status='queued', started_at=None):
+                self.push(job)
+        if failed or requeued:
+            logger.warning(f"Stale jobs: {len(requeued)} requeued, {failed} failed")
+        return len(requeued)
+
+
+class RedisJobQueue(DatabaseJobQueue):
+    """Queue order kept in a Redis sorted set; idle workers block on it."""
+    
+    KEY = 'aigolos:jobs:queue'
+    # Score = -priority * PRIORITY_SCALE + position (exact in a double up to 2**53)
+    PRIORITY_SCALE = 2 ** 40
+    
+    def __init__(self, url: str, poll_interval: float = 1.0):
+        super().__init__(poll_interval)
+        import redis
+        self.redis = redis.Redis.from_url(url)
+    
+    def push(self, job: Job):
+        self.redis.zadd(self.KEY, {job.id: -job.priority * self.PRIORITY_SCALE + job.position})
+    
+    def pop(self, timeout: Optional[float] = None) -> Optional[Job]:
+        deadline = None if timeout is None else timezone.now() + timedelta(seconds=timeout)
+        while True:
+            wait = self.poll_interval
+            if deadline is not None:
+                remaining = (deadline - timezone.now()).total_seconds()
+                if remaining <= 0:
+                    return None
+                wait = min(wait, remaining)
+            
+            # BZPOPMIN timeout 0 means forever; never block less than 10 ms
+            item = self.redis.bzpopmin(self.KEY, timeout=max(wait, 0.01))
+            if item is None:
+                continue
+            job = claim(int(item[1]))
+            if job is not None:
+                return job
+            # Cancelled (or already claimed) in the meantime: try the next one
+    
+    def remove(self, job: Job):
+        self.redis.zrem(self.KEY, job.id)
+    
+    def requeue_stale(self, timeout: float, max_attempts: int) -> int:
+        requeued = super().requeue_stale(timeout, max_attempts)
+        restored = self.restore_missing()
+        if restored:
+            logger.warning(f"Re-added {restored} queued jobs missing from the Redis queue")
+        return requeued
+    
+    def restore_missing(self, batch_size: int = 1000) -> int:
+        """
+        Re-add queued jobs that are not in the sorted set.
+        
+        Entries already there are left as they are (``ZADD NX``). A job a
+        live worker is just claiming may be added back; popping it again
+        finds it no longer queued and skips it.
+        
+        Returns:
+            Number of jobs added
+        """
+        added = 0
+        scores = {}
+        rows = Job.objects.filter(status='queued').values_list('id', 'priority', 'position')
+        for job_id, priority, position in rows.iterator(chunk_size=batch_size):
+            scores[job_id] = -priority * self.PRIORITY_SCALE + position
+            if len(scores) >= batch_size:
+                added += self.redis.zadd(self.KEY, scores, nx=True)
+                scores = {}
+        if scores:
+            added += self.redis.zadd(self.KEY, scores, nx=True)
+        return added
+    
+    def rebuild(self) -> int:
+        """Re-add every queued job (e.g. after Redis lost its data)."""
+        jobs = list(Job.objects.filter(status='queued'))
+        for job in jobs:
+            self.push(job)
+        return len(jobs)
+
+
+_queue: Optional[DatabaseJobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> DatabaseJobQueue:
+    """Process-wide job queue for ``JOB_QUEUE_BACKEND``."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = _create_queue()
+        return _queue
+
+
+def _create_queue() -> DatabaseJobQueue:
+    if settings.JOB_QUEUE_BACKEND == 'redis':
+        try:
+            return RedisJobQueue(settings.JOB_REDIS_URL, settings.JOB_POLL_INTERVAL)
+        except ImportError:
+            logger.warning("redis not installed; falling back to the database job queue")
+    return DatabaseJobQueue(settings.JOB_POLL_INTERVAL)
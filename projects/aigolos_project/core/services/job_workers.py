@@ -0,0 +1,153 @@
+"""
+Background job workers for ASR and TTS.
+
+``JobWorkerPool`` threads take jobs from the queue (``core.services.job_queue``)
+and run the handler for the job's kind. Model inference then happens outside
+the HTTP request, and clients poll ``/api/jobs/<id>/`` or subscribe to
+``/api/jobs/<id>/events/`` for the result.
+
+Jobs are run by separate worker processes (``python manage.py
+run_job_workers``). For development without one, ``JOB_WORKERS > 0`` starts
+that many worker threads in the web process on the first submission.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from core.models import Job
+from core.services.job_queue import get_job_queue
+
+logger = logging.getLogger('core')
+
+# Job kind -> callable(job) returning the created Transcription/Synthesis
+HANDLERS: Dict[str, Callable[[Job], object]] = {}
+
+
+def handler(kind: str):
+    """Register the handler for a job kind."""
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+@handler('transcription')
+def run_transcription(job: Job):
+    from core.view_services import ASRViewService
+    return ASRViewService.transcribe_stored(
+        job.user,
+        job.params['audio'],
+        job.params['digest'],
+        job.params.get('language')
+    )
+
+
+@handler('chunked')
+def run_chunked_transcription(job: Job):
+    from core.view_services import ASRViewService
+    return ASRViewService.process_chunked_transcription(
+        job.params['transcription'],
+        job.params.get('language')
+    )
+
+
+@handler('synthesis')
+def run_synthesis(job: Job):
+    from core.view_services import TTSViewService
+    return TTSViewService.synthesize_text(job.user, job.params['text'], job.params.get('voice'))
+
+
+def run_job(job: Job) -> Job:
+    """Run a claimed job and record its outcome."""
+    started = time.perf_counter()
+    try:
+        result = HANDLERS[job.kind](job)
+        Job.objects.filter(id=job.id, status='running').update(
+            status='completed',
+            result_id=result.id,
+            finished_at=timezone.now()
+        )
+        logger.info(f"Job {job.id} ({job.kind}) completed in {time.perf_counter() - started:.2f}s")
+    except Exception as e:
+        logger.error(f"Job {job.id} ({job.kind}) failed: {e}", exc_info=True)
+        Job.objects.filter(id=job.id, status='running').update(
+            status='failed',
+            error=str(e),
+            finished_at=timezone.now()
+        )
+    job.refresh_from_db()
+    return job
+
+
+class JobWorkerPool:
+    """Threads that process queued jobs until stopped."""
+    
+    def __init__(self, workers: int, queue=None):
+        """
+        Initialize pool.
+        
+        Args:
+            workers: Number of worker threads
+            queue: Job queue (default: ``get_job_queue()``)
+        """
+        self.workers = workers
+        self.queue = queue or get_job_queue()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+    
+    def start(self) -> 'JobWorkerPool':
+        self.requeue_stale()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'job-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Job worker pool started ({self.workers} workers)")
+        return self
+    
+    def stop(self, timeout: Optional[float] = None):
+        """Stop after the running jobs finish."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+    
+    def requeue_stale(self) -> int:
+        try:
+            return self.queue.requeue_stale(settings.JOB_TIMEOUT, settings.JOB_MAX_ATTEMPTS)
+        finally:
+            connection.close()
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                job = self.queue.pop(timeout=self.queue.poll_interval)
+                if job is not None:
+                    run_job(job)
+            except Exception as e:
+                # Database or Redis unavailable: back off and retry
+                logger.error(f"Job worker error: {e}", exc_info=True)
+                self._stop.wait(self.queue.poll_interval)
+            finally:
+                close_old_connections()
+        connection.close()
+
+
+_local_pool: Optional[JobWorkerPool] = None
+_local_pool_lock = threading.Lock()
+
+
+def ensure_local_workers() -> Optional[JobWorkerPool]:
+    """Start this process's worker threads (``JOB_WORKERS``) if not running yet."""
+    global _local_pool
+    if settings.JOB_WORKERS <= 0:
+        return None
+    with _local_pool_lock:
+        if _local_pool is None:
+            _local_pool = JobWorkerPool(settings.JOB_WORKERS).start()
+        return _local_pool
@@ -0,0 +1,204 @@
+"""
+Conversation context cache for LLM prompts.
+
+Keeps each conversation's recent turns in the cache so a chat turn doesn't
+re-query and re-format the history. New messages are appended by the
+``message_created`` signal; edits and deletions invalidate the entry.
+
+History is trimmed to an estimated token budget (``LLM_CONTEXT_TOKENS``).
+With ``LLM_CONTEXT_SUMMARIZE`` enabled, trimmed turns are folded into a short
+running summary instead of being dropped.
+
+Ollama returns a ``context`` token array with each response. When the only
+turn since that response is the assistant reply itself, the array is sent
+back instead of the text history, so the model doesn't re-encode it.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger('core')
+
+# Rough average for English/Russian text with common LLM tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+@dataclass
+class Turn:
+    """One message in a conversation context."""
+    id: int
+    role: str
+    content: str
+    
+    def format(self) -> str:
+        role_prefix = "User" if self.role == 'user' else "Assistant"
+        return f"{role_prefix}: {self.content}"
+
+
+@dataclass
+class ConversationContext:
+    """Cached context of a conversation."""
+    turns: List[Turn] = field(default_factory=list)
+    summary: str = ''
+    last_message_id: int = 0
+    # Ollama token array and the last message ID in the prompt that produced it
+    ollama_context: Optional[List[int]] = None
+    ollama_context_through: Optional[int] = None
+    
+    def tokens(self) -> int:
+        total = estimate_tokens(self.summary) if self.summary else 0
+        return total + sum(estimate_tokens(turn.format()) for turn in self.turns)
+
+
+class ConversationContextCache:
+    """Per-conversation LLM context, updated incrementally."""
+    
+    def __init__(self, alias: str = 'default'):
+        self.alias = alias
+    
+    @property
+    def cache(self):
+        return caches[self.alias]
+    
+    @staticmethod
+    def make_key(conversation_id) -> str:
+        return f'llm_context:{conversation_id}'
+    
+    def _save(self, conversation_id, context: ConversationContext):
+        self.cache.set(self.make_key(conversation_id), context, settings.LLM_CONTEXT_CACHE_TIMEOUT)
+    
+    def _load(self, conversation_id) -> ConversationContext:
+        """Load the most recent turns from the database (trimmed when the prompt is built)."""
+        from llm.models import Message
+        
+        messages = Message.objects.filter(
+            conversation_id=conversation_id
+        ).order_by('-id').only('id', 'role', 'content')[:settings.LLM_CONTEXT_MAX_MESSAGES]
+        
+        turns = [Turn(message.id, message.role, message.content) for message in reversed(messages)]
+        return ConversationContext(
+            turns=turns,
+            last_message_id=turns[-1].id if turns else 0
+        )
+    
+    def get(self, conversation_id) -> ConversationContext:
+        """Get cached context, loading it from the database on a miss."""
+        context = self.cache.get(self.make_key(conversation_id))
+        if context is None:
+            context = self._load(conversation_id)
+            self._save(conversation_id, context)
+        return context
+    
+    def append(self, conversation_id, message):
+        """Append a new message to a cached context (no-op if not cached)."""
+        context = self.cache.get(self.make_key(conversation_id))
+        if context is None or message.id <= context.last_message_id:
+            return
+        context.turns.append(Turn(message.id, message.role, message.content))
+        context.last_message_id = message.id
+        self._save(conversation_id, context)
+    
+    def invalidate(self, conversation_id):
+        self.cache.delete(self.make_key(conversation_id))
+    
+    def set_ollama_context(self, conversation_id, tokens: Optional[List[int]], through: Optional[int]):
+        """Remember the context token array Ollama returned for a prompt."""
+        context = self.cache.get(self.make_key(conversation_id))
+        if context is None or not tokens or through is None:
+            return
+        context.ollama_context = tokens
+        context.ollama_context_through = through
+        self._save(conversation_id, context)
+    
+    def trim(
+        self,
+        context: ConversationContext,
+        reserve: int = 0,
+        summarize: Optional[Callable[[str, List[Turn]], str]] = None
+    ) -> bool:
+        """
+        Drop the oldest turns until the context fits the token budget.
+        
+        Args:
+            context: Context to trim in place
+            reserve: Tokens to keep free (e.g. for the new message)
+            summarize: Optional callable folding dropped turns into the summary
+        
+        Returns:
+            True if turns were dropped
+        """
+        budget = settings.LLM_CONTEXT_TOKENS - reserve
+        dropped = []
+        while context.turns and context.tokens() > budget:
+            dropped.append(context.turns.pop(0))
+        if not dropped:
+            return False
+        
+        if summarize is not None:
+            context.summary = summarize(context.summary, dropped)
+            # Summary is kept short, but never let it crowd out recent turns
+            while context.turns and context.tokens() > budget:
+                context.turns.pop(0)
+        return True
+    
+    def build(
+        self,
+        conversation_id,
+        message: str,
+        summarize: Optional[Callable[[str, List[Turn]], str]] = None
+    ) -> Tuple[str, Optional[List[int]], Optional[int]]:
+        """
+        Build the prompt context for a new message.
+        
+        The current message may already be saved as the last turn; it is not
+        repeated in the history.
+        
+        Args:
+            conversation_id: Conversation ID
+            message: New user message
+            summarize: Optional callable folding trimmed turns into a summary
+        
+        Returns:
+            Tuple of (history text, Ollama context tokens or None, last message
+            ID covered by the prompt)
+        """
+        context = self.get(conversation_id)
+        history = context.turns
+        if history and history[-1].role == 'user' and history[-1].content == message:
+            history = history[:-1]
+        through = context.last_message_id or None
+        
+        # Reuse Ollama's encoded context when only its own reply came since
+        # (and it still fits the budget - it grows by a full turn each time)
+        if (
+            context.ollama_context
+            and context.ollama_context_through is not None
+            and len(context.ollama_context) <= settings.LLM_CONTEXT_TOKENS
+        ):
+            since = [turn for turn in history if turn.id > context.ollama_context_through]
+            if len(since) == 1 and since[0].role == 'assistant':
+                return '', context.ollama_context, through
+        
+        if self.trim(context, estimate_tokens(message), summarize):
+            self._save(conversation_id, context)
+            history = [turn for turn in context.turns if turn in history]
+        
+        parts = []
+        if context.summary:
+            parts.append(f"Summary of earlier conversation: {context.summary}")
+        parts.extend(turn.format() for turn in history)
+        
+        text = "\n".join(parts) + "\n\n" if parts else ""
+        return text, None, through
+
+
+conversation_context_cache = ConversationContextCache()
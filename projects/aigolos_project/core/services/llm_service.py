@@ -2,11 +2,19 @@
 LLM Service - Language Model interactions using Ollama.
 """
 
+import asyncio
+import json
 import logging
-from typing import Optional
+import threading
+import time
+import weakref
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
 import httpx
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from core.exceptions import LLMServiceError
+from core.services.llm_context import Turn, conversation_context_cache
+from core.services.ollama_client import CONNECT_ERRORS, OllamaBackend, OllamaRouter
 
 logger = logging.getLogger('core')
 
@@ -17,10 +25,38 @@ class LLMService:
     def __init__(self):
         """Initialize LLM service."""
         self.base_url = settings.OLLAMA_BASE_URL
+        # Optional list of Ollama servers; requests go to the least-loaded one
+        self.base_urls = list(settings.OLLAMA_BASE_URLS)
         self.model_name = settings.LLM_MODEL_NAME
         self.max_tokens = settings.LLM_MAX_TOKENS
         self.temperature = settings.LLM_TEMPERATURE
         self._client = None
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+        # Async clients are bound to the event loop that created them
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._router = None
+    
+    @property
+    def router(self) -> OllamaRouter:
+        """Backend router with per-model concurrency limits (built on first use)."""
+        if self._router is None:
+            self._router = OllamaRouter(
+                self.base_urls or [self.base_url],
+                max_concurrency=settings.LLM_MAX_CONCURRENCY,
+                queue_timeout=settings.LLM_QUEUE_TIMEOUT,
+                retries=settings.LLM_RETRIES
+            )
+        return self._router
+    
+    def _client_options(self) -> dict:
+        return {
+            'timeout': httpx.Timeout(settings.LLM_TIMEOUT, connect=settings.LLM_CONNECT_TIMEOUT),
+            'limits': httpx.Limits(
+                max_connections=settings.LLM_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_POOL_MAX_KEEPALIVE
+            ),
+        }
     
     @property
     def client(self) -> httpx.Client:
@@ -28,38 +64,270 @@ class LLMService:
         if self._client is None:
             self._client = httpx.Client(
                 base_url=self.base_url,
-                timeout=60.0
+                **self._client_options()
             )
         return self._client
     
-    def _build_conversation_context(self, conversation_id: Optional[str]) -> str:
-        """Build conversation context from history."""
+    def _client_for(self, backend: OllamaBackend) -> httpx.Client:
+        """Sync client of a backend (connections pooled per backend)."""
+        if backend.url == self.base_url.rstrip('/'):
+            return self.client
+        with self._clients_lock:
+            if backend.url not in self._clients:
+                self._clients[backend.url] = httpx.Client(base_url=backend.url, **self._client_options())
+            return self._clients[backend.url]
+    
+    def _async_client_for(self, backend: OllamaBackend) -> httpx.AsyncClient:
+        """Async client of a backend for the running event loop."""
+        clients = self._async_clients.setdefault(asyncio.get_running_loop(), {})
+        if backend.url not in clients:
+            clients[backend.url] = httpx.AsyncClient(base_url=backend.url, **self._client_options())
+        return clients[backend.url]
+    
+    def _retry_or_raise(self, backend: OllamaBackend, error: Exception, attempt: int) -> float:
+        """Handle a connect error: return the delay before the next attempt, or re-raise."""
+        self.router.mark_failed(backend)
+        if attempt > self.router.retries:
+            raise error
+        logger.warning(
+            f"Ollama at {backend.url} unreachable ({error}), retry {attempt}/{self.router.retries}"
+        )
+        return self.router.backoff(attempt)
+    
+    def _post(self, payload: dict) -> dict:
+        """POST /api/generate in a concurrency slot, retrying connect errors on another backend."""
+        attempt = 0
+        while True:
+            attempt += 1
+            with self.router.slot(self.model_name) as backend:
+                try:
+                    response = self._client_for(backend).post("/api/generate", json=payload)
+                    response.raise_for_status()
+                    return response.json()
+                except CONNECT_ERRORS as e:
+                    delay = self._retry_or_raise(backend, e, attempt)
+            time.sleep(delay)
+    
+    async def _apost(self, payload: dict) -> dict:
+        """Async counterpart of ``_post``."""
+        attempt = 0
+        while True:
+            attempt += 1
+            async with self.router.aslot(self.model_name) as backend:
+                try:
+                    response = await self._async_client_for(backend).post("/api/generate", json=payload)
+                    response.raise_for_status()
+                    return response.json()
+                except CONNECT_ERRORS as e:
+                    delay = self._retry_or_raise(backend, e, attempt)
+            await asyncio.sleep(delay)
+    
+    def _stream_chunks(self, payload: dict) -> Iterator[dict]:
+        """Stream /api/generate chunks; connect errors are retried until the first chunk."""
+        attempt = 0
+        while True:
+            attempt += 1
+            started = False
+            with self.router.slot(self.model_name) as backend:
+                try:
+                    with self._client_for(backend).stream("POST", "/api/generate", json=payload) as response:
+                        response.raise_for_status()
+                        started = True
+                        for line in response.iter_lines():
+                            if line:
+                                yield json.loads(line)
+                        return
+                except CONNECT_ERRORS as e:
+                    if started:
+                        raise
+                    delay = self._retry_or_raise(backend, e, attempt)
+            time.sleep(delay)
+    
+    async def _astream_chunks(self, payload: dict) -> AsyncIterator[dict]:
+        """Async counterpart of ``_stream_chunks``."""
+        attempt = 0
+        while True:
+            attempt += 1
+            started = False
+            async with self.router.aslot(self.model_name) as backend:
+                try:
+                    client = self._async_client_for(backend)
+                    async with client.stream("POST", "/api/generate", json=payload) as response:
+                        response.raise_for_status()
+                        started = True
+                        async for line in response.aiter_lines():
+                            if line:
+                                yield json.loads(line)
+                        return
+                except CONNECT_ERRORS as e:
+                    if started:
+                        raise
+                    delay = self._retry_or_raise(backend, e, attempt)
+            await asyncio.sleep(delay)
+    
+    def warm_up(self) -> str:
+        """
+        Load the model into memory on every Ollama backend.
+        
+        An empty prompt makes Ollama load the model without generating.
+        
+        Returns:
+            Short description of what was warmed
+        """
+        payload = {"model": self.model_name, "prompt": "", "stream": False}
+        if settings.LLM_KEEP_ALIVE:
+            payload["keep_alive"] = settings.LLM_KEEP_ALIVE
+        for backend in self.router.backends:
+            response = self._client_for(backend).post("/api/generate", json=payload)
+            response.raise_for_status()
+        return f"{self.model_name} loaded on {len(self.router.backends)} backend(s)"
+    
+    def _build_conversation_context(
+        self,
+        conversation_id: Optional[str],
+        message: str = ''
+    ) -> Tuple[str, Optional[List[int]], Optional[int]]:
+        """
+        Build conversation context from the cached history.
+        
+        Returns:
+            Tuple of (history text, Ollama context tokens, last message ID covered)
+        """
         if not conversation_id:
-            return ""
+            return "", None, None
         
         try:
-            from llm.models import Conversation, Message
-            conversation = Conversation.objects.filter(id=conversation_id).first()
-            if not conversation:
-                return ""
-            
-            # Get recent messages (last 10 for context)
-            messages = Message.objects.filter(
-                conversation=conversation
-            ).order_by('-created_at')[:10]
-            
-            # Build context from messages (reverse to get chronological order)
-            context_parts = []
-            for msg in reversed(messages):
-                role_prefix = "User" if msg.role == 'user' else "Assistant"
-                context_parts.append(f"{role_prefix}: {msg.content}")
-            
-            if context_parts:
-                return "\n".join(context_parts) + "\n\n"
-            return ""
+            summarize = self._summarize if settings.LLM_CONTEXT_SUMMARIZE else None
+            return conversation_context_cache.build(int(conversation_id), message, summarize)
         except Exception as e:
             logger.warning(f"Failed to build conversation context: {e}")
-            return ""
+            return "", None, None
+    
+    def _summarize(self, summary: str, turns: List[Turn]) -> str:
+        """Fold turns trimmed from the context into the running summary."""
+        lines = [f"Summary so far: {summary}"] if summary else []
+        lines.extend(turn.format() for turn in turns)
+        prompt = (
+            "Summarize the following conversation in a few sentences, keeping names, "
+            "facts and open questions:\n\n" + "\n".join(lines)
+        )
+        try:
+            result = self._post({
+                "model": self.model_name,
+                "prompt": prompt,
+                "stream": False,
+                "options": {"temperature": 0, "num_predict": self.max_tokens}
+            })
+            return result.get("response", "").strip() or summary
+        except Exception as e:
+            logger.warning(f"Failed to summarize conversation context: {e}")
+            return summary
+    
+    def _build_payload(
+        self,
+        message: str,
+        conversation_id: Optional[str],
+        stream: bool
+    ) -> Tuple[dict, Optional[int]]:
+        """
+        Build Ollama /api/generate payload with conversation context.
+        
+        Returns:
+            Tuple of (payload, last message ID covered by the prompt)
+        """
+        context, context_tokens, through = self._build_conversation_context(conversation_id, message)
+        
+        # Prepare prompt with context
+        if context:
+            full_prompt = f"{context}User: {message}\nAssistant:"
+        else:
+            full_prompt = message
+        
+        payload = {
+            "model": self.model_name,
+            "prompt": full_prompt,
+            "stream": stream,
+            "options": {
+                "temperature": self.temperature,
+                "num_predict": self.max_tokens
+            }
+        }
+        if context_tokens:
+            # History already encoded by Ollama on the previous turn
+            payload["context"] = context_tokens
+        if settings.LLM_KEEP_ALIVE:
+            payload["keep_alive"] = settings.LLM_KEEP_ALIVE
+        return payload, through
+    
+    def _remember_context(
+        self,
+        conversation_id: Optional[str],
+        result: dict,
+        through: Optional[int]
+    ):
+        """Keep the context tokens Ollama returned for the next turn."""
+        if conversation_id and result.get("context"):
+            conversation_context_cache.set_ollama_context(
+                int(conversation_id), result["context"], through
+            )
+    
+    def _to_service_error(self, error: Exception) -> LLMServiceError:
+        """Convert a request exception into LLMServiceError (and log it)."""
+        if isinstance(error, httpx.ConnectError):
+            logger.error(f"Ollama connection failed: {error}", exc_info=True)
+            return LLMServiceError(
+                f"Не удалось подключиться к Ollama. Убедитесь, что Ollama запущен:\n"
+                f"1. Установите Ollama: https://ollama.ai\n"
+                f"2. Запустите: ollama serve\n"
+                f"3. Проверьте URL: {self.base_url}\n"
+                f"Ошибка: {str(error)}"
+            )
+        if isinstance(error, httpx.HTTPError):
+            logger.error(f"LLM request failed: {error}", exc_info=True)
+            return LLMServiceError(f"Ошибка запроса к Ollama: {error}")
+        logger.error(f"Unexpected error in LLM service: {error}", exc_info=True)
+        return LLMServiceError(f"Ошибка LLM сервиса: {error}")
+    
+    def _cached_response(self, payload: dict) -> Tuple[Optional[str], Optional[tuple]]:
+        """
+        Look up a deterministic (temperature 0) response, cached by prompt.
+        
+        Returns:
+            Tuple of (cached response or None, cache key or None if not cacheable)
+        """
+        if self.temperature != 0:
+            return None, None
+        from core.result_cache import content_hash, result_cache
+        digest = content_hash(payload['prompt'])
+        params = {
+            'model': self.model_name,
+            'num_predict': self.max_tokens,
+            'context': content_hash(json.dumps(payload.get('context'))),
+        }
+        return result_cache.get('llm', digest, params), (digest, params)
+    
+    def _finish_response(
+        self,
+        message: str,
+        conversation_id: Optional[str],
+        payload: dict,
+        result: dict,
+        through: Optional[int],
+        cache_key: Optional[tuple]
+    ) -> str:
+        """Remember Ollama's context, log and cache a complete response."""
+        ai_response = result.get("response", "")
+        self._remember_context(conversation_id, result, through)
+        
+        logger.info(
+            f"LLM response generated (length: {len(ai_response)}, "
+            f"context_used={payload['prompt'] != message or 'context' in payload})"
+        )
+        ai_response = ai_response.strip()
+        if cache_key is not None:
+            from core.result_cache import result_cache
+            result_cache.set('llm', *cache_key, ai_response)
+        return ai_response
     
     def generate(
         self,
@@ -77,61 +345,139 @@ class LLMService:
             AI response text
             
         Raises:
+            LLMBusyError: If no slot frees up within LLM_QUEUE_TIMEOUT
             LLMServiceError: If generation fails
         """
         try:
-            # Build conversation context if conversation_id is provided
-            context = self._build_conversation_context(conversation_id)
+            payload, through = self._build_payload(message, conversation_id, stream=False)
+            cached, cache_key = self._cached_response(payload)
+            if cached is not None:
+                return cached
             
-            # Prepare prompt with context
-            if context:
-                full_prompt = f"{context}User: {message}\nAssistant:"
-            else:
-                full_prompt = message
+            result = self._post(payload)
+            return self._finish_response(message, conversation_id, payload, result, through, cache_key)
             
-            # Prepare request
-            payload = {
-                "model": self.model_name,
-                "prompt": full_prompt,
-                "stream": False,
-                "options": {
-                    "temperature": self.temperature,
-                    "num_predict": self.max_tokens
-                }
-            }
+        except LLMServiceError:
+            raise
+        except Exception as e:
+            raise self._to_service_error(e)
+    
+    async def agenerate(
+        self,
+        message: str,
+        conversation_id: Optional[str] = None
+    ) -> str:
+        """
+        Generate response from LLM without blocking the event loop.
+        
+        Same as ``generate``, over an ``httpx.AsyncClient``.
+        """
+        try:
+            payload, through = await sync_to_async(self._build_payload)(message, conversation_id, False)
+            cached, cache_key = await sync_to_async(self._cached_response)(payload)
+            if cached is not None:
+                return cached
             
-            # Make request to Ollama
-            response = self.client.post(
-                "/api/generate",
-                json=payload
+            result = await self._apost(payload)
+            return await sync_to_async(self._finish_response)(
+                message, conversation_id, payload, result, through, cache_key
             )
-            response.raise_for_status()
             
-            result = response.json()
-            ai_response = result.get("response", "")
+        except LLMServiceError:
+            raise
+        except Exception as e:
+            raise self._to_service_error(e)
+    
+    @staticmethod
+    def _chunk_token(chunk: dict) -> str:
+        if chunk.get("error"):
+            raise LLMServiceError(f"Ошибка Ollama: {chunk['error']}")
+        return chunk.get("response", "")
+    
+    def generate_stream(
+        self,
+        message: str,
+        conversation_id: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Generate response from LLM token by token.
+        
+        Uses Ollama stream mode: the response body is newline-delimited JSON,
+        one object per generated chunk, the last one with ``"done": true``.
+        
+        Args:
+            message: User message
+            conversation_id: Optional conversation ID for context
+            
+        Yields:
+            Response text chunks as Ollama emits them
+            
+        Raises:
+            LLMBusyError: If no slot frees up within LLM_QUEUE_TIMEOUT
+            LLMServiceError: If generation fails
+        """
+        try:
+            payload, through = self._build_payload(message, conversation_id, stream=True)
+            
+            chunk_count = 0
+            for chunk in self._stream_chunks(payload):
+                token = self._chunk_token(chunk)
+                if token:
+                    chunk_count += 1
+                    yield token
+                if chunk.get("done"):
+                    self._remember_context(conversation_id, chunk, through)
+                    break
             
-            logger.info(f"LLM response generated (length: {len(ai_response)}, context_used={bool(context)})")
-            return ai_response.strip()
+            logger.info(f"LLM stream completed (chunks: {chunk_count})")
             
-        except httpx.ConnectError as e:
-            logger.error(f"Ollama connection failed: {e}", exc_info=True)
-            raise LLMServiceError(
-                f"Не удалось подключиться к Ollama. Убедитесь, что Ollama запущен:\n"
-                f"1. Установите Ollama: https://ollama.ai\n"
-                f"2. Запустите: ollama serve\n"
-                f"3. Проверьте URL: {self.base_url}\n"
-                f"Ошибка: {str(e)}"
-            )
-        except httpx.HTTPError as e:
-            logger.error(f"LLM request failed: {e}", exc_info=True)
-            raise LLMServiceError(f"Ошибка запроса к Ollama: {e}")
+        except LLMServiceError:
+            raise
         except Exception as e:
-            logger.error(f"Unexpected error in LLM service: {e}", exc_info=True)
-            raise LLMServiceError(f"Ошибка LLM сервиса: {e}")
+            raise self._to_service_error(e)
+    
+    async def agenerate_stream(
+        self,
+        message: str,
+        conversation_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Generate response from LLM token by token without blocking the event loop.
+        
+        Same as ``generate_stream``, over an ``httpx.AsyncClient``.
+        """
+        try:
+            payload, through = await sync_to_async(self._build_payload)(message, conversation_id, True)
+            
+            chunk_count = 0
+            async for chunk in self._astream_chunks(payload):
+                token = self._chunk_token(chunk)
+                if token:
+                    chunk_count += 1
+                    yield token
+                if chunk.get("done"):
+                    await sync_to_async(self._remember_context)(conversation_id, chunk, through)
+                    break
+            
+            logger.info(f"LLM stream completed (chunks: {chunk_count})")
+            
+        except LLMServiceError:
+            raise
+        except Exception as e:
+            raise self._to_service_error(e)
     
     def close(self):
-        """Close HTTP client."""
+        """Close HTTP clients."""
         if self._client:
             self._client.close()
             self._client = None
-
+        with self._clients_lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+    
+    async def aclose(self):
+        """Close the async HTTP clients of the running event loop."""
+        clients = self._async_clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            await client.aclose()
@@ -0,0 +1,235 @@
+"""
+Ollama connection management: concurrency limits, queueing, retries and routing.
+
+Each model may have ``LLM_MAX_CONCURRENCY`` requests in flight on each
+backend (``OLLAMA_BASE_URLS``). Requests for a model share one FIFO queue, a
+``ConcurrencyLimiter`` with that many slots per available backend, for threads
+and coroutines alike, and wait in it for up to ``LLM_QUEUE_TIMEOUT`` seconds. A
+burst of chats then queues in the web process instead of piling onto Ollama.
+A granted request goes to the least-loaded backend that has a free slot for
+its model. Backends that refuse connections are skipped for a cooldown (and
+their slots are withdrawn meanwhile), and the request is retried with
+jittered exponential backoff.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+
+import httpx
+
+from core.exceptions import LLMBusyError
+
+# Errors raised before the request reached Ollama - safe to retry elsewhere
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+class _Waiter:
+    __slots__ = ('event', 'loop', 'future', 'granted')
+    
+    def __init__(self, event=None, loop=None, future=None):
+        self.event = event
+        self.loop = loop
+        self.future = future
+        self.granted = False
+
+
+class ConcurrencyLimiter:
+    """Counting semaphore with a FIFO queue shared by threads and coroutines."""
+    
+    def __init__(self, slots: int):
+        self.slots = slots
+        self.in_use = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+    
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+    
+    def _try_acquire(self, waiter_factory) -> Optional[_Waiter]:
+        """Take a free slot (returns None) or enqueue a waiter."""
+        with self._lock:
+            if self.in_use < self.slots and not self._waiters:
+                self.in_use += 1
+                return None
+            waiter = waiter_factory()
+            self._waiters.append(waiter)
+            return waiter
+    
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """Leave the queue after a timeout; returns True if the slot was granted meanwhile."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            return False
+    
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a slot in a thread; False on timeout."""
+        waiter = self._try_acquire(lambda: _Waiter(event=threading.Event()))
+        if waiter is None:
+            return True
+        if waiter.event.wait(timeout):
+            return True
+        return self._abandon(waiter)
+    
+    async def acquire_async(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a slot in a coroutine; False on timeout."""
+        loop = asyncio.get_running_loop()
+        waiter = self._try_acquire(lambda: _Waiter(loop=loop, future=loop.create_future()))
+        if waiter is None:
+            return True
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return self._abandon(waiter)
+        except asyncio.CancelledError:
+            if self._abandon(waiter):
+                self.release()
+            raise
+    
+    def release(self):
+        """Free a slot, handing it to the longest-waiting request if any."""
+        with self._lock:
+            if not self._waiters or self.in_use > self.slots:
+                self.in_use -= 1
+                return
+            # The slot passes directly to the next waiter (in_use unchanged)
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+        _wake(waiter)
+    
+    def resize(self, slots: int):
+        """Change the number of slots; extra slots go to waiting requests at once."""
+        with self._lock:
+            self.slots = slots
+            granted = []
+            while self._waiters and self.in_use < self.slots:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                self.in_use += 1
+                granted.append(waiter)
+        for waiter in granted:
+            _wake(waiter)
+
+
+def _wake(waiter: _Waiter):
+    if waiter.event is not None:
+        waiter.event.set()
+    else:
+        waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+@dataclass
+class OllamaBackend:
+    """One Ollama server."""
+    url: str
+    in_flight: int = 0
+    unavailable_until: float = 0.0
+    requests: int = 0
+    # In-flight requests per model
+    models: Dict[str, int] = field(default_factory=dict)
+    
+    def available(self, now: float) -> bool:
+        return now >= self.unavailable_until
+
+
+@dataclass
+class OllamaRouter:
+    """Routes requests over Ollama backends under per-backend, per-model concurrency limits."""
+    urls: List[str]
+    max_concurrency: int = 4
+    queue_timeout: float = 30.0
+    retries: int = 2
+    retry_backoff: float = 0.25
+    cooldown: float = 5.0
+    backends: List[OllamaBackend] = field(init=False)
+    
+    def __post_init__(self):
+        self.backends = [OllamaBackend(url.rstrip('/')) for url in self.urls]
+        self._limiters: Dict[str, ConcurrencyLimiter] = {}
+        self._lock = threading.Lock()
+    
+    def _candidates(self) -> List[OllamaBackend]:
+        """Available backends (all of them if none is available)."""
+        now = time.monotonic()
+        return [b for b in self.backends if b.available(now)] or self.backends
+    
+    def limiter(self, model: str) -> ConcurrencyLimiter:
+        """Queue of ``model``, with ``max_concurrency`` slots per available backend."""
+        with self._lock:
+            slots = self.max_concurrency * len(self._candidates())
+            limiter = self._limiters.get(model)
+            if limiter is None:
+                limiter = self._limiters[model] = ConcurrencyLimiter(slots)
+        limiter.resize(slots)
+        return limiter
+    
+    def _choose(self, model: str) -> OllamaBackend:
+        """Least-loaded candidate backend with a free slot for ``model``."""
+        with self._lock:
+            candidates = self._candidates()
+            free = [b for b in candidates if b.models.get(model, 0) < self.max_concurrency]
+            backend = min(free or candidates, key=lambda b: (b.in_flight, b.requests))
+            backend.in_flight += 1
+            backend.requests += 1
+            backend.models[model] = backend.models.get(model, 0) + 1
+            return backend
+    
+    def _finish(self, backend: OllamaBackend, model: str):
+        with self._lock:
+            backend.in_flight -= 1
+            backend.models[model] -= 1
+    
+    def _busy(self, model: str) -> LLMBusyError:
+        return LLMBusyError(
+            f"LLM сервис перегружен: нет свободного слота для модели {model} "
+            f"за {self.queue_timeout:.0f} с"
+        )
+    
+    @contextmanager
+    def slot(self, model: str):
+        """Hold a concurrency slot and a backend for one request (threads)."""
+        limiter = self.limiter(model)
+        if not limiter.acquire(self.queue_timeout):
+            raise self._busy(model)
+        backend = self._choose(model)
+        try:
+            yield backend
+        finally:
+            self._finish(backend, model)
+            limiter.release()
+    
+    @asynccontextmanager
+    async def aslot(self, model: str):
+        """Hold a concurrency slot and a backend for one request (coroutines)."""
+        limiter = self.limiter(model)
+        if not await limiter.acquire_async(self.queue_timeout):
+            raise self._busy(model)
+        backend = self._choose(model)
+        try:
+            yield backend
+        finally:
+            self._finish(backend, model)
+            limiter.release()
+    
+    def mark_failed(self, backend: OllamaBackend):
+        """Skip a backend that refused a connection for the cooldown period."""
+        with self._lock:
+            backend.unavailable_until = time.monotonic() + self.cooldown
+    
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry ``attempt`` (1-based): exponential with full jitter."""
+        return random.uniform(0, self.retry_backoff * (2 ** (attempt - 1)))
@@ -0,0 +1,181 @@
+"""
+Voice assistant pipeline - ASR → LLM → TTS in one async request.
+
+Stages overlap instead of running back to back: the LLM response is streamed
+token by token, and each complete sentence is handed to TTS while generation
+continues, so the first audio is ready long before the full reply is.
+
+The blocking ASR and TTS model calls run in threads (``asyncio.to_thread``) and
+the LLM is streamed over an async HTTP client, keeping the event loop free to
+serve other requests under ASGI.
+"""
+
+import asyncio
+import base64
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from core.exceptions import ASRServiceError, LLMServiceError, TTSServiceError
+from core.services.tts_service import SENTENCE_BOUNDARY
+
+logger = logging.getLogger('core')
+
+
+@dataclass
+class StageTimings:
+    """Wall-clock timings (seconds) of pipeline stages, measured from request start."""
+    started: float = field(default_factory=time.perf_counter)
+    values: Dict[str, float] = field(default_factory=dict)
+    
+    def mark(self, stage: str) -> float:
+        """Record time elapsed since start for a stage (first mark wins)."""
+        return self.values.setdefault(stage, time.perf_counter() - self.started)
+    
+    def add(self, stage: str, seconds: float):
+        """Accumulate time spent in a stage (e.g. all TTS calls)."""
+        self.values[stage] = self.values.get(stage, 0.0) + seconds
+    
+    def as_dict(self) -> Dict[str, float]:
+        return {stage: round(value, 4) for stage, value in self.values.items()}
+
+
+class SentenceBuffer:
+    """Collect streamed tokens and release text in complete sentences."""
+    
+    def __init__(self, min_length: int = 20):
+        self.min_length = min_length
+        self._text = ''
+    
+    def feed(self, token: str) -> Optional[str]:
+        """Add a token; return complete sentences once at least ``min_length`` long."""
+        self._text += token
+        boundary = None
+        for boundary in SENTENCE_BOUNDARY.finditer(self._text):
+            pass
+        if boundary is None or len(self._text[:boundary.start()].strip()) < self.min_length:
+            return None
+        complete = self._text[:boundary.start()].strip()
+        self._text = self._text[boundary.end():]
+        return complete
+    
+    def flush(self) -> Optional[str]:
+        """Return any remaining text."""
+        remainder, self._text = self._text.strip(), ''
+        return remainder or None
+
+
+class VoicePipeline:
+    """Async ASR → LLM → TTS pipeline with overlapped LLM and TTS stages."""
+    
+    def __init__(self, asr, llm, tts, tts_workers: Optional[int] = None):
+        """
+        Initialize pipeline.
+        
+        Args:
+            asr: ASRService instance
+            llm: LLMService instance
+            tts: TTSService instance
+            tts_workers: Sentences synthesized concurrently (default TTS_STREAM_WORKERS)
+        """
+        self.asr = asr
+        self.llm = llm
+        self.tts = tts
+        self.tts_workers = tts_workers or settings.TTS_STREAM_WORKERS
+    
+    async def run(
+        self,
+        audio_data: bytes,
+        language: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        voice: Optional[str] = None,
+        timings: Optional[StageTimings] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Run the pipeline, yielding events as each stage produces output.
+        
+        Events: ``('transcript', {text, language})``, ``('token', {token})``,
+        ``('audio', {index, text, audio})`` with base64 WAV per sentence, and a
+        final ``('done', {content, timings})``. Service errors end the stream
+        with ``('error', {stage, error})``.
+        
+        Args:
+            audio_data: Uploaded audio bytes
+            language: Optional language code for ASR
+            conversation_id: Optional conversation ID for LLM context
+            voice: Optional TTS voice name
+            timings: Optional StageTimings to record into
+        """
+        timings = timings or StageTimings()
+        
+        try:
+            text, detected_language = await asyncio.to_thread(self.asr.transcribe, audio_data, language)
+        except ASRServiceError as e:
+            logger.error(f"Voice pipeline ASR error: {e}")
+            yield 'error', {'stage': 'asr', 'error': str(e)}
+            return
+        timings.mark('asr')
+        yield 'transcript', {'text': text, 'language': detected_language}
+        
+        semaphore = asyncio.Semaphore(self.tts_workers)
+        
+        async def synthesize(sentence: str) -> bytes:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    return await asyncio.to_thread(self.tts.synthesize, sentence, voice)
+                finally:
+                    timings.add('tts', time.perf_counter() - started)
+        
+        sentences = SentenceBuffer()
+        pending: List[Tuple[str, asyncio.Task]] = []
+        parts = []
+        sent = 0
+        
+        def queue_sentence(sentence: Optional[str]):
+            if sentence:
+                pending.append((sentence, asyncio.ensure_future(synthesize(sentence))))
+        
+        def audio_event(sentence: str, task: asyncio.Task) -> Tuple[str, Dict[str, Any]]:
+            timings.mark('tts_first_audio')
+            return 'audio', {
+                'index': sent,
+                'text': sentence,
+                'audio': base64.b64encode(task.result()).decode('ascii'),
+            }
+        
+        try:
+            async for token in self.llm.agenerate_stream(text, conversation_id):
+                timings.mark('llm_first_token')
+                parts.append(token)
+                yield 'token', {'token': token}
+                queue_sentence(sentences.feed(token))
+                
+                # Deliver finished sentences in order while generation continues
+                while sent < len(pending) and pending[sent][1].done():
+                    yield audio_event(*pending[sent])
+                    sent += 1
+            timings.mark('llm')
+            queue_sentence(sentences.flush())
+            
+            while sent < len(pending):
+                sentence, task = pending[sent]
+                await task
+                yield audio_event(sentence, task)
+                sent += 1
+        except LLMServiceError as e:
+            logger.error(f"Voice pipeline LLM error: {e}")
+            yield 'error', {'stage': 'llm', 'error': str(e)}
+            return
+        except TTSServiceError as e:
+            logger.error(f"Voice pipeline TTS error: {e}")
+            yield 'error', {'stage': 'tts', 'error': str(e)}
+            return
+        finally:
+            for _, task in pending[sent:]:
+                task.cancel()
+        
+        timings.mark('total')
+        yield 'done', {'content': ''.join(parts).strip(), 'timings': timings.as_dict()}
@@ -0,0 +1,185 @@
+"""
+Batched data retention.
+
+Old rows are deleted in bounded primary-key batches, each in its own short
+transaction, with an optional pause between batches so cleanup can run
+alongside normal traffic. Deletes are explicit ``DELETE ... WHERE id IN``
+statements that skip the per-object ``post_delete`` signals; their work is
+done once per batch instead: cache invalidation, search index removal, and
+deletion of media files on a thread pool.
+
+A media file is deleted only if no remaining row and no queued or running
+job references it. Right before deleting, the file's media lock (which
+``store_media`` takes as well) is held and names ``store_media`` returned
+recently are kept: their rows may not be saved yet.
+"""
+
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Exists, OuterRef, QuerySet
+
+from core.result_cache import delete_media_file, referenced_media
+from core.search import remove_documents
+
+logger = logging.getLogger('core')
+
+
+@dataclass
+class RetentionResult:
+    """Outcome of purging one model."""
+    deleted: int = 0
+    files_deleted: int = 0
+    batches: int = 0
+
+
+class RetentionCleaner:
+    """Delete rows created before a cutoff in batches, bypassing per-object signals."""
+    
+    def __init__(self, cutoff, batch_size: int = 1000, workers: int = 8, pause: float = 0.0):
+        """
+        Initialize cleaner.
+        
+        Args:
+            cutoff: Rows created before this datetime are deleted
+            batch_size: Rows deleted per transaction
+            workers: Threads deleting media files
+            pause: Seconds to sleep between batches (throttling)
+        """
+        self.cutoff = cutoff
+        self.batch_size = batch_size
+        self.workers = workers
+        self.pause = pause
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._file_jobs: List[Tuple[RetentionResult, Future]] = []
+    
+    def __enter__(self):
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='retention')
+        return self
+    
+    def __exit__(self, *exc):
+        self.wait()
+        self._pool.shutdown()
+        self._pool = None
+    
+    # Candidate querysets
+    
+    def old_transcriptions(self) -> QuerySet:
+        from asr.models import Transcription
+        return Transcription.objects.filter(created_at__lt=self.cutoff)
+    
+    def old_syntheses(self) -> QuerySet:
+        from tts.models import Synthesis
+        return Synthesis.objects.filter(created_at__lt=self.cutoff)
+    
+    def old_empty_conversations(self) -> QuerySet:
+        from llm.models import Conversation, Message
+        return Conversation.objects.filter(created_at__lt=self.cutoff).filter(
+            ~Exists(Message.objects.filter(conversation=OuterRef('pk')))
+        )
+    
+    # Purges
+    
+    def purge_transcriptions(self) -> RetentionResult:
+        """Delete old transcriptions, their segments and unreferenced audio files."""
+        from asr.models import TranscriptionSegment
+        
+        def after_batch(ids, rows):
+            user_ids = {row[2] for row in rows}
+            cache.delete_many([f'transcriptions_{user_id}' for user_id in user_ids])
+            remove_documents('transcription', ids)
+        
+        return self._purge(
+            self.old_transcriptions(),
+            columns=('audio_file', 'user_id'),
+            children=[(TranscriptionSegment, 'transcription_id')],
+            after_batch=after_batch,
+            media_field='audio_file'
+        )
+    
+    def purge_syntheses(self) -> RetentionResult:
+        """Delete old syntheses and unreferenced audio files."""
+        return self._purge(self.old_syntheses(), columns=('audio_file',), media_field='audio_file')
+    
+    def purge_empty_conversations(self) -> RetentionResult:
+        """Delete old conversations without messages."""
+        return self._purge(self.old_empty_conversations())
+    
+    def batches(self, queryset: QuerySet, columns: Sequence[str] = ()) -> Iterator[List[tuple]]:
+        """Yield ``(pk, *columns)`` rows in ascending primary-key batches."""
+        last_pk = 0
+        while True:
+            rows = list(
+                queryset.filter(pk__gt=last_pk).order_by('pk').values_list('pk', *columns)[:self.batch_size]
+            )
+            if not rows:
+                return
+            yield rows
+            last_pk = rows[-1][0]
+    
+    def _purge(
+        self,
+        queryset: QuerySet,
+        columns: Sequence[str] = (),
+        children: Sequence[Tuple[type, str]] = (),
+        after_batch: Optional[Callable[[List[int], List[tuple]], None]] = None,
+        media_field: Optional[str] = None
+    ) -> RetentionResult:
+        result = RetentionResult()
+        model = queryset.model
+        db = queryset.db
+        
+        for rows in self.batches(queryset, columns):
+            with transaction.atomic(using=db):
+                # Re-select and lock the rows so ones that changed since selection are kept
+                kept = set(
+                    queryset.filter(pk__in=[row[0] for row in rows])
+                    .select_for_update()
+                    .values_list('pk', flat=True)
+                )
+                rows = [row for row in rows if row[0] in kept]
+                ids = [row[0] for row in rows]
+                for child, field in children:
+                    _delete_in(child, field, ids, db)
+                result.deleted += _delete_in(model, model._meta.pk.name, ids, db)
+            result.batches += 1
+            
+            if ids and after_batch is not None:
+                after_batch(ids, rows)
+            if media_field is not None:
+                self._delete_media(model, media_field, {row[1] for row in rows if row[1]}, result)
+            
+            if self.pause:
+                time.sleep(self.pause)
+        return result
+    
+    def _delete_media(self, model, field: str, names: Set[str], result: RetentionResult):
+        """Queue deletion of files nothing references any more (media is content-addressed and shared)."""
+        if not names:
+            return
+        for name in names - referenced_media(names, model, field):
+            self._file_jobs.append((result, self._pool.submit(delete_media_file, name)))
+    
+    def wait(self):
+        """Wait for queued file deletions and count them into their results."""
+        for result, job in self._file_jobs:
+            result.files_deleted += job.result()
+        self._file_jobs.clear()
+
+
+def _delete_in(model, field: str, values: List, using: str) -> int:
+    """Run ``DELETE FROM <table> WHERE <field> IN (values)``; returns the row count."""
+    if not values:
+        return 0
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.get_field(field).column)
+    placeholders = ', '.join(['%s'] * len(values))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE {column} IN ({placeholders})', values)
+        return cursor.rowcount
@@ -0,0 +1,108 @@
+"""
+Resident Piper TTS engine - voices loaded once per process.
+
+Uses the ``piper-tts`` Python package (ONNX runtime) in-process instead of
+starting a ``piper`` subprocess per request, so each request pays only for
+synthesis, not for loading the voice model. Audio is returned from memory.
+
+Install with: pip install piper-tts
+"""
+
+import io
+import logging
+import threading
+import wave
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+logger = logging.getLogger('core')
+
+
+class PiperEngine:
+    """In-process Piper runtime with a per-process cache of loaded voices."""
+    
+    def __init__(self, model_path: str = ''):
+        """
+        Initialize engine.
+        
+        Args:
+            model_path: Directory with voice models (or a single .onnx file)
+        """
+        self.model_path = model_path
+        self._voices: Dict[str, object] = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def is_available() -> bool:
+        """Check if the piper Python package is installed."""
+        try:
+            import piper  # noqa: F401
+            return True
+        except ImportError:
+            return False
+    
+    def resolve_model(self, voice_name: str) -> Path:
+        """
+        Find the .onnx model file for a voice.
+        
+        Accepts a path to an .onnx file, or a voice name such as
+        ``de_DE/thorsten/medium`` looked up in ``model_path`` (also as
+        ``de_DE-thorsten-medium.onnx``, the name used by Piper releases).
+        """
+        candidates = []
+        if voice_name.endswith('.onnx'):
+            candidates.append(Path(voice_name))
+        if self.model_path:
+            base = Path(self.model_path)
+            if base.suffix == '.onnx':
+                candidates.append(base)
+            candidates.append(base / f'{voice_name}.onnx')
+            candidates.append(base / f"{voice_name.replace('/', '-')}.onnx")
+        candidates.append(Path(f"{voice_name.replace('/', '-')}.onnx"))
+        
+        for candidate in candidates:
+            if candidate.is_file():
+                return candidate
+        raise FileNotFoundError(f"Piper voice model not found for '{voice_name}'")
+    
+    def get_voice(self, voice_name: str):
+        """Get a loaded voice, loading it on first use."""
+        voice = self._voices.get(voice_name)
+        if voice is not None:
+            return voice
+        
+        with self._lock:
+            voice = self._voices.get(voice_name)
+            if voice is None:
+                from piper import PiperVoice
+                model = self.resolve_model(voice_name)
+                logger.info(f"Loading Piper voice: {voice_name} ({model})")
+                voice = PiperVoice.load(str(model))
+                self._voices[voice_name] = voice
+        return voice
+    
+    def preload(self, voice_names: Iterable[str]) -> List[str]:
+        """Load voices ahead of the first request; returns voices that loaded."""
+        loaded = []
+        for voice_name in voice_names:
+            try:
+                self.get_voice(voice_name)
+                loaded.append(voice_name)
+            except Exception as e:
+                logger.warning(f"Failed to preload Piper voice {voice_name}: {e}")
+        return loaded
+    
+    @property
+    def loaded_voices(self) -> List[str]:
+        return list(self._voices)
+    
+    def synthesize(self, text: str, voice_name: str) -> bytes:
+        """Synthesize text to WAV bytes in memory."""
+        voice = self.get_voice(voice_name)
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav_file:
+            if hasattr(voice, 'synthesize_wav'):
+                voice.synthesize_wav(text, wav_file)  # piper-tts >= 1.3
+            else:
+                voice.synthesize(text, wav_file)
+        return buffer.getvalue()
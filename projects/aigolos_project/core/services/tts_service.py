@@ -2,16 +2,78 @@
 TTS Service - Text-to-Speech using Piper.
 """
 
+import io
 import logging
-from typing import Optional
+import re
+import struct
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
 import tempfile
 import subprocess
 from django.conf import settings
 from core.exceptions import TTSServiceError
+from core.services.tts_engine import PiperEngine
 
 logger = logging.getLogger('core')
 
+# Sentence end (., !, ?, …) followed by whitespace, or a paragraph break
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?…])\s+|\n\s*\n')
+
+# Data size used in streamed WAV headers when the total length is unknown
+STREAMING_WAV_SIZE = 0xFFFFFFFF
+
+
+def split_sentences(text: str, min_length: int = 20) -> List[str]:
+    """
+    Split text into sentences for pipelined synthesis.
+    
+    Sentences shorter than ``min_length`` are merged with the next one so very
+    short fragments don't each pay per-call overhead.
+    """
+    sentences = []
+    pending = ''
+    for part in SENTENCE_BOUNDARY.split(text):
+        part = part.strip()
+        if not part:
+            continue
+        pending = f"{pending} {part}" if pending else part
+        if len(pending) >= min_length:
+            sentences.append(pending)
+            pending = ''
+    if pending:
+        if sentences and len(pending) < min_length:
+            sentences[-1] = f"{sentences[-1]} {pending}"
+        else:
+            sentences.append(pending)
+    return sentences
+
+
+def wav_header(
+    channels: int,
+    sample_width: int,
+    frame_rate: int,
+    data_size: int = STREAMING_WAV_SIZE
+) -> bytes:
+    """Build a PCM WAV header; the default data size marks a stream of unknown length."""
+    byte_rate = frame_rate * channels * sample_width
+    riff_size = STREAMING_WAV_SIZE if data_size == STREAMING_WAV_SIZE else 36 + data_size
+    return (
+        b'RIFF' + struct.pack('<I', riff_size) + b'WAVE'
+        + b'fmt ' + struct.pack('<IHHIIHH', 16, 1, channels, frame_rate, byte_rate,
+                                channels * sample_width, sample_width * 8)
+        + b'data' + struct.pack('<I', data_size)
+    )
+
+
+def read_wav(audio_data: bytes) -> Tuple[Tuple[int, int, int], bytes]:
+    """Split WAV bytes into ((channels, sample_width, frame_rate), PCM frames)."""
+    with wave.open(io.BytesIO(audio_data), 'rb') as wav:
+        params = (wav.getnchannels(), wav.getsampwidth(), wav.getframerate())
+        return params, wav.readframes(wav.getnframes())
+
 
 class TTSService:
     """Service for text-to-speech using Piper."""
@@ -20,7 +82,35 @@ class TTSService:
         """Initialize TTS service."""
         self.voice_name = settings.TTS_VOICE_NAME
         self.model_path = settings.TTS_MODEL_PATH
-        self._piper_available = self._check_piper()
+        # Prefer the resident in-process engine; fall back to the piper CLI
+        self._engine = PiperEngine(self.model_path) if PiperEngine.is_available() else None
+    
+    @cached_property
+    def _piper_available(self) -> bool:
+        # Checked on first use, not at import (the CLI check starts a subprocess)
+        return self._engine is not None or self._check_piper()
+    
+    def preload(self, voices: Optional[Iterable[str]] = None) -> List[str]:
+        """Load voices into the resident engine before the first request."""
+        if self._engine is None:
+            return []
+        return self._engine.preload(voices or [self.voice_name, *settings.TTS_PRELOAD_VOICES])
+    
+    def warm_up(self) -> str:
+        """
+        Load voices and synthesize a short phrase.
+        
+        Returns:
+            Short description of what was warmed
+            
+        Raises:
+            TTSServiceError: If Piper is not available or synthesis fails
+        """
+        loaded = self.preload()
+        self.synthesize("Ok.")
+        if self._engine is None:
+            return "piper CLI"
+        return f"voices loaded: {', '.join(loaded)}"
     
     def _check_piper(self) -> bool:
         """Check if Piper is available."""
@@ -65,12 +155,17 @@ class TTSService:
         
         voice_name = voice or self.voice_name
         
+        if self._engine is not None:
+            try:
+                audio_data = self._engine.synthesize(text, voice_name)
+                logger.info(f"TTS synthesis completed (audio size: {len(audio_data)} bytes)")
+                return audio_data
+            except Exception as e:
+                logger.error(f"TTS synthesis failed: {e}", exc_info=True)
+                raise TTSServiceError(f"TTS synthesis failed: {e}")
+        
         try:
-            # Create temporary files
-            with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as text_file:
-                text_file.write(text)
-                text_path = text_file.name
-            
+            # Piper CLI fallback: text is passed on stdin, audio written to a temp file
             with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as audio_file:
                 audio_path = audio_file.name
             
@@ -103,8 +198,7 @@ class TTSService:
                 return audio_data
                 
             finally:
-                # Clean up temporary files
-                Path(text_path).unlink(missing_ok=True)
+                # Clean up temporary file
                 Path(audio_path).unlink(missing_ok=True)
                 
         except subprocess.TimeoutExpired:
@@ -116,3 +210,42 @@ class TTSService:
             logger.error(f"TTS synthesis failed: {e}", exc_info=True)
             raise TTSServiceError(f"TTS synthesis failed: {e}")
 
+    
+    def synthesize_stream(
+        self,
+        text: str,
+        voice: Optional[str] = None,
+        parallel: Optional[int] = None
+    ) -> Iterator[Tuple[Tuple[int, int, int], bytes]]:
+        """
+        Synthesize text sentence by sentence.
+        
+        Sentences are synthesized in a pipeline (up to ``parallel`` at once)
+        and yielded in order as soon as each is ready, so playback can start
+        after the first sentence.
+        
+        Args:
+            text: Text to convert to speech
+            voice: Optional voice name (overrides default)
+            parallel: Sentences synthesized concurrently (default: TTS_STREAM_WORKERS)
+            
+        Yields:
+            Tuple of ((channels, sample_width, frame_rate), PCM frames) per sentence
+            
+        Raises:
+            TTSServiceError: If synthesis fails
+        """
+        sentences = split_sentences(text) or [text]
+        parallel = parallel or settings.TTS_STREAM_WORKERS
+        
+        executor = ThreadPoolExecutor(max_workers=parallel)
+        try:
+            futures = [executor.submit(self.synthesize, sentence, voice) for sentence in sentences]
+            for future in futures:
+                try:
+                    yield read_wav(future.result())
+                except (wave.Error, EOFError) as e:
+                    raise TTSServiceError(f"TTS synthesis returned invalid audio: {e}")
+        finally:
+            # Client went away or synthesis failed: drop sentences not started yet
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,138 @@
+"""
+Model warm-up and readiness.
+
+Without warm-up, the first request after a deploy pays for loading the
+Whisper model, the Piper voices and the Ollama model. At process start
+(``WARMUP_ON_START``, opt-in, from the WSGI/ASGI entry points) each service
+is loaded on its own thread, and a tiny inference runs to prime it. Every
+server process loads its own copy of the models; ASR is not loaded when
+``ASR_WORKER_ADDRESS`` hands it to the shared worker pool.
+
+``health_view`` reports the state of every service. ``readiness_view``
+returns 503 until warm-up has finished, and with ``WARMUP_STRICT`` (the
+default) also when a service failed to warm up, so a load balancer only
+routes to warm workers.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger('core')
+
+# Service states
+COLD = 'cold'  # not warmed (warm-up disabled or not started yet)
+WARMING = 'warming'
+READY = 'ready'
+FAILED = 'failed'  # warm-up raised; not ready when strict, else loads lazily on first use
+
+
+@dataclass
+class ServiceStatus:
+    """Warm-up state of one service."""
+    state: str = COLD
+    detail: str = ''
+    seconds: Optional[float] = None
+
+
+class Warmup:
+    """Runs warm-up steps (one thread each) and tracks per-service readiness."""
+    
+    def __init__(self, steps: Dict[str, Callable[[], str]], strict: Optional[bool] = None):
+        """
+        Initialize warm-up.
+        
+        Args:
+            steps: Service name -> callable that loads the service and returns
+                a short description; raising marks the service as failed
+            strict: Report not ready while any service has failed
+                (default: WARMUP_STRICT)
+        """
+        self.steps = steps
+        self.strict = settings.WARMUP_STRICT if strict is None else strict
+        self.statuses = {name: ServiceStatus() for name in steps}
+        self.started = False
+        self._threads = []
+        self._lock = threading.Lock()
+    
+    def start(self) -> 'Warmup':
+        """Start all steps in background threads (idempotent)."""
+        with self._lock:
+            if self.started:
+                return self
+            self.started = True
+            for name, step in self.steps.items():
+                self.statuses[name].state = WARMING
+                thread = threading.Thread(target=self._run, args=(name, step), name=f'warmup-{name}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for all steps to finish; returns whether they did."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return self.finished
+    
+    def _run(self, name: str, step: Callable[[], str]):
+        status = self.statuses[name]
+        started = time.perf_counter()
+        try:
+            detail = step()
+            status.detail = detail or ''
+            status.state = READY
+            logger.info(f"Warm-up of {name} finished in {time.perf_counter() - started:.1f}s: {detail}")
+        except Exception as e:
+            status.detail = str(e)
+            status.state = FAILED
+            logger.warning(f"Warm-up of {name} failed: {e}")
+        finally:
+            status.seconds = round(time.perf_counter() - started, 3)
+    
+    @property
+    def finished(self) -> bool:
+        """True unless a started warm-up is still running."""
+        return not any(status.state == WARMING for status in self.statuses.values())
+    
+    @property
+    def ready(self) -> bool:
+        """True once warm-up has finished, and (when strict) no service failed."""
+        states = [status.state for status in self.statuses.values()]
+        return WARMING not in states and not (self.strict and FAILED in states)
+    
+    def report(self) -> Dict[str, dict]:
+        return {name: asdict(status) for name, status in self.statuses.items()}
+
+
+def default_steps() -> Dict[str, Callable[[], str]]:
+    """Warm-up steps of the global services listed in ``WARMUP_SERVICES``."""
+    from core.services import asr_service, llm_service, tts_service
+    steps = {
+        'asr': asr_service.warm_up,
+        'llm': llm_service.warm_up,
+        'tts': tts_service.warm_up,
+    }
+    return {name: steps[name] for name in settings.WARMUP_SERVICES if name in steps}
+
+
+_warmup: Optional[Warmup] = None
+_warmup_lock = threading.Lock()
+
+
+def get_warmup() -> Warmup:
+    """Process-wide warm-up (not started until ``start_warmup``)."""
+    global _warmup
+    with _warmup_lock:
+        if _warmup is None:
+            _warmup = Warmup(default_steps())
+        return _warmup
+
+
+def start_warmup() -> Warmup:
+    """Start warming this process's services in the background."""
+    return get_warmup().start()
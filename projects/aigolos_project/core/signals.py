@@ -12,6 +12,9 @@ from asr.models import Transcription
 from llm.models import Conversation, Message
 from tts.models import Synthesis
 from accounts.models import User
+from core.result_cache import delete_media_if_unreferenced
+from core.services.llm_context import conversation_context_cache
+from core.search import index_document, remove_document
 
 logger = logging.getLogger('core')
 
@@ -23,6 +26,9 @@ def transcription_created(sender, instance, created, **kwargs):
         # Invalidate cache
         cache.delete(f'transcriptions_{instance.user.id}')
         logger.debug(f"Cache invalidated for user {instance.user.id} transcriptions")
+    
+    # Keep the full-text search index current
+    index_document('transcription', instance.id, instance.text)
 
 
 @receiver(post_save, sender=Conversation)
@@ -36,6 +42,9 @@ def conversation_updated(sender, instance, created, **kwargs):
 @receiver(post_save, sender=Message)
 def message_created(sender, instance, created, **kwargs):
     """Handle message creation."""
+    # Keep the full-text search index current
+    index_document('message', instance.id, instance.content)
+    
     if created:
         # Update conversation's updated_at timestamp
         instance.conversation.updated_at = timezone.now()
@@ -43,6 +52,19 @@ def message_created(sender, instance, created, **kwargs):
         
         # Invalidate cache
         cache.delete(f'conversations_{instance.conversation.user.id}')
+        
+        # Extend the cached LLM context with the new turn
+        conversation_context_cache.append(instance.conversation_id, instance)
+    else:
+        # Edited message: cached LLM context is stale
+        conversation_context_cache.invalidate(instance.conversation_id)
+
+
+@receiver(post_delete, sender=Message)
+def message_deleted(sender, instance, **kwargs):
+    """Handle message deletion."""
+    conversation_context_cache.invalidate(instance.conversation_id)
+    remove_document('message', instance.id)
 
 
 @receiver(post_delete, sender=Transcription)
@@ -50,11 +72,11 @@ def transcription_deleted(sender, instance, **kwargs):
     """Handle transcription deletion."""
     # Invalidate cache
     cache.delete(f'transcriptions_{instance.user.id}')
+    remove_document('transcription', instance.id)
     
-    # Delete associated audio file
+    # Delete associated audio file (unless another row or an active job still uses it)
     try:
-        if instance.audio_file:
-            instance.audio_file.delete(save=False)
+        delete_media_if_unreferenced(instance.audio_file, Transcription)
     except Exception as e:
         logger.warning(f"Failed to delete audio file for transcription {instance.id}: {e}")
 
@@ -62,10 +84,9 @@ def transcription_deleted(sender, instance, **kwargs):
 @receiver(post_delete, sender=Synthesis)
 def synthesis_deleted(sender, instance, **kwargs):
     """Handle synthesis deletion."""
-    # Delete associated audio file
+    # Delete associated audio file (unless another row still uses it)
     try:
-        if instance.audio_file:
-            instance.audio_file.delete(save=False)
+        delete_media_if_unreferenced(instance.audio_file, Synthesis)
     except Exception as e:
         logger.warning(f"Failed to delete audio file for synthesis {instance.id}: {e}")
 
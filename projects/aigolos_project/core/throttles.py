@@ -19,3 +19,8 @@ class TTSThrottle(UserRateThrottle):
     """Throttle for TTS endpoint."""
     rate = '50/hour'
 
+
+class JobSubmitThrottle(UserRateThrottle):
+    """Throttle for queued ASR/TTS jobs (workers bound the load, so the rate is higher)."""
+    scope = 'jobs'
+    rate = '200/hour'
@@ -10,5 +10,13 @@ app_name = 'core'
 urlpatterns = [
     path('', views.index_view, name='index'),
     path('health/', views.health_view, name='health'),
+    path('health/ready/', views.readiness_view, name='readiness'),
+    path('metrics/', views.metrics_view, name='metrics'),
+    path('search/', views.search_view, name='search'),
+    path('jobs/', views.JobListView.as_view(), name='jobs'),
+    path('jobs/<int:pk>/', views.job_detail_view, name='job_detail'),
+    path('jobs/<int:pk>/events/', views.job_events_view, name='job_events'),
+    path('jobs/<int:pk>/audio/', views.job_audio_view, name='job_audio'),
+    path('assistant/voice/', views.voice_assistant_view, name='voice-assistant'),
 ]
 
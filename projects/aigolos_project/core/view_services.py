@@ -3,15 +3,20 @@ Service layer for views - business logic separated from views.
 """
 
 import logging
-from typing import Optional, Tuple
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+from asgiref.sync import sync_to_async
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import UploadedFile
 from django.contrib.auth import get_user_model
 from core.services import asr_service, llm_service, tts_service
 from core.validators import validate_audio_file
-from core.exceptions import ASRServiceError, LLMServiceError, TTSServiceError
-from asr.models import Transcription
+from core.result_cache import content_hash, result_cache, store_media
+from core.search import index_document
+from core.exceptions import ASRServiceError, JobQueueFullError, LLMServiceError, TTSServiceError
+from core.models import Job
+from asr.models import Transcription, TranscriptionSegment
 from llm.models import Conversation, Message
 from tts.models import Synthesis
 
@@ -42,18 +47,58 @@ class ASRViewService:
         if audio_file.size > settings.MAX_AUDIO_SIZE:
             raise ValidationError(f'File too large. Maximum size: {settings.MAX_AUDIO_SIZE} bytes')
         
-        # Read audio data
-        audio_data = audio_file.read()
+        # Identical audio (from any user) reuses the cached result
+        digest = content_hash(audio_file)
+        params = {'model': settings.ASR_MODEL_NAME, 'language': language or ''}
         
-        # Transcribe
-        text, detected_language = asr_service.transcribe(audio_data, language)
+        # Transcribe straight from the upload (decoded in memory, no temp copy)
+        text, detected_language = result_cache.get_or_compute(
+            'asr', digest, params,
+            lambda: asr_service.transcribe(audio_file, language)
+        )
+        
+        # Save transcription; the file is stored once per distinct content
+        extension = Path(audio_file.name).suffix or '.wav'
+        audio_name = store_media(audio_file, 'transcriptions', digest, extension)
+        return ASRViewService._save_transcription(user, audio_name, text, detected_language)
+    
+    @staticmethod
+    def transcribe_stored(
+        user: User,
+        audio_name: str,
+        digest: str,
+        language: Optional[str] = None
+    ) -> Transcription:
+        """
+        Transcribe audio already in storage (background jobs) and save it.
         
-        # Save transcription
+        Returns:
+            Transcription object
+        """
+        from django.conf import settings
+        from django.core.files.storage import default_storage
+        
+        params = {'model': settings.ASR_MODEL_NAME, 'language': language or ''}
+        with default_storage.open(audio_name, 'rb') as audio:
+            text, detected_language = result_cache.get_or_compute(
+                'asr', digest, params,
+                lambda: asr_service.transcribe(audio, language)
+            )
+        return ASRViewService._save_transcription(user, audio_name, text, detected_language)
+    
+    @staticmethod
+    def _save_transcription(
+        user: User,
+        audio_name: str,
+        text: str,
+        language: Optional[str]
+    ) -> Transcription:
+        """Create Transcription row for stored audio and record metrics."""
         transcription = Transcription.objects.create(
             user=user,
-            audio_file=audio_file,
+            audio_file=audio_name,
             text=text,
-            language=detected_language
+            language=language
         )
         
         # Invalidate cache
@@ -65,6 +110,116 @@ class ASRViewService:
         
         logger.info(f"Transcription created: {transcription.id} by {user.username}")
         return transcription
+    
+    @staticmethod
+    def start_chunked_transcription(
+        user: User,
+        audio_file: UploadedFile,
+        language: Optional[str] = None
+    ) -> Transcription:
+        """
+        Save audio and queue its chunk-by-chunk transcription as a job.
+        
+        Segments are persisted as they arrive and ``progress`` is updated, so
+        clients can poll partial transcripts while long audio is processed.
+        
+        Returns:
+            Transcription object (status ``processing``)
+            
+        Raises:
+            JobQueueFullError: If the user has too many queued jobs
+        """
+        validate_audio_file(audio_file)
+        
+        from django.conf import settings
+        if audio_file.size > settings.MAX_AUDIO_SIZE:
+            raise ValidationError(f'File too large. Maximum size: {settings.MAX_AUDIO_SIZE} bytes')
+        
+        from django.db import transaction
+        audio_file.seek(0)
+        with transaction.atomic():
+            transcription = Transcription.objects.create(
+                user=user,
+                audio_file=audio_file,
+                text='',
+                language=language or None,
+                status='processing',
+                progress=0.0
+            )
+            JobViewService._submit(user, 'chunked', {
+                'transcription': transcription.id,
+                'language': language,
+            }, priority=0)
+        
+        from core.metrics import MetricsCollector
+        MetricsCollector.record_user_activity(user.id, 'transcription')
+        
+        logger.info(f"Chunked transcription started: {transcription.id} by {user.username}")
+        return transcription
+    
+    @staticmethod
+    def process_chunked_transcription(
+        transcription_id: int,
+        language: Optional[str] = None
+    ) -> Transcription:
+        """
+        Transcribe a saved transcription's audio, persisting segments as they arrive.
+        
+        Segments of an earlier, interrupted attempt are discarded first.
+        
+        Raises:
+            ASRServiceError: If transcription fails (the transcription is marked failed)
+        """
+        transcription = Transcription.objects.get(id=transcription_id)
+        TranscriptionSegment.objects.filter(transcription_id=transcription_id).delete()
+        Transcription.objects.filter(id=transcription_id).update(status='processing', progress=0.0)
+        pending = []
+        texts = []
+        detected_language = language
+        progress = 0.0
+        
+        def flush():
+            TranscriptionSegment.objects.bulk_create(pending)
+            Transcription.objects.filter(id=transcription_id).update(
+                progress=progress,
+                language=detected_language
+            )
+            pending.clear()
+        
+        try:
+            with transcription.audio_file.open('rb') as audio:
+                for segment in asr_service.transcribe_segments(audio, language):
+                    # A new chunk has started: persist the previous one
+                    if pending and segment.progress != progress:
+                        flush()
+                    progress = segment.progress
+                    detected_language = detected_language or segment.language
+                    pending.append(TranscriptionSegment(
+                        transcription_id=transcription_id,
+                        index=len(texts),
+                        start=segment.start,
+                        end=segment.end,
+                        text=segment.text
+                    ))
+                    texts.append(segment.text)
+            progress = 1.0
+            flush()
+            
+            duration = max((s.end for s in transcription.segments.all()), default=0.0)
+            Transcription.objects.filter(id=transcription_id).update(
+                text=' '.join(texts),
+                status='completed',
+                duration=duration
+            )
+            # update() bypasses post_save, so index the final text here
+            index_document('transcription', transcription_id, ' '.join(texts))
+            cache.delete(f'transcriptions_{transcription.user_id}')
+            logger.info(f"Chunked transcription completed: {transcription_id}")
+        except Exception as e:
+            logger.error(f"Chunked transcription {transcription_id} failed: {e}", exc_info=True)
+            Transcription.objects.filter(id=transcription_id).update(status='failed')
+            raise
+        return transcription
 
 
 class LLMViewService:
@@ -83,18 +238,9 @@ class LLMViewService:
             Tuple of (conversation, user_message, ai_message)
         """
         # Get or create conversation
-        if conversation_id:
-            conversation = Conversation.objects.filter(
-                id=conversation_id,
-                user=user
-            ).first()
-            if not conversation:
-                raise Conversation.DoesNotExist("Conversation not found.")
-        else:
-            conversation = Conversation.objects.create(
-                user=user,
-                title=message_text[:50]
-            )
+        conversation = LLMViewService._get_or_create_conversation(
+            user, message_text, conversation_id
+        )
         
         # Save user message
         user_message = Message.objects.create(
@@ -104,10 +250,7 @@ class LLMViewService:
         )
         
         # Generate AI response with conversation context
-        ai_response = llm_service.generate(
-            message_text,
-            str(conversation.id) if conversation_id else None
-        )
+        ai_response = llm_service.generate(message_text, str(conversation.id))
         
         # Save AI message
         ai_message = Message.objects.create(
@@ -130,11 +273,135 @@ class LLMViewService:
         
         logger.info(f"Chat message processed: conversation {conversation.id} by {user.username}")
         return conversation, user_message, ai_message
+    
+    @staticmethod
+    def _get_or_create_conversation(
+        user: User,
+        message_text: str,
+        conversation_id: Optional[int]
+    ) -> Conversation:
+        """Get user's conversation or start a new one."""
+        if conversation_id:
+            conversation = Conversation.objects.filter(
+                id=conversation_id,
+                user=user
+            ).first()
+            if not conversation:
+                raise Conversation.DoesNotExist("Conversation not found.")
+            return conversation
+        return Conversation.objects.create(
+            user=user,
+            title=message_text[:50]
+        )
+    
+    @staticmethod
+    def stream_chat_message(
+        user: User,
+        message_text: str,
+        conversation_id: Optional[int] = None
+    ) -> Tuple[Conversation, Message, Iterator[Tuple[str, Dict[str, Any]]]]:
+        """
+        Process chat message and stream the AI response.
+        
+        The conversation and user message are saved immediately; the returned
+        iterator relays LLM tokens as ``('token', {...})`` events and, once
+        generation finishes, saves the assistant message and emits a single
+        ``('done', {...})`` event. Service errors are emitted as ``('error', {...})``.
+        
+        Returns:
+            Tuple of (conversation, user_message, events)
+        """
+        conversation = LLMViewService._get_or_create_conversation(
+            user, message_text, conversation_id
+        )
+        
+        user_message = Message.objects.create(
+            conversation=conversation,
+            role='user',
+            content=message_text
+        )
+        
+        def events() -> Iterator[Tuple[str, Dict[str, Any]]]:
+            parts = []
+            try:
+                for token in llm_service.generate_stream(message_text, str(conversation.id)):
+                    parts.append(token)
+                    yield 'token', {'token': token}
+            except LLMServiceError as e:
+                logger.error(f"Chat stream error: {e}")
+                yield 'error', {'error': str(e)}
+                return
+            
+            # Persist the final assistant message once generation is complete
+            ai_message = Message.objects.create(
+                conversation=conversation,
+                role='assistant',
+                content=''.join(parts).strip()
+            )
+            conversation.save()
+            
+            cache.delete(f'conversations_{user.id}')
+            
+            from core.metrics import MetricsCollector
+            MetricsCollector.record_user_activity(user.id, 'conversation')
+            
+            logger.info(f"Chat stream processed: conversation {conversation.id} by {user.username}")
+            yield 'done', {
+                'conversation_id': conversation.id,
+                'ai_message_id': ai_message.id,
+                'content': ai_message.content,
+            }
+        
+        return conversation, user_message, events()
 
 
 class TTSViewService:
     """Service layer for TTS views."""
     
+    @staticmethod
+    def _cache_params(voice: Optional[str]) -> dict:
+        """Result cache parameters for a synthesis."""
+        return {'voice': voice or tts_service.voice_name, 'model_path': tts_service.model_path}
+    
+    @staticmethod
+    def _cached_audio(text: str, voice: Optional[str]) -> Optional[str]:
+        """Storage name of previously synthesized audio for this text and voice."""
+        from django.core.files.storage import default_storage
+        
+        audio_name = result_cache.get('tts', content_hash(text), TTSViewService._cache_params(voice))
+        if audio_name and default_storage.exists(audio_name):
+            return audio_name
+        return None
+    
+    @staticmethod
+    def _save_synthesis(
+        user: User,
+        text: str,
+        voice: Optional[str],
+        audio_name: str
+    ) -> Synthesis:
+        """Create Synthesis row for stored audio and record metrics."""
+        synthesis = Synthesis.objects.create(
+            user=user,
+            text=text,
+            voice=voice or '',
+            audio_file=audio_name
+        )
+        
+        # Record metrics
+        from core.metrics import MetricsCollector
+        MetricsCollector.record_user_activity(user.id, 'synthesis')
+        
+        logger.info(f"Synthesis created: {synthesis.id} by {user.username}")
+        return synthesis
+    
+    @staticmethod
+    def _store_audio(text: str, voice: Optional[str], audio_data: bytes) -> str:
+        """Store synthesized audio (content-addressed) and cache its name."""
+        audio_name = store_media(audio_data, 'syntheses', content_hash(audio_data), '.wav')
+        result_cache.set('tts', content_hash(text), TTSViewService._cache_params(voice), audio_name)
+        return audio_name
+    
     @staticmethod
     def synthesize_text(
         user: User,
@@ -147,23 +414,238 @@ class TTSViewService:
         Returns:
             Synthesis object
         """
-        # Synthesize
-        audio_data = tts_service.synthesize(text, voice)
+        # Identical text and voice (from any user) reuse the stored audio
+        audio_name = TTSViewService._cached_audio(text, voice)
+        if audio_name is None:
+            audio_data = tts_service.synthesize(text, voice)
+            audio_name = TTSViewService._store_audio(text, voice, audio_data)
         
-        # Save synthesis
-        from django.core.files.base import ContentFile
-        audio_file = ContentFile(audio_data, name='synthesis.wav')
-        synthesis = Synthesis.objects.create(
-            user=user,
-            text=text,
-            voice=voice or '',
-            audio_file=audio_file
+        return TTSViewService._save_synthesis(user, text, voice, audio_name)
+    
+    @staticmethod
+    def stream_synthesis(
+        user: User,
+        text: str,
+        voice: Optional[str] = None
+    ) -> Iterator[bytes]:
+        """
+        Synthesize text to speech, yielding WAV bytes as sentences are ready.
+        
+        The first chunk is a streaming WAV header, followed by PCM frames per
+        sentence. After the last sentence the complete file is stored and a
+        Synthesis row saved. Previously synthesized text is streamed from storage.
+        
+        Yields:
+            WAV data chunks
+        """
+        from django.core.files.storage import default_storage
+        
+        audio_name = TTSViewService._cached_audio(text, voice)
+        if audio_name is not None:
+            with default_storage.open(audio_name, 'rb') as audio_file:
+                yield from audio_file.chunks()
+            TTSViewService._save_synthesis(user, text, voice, audio_name)
+            return
+        
+        from core.services.tts_service import wav_header
+        
+        wav_params = None
+        frames = []
+        for sentence_params, pcm in tts_service.synthesize_stream(text, voice):
+            if wav_params is None:
+                wav_params = sentence_params
+                yield wav_header(*wav_params)
+            frames.append(pcm)
+            yield pcm
+        
+        # Assemble the complete file for storage once the client has all audio
+        pcm = b''.join(frames)
+        audio_data = wav_header(*wav_params, data_size=len(pcm)) + pcm
+        audio_name = TTSViewService._store_audio(text, voice, audio_data)
+        TTSViewService._save_synthesis(user, text, voice, audio_name)
+
+
+class VoiceAssistantViewService:
+    """Service layer for the voice assistant pipeline view."""
+    
+    @staticmethod
+    def _save_user_message(
+        user: User,
+        text: str,
+        conversation: Optional[Conversation]
+    ) -> Tuple[Conversation, Message]:
+        """Save the transcribed request, starting a conversation if needed."""
+        if conversation is None:
+            conversation = Conversation.objects.create(user=user, title=text[:50])
+        user_message = Message.objects.create(
+            conversation=conversation,
+            role='user',
+            content=text
+        )
+        return conversation, user_message
+    
+    @staticmethod
+    def _save_ai_message(user: User, conversation: Conversation, content: str) -> Message:
+        """Save the assistant reply and record metrics."""
+        ai_message = Message.objects.create(
+            conversation=conversation,
+            role='assistant',
+            content=content
         )
+        conversation.save()
+        cache.delete(f'conversations_{user.id}')
         
-        # Record metrics
         from core.metrics import MetricsCollector
-        MetricsCollector.record_user_activity(user.id, 'synthesis')
+        MetricsCollector.record_user_activity(user.id, 'conversation')
         
-        logger.info(f"Synthesis created: {synthesis.id} by {user.username}")
-        return synthesis
+        logger.info(f"Voice request processed: conversation {conversation.id} by {user.username}")
+        return ai_message
+    
+    @staticmethod
+    async def run(
+        user: User,
+        audio_data: bytes,
+        language: Optional[str] = None,
+        conversation: Optional[Conversation] = None,
+        voice: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Answer a spoken request: transcribe, generate a reply and synthesize it.
+        
+        Relays pipeline events (see ``VoicePipeline.run``). The transcript is
+        saved as a user message as soon as it is available and the reply as
+        an assistant message when generation completes; the ``done`` event
+        carries the message IDs and per-stage timings.
+        
+        Yields:
+            (event, data) tuples
+        """
+        from core.services.pipeline_service import StageTimings, VoicePipeline
+        from core.metrics import MetricsCollector
+        
+        pipeline = VoicePipeline(asr_service, llm_service, tts_service)
+        timings = StageTimings()
+        context_id = str(conversation.id) if conversation else None
+        
+        async for event, data in pipeline.run(audio_data, language, context_id, voice, timings):
+            if event == 'transcript':
+                conversation, user_message = await sync_to_async(
+                    VoiceAssistantViewService._save_user_message
+                )(user, data['text'], conversation)
+                data = {**data, 'conversation_id': conversation.id, 'user_message_id': user_message.id}
+            elif event == 'done':
+                ai_message = await sync_to_async(VoiceAssistantViewService._save_ai_message)(
+                    user, conversation, data['content']
+                )
+                await sync_to_async(MetricsCollector.record_pipeline_timings)(data['timings'])
+                logger.info(f"Voice pipeline timings: {data['timings']}")
+                data = {**data, 'conversation_id': conversation.id, 'ai_message_id': ai_message.id}
+            yield event, data
+
 
+class JobViewService:
+    """Service layer for background ASR/TTS jobs."""
+    
+    @staticmethod
+    def submit_transcription(
+        user: User,
+        audio_file: UploadedFile,
+        language: Optional[str] = None,
+        priority: int = 0
+    ) -> Job:
+        """
+        Validate and store audio, then queue its transcription.
+        
+        Returns:
+            Job object (status ``queued``)
+        """
+        validate_audio_file(audio_file)
+        
+        from django.conf import settings
+        if audio_file.size > settings.MAX_AUDIO_SIZE:
+            raise ValidationError(f'File too large. Maximum size: {settings.MAX_AUDIO_SIZE} bytes')
+        
+        digest = content_hash(audio_file)
+        extension = Path(audio_file.name).suffix or '.wav'
+        audio_name = store_media(audio_file, 'transcriptions', digest, extension)
+        return JobViewService._submit(user, 'transcription', {
+            'audio': audio_name,
+            'digest': digest,
+            'language': language,
+        }, priority)
+    
+    @staticmethod
+    def submit_synthesis(
+        user: User,
+        text: str,
+        voice: Optional[str] = None,
+        priority: int = 0
+    ) -> Job:
+        """
+        Queue synthesis of text.
+        
+        Returns:
+            Job object (status ``queued``)
+        """
+        return JobViewService._submit(user, 'synthesis', {'text': text, 'voice': voice}, priority)
+    
+    @staticmethod
+    def _submit(user: User, kind: str, params: dict, priority: int) -> Job:
+        from django.conf import settings
+        from django.db import transaction
+        from core.services.job_queue import get_job_queue, next_position
+        from core.services.job_workers import ensure_local_workers
+        
+        queued = Job.objects.filter(user=user, status='queued').count()
+        if queued >= settings.JOB_MAX_QUEUED_PER_USER:
+            raise JobQueueFullError(
+                f'Too many queued jobs ({queued}). Wait for some to finish.'
+            )
+        
+        job = Job.objects.create(
+            user=user,
+            kind=kind,
+            priority=priority,
+            position=next_position(user.id),
+            params=params
+        )
+        queue = get_job_queue()
+        transaction.on_commit(lambda: queue.push(job))
+        ensure_local_workers()
+        
+        logger.info(f"Job queued: {kind} {job.id} by {user.username} (priority {priority})")
+        return job
+    
+    @staticmethod
+    def cancel(job: Job) -> bool:
+        """Cancel a job that has not started yet."""
+        from django.utils import timezone
+        from core.services.job_queue import get_job_queue
+        
+        cancelled = Job.objects.filter(id=job.id, status='queued').update(
+            status='cancelled',
+            finished_at=timezone.now()
+        )
+        if cancelled:
+            get_job_queue().remove(job)
+        job.refresh_from_db()
+        return bool(cancelled)
+    
+    @staticmethod
+    def queue_ahead(job: Job) -> int:
+        """Number of queued jobs that will run before this one."""
+        from django.db.models import Q
+        
+        return Job.objects.filter(status='queued').filter(
+            Q(priority__gt=job.priority)
+            | Q(priority=job.priority, position__lt=job.position)
+            | Q(priority=job.priority, position=job.position, id__lt=job.id)
+        ).count()
+    
+    @staticmethod
+    def result(job: Job) -> Optional[Any]:
+        """Transcription or Synthesis a completed job produced."""
+        if job.status != 'completed' or job.result_id is None:
+            return None
+        model = Synthesis if job.kind == 'synthesis' else Transcription
+        return model.objects.filter(id=job.result_id).first()
@@ -2,10 +2,39 @@
 Views for core app.
 """
 
+import asyncio
+import json
+import logging
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import render
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.exceptions import APIException
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework import permissions
+from rest_framework.settings import api_settings
+from rest_framework import generics, permissions, status
+from core.metrics import render_prometheus
+from core.models import Job
+from core.permissions import MetricsPermission
+from core.search import get_search_backend
+from core.serializers import JobSerializer, SearchHitSerializer, SearchRequestSerializer, VoiceRequestSerializer
+from core.services.warmup import get_warmup
+from core.throttles import ASRThrottle, JobSubmitThrottle
+from core.validators import validate_audio_file
+from core.view_services import JobViewService, VoiceAssistantViewService
+from llm.models import Conversation
+
+logger = logging.getLogger('core')
+
+JOB_EVENTS_POLL_INTERVAL = 0.5  # seconds between status checks in job event streams
+# Longest job event stream, below the 120 s gunicorn worker timeout of the shipped server
+JOB_EVENTS_MAX_SECONDS = 100
 
 
 def index_view(request):
@@ -17,13 +46,322 @@ def index_view(request):
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])  # Allow unauthenticated access for monitoring
 def health_view(request):
-    """Health check endpoint."""
+    """Health check endpoint (liveness), with per-service warm-up state."""
+    warmup = get_warmup()
     response_data = {
         'status': 'healthy',
         'version': '2.0.0',
+        'ready': warmup.ready,
+        'services': warmup.report(),
     }
     # Include user info if authenticated, but don't require it
     if request.user.is_authenticated:
         response_data['user'] = request.user.username
     return Response(response_data)
 
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+@throttle_classes([])  # Polled by load balancers
+def readiness_view(request):
+    """Readiness check: 503 while models are still warming up."""
+    warmup = get_warmup()
+    ready = warmup.ready
+    return Response(
+        {'ready': ready, 'services': warmup.report()},
+        status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+
+
+
+
+@api_view(['GET'])
+@permission_classes([MetricsPermission])
+@throttle_classes([])  # Scraped every few seconds
+def metrics_view(request):
+    """Metrics in Prometheus text format (request latency histograms, cache hits)."""
+    return HttpResponse(
+        render_prometheus(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def search_view(request):
+    """Ranked full-text search over the user's transcriptions or messages."""
+    serializer = SearchRequestSerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(
+            {'error': 'Invalid request', 'details': serializer.errors},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    hits = get_search_backend().search(
+        serializer.validated_data['type'],
+        request.user.id,
+        serializer.validated_data['q'],
+        serializer.validated_data['limit']
+    )
+    return Response({
+        'query': serializer.validated_data['q'],
+        'type': serializer.validated_data['type'],
+        'count': len(hits),
+        'results': SearchHitSerializer(hits, many=True).data,
+    })
+
+class JobListView(generics.ListAPIView):
+    """List the user's background jobs, newest first."""
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['kind', 'status']
+    
+    def get_queryset(self):
+        return Job.objects.filter(user=self.request.user)
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([permissions.IsAuthenticated])
+@throttle_classes([])  # Polled while jobs run
+def job_detail_view(request, pk):
+    """
+    Get job status and, once completed, its result.
+    
+    DELETE cancels a job that has not started yet.
+    """
+    job = Job.objects.filter(id=pk, user=request.user).first()
+    if not job:
+        return Response(
+            {'error': 'Job not found.'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    if request.method == 'DELETE' and not JobViewService.cancel(job):
+        return Response(
+            {'error': f'Job is {job.status} and can no longer be cancelled.'},
+            status=status.HTTP_409_CONFLICT
+        )
+    return Response(JobSerializer(job, context={'request': request}).data)
+
+
+def _prepare_job_events(request, pk):
+    """
+    Authenticate, throttle and look up the job of an event stream.
+    
+    Blocking (DB) - called through ``sync_to_async``.
+    
+    Returns:
+        Tuple of (error response or None, job)
+    """
+    drf_request = Request(
+        request,
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+    try:
+        user = drf_request.user
+        if not user.is_authenticated:
+            return JsonResponse(
+                {'error': 'Authentication credentials were not provided.'},
+                status=status.HTTP_401_UNAUTHORIZED
+            ), None
+        
+        throttle = JobSubmitThrottle()
+        if not throttle.allow_request(drf_request, None):
+            return JsonResponse(
+                {'error': 'Request was throttled.'},
+                status=status.HTTP_429_TOO_MANY_REQUESTS
+            ), None
+    except APIException as e:
+        return JsonResponse({'error': str(e.detail)}, status=e.status_code), None
+    
+    job = Job.objects.filter(id=pk, user=user).first()
+    if not job:
+        return JsonResponse(
+            {'error': 'Job not found.'},
+            status=status.HTTP_404_NOT_FOUND
+        ), None
+    return None, job
+
+
+def _job_snapshot(job: Job, request) -> dict:
+    """Reload a job and serialize it (blocking)."""
+    job.refresh_from_db()
+    return JobSerializer(job, context={'request': request}).data
+
+
+async def job_events_view(request, pk):
+    """
+    Job status as Server-Sent Events.
+    
+    Async view: under ASGI a waiting subscriber holds no worker. Sends a
+    ``status`` event whenever the status or queue position changes and
+    ``done`` with the result once the job has finished. The stream ends with
+    a ``timeout`` event after JOB_EVENTS_TIMEOUT seconds (at most
+    JOB_EVENTS_MAX_SECONDS, below the server's worker timeout); clients
+    reconnect or fall back to polling ``/api/jobs/<id>/``.
+    
+    Rate limited like job submission (200 requests per hour per user).
+    """
+    if request.method != 'GET':
+        return JsonResponse(
+            {'error': f'Method "{request.method}" not allowed.'},
+            status=status.HTTP_405_METHOD_NOT_ALLOWED
+        )
+    
+    error_response, job = await sync_to_async(_prepare_job_events)(request, pk)
+    if error_response is not None:
+        return error_response
+    
+    async def event_stream():
+        deadline = time.monotonic() + min(settings.JOB_EVENTS_TIMEOUT, JOB_EVENTS_MAX_SECONDS)
+        last = None
+        while True:
+            data = await sync_to_async(_job_snapshot)(job, request)
+            if job.finished:
+                yield f"event: done\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+                return
+            state = (data['status'], data['queue_ahead'])
+            if state != last:
+                last = state
+                yield f"event: status\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+            if time.monotonic() >= deadline:
+                yield "event: timeout\ndata: {}\n\n"
+                return
+            await asyncio.sleep(JOB_EVENTS_POLL_INTERVAL)
+    
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def job_audio_view(request, pk):
+    """Download the audio of a completed synthesis job."""
+    job = Job.objects.filter(id=pk, user=request.user, kind='synthesis').first()
+    synthesis = JobViewService.result(job) if job else None
+    if synthesis is None:
+        return Response(
+            {'error': 'Audio not found.'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    return FileResponse(
+        synthesis.audio_file.open('rb'),
+        content_type='audio/wav',
+        as_attachment=True,
+        filename='synthesis.wav'
+    )
+
+
+def _prepare_voice_request(request):
+    """
+    Authenticate, throttle and validate a voice request.
+    
+    Blocking (DB and upload parsing) - called through ``sync_to_async``.
+    
+    Returns:
+        Tuple of (error response or None, request parameters)
+    """
+    drf_request = Request(
+        request,
+        parsers=[MultiPartParser(), FormParser()],
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+    try:
+        user = drf_request.user
+        if not user.is_authenticated:
+            return JsonResponse(
+                {'error': 'Authentication credentials were not provided.'},
+                status=status.HTTP_401_UNAUTHORIZED
+            ), None
+        
+        throttle = ASRThrottle()
+        if not throttle.allow_request(drf_request, None):
+            return JsonResponse(
+                {'error': 'Request was throttled.'},
+                status=status.HTTP_429_TOO_MANY_REQUESTS
+            ), None
+        
+        files = drf_request.FILES
+        data = drf_request.data
+    except APIException as e:
+        return JsonResponse({'error': str(e.detail)}, status=e.status_code), None
+    
+    if 'audio' not in files:
+        return JsonResponse(
+            {'error': 'No audio file provided.'},
+            status=status.HTTP_400_BAD_REQUEST
+        ), None
+    
+    serializer = VoiceRequestSerializer(data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST), None
+    
+    audio_file = files['audio']
+    try:
+        validate_audio_file(audio_file)
+    except ValidationError as e:
+        logger.warning(f"Invalid audio file uploaded by {user.username}: {e}")
+        return JsonResponse({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST), None
+    if audio_file.size > settings.MAX_AUDIO_SIZE:
+        return JsonResponse(
+            {'error': f'File too large. Maximum size: {settings.MAX_AUDIO_SIZE} bytes'},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        ), None
+    
+    conversation = None
+    conversation_id = serializer.validated_data.get('conversation_id')
+    if conversation_id:
+        conversation = Conversation.objects.filter(id=conversation_id, user=user).first()
+        if conversation is None:
+            return JsonResponse(
+                {'error': 'Conversation not found.'},
+                status=status.HTTP_404_NOT_FOUND
+            ), None
+    
+    audio_file.seek(0)
+    return None, {
+        'user': user,
+        'audio_data': audio_file.read(),
+        'language': serializer.validated_data.get('language') or None,
+        'conversation': conversation,
+        'voice': serializer.validated_data.get('voice') or None,
+    }
+
+
+async def voice_assistant_view(request):
+    """
+    Answer a spoken request in one call: ASR → LLM → TTS.
+    
+    Async view (served without blocking a worker under ASGI). Speech synthesis
+    starts on the first complete sentence of the reply while the LLM is still
+    generating. Results are streamed as Server-Sent Events: ``transcript``,
+    ``token``, ``audio`` (base64 WAV per sentence), then ``done`` (saved
+    messages and per-stage timings) or ``error``.
+    
+    Rate limited like ASR (20 requests per hour per user).
+    """
+    if request.method != 'POST':
+        return JsonResponse(
+            {'error': f'Method "{request.method}" not allowed.'},
+            status=status.HTTP_405_METHOD_NOT_ALLOWED
+        )
+    
+    error_response, params = await sync_to_async(_prepare_voice_request)(request)
+    if error_response is not None:
+        return error_response
+    
+    async def event_stream():
+        async for event, data in VoiceAssistantViewService.run(**params):
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# Token clients don't send CSRF tokens; session auth enforces CSRF in DRF itself
+voice_assistant_view.csrf_exempt = True
@@ -3,12 +3,48 @@ Models for LLM app.
 """
 
 from django.db import models
+from django.db.models.functions import Coalesce, Substr
 from django.conf import settings
 import logging
 
 logger = logging.getLogger('llm')
 
 
+# Characters of the last message shown in conversation lists
+LAST_MESSAGE_PREVIEW_LENGTH = 200
+
+
+class ConversationQuerySet(models.QuerySet):
+    """QuerySet for conversations."""
+    
+    def with_summary(self):
+        """
+        Annotate message count and a preview of the last message.
+        
+        Uses correlated subqueries (served by the message index) instead of
+        loading messages, so cost doesn't grow with conversation length.
+        """
+        messages = Message.objects.filter(conversation=models.OuterRef('pk'))
+        last_message = messages.order_by('-created_at', '-id')
+        return self.annotate(
+            message_count=Coalesce(
+                models.Subquery(
+                    messages.values('conversation').annotate(
+                        count=models.Count('id')
+                    ).values('count')[:1]
+                ),
+                0
+            ),
+            last_message_role=models.Subquery(last_message.values('role')[:1]),
+            last_message_preview=models.Subquery(
+                last_message.annotate(
+                    preview=Substr('content', 1, LAST_MESSAGE_PREVIEW_LENGTH)
+                ).values('preview')[:1]
+            ),
+            last_message_at=models.Subquery(last_message.values('created_at')[:1]),
+        )
+
+
 class Conversation(models.Model):
     """Model for storing conversations."""
     
@@ -17,6 +53,8 @@ class Conversation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ConversationQuerySet.as_manager()
+    
     class Meta:
         db_table = 'conversations'
         verbose_name = 'Conversation'
@@ -48,3 +48,28 @@ class ConversationSerializer(serializers.ModelSerializer):
         fields = ('id', 'title', 'messages', 'created_at', 'updated_at')
         read_only_fields = ('id', 'created_at', 'updated_at')
 
+
+
+class ConversationSummarySerializer(serializers.ModelSerializer):
+    """
+    Lightweight conversation representation for lists.
+    
+    Expects a queryset annotated with ``Conversation.objects.with_summary()``;
+    messages are loaded separately through the paginated messages endpoint.
+    """
+    message_count = serializers.IntegerField(read_only=True)
+    last_message = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Conversation
+        fields = ('id', 'title', 'message_count', 'last_message', 'created_at', 'updated_at')
+        read_only_fields = fields
+    
+    def get_last_message(self, obj):
+        if obj.last_message_at is None:
+            return None
+        return {
+            'role': obj.last_message_role,
+            'preview': obj.last_message_preview,
+            'created_at': serializers.DateTimeField().to_representation(obj.last_message_at),
+        }
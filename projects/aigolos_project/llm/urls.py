@@ -9,7 +9,9 @@ app_name = 'llm'
 
 urlpatterns = [
     path('chat/', views.chat_view, name='chat'),
+    path('chat/stream/', views.chat_stream_view, name='chat_stream'),
     path('conversations/', views.ConversationListView.as_view(), name='conversations'),
     path('conversations/<int:pk>/', views.ConversationDetailView.as_view(), name='conversation_detail'),
+    path('conversations/<int:pk>/messages/', views.ConversationMessagesView.as_view(), name='conversation_messages'),
 ]
 
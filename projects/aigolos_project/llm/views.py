@@ -2,11 +2,14 @@
 Views for LLM app.
 """
 
+import json
 import logging
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from core.services import llm_service
 from core.throttles import LLMThrottle
@@ -14,8 +17,9 @@ from core.exceptions import LLMServiceError
 from core.view_services import LLMViewService
 from core.base_views import BaseAPIViewMixin
 from core.filters import ConversationFilter
+from core.pagination import MessageCursorPagination
 from .models import Conversation, Message
-from .serializers import ConversationSerializer, MessageSerializer, ChatRequestSerializer
+from .serializers import ConversationSummarySerializer, MessageSerializer, ChatRequestSerializer
 
 logger = logging.getLogger('llm')
 
@@ -65,34 +69,110 @@ def chat_view(request):
         return BaseAPIViewMixin().handle_generic_error(e, "Internal server error")
 
 
+def _format_sse(event: str, data: dict) -> str:
+    """Format a Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+@throttle_classes([LLMThrottle])
+def chat_stream_view(request):
+    """
+    Chat with LLM, streaming the response as Server-Sent Events.
+    
+    Events: ``start`` (conversation and user message), ``token`` (one per
+    generated chunk), then ``done`` (saved assistant message) or ``error``.
+    
+    Rate limited to 100 requests per hour per user.
+    """
+    try:
+        request_serializer = ChatRequestSerializer(data=request.data)
+        if not request_serializer.is_valid():
+            return Response(
+                request_serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        message_text = request_serializer.validated_data['message']
+        conversation_id = request_serializer.validated_data.get('conversation_id')
+        
+        conversation, user_message, events = LLMViewService.stream_chat_message(
+            user=request.user,
+            message_text=message_text,
+            conversation_id=conversation_id
+        )
+        
+        def event_stream():
+            yield _format_sse('start', {
+                'conversation_id': conversation.id,
+                'user_message': MessageSerializer(user_message).data,
+            })
+            for event, data in events:
+                yield _format_sse(event, data)
+        
+        response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Disable proxy buffering (nginx) so tokens reach the client immediately
+        response['X-Accel-Buffering'] = 'no'
+        return response
+        
+    except Conversation.DoesNotExist:
+        return Response(
+            {'error': 'Conversation not found.'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    except Exception as e:
+        return BaseAPIViewMixin().handle_generic_error(e, "Internal server error")
+
+
 class ConversationListView(generics.ListAPIView):
     """List user conversations with filtering, searching, and sorting."""
-    serializer_class = ConversationSerializer
+    serializer_class = ConversationSummarySerializer
     permission_classes = [permissions.IsAuthenticated]
     throttle_classes = [LLMThrottle]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]  # `search` uses the full-text index
     filterset_class = ConversationFilter
-    search_fields = ['title', 'messages__content']
-    ordering_fields = ['created_at', 'updated_at', 'title']
+    ordering_fields = ['created_at', 'updated_at', 'title', 'message_count']
     ordering = ['-updated_at']  # Default ordering
     
     def get_queryset(self):
         """Get user's conversations."""
         # Django ORM filter() automatically parameterizes queries - prevents SQL injection
-        # Use select_related for user and prefetch_related for messages to optimize queries
+        # Summary fields are annotated; messages are not loaded (see ConversationMessagesView)
         # Pagination is handled by DRF (configured in settings: PAGE_SIZE=20)
-        return Conversation.objects.filter(user=self.request.user).select_related('user').prefetch_related('messages')
+        return Conversation.objects.filter(user=self.request.user).with_summary()
 
 
 class ConversationDetailView(generics.RetrieveAPIView):
     """Get conversation details."""
-    serializer_class = ConversationSerializer
+    serializer_class = ConversationSummarySerializer
     permission_classes = [permissions.IsAuthenticated]
     throttle_classes = [LLMThrottle]
     
     def get_queryset(self):
         """Get user's conversations."""
         # Django ORM filter() automatically parameterizes queries - prevents SQL injection
-        # Use select_related for user and prefetch_related for messages to optimize queries
-        return Conversation.objects.filter(user=self.request.user).select_related('user').prefetch_related('messages')
+        return Conversation.objects.filter(user=self.request.user).with_summary()
+
 
+class ConversationMessagesView(generics.ListAPIView):
+    """
+    List messages of a conversation, newest first.
+    
+    Cursor-paginated: follow ``next`` to load older messages.
+    """
+    serializer_class = MessageSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [LLMThrottle]
+    pagination_class = MessageCursorPagination
+    filter_backends = []
+    
+    def get_queryset(self):
+        """Get messages of the user's conversation."""
+        conversation = get_object_or_404(
+            Conversation.objects.only('id'),
+            pk=self.kwargs['pk'],
+            user=self.request.user
+        )
+        return Message.objects.filter(conversation=conversation)
@@ -12,6 +12,19 @@ from factory.django import DjangoModelFactory
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Keep cached model results, throttle counters and metrics from leaking between tests."""
+    from django.core.cache import cache, caches
+    from core.metrics import _buffer
+    from core.result_cache import result_cache
+    cache.clear()
+    caches['metrics'].clear()
+    _buffer.reset()
+    result_cache.clear()
+    yield
+
+
 @pytest.fixture
 def api_client():
     """Create API client."""
@@ -46,6 +59,14 @@ def authenticated_admin_client(api_client, admin_user):
     return api_client
 
 
+@pytest.fixture
+def fake_ollama():
+    """Run a local fake Ollama server for the duration of a test."""
+    from tests.fakes.ollama import FakeOllamaServer
+    with FakeOllamaServer(reply="Hello there, how can I help?") as server:
+        yield server
+
+
 # Factories
 class UserFactory(DjangoModelFactory):
     """Factory for User model."""
@@ -0,0 +1,149 @@
+"""
+Fake Ollama server for testing LLM features without a real model.
+
+Implements the subset of the Ollama HTTP API used by LLMService:
+``POST /api/generate`` (both ``stream: false`` and newline-delimited JSON
+streaming, returning a ``context`` token array) and ``GET /api/tags``.
+
+Can also be run standalone for local development:
+
+    python -m tests.fakes.ollama --port 11434
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOllamaServer:
+    """Threaded fake Ollama server that streams a canned reply word by word."""
+    
+    def __init__(
+        self,
+        reply: str = "Hello from fake Ollama.",
+        token_delay: float = 0.0,
+        host: str = '127.0.0.1',
+        port: int = 0
+    ):
+        self.reply = reply
+        self.token_delay = token_delay
+        self.requests = []
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread = None
+    
+    @property
+    def url(self) -> str:
+        """Base URL of the running server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def tokens(self):
+        """Split the canned reply into stream chunks (words with spacing)."""
+        words = self.reply.split(' ')
+        return [word if i == 0 else f" {word}" for i, word in enumerate(words)]
+    
+    def context_for(self, payload):
+        """Fake context token array: the previous context plus one token per word."""
+        words = len(payload.get('prompt', '').split()) + len(self.reply.split())
+        return payload.get('context', []) + list(range(words))
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    def _make_handler(self):
+        fake = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def _send_json(self, data, status=200):
+                body = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def do_GET(self):
+                if self.path == '/api/tags':
+                    self._send_json({'models': [{'name': 'fake'}]})
+                else:
+                    self._send_json({'error': 'not found'}, status=404)
+            
+            def do_POST(self):
+                if self.path != '/api/generate':
+                    self._send_json({'error': 'not found'}, status=404)
+                    return
+                
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                fake.requests.append(payload)
+                model = payload.get('model', 'fake')
+                
+                if not payload.get('stream', True):
+                    if fake.token_delay:
+                        # Same generation time as the streamed reply
+                        time.sleep(fake.token_delay * len(fake.tokens()))
+                    self._send_json({
+                        'model': model,
+                        'response': fake.reply,
+                        'done': True,
+                        'context': fake.context_for(payload),
+                    })
+                    return
+                
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                for token in fake.tokens():
+                    self._write_chunk({'model': model, 'response': token, 'done': False})
+                    if fake.token_delay:
+                        time.sleep(fake.token_delay)
+                self._write_chunk({
+                    'model': model,
+                    'response': '',
+                    'done': True,
+                    'context': fake.context_for(payload),
+                })
+                self.wfile.write(b'0\r\n\r\n')
+            
+            def _write_chunk(self, data):
+                line = json.dumps(data).encode() + b'\n'
+                self.wfile.write(f"{len(line):x}\r\n".encode() + line + b'\r\n')
+                self.wfile.flush()
+        
+        return Handler
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run a fake Ollama server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--reply', default="Hello from fake Ollama.")
+    parser.add_argument('--token-delay', type=float, default=0.05)
+    args = parser.parse_args()
+    
+    server = FakeOllamaServer(args.reply, args.token_delay, args.host, args.port)
+    print(f"Fake Ollama listening on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,136 @@
+"""
+Tests for CompressionMiddleware.
+"""
+
+import gzip
+import zlib
+import pytest
+from unittest.mock import Mock
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, override_settings
+from aigolos.compression import choose_encoding, parse_accept_encoding
+from aigolos.middleware import CompressionMiddleware
+
+BODY = b'{"items": [' + b', '.join(b'{"id": %d, "text": "hello world"}' % i for i in range(200)) + b']}'
+
+
+def make_request(accept_encoding='gzip'):
+    return RequestFactory().get('/test/', HTTP_ACCEPT_ENCODING=accept_encoding)
+
+
+class TestAcceptEncoding:
+    """Test cases for Accept-Encoding negotiation."""
+    
+    def test_parse_q_values(self):
+        """Test q-values are parsed."""
+        assert parse_accept_encoding('gzip, br;q=0.5, zstd;q=0') == {'gzip': 1.0, 'br': 0.5, 'zstd': 0.0}
+    
+    def test_client_preference_then_server_order(self):
+        """Test highest q wins, ties go to server preference, q=0 is refused."""
+        assert choose_encoding('gzip;q=1, br;q=0.5', ['zstd', 'br', 'gzip']) == 'gzip'
+        assert choose_encoding('gzip, br', ['zstd', 'br', 'gzip']) == 'br'
+        assert choose_encoding('gzip;q=0', ['gzip']) is None
+        assert choose_encoding('*', ['zstd', 'gzip']) == 'zstd'
+        assert choose_encoding('', ['gzip']) is None
+
+
+class TestCompressionMiddleware:
+    """Test cases for CompressionMiddleware."""
+    
+    def test_gzip_response(self):
+        """Test JSON is gzipped with Vary and Content-Length set."""
+        middleware = CompressionMiddleware(get_response=Mock())
+        response = HttpResponse(BODY, content_type='application/json')
+        
+        result = middleware.process_response(make_request(), response)
+        
+        assert result['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(result.content) == BODY
+        assert result['Content-Length'] == str(len(result.content))
+        assert 'Accept-Encoding' in result['Vary']
+    
+    def test_small_or_binary_responses_untouched(self):
+        """Test small bodies and non-text types are not compressed."""
+        middleware = CompressionMiddleware(get_response=Mock())
+        
+        small = middleware.process_response(make_request(), HttpResponse(b'{}', content_type='application/json'))
+        audio = middleware.process_response(make_request(), HttpResponse(BODY, content_type='audio/wav'))
+        
+        assert not small.has_header('Content-Encoding')
+        assert not audio.has_header('Content-Encoding')
+    
+    def test_no_accepted_encoding(self):
+        """Test clients without a supported encoding get the original body."""
+        middleware = CompressionMiddleware(get_response=Mock())
+        
+        result = middleware.process_response(make_request('identity'), HttpResponse(BODY, content_type='application/json'))
+        
+        assert result.content == BODY
+        assert not result.has_header('Content-Encoding')
+    
+    def test_strong_etag_made_weak(self):
+        """Test ETag of a compressed body is weakened."""
+        middleware = CompressionMiddleware(get_response=Mock())
+        response = HttpResponse(BODY, content_type='application/json')
+        response['ETag'] = '"abc"'
+        
+        result = middleware.process_response(make_request(), response)
+        
+        assert result['ETag'] == 'W/"abc"'
+    
+    def test_streaming_response_compressed_incrementally(self):
+        """Test streaming content is compressed chunk by chunk, each chunk decodable as it arrives."""
+        middleware = CompressionMiddleware(get_response=Mock())
+        chunks = [b'row %d\n' % i * 50 for i in range(5)]
+        response = StreamingHttpResponse(iter(chunks), content_type='text/csv')
+        
+        result = middleware.process_response(make_request(), response)
+        
+        assert result['Content-Encoding'] == 'gzip'
+        assert not result.has_header('Content-Length')
+        decompressor = zlib.decompressobj(31)
+        received = b''
+        for index, part in enumerate(result.streaming_content):
+            received += decompressor.decompress(part)
+            if index < len(chunks):
+                # Sync flush: everything sent so far is decodable immediately
+                assert received == b''.join(chunks[:index + 1])
+        assert received == b''.join(chunks)
+    
+    def test_async_streaming_response(self):
+        """Test async streaming content is compressed."""
+        middleware = CompressionMiddleware(get_response=Mock())
+        
+        async def content():
+            for _ in range(3):
+                yield BODY
+        
+        result = middleware.process_response(make_request(), StreamingHttpResponse(content(), content_type='application/json'))
+        
+        async def collect():
+            return b''.join([part async for part in result.streaming_content])
+        
+        assert gzip.decompress(async_to_sync(collect)()) == BODY * 3
+    
+    def test_template_output_cached(self):
+        """Test identical HTML bodies are compressed once."""
+        middleware = CompressionMiddleware(get_response=Mock())
+        html = b'<html>' + b'<p>hello</p>' * 100 + b'</html>'
+        first = middleware.process_response(make_request(), HttpResponse(html, content_type='text/html'))
+        
+        codec = Mock(wraps=middleware.codecs['gzip'])
+        codec.name = 'gzip'
+        middleware.codecs['gzip'] = codec
+        second = middleware.process_response(make_request(), HttpResponse(html, content_type='text/html'))
+        
+        codec.compress.assert_not_called()
+        assert second.content == first.content
+    
+    @override_settings(COMPRESSION_LEVELS={'gzip': 1}, COMPRESSION_ENCODINGS=['gzip', 'unknown'])
+    def test_configured_level(self):
+        """Test compression level and encodings come from settings."""
+        middleware = CompressionMiddleware(get_response=Mock())
+        
+        assert list(middleware.codecs) == ['gzip']
+        assert middleware.codecs['gzip'].level == 1
@@ -0,0 +1,128 @@
+"""
+Tests for security telemetry.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+from django.core.cache import cache
+from django.test import RequestFactory
+from aigolos.middleware import LoggingMiddleware
+from aigolos.telemetry import SecurityEvent, SecurityTelemetry, find_suspicious_pattern, increment_failed_auth
+
+
+def response(status_code):
+    result = Mock()
+    result.status_code = status_code
+    return result
+
+
+class TestFindSuspiciousPattern:
+    """Test cases for find_suspicious_pattern."""
+    
+    def test_query_string(self):
+        """Test patterns are found in the decoded query string, case-insensitively."""
+        request = RequestFactory().get('/api/asr/history/', {'search': "x' UNION SELECT password"})
+        
+        assert find_suspicious_pattern(request, 1024) == 'union select'
+    
+    def test_clean_request(self):
+        """Test ordinary requests have no match."""
+        request = RequestFactory().get('/api/asr/history/', {'search': 'union station'})
+        
+        assert find_suspicious_pattern(request, 1024) is None
+    
+    def test_read_json_body(self):
+        """Test JSON bodies the view has read are scanned."""
+        request = RequestFactory().post('/api/llm/chat/', '{"message": "<script>"}', content_type='application/json')
+        request.body  # Read by the view
+        
+        assert find_suspicious_pattern(request, 1024) == 'script>'
+    
+    def test_unread_large_and_multipart_bodies_skipped(self):
+        """Test bodies are never read or parsed by the scan, and large or multipart ones are skipped."""
+        unread = RequestFactory().post('/api/llm/chat/', '{"message": "drop table"}', content_type='application/json')
+        large = RequestFactory().post('/api/llm/chat/', '{"message": "drop table"}', content_type='application/json')
+        large.body
+        upload = RequestFactory().post('/api/asr/transcribe/', {'language': 'drop table'})
+        upload.body
+        
+        assert find_suspicious_pattern(unread, 1024) is None
+        assert not hasattr(unread, '_body')
+        assert find_suspicious_pattern(large, 10) is None
+        assert find_suspicious_pattern(upload, 1024 * 1024) is None
+
+
+class TestSecurityTelemetry:
+    """Test cases for SecurityTelemetry."""
+    
+    def test_failed_auth_counter_is_atomic_and_logs_at_threshold(self):
+        """Test failed auth attempts are counted with increments and logged from the fifth."""
+        telemetry = SecurityTelemetry(run_async=False)
+        
+        with patch('aigolos.telemetry.security_logger') as mock_logger:
+            for _ in range(5):
+                telemetry.submit(SecurityEvent('failed_auth', '10.0.0.1', '/api/auth/login/'))
+        
+        assert cache.get('failed_auth_10.0.0.1') == 5
+        assert mock_logger.warning.call_count == 1
+        assert 'Count: 5' in mock_logger.warning.call_args[0][0]
+    
+    def test_increment_starts_window(self):
+        """Test the first failure starts the counter at one."""
+        assert increment_failed_auth('10.0.0.2') == 1
+        assert increment_failed_auth('10.0.0.2') == 2
+    
+    def test_background_thread(self):
+        """Test events are handled on the background thread."""
+        telemetry = SecurityTelemetry(run_async=True)
+        
+        with patch('aigolos.telemetry.security_logger') as mock_logger:
+            telemetry.submit(SecurityEvent('rate_limited', '10.0.0.3', '/api/llm/chat/', username='alice'))
+            telemetry.drain()
+        
+        assert 'User: alice' in mock_logger.warning.call_args[0][0]
+    
+    def test_full_queue_drops_events(self):
+        """Test a full queue drops events instead of blocking."""
+        telemetry = SecurityTelemetry(run_async=True, max_queue=1)
+        telemetry._ensure_thread = Mock()  # No consumer
+        
+        for _ in range(3):
+            telemetry.submit(SecurityEvent('rate_limited', '10.0.0.4', '/'))
+        
+        assert telemetry.dropped == 2
+
+
+class TestLoggingMiddlewareTelemetry:
+    """Test cases for LoggingMiddleware security checks."""
+    
+    def test_successful_clean_request_submits_nothing(self):
+        """Test the common path submits no events."""
+        middleware = LoggingMiddleware(get_response=Mock())
+        middleware.telemetry = Mock()
+        
+        middleware._check_suspicious_activity(RequestFactory().get('/api/health/'), response(200))
+        
+        middleware.telemetry.submit.assert_not_called()
+    
+    def test_injection_and_status_events(self):
+        """Test a rejected request with a suspicious query yields both events."""
+        middleware = LoggingMiddleware(get_response=Mock())
+        middleware.telemetry = Mock()
+        request = RequestFactory().get('/api/asr/history/', {'q': 'exec(x)'})
+        
+        middleware._check_suspicious_activity(request, response(403))
+        
+        kinds = [call.args[0].kind for call in middleware.telemetry.submit.call_args_list]
+        assert kinds == ['failed_auth', 'injection']
+    
+    def test_upload_body_not_parsed(self):
+        """Test a multipart upload's POST data is not parsed by the check."""
+        middleware = LoggingMiddleware(get_response=Mock())
+        middleware.telemetry = Mock()
+        request = RequestFactory().post('/api/asr/transcribe/', {'language': 'en'})
+        
+        middleware._check_suspicious_activity(request, response(400))
+        
+        assert middleware.telemetry.submit.call_args.args[0].kind == 'invalid_upload'
+        assert not hasattr(request, '_post')
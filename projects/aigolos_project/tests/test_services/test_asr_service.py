@@ -6,8 +6,22 @@ import pytest
 from unittest.mock import Mock, patch, MagicMock
 from django.test import override_settings
 from core.services import ASRService
+import io
 import tempfile
+import wave
 from pathlib import Path
+from core.services.asr_service import decode_audio
+
+
+def make_wav(seconds=1.0, rate=16000, channels=1):
+    """Build PCM WAV bytes of silence."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b'\x00\x00' * channels * int(seconds * rate))
+    return buffer.getvalue()
 
 
 class TestASRService:
@@ -156,3 +170,141 @@ class TestASRService:
         # Verify temp file was cleaned up (or at least created)
         # Note: This is a basic check, actual cleanup happens in finally block
 
+
+    def test_transcribe_decodes_in_memory(self):
+        """Test that audio is decoded in memory and passed to the model as samples."""
+        np = pytest.importorskip('numpy')
+        
+        mock_model = Mock()
+        mock_model.transcribe.return_value = ([Mock(text='Hi')], Mock(language='en'))
+        
+        service = ASRService()
+        service.model = mock_model
+        service._model_loaded = True
+        
+        with patch('tempfile.NamedTemporaryFile') as mock_tempfile:
+            text, language = service.transcribe(io.BytesIO(make_wav(seconds=0.5)))
+        
+        assert text == 'Hi'
+        assert not mock_tempfile.called
+        audio = mock_model.transcribe.call_args[0][0]
+        assert isinstance(audio, np.ndarray)
+        assert audio.dtype == np.float32
+        assert len(audio) == 8000
+    
+    def test_transcribe_segments_offsets_timestamps(self):
+        """Test chunked transcription yields segments with absolute timestamps."""
+        pytest.importorskip('numpy')
+        
+        def transcribe(audio, language=None, beam_size=5):
+            return [Mock(start=0.1, end=0.5, text=' chunk ')], Mock(language='en')
+        
+        service = ASRService()
+        service.model = Mock()
+        service.model.transcribe.side_effect = transcribe
+        service._model_loaded = True
+        
+        segments = list(service.transcribe_segments(make_wav(seconds=2.5), chunk_seconds=1.0))
+        
+        assert len(segments) == 3
+        assert [s.text for s in segments] == ['chunk', 'chunk', 'chunk']
+        assert segments[0].start == pytest.approx(0.1)
+        assert 0.9 < segments[1].start - 0.1 <= 1.0
+        assert 1.8 < segments[2].start - 0.1 <= 2.0
+        assert segments[-1].progress == 1.0
+        assert [s.progress for s in segments] == sorted(s.progress for s in segments)
+    
+    def test_transcribe_segments_uses_worker_pool(self):
+        """Test that chunks go to the ASR worker pool when it is configured."""
+        pytest.importorskip('numpy')
+        
+        with override_settings(ASR_WORKER_ADDRESS='127.0.0.1:9'):
+            service = ASRService()
+        service._worker_client = Mock()
+        service._worker_client.transcribe.return_value = (' chunk ', 'de')
+        
+        with patch.object(service, '_initialize_model') as mock_init:
+            segments = list(service.transcribe_segments(make_wav(seconds=2.5), chunk_seconds=1.0))
+        
+        assert not mock_init.called
+        assert service._worker_client.transcribe.call_count == 3
+        clip = service._worker_client.transcribe.call_args_list[0][0][0]
+        assert decode_audio(clip).shape[0] <= 16000
+        assert [(s.text, s.language) for s in segments] == [('chunk', 'de')] * 3
+        assert segments[0].start == 0.0
+        assert segments[-1].end == pytest.approx(2.5)
+    
+    def test_transcribe_segments_bounds_chunks_in_flight(self):
+        """Test that only ``parallel`` chunks are submitted ahead of the consumer."""
+        pytest.importorskip('numpy')
+        calls = []
+        
+        def transcribe(audio, language=None, beam_size=5):
+            calls.append(len(audio))
+            return [Mock(start=0.0, end=0.5, text='chunk')], Mock(language='en')
+        
+        service = ASRService(use_workers=False)
+        service.model = Mock()
+        service.model.transcribe.side_effect = transcribe
+        service._model_loaded = True
+        
+        segments = service.transcribe_segments(make_wav(seconds=5.5), chunk_seconds=1.0, parallel=2)
+        next(segments)
+        
+        assert len(calls) <= 3
+        segments.close()
+
+
+class TestSplitOnSilence:
+    """Test cases for silence-based chunk splitting."""
+    
+    def test_cuts_at_quiet_point(self):
+        """Test that a chunk boundary moves to the nearest silence."""
+        np = pytest.importorskip('numpy')
+        from core.services.asr_service import split_on_silence
+        
+        audio = np.ones(16000 * 3, dtype=np.float32)
+        audio[int(16000 * 1.5):int(16000 * 1.6)] = 0.0
+        
+        bounds = split_on_silence(audio, 16000, chunk_seconds=2.0, search_seconds=1.0)
+        
+        assert bounds[0][0] == 0
+        assert 16000 * 1.5 <= bounds[0][1] < 16000 * 1.6
+        assert bounds[-1][1] == len(audio)
+    
+    def test_short_audio_single_chunk(self):
+        """Test that audio shorter than a chunk is not split."""
+        np = pytest.importorskip('numpy')
+        from core.services.asr_service import split_on_silence
+        
+        assert split_on_silence(np.zeros(100, dtype=np.float32), 16000, 1.0) == [(0, 100)]
+
+
+class TestDecodeAudio:
+    """Test cases for in-memory audio decoding."""
+    
+    def test_decode_wav_bytes(self):
+        """Test decoding WAV bytes to 16 kHz float32 samples."""
+        np = pytest.importorskip('numpy')
+        
+        audio = decode_audio(make_wav(seconds=1.0))
+        
+        assert audio.dtype == np.float32
+        assert len(audio) == 16000
+    
+    def test_decode_resamples_and_downmixes(self):
+        """Test that stereo 8 kHz audio is converted to 16 kHz mono."""
+        pytest.importorskip('numpy')
+        
+        audio = decode_audio(make_wav(seconds=1.0, rate=8000, channels=2))
+        
+        assert audio.ndim == 1
+        assert len(audio) == 16000
+    
+    def test_decode_invalid_audio(self):
+        """Test that undecodable input raises ASRServiceError."""
+        pytest.importorskip('numpy')
+        from core.exceptions import ASRServiceError
+        
+        with pytest.raises(ASRServiceError):
+            decode_audio(b'not audio at all')
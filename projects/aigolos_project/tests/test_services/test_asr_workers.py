@@ -0,0 +1,148 @@
+"""
+Unit tests for the ASR worker pool.
+"""
+
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+from core.exceptions import ASRServiceError
+from core.services import ASRService
+from core.services.asr_workers import ASRWorkerPool, ASRWorkerServer, ASRWorkerClient
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Thread executor that records submitted batches."""
+    
+    def __init__(self, max_workers=2):
+        super().__init__(max_workers=max_workers)
+        self.batches = []
+    
+    def submit(self, fn, items):
+        self.batches.append(items)
+        return super().submit(fn, items)
+
+
+@pytest.fixture
+def worker_service():
+    """Process-local ASR service with a mocked Whisper model."""
+    def transcribe(audio, language=None, beam_size=5):
+        if audio == b'bad':
+            raise Exception('corrupt audio')
+        return [Mock(text=audio.decode())], Mock(language=language or 'en')
+    
+    service = ASRService(use_workers=False)
+    service.model = Mock()
+    service.model.transcribe.side_effect = transcribe
+    service._model_loaded = True
+    # Skip decoding so the mocked model sees the raw clip bytes
+    with patch('core.services.asr_workers._worker_service', service), \
+            patch('core.services.asr_service.decode_audio', lambda audio: audio):
+        yield service
+
+
+class TestASRWorkerPool:
+    """Test cases for ASRWorkerPool."""
+    
+    def test_clips_go_to_idle_workers_alone(self, worker_service):
+        """Test that each clip is its own task while workers are idle."""
+        executor = CountingExecutor()
+        pool = ASRWorkerPool(max_workers=2, batch_size=8, batch_max_bytes=100, executor=executor)
+        
+        first = pool.submit(b'clip 0')
+        assert first.result(timeout=5) == ('clip 0', 'en')
+        second = pool.submit(b'clip 1')
+        assert second.result(timeout=5) == ('clip 1', 'en')
+        pool.shutdown()
+        
+        assert [len(batch) for batch in executor.batches] == [1, 1]
+    
+    def test_short_clips_are_batched_when_workers_busy(self, worker_service):
+        """Test that short clips queued behind busy workers share one task."""
+        started, release = threading.Event(), threading.Event()
+        transcribe = worker_service.model.transcribe.side_effect
+        
+        def slow_transcribe(audio, language=None, beam_size=5):
+            if audio == b'slow':
+                started.set()
+                release.wait(5)
+            return transcribe(audio, language, beam_size)
+        
+        worker_service.model.transcribe.side_effect = slow_transcribe
+        executor = CountingExecutor(max_workers=1)
+        pool = ASRWorkerPool(max_workers=1, batch_size=8, batch_max_bytes=100, executor=executor)
+        
+        slow = pool.submit(b'slow')
+        started.wait(5)
+        futures = [pool.submit(f'clip {i}'.encode()) for i in range(3)]
+        release.set()
+        results = [future.result(timeout=5) for future in futures]
+        assert slow.result(timeout=5) == ('slow', 'en')
+        pool.shutdown()
+        
+        assert results == [('clip 0', 'en'), ('clip 1', 'en'), ('clip 2', 'en')]
+        assert [len(batch) for batch in executor.batches] == [1, 3]
+    
+    def test_long_clips_are_not_batched(self, worker_service):
+        """Test that clips above batch_max_bytes are dispatched alone."""
+        started, release = threading.Event(), threading.Event()
+        transcribe = worker_service.model.transcribe.side_effect
+        
+        def slow_transcribe(audio, language=None, beam_size=5):
+            if audio == b'slow':
+                started.set()
+                release.wait(5)
+            return transcribe(audio, language, beam_size)
+        
+        worker_service.model.transcribe.side_effect = slow_transcribe
+        executor = CountingExecutor(max_workers=1)
+        pool = ASRWorkerPool(max_workers=1, batch_size=8, batch_max_bytes=4, executor=executor)
+        
+        futures = [pool.submit(b'slow')]
+        started.wait(5)
+        futures += [pool.submit(b'long clip one'), pool.submit(b'long clip two')]
+        release.set()
+        for future in futures:
+            future.result(timeout=5)
+        pool.shutdown()
+        
+        assert [len(batch) for batch in executor.batches] == [1, 1, 1]
+    
+    def test_error_only_fails_its_request(self, worker_service):
+        """Test that one failing clip does not fail the whole batch."""
+        pool = ASRWorkerPool(max_workers=2, batch_size=8, executor=CountingExecutor())
+        
+        good = pool.submit(b'good', 'de')
+        bad = pool.submit(b'bad')
+        
+        assert good.result(timeout=5) == ('good', 'de')
+        with pytest.raises(ASRServiceError, match='corrupt audio'):
+            bad.result(timeout=5)
+        pool.shutdown()
+
+
+class TestASRWorkerServer:
+    """Test cases for the worker server/client round trip."""
+    
+    def test_client_round_trip(self, worker_service):
+        """Test that web workers get results from the pool over the socket."""
+        pool = ASRWorkerPool(max_workers=2, executor=CountingExecutor())
+        server = ASRWorkerServer(pool, '127.0.0.1:0', b'secret')
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.address
+        
+        client = ASRWorkerClient(f'{host}:{port}', b'secret')
+        assert client.transcribe(b'hello', 'fr') == ('hello', 'fr')
+        assert client.transcribe(b'again') == ('again', 'en')
+        with pytest.raises(ASRServiceError):
+            client.transcribe(b'bad')
+        
+        server.close()
+        pool.shutdown()
+    
+    def test_client_unavailable(self):
+        """Test that a missing worker pool raises ASRServiceError."""
+        client = ASRWorkerClient('127.0.0.1:9', b'secret')
+        
+        with pytest.raises(ASRServiceError, match='unavailable'):
+            client.transcribe(b'hello')
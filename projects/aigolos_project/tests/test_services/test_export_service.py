@@ -0,0 +1,133 @@
+"""
+Tests for streaming user data export.
+"""
+
+import csv
+import gzip
+import json
+import zipfile
+import pytest
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from asr.models import Transcription
+from llm.models import Conversation, Message
+from tts.models import Synthesis
+from core.services.export_service import ExportCheckpoint, export_user
+from tests.conftest import UserFactory
+
+
+@pytest.fixture
+def user_data(db):
+    """User with a transcription, two conversations and a synthesis."""
+    user = UserFactory(username='exporter')
+    Transcription.objects.create(user=user, audio_file='transcriptions/a.wav', text='Привет', language='ru')
+    first = Conversation.objects.create(user=user, title='First')
+    Message.objects.create(conversation=first, role='user', content='Hi')
+    Message.objects.create(conversation=first, role='assistant', content='Hello')
+    Conversation.objects.create(user=user, title='Empty')
+    Synthesis.objects.create(user=user, text='Speak', voice='test')
+    return user
+
+
+class TestExportUser:
+    """Test cases for export_user."""
+    
+    def test_json(self, user_data, tmp_path):
+        """Test JSON export nests messages in their conversation."""
+        counts = export_user(user_data.id, str(tmp_path), 'json')
+        
+        user_dir = tmp_path / 'exporter'
+        conversations = json.loads((user_dir / 'conversations.json').read_text(encoding='utf-8'))
+        transcriptions = json.loads((user_dir / 'transcriptions.json').read_text(encoding='utf-8'))
+        assert counts == {'username': 'exporter', 'transcriptions': 1, 'conversations': 2, 'syntheses': 1}
+        assert [c['title'] for c in conversations] == ['First', 'Empty']
+        assert [m['content'] for m in conversations[0]['messages']] == ['Hi', 'Hello']
+        assert conversations[1]['messages'] == []
+        assert transcriptions[0]['text'] == 'Привет'
+        assert not list(user_dir.glob('*.partial'))
+    
+    def test_jsonl_gzip(self, user_data, tmp_path):
+        """Test gzipped JSON Lines export writes one record per line."""
+        export_user(user_data.id, str(tmp_path), 'jsonl', compress='gzip')
+        
+        with gzip.open(tmp_path / 'exporter' / 'conversations.jsonl.gz', 'rt', encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        assert len(lines) == 2
+        assert len(lines[0]['messages']) == 2
+    
+    def test_csv(self, user_data, tmp_path):
+        """Test CSV export writes conversations and messages separately."""
+        export_user(user_data.id, str(tmp_path), 'csv')
+        
+        user_dir = tmp_path / 'exporter'
+        with open(user_dir / 'conversations.csv', encoding='utf-8') as f:
+            conversations = list(csv.DictReader(f))
+        with open(user_dir / 'messages.csv', encoding='utf-8') as f:
+            messages = list(csv.DictReader(f))
+        assert [c['message_count'] for c in conversations] == ['2', '0']
+        assert [m['role'] for m in messages] == ['user', 'assistant']
+    
+    def test_zip(self, user_data, tmp_path):
+        """Test zip export writes one archive per user."""
+        export_user(user_data.id, str(tmp_path), 'both', compress='zip')
+        
+        with zipfile.ZipFile(tmp_path / 'exporter.zip') as archive:
+            names = set(archive.namelist())
+            syntheses = json.loads(archive.read('syntheses.json'))
+        assert {'transcriptions.json', 'conversations.json', 'transcriptions.csv', 'messages.csv'} <= names
+        assert syntheses[0]['voice'] == 'test'
+    
+    @pytest.mark.parametrize('compress', ['none', 'zip'])
+    def test_failed_export_leaves_no_files(self, user_data, tmp_path, compress):
+        """Test an export that fails partway leaves no finished-looking or partial files."""
+        def conversations(user_id, chunk_size):
+            yield {'id': 1, 'title': 'First', 'messages': []}
+            raise RuntimeError('db gone')
+        
+        with patch('core.services.export_service._conversations_with_messages', conversations):
+            with pytest.raises(RuntimeError):
+                export_user(user_data.id, str(tmp_path), 'json', compress=compress)
+        
+        assert not (tmp_path / 'exporter.zip').exists()
+        assert not list(tmp_path.rglob('*.partial'))
+        assert not (tmp_path / 'exporter' / 'conversations.json').exists()
+
+
+class TestExportCommand:
+    """Test cases for the export_data command."""
+    
+    def test_export_all_users_with_checkpoint(self, user_data, tmp_path):
+        """Test every user is exported and recorded in the checkpoint."""
+        other = UserFactory(username='other')
+        
+        call_command('export_data', output=str(tmp_path), stdout=StringIO())
+        
+        checkpoint = ExportCheckpoint(tmp_path, {'format': 'json', 'compress': 'none'})
+        assert checkpoint.load() == {user_data.id, other.id}
+        assert (tmp_path / 'other' / 'transcriptions.json').read_text() == '[]\n'
+    
+    def test_resume_skips_finished_users(self, user_data, tmp_path):
+        """Test --resume skips users already in the checkpoint."""
+        ExportCheckpoint(tmp_path, {'format': 'json', 'compress': 'none'}).mark_done(user_data.id)
+        
+        out = StringIO()
+        call_command('export_data', output=str(tmp_path), resume=True, stdout=out)
+        
+        assert 'already exported' in out.getvalue()
+        assert not (tmp_path / 'exporter').exists()
+    
+    def test_checkpoint_ignored_when_options_change(self, user_data, tmp_path):
+        """Test a checkpoint written with other options is not used."""
+        ExportCheckpoint(tmp_path, {'format': 'csv', 'compress': 'none'}).mark_done(user_data.id)
+        
+        call_command('export_data', output=str(tmp_path), resume=True, stdout=StringIO())
+        
+        assert (tmp_path / 'exporter' / 'conversations.json').exists()
+    
+    def test_unknown_user(self, db, tmp_path):
+        """Test unknown username is reported."""
+        out = StringIO()
+        call_command('export_data', username='missing', output=str(tmp_path), stdout=out)
+        
+        assert "User 'missing' not found" in out.getvalue()
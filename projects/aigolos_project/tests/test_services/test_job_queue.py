@@ -0,0 +1,181 @@
+"""
+Unit tests for the background job queue and workers.
+"""
+
+from datetime import timedelta
+from unittest.mock import patch
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+from core.models import Job
+from core.services.job_queue import DatabaseJobQueue, RedisJobQueue, claim, next_position
+from core.services.job_workers import run_job
+from core.view_services import JobViewService
+from tests.conftest import UserFactory
+
+
+def queue_job(user, priority=0, kind='synthesis'):
+    return Job.objects.create(
+        user=user,
+        kind=kind,
+        priority=priority,
+        position=next_position(user.id),
+        params={'text': 'Hello', 'voice': None}
+    )
+
+
+@pytest.mark.django_db
+class TestDatabaseJobQueue:
+    """Test cases for DatabaseJobQueue."""
+    
+    def test_users_take_turns(self):
+        """Test a user with many queued jobs does not block another user."""
+        heavy, light = UserFactory(), UserFactory()
+        heavy_jobs = [queue_job(heavy) for _ in range(3)]
+        light_job = queue_job(light)
+        
+        queue = DatabaseJobQueue(poll_interval=0.01)
+        order = [queue.pop(timeout=0).id for _ in range(4)]
+        
+        assert order[:2] == [heavy_jobs[0].id, light_job.id]
+        assert order[2:] == [heavy_jobs[1].id, heavy_jobs[2].id]
+    
+    def test_priority_runs_first(self):
+        """Test higher priority jobs are claimed before earlier ones."""
+        user = UserFactory()
+        low = queue_job(user, priority=-5)
+        normal = queue_job(user)
+        urgent = queue_job(user, priority=5)
+        
+        queue = DatabaseJobQueue(poll_interval=0.01)
+        assert [queue.pop(timeout=0).id for _ in range(3)] == [urgent.id, normal.id, low.id]
+        assert queue.pop(timeout=0.05) is None
+    
+    def test_claim_once(self):
+        """Test a job can only be claimed by one worker."""
+        job = queue_job(UserFactory())
+        
+        claimed = claim(job.id)
+        assert claimed.status == 'running'
+        assert claimed.attempts == 1
+        assert claimed.started_at is not None
+        assert claim(job.id) is None
+    
+    def test_cancelled_job_not_claimed(self):
+        """Test cancelled jobs are skipped by workers."""
+        job = queue_job(UserFactory())
+        
+        assert JobViewService.cancel(job)
+        assert job.status == 'cancelled'
+        assert DatabaseJobQueue().pop(timeout=0) is None
+        assert not JobViewService.cancel(job)
+    
+    def test_requeue_stale(self):
+        """Test jobs of dead workers are requeued, then failed after max attempts."""
+        user = UserFactory()
+        retry, give_up = queue_job(user), queue_job(user)
+        claim(retry.id)
+        claim(give_up.id)
+        Job.objects.filter(id=give_up.id).update(attempts=3)
+        Job.objects.update(started_at=timezone.now() - timedelta(hours=1))
+        
+        assert DatabaseJobQueue().requeue_stale(timeout=900, max_attempts=3) == 1
+        retry.refresh_from_db()
+        give_up.refresh_from_db()
+        assert retry.status == 'queued'
+        assert give_up.status == 'failed'
+        assert give_up.error == 'Job timed out'
+
+
+class SortedSet:
+    """In-memory stand-in for the Redis sorted set commands RedisJobQueue uses."""
+    
+    def __init__(self):
+        self.items = {}
+    
+    def zadd(self, key, mapping, nx=False):
+        added = 0
+        for member, score in mapping.items():
+            member = str(member).encode()
+            if member not in self.items:
+                added += 1
+            elif nx:
+                continue
+            self.items[member] = score
+        return added
+    
+    def bzpopmin(self, key, timeout=0):
+        if not self.items:
+            return None
+        member = min(self.items, key=lambda m: (self.items[m], m))
+        return key, member, self.items.pop(member)
+    
+    def zrem(self, key, member):
+        self.items.pop(str(member).encode(), None)
+
+
+@pytest.fixture
+def redis_queue():
+    queue = RedisJobQueue.__new__(RedisJobQueue)
+    DatabaseJobQueue.__init__(queue, poll_interval=0.01)
+    queue.redis = SortedSet()
+    return queue
+
+
+@pytest.mark.django_db
+class TestRedisJobQueue:
+    """Test cases for RedisJobQueue."""
+    
+    def test_pop_claims_in_order(self, redis_queue):
+        """Test jobs are claimed by priority from the sorted set."""
+        user = UserFactory()
+        low, high = queue_job(user), queue_job(user, priority=5)
+        redis_queue.push(low)
+        redis_queue.push(high)
+        
+        assert redis_queue.pop(timeout=0.1).id == high.id
+        assert redis_queue.pop(timeout=0.1).id == low.id
+        assert redis_queue.pop(timeout=0.05) is None
+    
+    def test_sweep_restores_job_lost_between_pop_and_claim(self, redis_queue):
+        """Test a queued job whose id was popped by a dead worker runs again."""
+        user = UserFactory()
+        lost, waiting = queue_job(user), queue_job(user)
+        redis_queue.push(lost)
+        redis_queue.push(waiting)
+        # The worker popped the id and died before claim()
+        redis_queue.redis.bzpopmin(RedisJobQueue.KEY)
+        
+        assert redis_queue.requeue_stale(timeout=900, max_attempts=3) == 0
+        assert redis_queue.restore_missing() == 0
+        assert [redis_queue.pop(timeout=0.1).id for _ in range(2)] == [lost.id, waiting.id]
+
+
+@pytest.mark.django_db
+class TestRunJob:
+    """Test cases for run_job."""
+    
+    def test_synthesis_completes(self, tmp_path):
+        """Test a synthesis job stores its result."""
+        job = claim(queue_job(UserFactory()).id)
+        
+        with override_settings(MEDIA_ROOT=str(tmp_path)), \
+             patch('core.view_services.tts_service.synthesize', return_value=b'RIFF' + b'\x00' * 40):
+            job = run_job(job)
+        
+        assert job.status == 'completed'
+        assert job.finished
+        result = JobViewService.result(job)
+        assert result is not None
+        assert result.text == 'Hello'
+    
+    def test_failure_recorded(self):
+        """Test handler errors mark the job failed with the message."""
+        job = claim(queue_job(UserFactory()).id)
+        
+        with patch('core.view_services.tts_service.synthesize', side_effect=RuntimeError('voice missing')):
+            job = run_job(job)
+        
+        assert job.status == 'failed'
+        assert 'voice missing' in job.error
+        assert JobViewService.result(job) is None
@@ -0,0 +1,120 @@
+"""
+Unit tests for the conversation context cache.
+"""
+
+import pytest
+from django.test import override_settings
+from core.services import LLMService
+from core.services.llm_context import conversation_context_cache, estimate_tokens
+from llm.models import Conversation, Message
+from tests.conftest import UserFactory
+
+
+@pytest.fixture
+def conversation(db):
+    conversation = Conversation.objects.create(user=UserFactory(), title='Chat')
+    conversation_context_cache.invalidate(conversation.id)
+    return conversation
+
+
+def add_turn(conversation, role, content):
+    return Message.objects.create(conversation=conversation, role=role, content=content)
+
+
+class TestConversationContextCache:
+    """Test cases for ConversationContextCache."""
+    
+    def test_build_from_history(self, conversation):
+        """Test history is formatted without repeating the current message."""
+        add_turn(conversation, 'user', 'Hi')
+        add_turn(conversation, 'assistant', 'Hello!')
+        add_turn(conversation, 'user', 'How are you?')
+        
+        text, tokens, through = conversation_context_cache.build(conversation.id, 'How are you?')
+        
+        assert text == "User: Hi\nAssistant: Hello!\n\n"
+        assert tokens is None
+        assert through == conversation.messages.last().id
+    
+    def test_new_messages_appended_without_queries(self, conversation, django_assert_num_queries):
+        """Test the message_created signal extends a cached context incrementally."""
+        add_turn(conversation, 'user', 'Hi')
+        conversation_context_cache.get(conversation.id)
+        add_turn(conversation, 'assistant', 'Hello!')
+        
+        with django_assert_num_queries(0):
+            text, _, _ = conversation_context_cache.build(conversation.id, 'Next question')
+        assert text == "User: Hi\nAssistant: Hello!\n\n"
+    
+    def test_edit_and_delete_invalidate(self, conversation):
+        """Test edited and deleted messages drop the cached context."""
+        message = add_turn(conversation, 'user', 'Hi')
+        conversation_context_cache.get(conversation.id)
+        
+        message.content = 'Hello'
+        message.save()
+        assert conversation_context_cache.build(conversation.id, 'x')[0] == "User: Hello\n\n"
+        
+        message.delete()
+        assert conversation_context_cache.build(conversation.id, 'x')[0] == ""
+    
+    @override_settings(LLM_CONTEXT_TOKENS=30)
+    def test_trimmed_to_token_budget(self, conversation):
+        """Test oldest turns are dropped once the estimated budget is exceeded."""
+        for i in range(6):
+            add_turn(conversation, 'user', f'Question number {i} is here')
+        
+        text, _, _ = conversation_context_cache.build(conversation.id, 'Last')
+        
+        assert 'number 0' not in text
+        assert 'number 5' in text
+        assert estimate_tokens(text) <= 30
+    
+    @override_settings(LLM_CONTEXT_TOKENS=30)
+    def test_trimmed_turns_summarized(self, conversation):
+        """Test trimmed turns are folded into the summary when enabled."""
+        for i in range(6):
+            add_turn(conversation, 'user', f'Question number {i} is here')
+        conversation_context_cache.get(conversation.id)
+        
+        dropped = []
+        def summarize(summary, turns):
+            dropped.extend(turn.content for turn in turns)
+            return 'Earlier questions'
+        
+        text, _, _ = conversation_context_cache.build(conversation.id, 'Last', summarize)
+        
+        assert dropped
+        assert text.startswith('Summary of earlier conversation: Earlier questions\n')
+        # Summary is kept for later turns without re-summarizing
+        assert conversation_context_cache.build(conversation.id, 'Last')[0].startswith('Summary')
+    
+    def test_ollama_context_reused(self, conversation, fake_ollama):
+        """Test the context array returned by Ollama is sent back on the next turn."""
+        service = LLMService()
+        service.base_url = fake_ollama.url
+        
+        add_turn(conversation, 'user', 'Hi')
+        reply = service.generate('Hi', str(conversation.id))
+        add_turn(conversation, 'assistant', reply)
+        add_turn(conversation, 'user', 'Tell me more')
+        list(service.generate_stream('Tell me more', str(conversation.id)))
+        service.close()
+        
+        first, second = fake_ollama.requests
+        assert 'context' not in first
+        assert second['prompt'] == 'Tell me more'
+        assert second['context'] == fake_ollama.context_for(first)
+    
+    def test_ollama_context_not_reused_after_other_turns(self, conversation):
+        """Test text history is used if messages arrived that Ollama hasn't seen."""
+        message = add_turn(conversation, 'user', 'Hi')
+        conversation_context_cache.get(conversation.id)
+        conversation_context_cache.set_ollama_context(conversation.id, [1, 2, 3], message.id)
+        add_turn(conversation, 'assistant', 'Hello!')
+        add_turn(conversation, 'user', 'Sent from another device')
+        
+        text, tokens, _ = conversation_context_cache.build(conversation.id, 'Next')
+        
+        assert tokens is None
+        assert 'Sent from another device' in text
@@ -6,6 +6,7 @@ import pytest
 from unittest.mock import Mock, patch, MagicMock
 from django.test import override_settings
 from core.services import LLMService
+from core.exceptions import LLMServiceError
 import httpx
 
 
@@ -144,6 +145,37 @@ class TestLLMService:
             
             assert response == ''
     
+    def test_generate_stream(self, fake_ollama):
+        """Test streaming generation against fake Ollama."""
+        with override_settings(OLLAMA_BASE_URL=fake_ollama.url, LLM_MODEL_NAME='test-model'):
+            service = LLMService()
+            
+            tokens = list(service.generate_stream('Hello'))
+            
+            assert tokens == fake_ollama.tokens()
+            assert ''.join(tokens) == 'Hello there, how can I help?'
+            assert fake_ollama.requests[0]['stream'] is True
+            assert fake_ollama.requests[0]['model'] == 'test-model'
+            service.close()
+    
+    def test_generate_deterministic_is_cached(self, fake_ollama):
+        """Test that temperature 0 responses are served from the result cache."""
+        with override_settings(OLLAMA_BASE_URL=fake_ollama.url, LLM_TEMPERATURE=0.0):
+            service = LLMService()
+            
+            assert service.generate('Hello') == 'Hello there, how can I help?'
+            assert service.generate('Hello') == 'Hello there, how can I help?'
+            assert len(fake_ollama.requests) == 1
+            service.close()
+    
+    def test_generate_stream_connection_error(self):
+        """Test streaming generation when Ollama is unreachable."""
+        with override_settings(OLLAMA_BASE_URL='http://127.0.0.1:9'):
+            service = LLMService()
+            
+            with pytest.raises(LLMServiceError):
+                list(service.generate_stream('Hello'))
+    
     def test_close(self):
         """Test closing the HTTP client."""
         mock_client = Mock()
@@ -0,0 +1,149 @@
+"""
+Unit tests for metrics collection.
+"""
+
+import threading
+import time
+import pytest
+from django.test import override_settings
+from rest_framework import status
+from core.metrics import (
+    LATENCY_BUCKETS,
+    MetricsBuffer,
+    MetricsCollector,
+    _read_histogram,
+    _series,
+    flush_metrics,
+    histogram_quantile,
+    render_prometheus,
+)
+
+
+class TestMetricsCollector:
+    """Test cases for buffered metrics."""
+    
+    def test_api_percentiles(self):
+        """Test counts, errors and latency percentiles per endpoint."""
+        for _ in range(90):
+            MetricsCollector.record_api_request('/api/health/', 'GET', 200, 0.004)
+        for _ in range(10):
+            MetricsCollector.record_api_request('/api/health/', 'GET', 500, 2.0)
+        
+        metrics = MetricsCollector.get_api_metrics('/api/health/', 'GET')
+        
+        assert metrics['count'] == 100
+        assert metrics['errors'] == 10
+        assert metrics['avg_duration'] == pytest.approx(0.2036)
+        assert metrics['p50'] <= 0.005
+        assert 1.0 < metrics['p95'] <= 2.5
+        assert MetricsCollector.get_api_metrics('/api/other/', 'GET') == {}
+    
+    def test_concurrent_updates_not_lost(self):
+        """Test observations from many threads are all counted."""
+        def record():
+            for _ in range(500):
+                MetricsCollector.record_api_request('/api/asr/', 'POST', 200, 0.01)
+        
+        threads = [threading.Thread(target=record) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert MetricsCollector.get_api_metrics('/api/asr/', 'POST')['count'] == 4000
+    
+    def test_flushes_aggregate_atomically(self):
+        """Test values from separate buffers (processes) add up in the cache."""
+        first, second = MetricsBuffer(flush_interval=60), MetricsBuffer(flush_interval=60)
+        first.observe('api', ('/x/', 'GET'), 0.1)
+        second.observe('api', ('/x/', 'GET'), 0.3, error=True)
+        first.flush()
+        second.flush()
+        
+        metrics = MetricsCollector.get_api_metrics('/x/', 'GET')
+        assert metrics['count'] == 2
+        assert metrics['errors'] == 1
+    
+    def test_concurrent_registration_keeps_all_series(self):
+        """Test series registered by many buffers at once are all listed."""
+        buffers = [MetricsBuffer(flush_interval=60) for _ in range(8)]
+        for i, buffer in enumerate(buffers):
+            buffer.observe('api', (f'/x/{i}/', 'GET'), 0.1)
+            buffer.observe('api', ('/shared/', 'GET'), 0.1)
+        
+        threads = [threading.Thread(target=buffer.flush) for buffer in buffers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        series = _series('api')
+        assert sorted(series) == sorted([(f'/x/{i}/', 'GET') for i in range(8)] + [('/shared/', 'GET')])
+    
+    def test_background_flush(self):
+        """Test buffered values reach the cache without an explicit flush."""
+        buffer = MetricsBuffer(flush_interval=0.05)
+        buffer.observe('api', ('/bg/', 'GET'), 0.1)
+        
+        deadline = time.monotonic() + 5
+        while _read_histogram('api', ('/bg/', 'GET')) is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        
+        assert _read_histogram('api', ('/bg/', 'GET'))['count'] == 1
+    
+    def test_histogram_quantile(self):
+        """Test linear interpolation inside a bucket."""
+        histogram = {'count': 10, **{f'b{i}': 0 for i in range(len(LATENCY_BUCKETS) + 1)}}
+        histogram['b4'] = 10  # all in (0.05, 0.1]
+        
+        assert histogram_quantile(0.5, histogram) == pytest.approx(0.075)
+        assert histogram_quantile(0.5, {**histogram, 'count': 0}) == 0.0
+    
+    def test_record_overhead(self):
+        """Test recording stays in the low-microsecond range (no cache round trip)."""
+        iterations = 20000
+        started = time.perf_counter()
+        for _ in range(iterations):
+            MetricsCollector.record_api_request('/api/health/', 'GET', 200, 0.01)
+        per_call = (time.perf_counter() - started) / iterations
+        
+        assert per_call < 20e-6  # generous bound for slow CI machines
+
+
+class TestPrometheusExport:
+    """Test cases for the Prometheus text format and endpoint."""
+    
+    def test_render(self):
+        """Test histogram buckets are cumulative and labelled."""
+        MetricsCollector.record_api_request('/api/health/', 'GET', 200, 0.02)
+        MetricsCollector.record_api_request('/api/health/', 'GET', 404, 0.2)
+        MetricsCollector.record_cache_event('asr', hit=True)
+        
+        text = render_prometheus()
+        
+        assert 'aigolos_http_request_duration_seconds_bucket{endpoint="/api/health/",method="GET",le="0.025"} 1' in text
+        assert 'aigolos_http_request_duration_seconds_bucket{endpoint="/api/health/",method="GET",le="+Inf"} 2' in text
+        assert 'aigolos_http_request_duration_seconds_count{endpoint="/api/health/",method="GET"} 2' in text
+        assert 'aigolos_http_request_errors_total{endpoint="/api/health/",method="GET"} 1' in text
+        assert 'aigolos_result_cache_requests_total{kind="asr",outcome="hits"} 1' in text
+    
+    def test_endpoint_hidden_from_users(self, authenticated_client):
+        """Test regular users can't read metrics."""
+        assert authenticated_client.get('/api/metrics/').status_code == status.HTTP_403_FORBIDDEN
+    
+    def test_endpoint_staff(self, authenticated_admin_client):
+        """Test metrics are available to staff."""
+        authenticated_admin_client.get('/api/health/')
+        response = authenticated_admin_client.get('/api/metrics/')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'].startswith('text/plain')
+        # Recorded by LoggingMiddleware under the URL pattern
+        assert 'endpoint="/api/health/",method="GET"' in response.content.decode()
+    
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_endpoint_bearer_token(self, api_client):
+        """Test scrapers can authenticate with METRICS_TOKEN."""
+        assert api_client.get('/api/metrics/').status_code in (401, 403)
+        response = api_client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        assert response.status_code == status.HTTP_200_OK
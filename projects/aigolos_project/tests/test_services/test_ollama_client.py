@@ -0,0 +1,187 @@
+"""
+Unit tests for Ollama connection management.
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+import pytest
+from django.test import override_settings
+from core.exceptions import LLMBusyError
+from core.services.llm_service import LLMService
+from core.services.ollama_client import ConcurrencyLimiter, OllamaRouter
+
+
+class TestConcurrencyLimiter:
+    """Test cases for ConcurrencyLimiter."""
+    
+    def test_timeout_when_full(self):
+        """Test a request over the limit gives up after the timeout."""
+        limiter = ConcurrencyLimiter(1)
+        
+        assert limiter.acquire(0.1)
+        assert not limiter.acquire(0.05)
+        assert limiter.queued == 0
+        limiter.release()
+        assert limiter.acquire(0.05)
+    
+    def test_release_hands_slot_in_fifo_order(self):
+        """Test waiting threads get freed slots in arrival order."""
+        limiter = ConcurrencyLimiter(1)
+        limiter.acquire()
+        order = []
+        
+        def worker(name):
+            assert limiter.acquire(5)
+            order.append(name)
+            limiter.release()
+        
+        threads = []
+        for name in ('first', 'second', 'third'):
+            thread = threading.Thread(target=worker, args=(name,))
+            thread.start()
+            threads.append(thread)
+            while limiter.queued < len(threads):
+                time.sleep(0.001)
+        limiter.release()
+        for thread in threads:
+            thread.join()
+        
+        assert order == ['first', 'second', 'third']
+        assert limiter.in_use == 0
+    
+    def test_async_waiter_woken_by_thread(self):
+        """Test coroutines and threads share one queue."""
+        limiter = ConcurrencyLimiter(1)
+        limiter.acquire()
+        
+        async def wait():
+            pending = asyncio.ensure_future(limiter.acquire_async(5))
+            await asyncio.sleep(0.01)
+            assert limiter.queued == 1
+            threading.Thread(target=limiter.release).start()
+            return await pending
+        
+        assert asyncio.run(wait()) is True
+        assert limiter.in_use == 1
+    
+    def test_resize(self):
+        """Test added slots go to waiters and removed ones are not handed out."""
+        limiter = ConcurrencyLimiter(2)
+        limiter.acquire()
+        limiter.acquire()
+        limiter.resize(1)
+        
+        assert not limiter.acquire(0.05)
+        limiter.release()
+        assert limiter.in_use == 1
+        
+        granted = []
+        thread = threading.Thread(target=lambda: granted.append(limiter.acquire(5)))
+        thread.start()
+        while limiter.queued < 1:
+            time.sleep(0.001)
+        limiter.resize(2)
+        thread.join()
+        
+        assert granted == [True]
+        assert limiter.in_use == 2
+
+
+class TestOllamaRouter:
+    """Test cases for OllamaRouter."""
+    
+    def test_least_loaded_backend(self):
+        """Test requests are spread over backends by in-flight count."""
+        router = OllamaRouter(['http://a', 'http://b'], max_concurrency=2)
+        
+        with router.slot('m') as first, router.slot('m') as second:
+            assert {first.url, second.url} == {'http://a', 'http://b'}
+            with router.slot('m') as third:
+                assert third.in_flight == 2
+        assert [b.in_flight for b in router.backends] == [0, 0]
+    
+    def test_failed_backend_skipped(self):
+        """Test a backend that refused a connection is skipped during cooldown."""
+        router = OllamaRouter(['http://a', 'http://b'])
+        router.mark_failed(router.backends[0])
+        
+        for _ in range(3):
+            with router.slot('m') as backend:
+                assert backend.url == 'http://b'
+    
+    def test_backend_with_free_slot_for_model(self):
+        """Test a request goes to a backend that still has a slot for its model."""
+        router = OllamaRouter(['http://a', 'http://b'], max_concurrency=1)
+        
+        with router.slot('m') as first, router.slot('other') as other:
+            assert (first.url, other.url) == ('http://a', 'http://b')
+            with router.slot('m') as second:
+                assert second.url == 'http://b'
+    
+    def test_failed_backend_slots_withdrawn(self):
+        """Test survivors do not take over the slots of a backend in cooldown."""
+        router = OllamaRouter(['http://a', 'http://b'], max_concurrency=1, queue_timeout=0.05)
+        router.mark_failed(router.backends[0])
+        
+        with router.slot('m') as backend:
+            assert backend.url == 'http://b'
+            with pytest.raises(LLMBusyError):
+                with router.slot('m'):
+                    pass
+        
+        router.backends[0].unavailable_until = 0
+        with router.slot('m'), router.slot('m'):
+            assert [b.in_flight for b in router.backends] == [1, 1]
+    
+    def test_busy_error(self):
+        """Test a full queue raises LLMBusyError."""
+        router = OllamaRouter(['http://a'], max_concurrency=1, queue_timeout=0.05)
+        
+        with router.slot('m'):
+            with pytest.raises(LLMBusyError):
+                with router.slot('m'):
+                    pass
+            # Limits are per model
+            with router.slot('other'):
+                pass
+
+
+@pytest.mark.django_db
+class TestLLMServiceRouting:
+    """Test cases for LLMService over the router."""
+    
+    def test_retries_on_another_backend(self, fake_ollama):
+        """Test a connection error is retried on the next backend."""
+        with override_settings(OLLAMA_BASE_URLS=['http://127.0.0.1:9', fake_ollama.url], LLM_RETRIES=2):
+            service = LLMService()
+            service.router.retry_backoff = 0.01
+            
+            assert service.generate('Hello') == 'Hello there, how can I help?'
+            assert service.router.backends[0].unavailable_until > 0
+            service.close()
+    
+    def test_agenerate_stream(self, fake_ollama):
+        """Test async streaming generation against fake Ollama."""
+        with override_settings(OLLAMA_BASE_URL=fake_ollama.url):
+            service = LLMService()
+            
+            async def collect():
+                tokens = [token async for token in service.agenerate_stream('Hello')]
+                reply = await service.agenerate('Hello')
+                await service.aclose()
+                return tokens, reply
+            
+            tokens, reply = asyncio.run(collect())
+            
+            assert tokens == fake_ollama.tokens()
+            assert reply == 'Hello there, how can I help?'
+    
+    def test_busy_returns_503(self, authenticated_client):
+        """Test an overloaded LLM maps to 503 with Retry-After."""
+        with patch('core.view_services.llm_service.generate', side_effect=LLMBusyError('busy')):
+            response = authenticated_client.post('/api/llm/chat/', {'message': 'Hi'}, format='json')
+        
+        assert response.status_code == 503
+        assert response['Retry-After'] == '5'
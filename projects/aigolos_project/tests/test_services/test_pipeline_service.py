@@ -0,0 +1,130 @@
+"""
+Unit tests for the voice assistant pipeline.
+"""
+
+import asyncio
+import base64
+import threading
+import time
+from unittest.mock import Mock
+from core.exceptions import ASRServiceError, LLMServiceError
+from core.services.pipeline_service import SentenceBuffer, StageTimings, VoicePipeline
+from tests.test_services.test_tts_service import make_sentence_wav
+
+
+def run_pipeline(pipeline, **kwargs):
+    """Collect all pipeline events."""
+    async def collect():
+        return [event async for event in pipeline.run(b'audio', **kwargs)]
+    return asyncio.run(collect())
+
+
+async def async_tokens(tokens):
+    for token in tokens:
+        yield token
+
+
+def make_pipeline(tokens, synthesize=make_sentence_wav):
+    asr = Mock()
+    asr.transcribe.return_value = ('What is the weather?', 'en')
+    llm = Mock()
+    llm.agenerate_stream.side_effect = lambda message, conversation_id=None: async_tokens(tokens)
+    tts = Mock()
+    tts.synthesize.side_effect = synthesize
+    return VoicePipeline(asr, llm, tts, tts_workers=2)
+
+
+class TestSentenceBuffer:
+    """Test cases for SentenceBuffer."""
+    
+    def test_releases_complete_sentences(self):
+        """Test text is released at sentence ends once long enough."""
+        buffer = SentenceBuffer(min_length=10)
+        
+        assert buffer.feed('Hi. ') is None  # too short, kept
+        assert buffer.feed('It is sunny') is None
+        assert buffer.feed(' today. Tomo') == 'Hi. It is sunny today.'
+        assert buffer.feed('rrow rain') is None
+        assert buffer.flush() == 'Tomorrow rain'
+        assert buffer.flush() is None
+
+
+class TestVoicePipeline:
+    """Test cases for VoicePipeline."""
+    
+    def test_events_in_order(self):
+        """Test transcript, tokens, ordered audio per sentence and timings."""
+        tokens = ['It is sunny ', 'and warm today. ', 'Tomorrow it ', 'will rain again.']
+        pipeline = make_pipeline(tokens)
+        
+        events = run_pipeline(pipeline, language='en')
+        names = [name for name, _ in events]
+        
+        assert events[0] == ('transcript', {'text': 'What is the weather?', 'language': 'en'})
+        assert names.count('token') == 4
+        assert names[-1] == 'done'
+        pipeline.llm.agenerate_stream.assert_called_once_with('What is the weather?', None)
+        
+        audio = [data for name, data in events if name == 'audio']
+        assert [a['index'] for a in audio] == [0, 1]
+        assert [a['text'] for a in audio] == ['It is sunny and warm today.', 'Tomorrow it will rain again.']
+        assert base64.b64decode(audio[0]['audio'])[44:].decode('utf-16-le') == 'It is sunny and warm today.'
+        
+        done = events[-1][1]
+        assert done['content'] == 'It is sunny and warm today. Tomorrow it will rain again.'
+        assert set(done['timings']) == {'asr', 'llm_first_token', 'llm', 'tts_first_audio', 'tts', 'total'}
+    
+    def test_tts_overlaps_generation(self):
+        """Test synthesis of the first sentence starts before generation ends."""
+        first_sentence_started = threading.Event()
+        
+        async def slow_tokens():
+            yield 'The first sentence is here. '
+            # Generation continues only once TTS is working on sentence one
+            assert await asyncio.to_thread(first_sentence_started.wait, 5)
+            yield 'And here is the second one.'
+        
+        def synthesize(text, voice=None):
+            first_sentence_started.set()
+            return make_sentence_wav(text)
+        
+        pipeline = make_pipeline([], synthesize)
+        pipeline.llm.agenerate_stream.side_effect = lambda message, conversation_id=None: slow_tokens()
+        
+        events = run_pipeline(pipeline)
+        
+        assert [data['index'] for name, data in events if name == 'audio'] == [0, 1]
+        assert events[-1][0] == 'done'
+    
+    def test_asr_error(self):
+        """Test ASR failure ends the stream with an error event."""
+        pipeline = make_pipeline([])
+        pipeline.asr.transcribe.side_effect = ASRServiceError('bad audio')
+        
+        assert run_pipeline(pipeline) == [('error', {'stage': 'asr', 'error': 'bad audio'})]
+        pipeline.llm.agenerate_stream.assert_not_called()
+    
+    def test_llm_error(self):
+        """Test LLM failure after the transcript is reported with its stage."""
+        pipeline = make_pipeline([])
+        pipeline.llm.agenerate_stream.side_effect = LLMServiceError('Ollama down')
+        
+        events = run_pipeline(pipeline)
+        
+        assert events[0][0] == 'transcript'
+        assert events[-1] == ('error', {'stage': 'llm', 'error': 'Ollama down'})
+
+
+class TestStageTimings:
+    """Test cases for StageTimings."""
+    
+    def test_mark_and_add(self):
+        """Test first mark wins and added durations accumulate."""
+        timings = StageTimings(started=time.perf_counter() - 1)
+        first = timings.mark('asr')
+        timings.mark('asr')
+        timings.add('tts', 0.25)
+        timings.add('tts', 0.5)
+        
+        assert timings.values['asr'] == first >= 1
+        assert timings.as_dict()['tts'] == 0.75
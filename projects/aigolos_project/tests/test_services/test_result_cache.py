@@ -0,0 +1,148 @@
+"""
+Unit tests for the content-addressed result cache.
+"""
+
+import io
+import pytest
+from unittest.mock import Mock, patch
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from asr.models import Transcription
+from tts.models import Synthesis
+from core.metrics import MetricsCollector
+from core.result_cache import (
+    content_hash,
+    delete_media_if_unreferenced,
+    result_cache,
+    store_media,
+)
+from core.view_services import ASRViewService, TTSViewService
+from tests.conftest import UserFactory
+from tests.test_services.test_asr_service import make_wav
+
+
+class TestResultCache:
+    """Test cases for ResultCache."""
+    
+    def test_content_hash_rewinds_file(self):
+        """Test hashing a file object matches bytes and rewinds it."""
+        data = b'audio bytes'
+        f = io.BytesIO(data)
+        
+        assert content_hash(f) == content_hash(data)
+        assert f.tell() == 0
+    
+    def test_get_or_compute_caches_by_params(self):
+        """Test results are reused only for identical input and parameters."""
+        compute = Mock(side_effect=['first', 'second'])
+        
+        assert result_cache.get_or_compute('asr', 'abc', {'language': 'en'}, compute) == 'first'
+        assert result_cache.get_or_compute('asr', 'abc', {'language': 'en'}, compute) == 'first'
+        assert result_cache.get_or_compute('asr', 'abc', {'language': 'de'}, compute) == 'second'
+        assert compute.call_count == 2
+    
+    def test_hit_miss_metrics(self):
+        """Test that hits and misses are recorded."""
+        before = MetricsCollector.get_cache_metrics('metrics-test')
+        
+        result_cache.get('metrics-test', 'x')
+        result_cache.set('metrics-test', 'x', None, 'value')
+        result_cache.get('metrics-test', 'x')
+        
+        after = MetricsCollector.get_cache_metrics('metrics-test')
+        assert after['hits'] == before['hits'] + 1
+        assert after['misses'] == before['misses'] + 1
+    
+    def test_disabled(self):
+        """Test that caching can be switched off."""
+        with override_settings(RESULT_CACHE_ENABLED=False):
+            result_cache.set('asr', 'abc', None, 'value')
+            assert result_cache.get('asr', 'abc') is None
+
+
+@pytest.mark.django_db
+class TestContentAddressedMedia:
+    """Test cases for deduplicated media and cached model calls."""
+    
+    def test_store_media_deduplicates(self):
+        """Test identical content is stored once."""
+        digest = content_hash(b'same audio')
+        
+        first = store_media(b'same audio', 'test-media', digest, '.wav')
+        second = store_media(b'same audio', 'test-media', digest, 'wav')
+        
+        assert first == second
+        assert default_storage.exists(first)
+        default_storage.delete(first)
+    
+    def test_transcribe_same_audio_twice(self):
+        """Test repeated uploads reuse the ASR result and the stored file."""
+        first_user, second_user = UserFactory(), UserFactory()
+        audio = make_wav(seconds=0.2)
+        
+        with patch('core.view_services.asr_service.transcribe', return_value=('Hi', 'en')) as mock:
+            first = ASRViewService.transcribe_audio(
+                first_user, SimpleUploadedFile('a.wav', audio, content_type='audio/wav')
+            )
+            second = ASRViewService.transcribe_audio(
+                second_user, SimpleUploadedFile('b.wav', audio, content_type='audio/wav')
+            )
+        
+        assert mock.call_count == 1
+        assert second.text == 'Hi'
+        assert first.audio_file.name == second.audio_file.name
+        
+        # Shared file survives deletion of one of the rows
+        first.delete()
+        assert not delete_media_if_unreferenced(second.audio_file, Transcription, exclude_pk=first.pk)
+        assert default_storage.exists(second.audio_file.name)
+        # Deleting the last row removes the file once the upload's claim expired
+        name = second.audio_file.name
+        cache.delete(f'media:claim:{name}')
+        second.delete()
+        assert not default_storage.exists(name)
+    
+    def test_delete_keeps_file_of_queued_job(self):
+        """Test deleting a transcription keeps audio another user's job still needs."""
+        from core.models import Job
+        owner, other = UserFactory(), UserFactory()
+        name = store_media(b'shared clip', 'transcriptions', content_hash(b'shared clip'), '.wav')
+        Job.objects.create(user=owner, kind='transcription', params={'audio': name})
+        transcription = Transcription.objects.create(user=other, audio_file=name, text='Hi', language='en')
+        cache.delete(f'media:claim:{name}')
+        
+        transcription.delete()
+        
+        assert default_storage.exists(name)
+        default_storage.delete(name)
+    
+    def test_delete_keeps_claimed_file(self):
+        """Test deleting a row keeps a file store_media has just reused."""
+        user = UserFactory()
+        digest = content_hash(b'reused clip')
+        name = store_media(b'reused clip', 'transcriptions', digest, '.wav')
+        transcription = Transcription.objects.create(user=user, audio_file=name, text='Hi', language='en')
+        cache.delete(f'media:claim:{name}')
+        # Same upload again: the file is reused, its row not saved yet
+        assert store_media(b'reused clip', 'transcriptions', digest, '.wav') == name
+        
+        transcription.delete()
+        
+        assert default_storage.exists(name)
+        default_storage.delete(name)
+    
+    def test_synthesize_same_text_twice(self):
+        """Test repeated syntheses reuse the stored audio."""
+        user = UserFactory()
+        
+        with patch('core.view_services.tts_service.synthesize', return_value=b'RIFF-audio') as mock:
+            first = TTSViewService.synthesize_text(user, 'Hello there')
+            second = TTSViewService.synthesize_text(user, 'Hello there')
+            TTSViewService.synthesize_text(user, 'Hello there', voice='other')
+        
+        assert mock.call_count == 2
+        assert first.audio_file.name == second.audio_file.name
+        Synthesis.objects.all().delete()
+        default_storage.delete(first.audio_file.name)
@@ -0,0 +1,167 @@
+"""
+Tests for batched data retention.
+"""
+
+import pytest
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.utils import timezone
+from asr.models import Transcription, TranscriptionSegment
+from llm.models import Conversation, Message
+from tts.models import Synthesis
+from core.search import get_search_backend
+from core.services.retention_service import RetentionCleaner
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+def age(obj, days=100):
+    """Backdate created_at (auto_now_add can't be set on create)."""
+    type(obj).objects.filter(pk=obj.pk).update(created_at=timezone.now() - timedelta(days=days))
+
+
+def make_transcription(user, name, text='old words', days=100):
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(b'audio'))
+    transcription = Transcription.objects.create(user=user, audio_file=name, text=text, language='en')
+    if days:
+        age(transcription, days)
+    return transcription
+
+
+class TestRetentionCleaner:
+    """Test cases for RetentionCleaner."""
+    
+    def test_purge_transcriptions_in_batches(self, db, user, media):
+        """Test old rows, segments and unshared files are deleted across batches."""
+        old = [make_transcription(user, f'transcriptions/{i}.wav') for i in range(5)]
+        TranscriptionSegment.objects.create(transcription=old[0], index=0, start=0, end=1, text='x')
+        shared = make_transcription(user, 'transcriptions/shared.wav')
+        recent = make_transcription(user, 'transcriptions/shared.wav', text='recent', days=0)
+        
+        with RetentionCleaner(timezone.now() - timedelta(days=90), batch_size=2) as cleaner:
+            result = cleaner.purge_transcriptions()
+        
+        assert result.deleted == 6
+        assert result.batches == 3
+        assert result.files_deleted == 5
+        assert list(Transcription.objects.values_list('id', flat=True)) == [recent.id]
+        assert not TranscriptionSegment.objects.exists()
+        assert default_storage.exists('transcriptions/shared.wav')
+        assert not default_storage.exists('transcriptions/0.wav')
+        assert shared.id not in [hit.id for hit in get_search_backend().search('transcription', user.id, 'old')]
+    
+    def test_bulk_delete_skips_signals(self, db, user, media):
+        """Test per-object post_delete handlers are not run."""
+        make_transcription(user, 'transcriptions/a.wav')
+        cache.set(f'transcriptions_{user.id}', 'stale')
+        
+        with patch('core.signals.delete_media_if_unreferenced') as per_object:
+            with RetentionCleaner(timezone.now() - timedelta(days=90)) as cleaner:
+                cleaner.purge_transcriptions()
+        
+        per_object.assert_not_called()
+        assert cache.get(f'transcriptions_{user.id}') is None
+    
+    def test_purge_empty_conversations_and_syntheses(self, db, user, media):
+        """Test only empty old conversations are deleted, and old syntheses."""
+        empty = Conversation.objects.create(user=user, title='Empty')
+        active = Conversation.objects.create(user=user, title='Active')
+        Message.objects.create(conversation=active, role='user', content='Hi')
+        age(empty)
+        age(active)
+        synthesis = Synthesis.objects.create(user=user, text='Hi', voice='v', audio_file='syntheses/a.wav')
+        default_storage.save('syntheses/a.wav', ContentFile(b'audio'))
+        age(synthesis)
+        
+        with RetentionCleaner(timezone.now() - timedelta(days=90)) as cleaner:
+            conversations = cleaner.purge_empty_conversations()
+            syntheses = cleaner.purge_syntheses()
+        
+        assert conversations.deleted == 1
+        assert list(Conversation.objects.values_list('id', flat=True)) == [active.id]
+        assert syntheses.deleted == 1
+        assert syntheses.files_deleted == 1
+    
+    def test_keeps_files_of_active_jobs(self, db, user, media):
+        """Test audio a queued job still needs is kept after its old row is purged."""
+        from core.models import Job
+        make_transcription(user, 'transcriptions/job.wav')
+        make_transcription(user, 'transcriptions/done.wav')
+        Job.objects.create(user=user, kind='transcription', params={'audio': 'transcriptions/job.wav'})
+        Job.objects.create(
+            user=user, kind='transcription', status='completed', params={'audio': 'transcriptions/done.wav'}
+        )
+        
+        with RetentionCleaner(timezone.now() - timedelta(days=90)) as cleaner:
+            result = cleaner.purge_transcriptions()
+        
+        assert result.deleted == 2
+        assert result.files_deleted == 1
+        assert default_storage.exists('transcriptions/job.wav')
+        assert not default_storage.exists('transcriptions/done.wav')
+    
+    def test_keeps_files_being_stored(self, db, user, media):
+        """Test files store_media just reused or is storing are not deleted."""
+        from core.result_cache import lock_media, store_media, unlock_media
+        make_transcription(user, 'transcriptions/ab/abcd.wav')
+        make_transcription(user, 'transcriptions/locked.wav')
+        # Upload of the same content: the file is reused, its row not saved yet
+        assert store_media(b'audio', 'transcriptions', 'abcd', '.wav') == 'transcriptions/ab/abcd.wav'
+        assert lock_media('transcriptions/locked.wav')
+        
+        try:
+            with RetentionCleaner(timezone.now() - timedelta(days=90)) as cleaner:
+                result = cleaner.purge_transcriptions()
+        finally:
+            unlock_media('transcriptions/locked.wav')
+        
+        assert result.deleted == 2
+        assert result.files_deleted == 0
+        assert default_storage.exists('transcriptions/ab/abcd.wav')
+        assert default_storage.exists('transcriptions/locked.wav')
+    
+    def test_pause_between_batches(self, db, user, media):
+        """Test throttling sleeps after each batch."""
+        for i in range(3):
+            make_transcription(user, f'transcriptions/{i}.wav')
+        
+        with patch('core.services.retention_service.time.sleep') as sleep:
+            with RetentionCleaner(timezone.now() - timedelta(days=90), batch_size=2, pause=0.5) as cleaner:
+                cleaner.purge_transcriptions()
+        
+        assert sleep.call_count == 2
+        sleep.assert_called_with(0.5)
+
+
+class TestCleanupCommand:
+    """Test cases for the cleanup_old_data command."""
+    
+    def test_dry_run_deletes_nothing(self, db, user, media):
+        """Test dry run only reports counts."""
+        make_transcription(user, 'transcriptions/a.wav')
+        
+        out = StringIO()
+        call_command('cleanup_old_data', dry_run=True, stdout=out)
+        
+        assert 'Would delete 1 transcriptions' in out.getvalue()
+        assert Transcription.objects.count() == 1
+    
+    def test_cleanup(self, db, user, media):
+        """Test cleanup deletes old data."""
+        make_transcription(user, 'transcriptions/a.wav')
+        
+        out = StringIO()
+        call_command('cleanup_old_data', days=90, batch_size=10, stdout=out)
+        
+        assert 'Deleted 1 transcriptions (1 audio files)' in out.getvalue()
+        assert not Transcription.objects.exists()
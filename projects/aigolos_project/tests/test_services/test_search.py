@@ -0,0 +1,124 @@
+"""
+Tests for full-text search.
+"""
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from asr.models import Transcription
+from llm.models import Conversation, Message
+from core.search import SQLiteSearchBackend, get_search_backend
+from tests.conftest import UserFactory
+
+
+def make_transcription(user, text):
+    return Transcription.objects.create(
+        user=user,
+        audio_file=SimpleUploadedFile("test.wav", b"fake audio content", content_type="audio/wav"),
+        text=text,
+        language='en'
+    )
+
+
+class TestSQLiteSearchBackend:
+    """Test cases for the FTS5 backend."""
+    
+    def test_fts_query_quotes_terms(self):
+        """Test user input is turned into quoted prefix terms."""
+        assert SQLiteSearchBackend.fts_query('hello "wor') == '"hello"* "wor"*'
+        assert SQLiteSearchBackend.fts_query('  -- ') == ''
+    
+    def test_search_ranks_and_highlights(self, db, user):
+        """Test results are ranked by relevance with highlighted snippets."""
+        make_transcription(user, 'The weather is nice today')
+        best = make_transcription(user, 'Weather, weather and more weather')
+        make_transcription(user, 'Nothing relevant here')
+        
+        hits = get_search_backend().search('transcription', user.id, 'weather')
+        
+        assert len(hits) == 2
+        assert hits[0].id == best.id
+        assert hits[0].rank >= hits[1].rank
+        assert '<mark>' in hits[0].snippet
+    
+    def test_search_is_scoped_to_user(self, db, user):
+        """Test other users' documents are not returned."""
+        other = UserFactory()
+        make_transcription(other, 'secret weather report')
+        
+        assert get_search_backend().search('transcription', user.id, 'weather') == []
+    
+    def test_index_follows_updates_and_deletes(self, db, user):
+        """Test signals keep the index current."""
+        transcription = make_transcription(user, 'original words')
+        backend = get_search_backend()
+        
+        transcription.text = 'replacement text'
+        transcription.save()
+        assert backend.search('transcription', user.id, 'original') == []
+        assert len(backend.search('transcription', user.id, 'replacement')) == 1
+        
+        transcription.delete()
+        assert backend.search('transcription', user.id, 'replacement') == []
+    
+    def test_message_hits_include_conversation(self, db, user):
+        """Test message hits carry their conversation ID."""
+        conversation = Conversation.objects.create(user=user, title='Chat')
+        Message.objects.create(conversation=conversation, role='user', content='Tell me about Python')
+        
+        hits = get_search_backend().search('message', user.id, 'pyth')
+        
+        assert len(hits) == 1
+        assert hits[0].conversation_id == conversation.id
+
+
+class TestSearchFilters:
+    """Test cases for list view filters using the index."""
+    
+    def test_transcription_list_search(self, authenticated_client, user):
+        """Test ?search= on transcriptions uses the full-text index."""
+        match = make_transcription(user, 'quarterly budget meeting')
+        make_transcription(user, 'holiday plans')
+        
+        response = authenticated_client.get('/api/asr/history/', {'search': 'budget'})
+        
+        assert response.status_code == 200
+        assert [item['id'] for item in response.data['results']] == [match.id]
+    
+    def test_conversation_list_search_by_message(self, authenticated_client, user):
+        """Test ?search= on conversations matches message content once per conversation."""
+        conversation = Conversation.objects.create(user=user, title='Chat')
+        Message.objects.create(conversation=conversation, role='user', content='budget question')
+        Message.objects.create(conversation=conversation, role='assistant', content='budget answer')
+        Conversation.objects.create(user=user, title='Other')
+        
+        response = authenticated_client.get('/api/llm/conversations/', {'search': 'budget'})
+        
+        assert response.status_code == 200
+        assert [item['id'] for item in response.data['results']] == [conversation.id]
+
+
+class TestSearchView:
+    """Test cases for search_view."""
+    
+    def test_search(self, authenticated_client, user):
+        """Test ranked search endpoint."""
+        transcription = make_transcription(user, 'hello search world')
+        
+        response = authenticated_client.get('/api/search/', {'q': 'search'})
+        
+        assert response.status_code == 200
+        assert response.data['count'] == 1
+        assert response.data['results'][0]['id'] == transcription.id
+        assert response.data['results'][0]['kind'] == 'transcription'
+    
+    def test_search_requires_query(self, authenticated_client):
+        """Test missing query is rejected."""
+        response = authenticated_client.get('/api/search/', {'type': 'message'})
+        
+        assert response.status_code == 400
+    
+    def test_search_requires_auth(self, api_client):
+        """Test unauthenticated access is rejected."""
+        response = api_client.get('/api/search/', {'q': 'x'})
+        
+        assert response.status_code == 401
@@ -0,0 +1,102 @@
+"""
+Unit tests for the resident Piper TTS engine.
+"""
+
+import io
+import sys
+import types
+import wave
+import pytest
+from unittest.mock import Mock, patch
+from django.test import override_settings
+from core.services import TTSService
+from core.services.tts_engine import PiperEngine
+
+
+class FakeVoice:
+    """Stand-in for piper.PiperVoice writing one frame per character."""
+    
+    loads = 0
+    
+    @classmethod
+    def load(cls, model_path):
+        cls.loads += 1
+        return cls()
+    
+    def synthesize_wav(self, text, wav_file):
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(22050)
+        wav_file.writeframes(b'\x00\x00' * len(text))
+
+
+@pytest.fixture
+def fake_piper(tmp_path):
+    """Install a fake piper package and a voice model file."""
+    FakeVoice.loads = 0
+    (tmp_path / 'de_DE-thorsten-medium.onnx').write_bytes(b'onnx')
+    module = types.ModuleType('piper')
+    module.PiperVoice = FakeVoice
+    with patch.dict(sys.modules, {'piper': module}):
+        yield tmp_path
+
+
+class TestPiperEngine:
+    """Test cases for PiperEngine."""
+    
+    def test_resolve_release_model_name(self, fake_piper):
+        """Test voice names map to Piper release file names."""
+        engine = PiperEngine(str(fake_piper))
+        
+        assert engine.resolve_model('de_DE/thorsten/medium').name == 'de_DE-thorsten-medium.onnx'
+    
+    def test_resolve_missing_model(self, tmp_path):
+        """Test that a missing voice raises FileNotFoundError."""
+        engine = PiperEngine(str(tmp_path))
+        
+        with pytest.raises(FileNotFoundError):
+            engine.resolve_model('xx_XX/nobody/low')
+    
+    def test_voice_loaded_once(self, fake_piper):
+        """Test that the voice model is loaded once and reused."""
+        engine = PiperEngine(str(fake_piper))
+        
+        first = engine.synthesize('Hello', 'de_DE/thorsten/medium')
+        engine.synthesize('Hello again', 'de_DE/thorsten/medium')
+        
+        assert FakeVoice.loads == 1
+        with wave.open(io.BytesIO(first), 'rb') as wav:
+            assert wav.getframerate() == 22050
+            assert wav.getnframes() == 5
+    
+    def test_preload(self, fake_piper):
+        """Test preloading reports loaded voices and skips missing ones."""
+        engine = PiperEngine(str(fake_piper))
+        
+        loaded = engine.preload(['de_DE/thorsten/medium', 'missing/voice'])
+        
+        assert loaded == ['de_DE/thorsten/medium']
+        assert engine.loaded_voices == ['de_DE/thorsten/medium']
+
+
+class TestTTSServiceEngine:
+    """Test cases for TTSService with the resident engine."""
+    
+    def test_synthesize_uses_engine(self, fake_piper):
+        """Test synthesis runs in-process without starting piper."""
+        with override_settings(TTS_VOICE_NAME='de_DE/thorsten/medium', TTS_MODEL_PATH=str(fake_piper)):
+            with patch('subprocess.run') as mock_run:
+                service = TTSService()
+                audio_data = service.synthesize('Hi')
+        
+        assert not mock_run.called
+        assert audio_data.startswith(b'RIFF')
+    
+    def test_synthesize_engine_error(self, fake_piper):
+        """Test engine failures raise TTSServiceError."""
+        from core.exceptions import TTSServiceError
+        with override_settings(TTS_VOICE_NAME='missing/voice', TTS_MODEL_PATH=str(fake_piper)):
+            service = TTSService()
+            
+            with pytest.raises(TTSServiceError):
+                service.synthesize('Hi')
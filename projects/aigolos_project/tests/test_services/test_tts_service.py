@@ -6,6 +6,7 @@ import pytest
 from unittest.mock import Mock, patch, MagicMock
 from django.test import override_settings
 from core.services import TTSService
+from core.services.tts_service import split_sentences, wav_header, read_wav
 import subprocess
 import tempfile
 from pathlib import Path
@@ -24,7 +25,9 @@ class TestTTSService:
                 TTS_MODEL_PATH=''
             ):
                 service = TTSService()
-                # Check that piper was checked
+                # Piper is checked on first use, not at construction
+                assert not mock_run.called
+                assert service._piper_available
                 assert mock_run.called
     
     def test_init_without_piper(self):
@@ -170,3 +173,47 @@ class TestTTSService:
                     
                     assert audio_data == b''
 
+
+
+def make_sentence_wav(text, voice=None):
+    """WAV bytes with one frame per character, for checking sentence order."""
+    return wav_header(1, 2, 22050, data_size=2 * len(text)) + text.encode('utf-16-le')
+
+
+class TestSentenceStreaming:
+    """Test cases for sentence-pipelined synthesis."""
+    
+    def test_split_sentences(self):
+        """Test splitting on sentence ends and paragraphs, merging short fragments."""
+        text = "Hello there, this is one. Ok! Is this the second sentence?\n\nA new paragraph starts here"
+        
+        assert split_sentences(text) == [
+            'Hello there, this is one.',
+            'Ok! Is this the second sentence?',
+            'A new paragraph starts here',
+        ]
+    
+    def test_wav_header_round_trip(self):
+        """Test that assembled WAV with a real size parses back."""
+        params, frames = read_wav(make_sentence_wav('abc'))
+        
+        assert params == (1, 2, 22050)
+        assert frames == 'abc'.encode('utf-16-le')
+    
+    def test_synthesize_stream_keeps_order(self):
+        """Test sentences are yielded in order even when synthesized in parallel."""
+        import time
+        
+        def synthesize(text, voice=None):
+            # Later sentences finish first
+            time.sleep(0.05 if text.startswith('First') else 0)
+            return make_sentence_wav(text)
+        
+        service = TTSService()
+        text = "First sentence is slow. Second sentence is fast. Third one is fast too."
+        with patch.object(service, 'synthesize', side_effect=synthesize):
+            chunks = list(service.synthesize_stream(text, parallel=3))
+        
+        assert [frames.decode('utf-16-le') for _, frames in chunks] == [
+            'First sentence is slow.', 'Second sentence is fast.', 'Third one is fast too.'
+        ]
@@ -0,0 +1,119 @@
+"""
+Unit tests for model warm-up and readiness.
+"""
+
+import threading
+from unittest.mock import patch
+import pytest
+from django.test import override_settings
+from core.services.llm_service import LLMService
+from core.services.warmup import COLD, FAILED, READY, WARMING, Warmup
+
+
+def failing_step():
+    raise RuntimeError('model missing')
+
+
+class TestWarmup:
+    """Test cases for Warmup."""
+    
+    def test_runs_steps_and_reports(self):
+        """Test each service ends ready or failed with timing and detail."""
+        warmup = Warmup({'asr': lambda: 'base on cpu', 'tts': failing_step})
+        
+        assert warmup.ready  # not started: nothing gates traffic
+        assert warmup.report()['asr']['state'] == COLD
+        
+        assert warmup.start().wait(5)
+        assert not warmup.ready  # strict by default: a failed service is not ready
+        report = warmup.report()
+        assert report['asr']['state'] == READY
+        assert report['asr']['detail'] == 'base on cpu'
+        assert report['tts'] == {'state': FAILED, 'detail': 'model missing', 'seconds': report['tts']['seconds']}
+        assert report['tts']['seconds'] is not None
+    
+    def test_lenient_ready_despite_failure(self):
+        """Test failures do not gate readiness when not strict."""
+        with override_settings(WARMUP_STRICT=False):
+            warmup = Warmup({'asr': lambda: 'ok', 'tts': failing_step})
+        
+        assert warmup.start().wait(5)
+        assert warmup.ready
+        assert warmup.report()['tts']['state'] == FAILED
+    
+    def test_not_ready_while_warming(self):
+        """Test readiness waits for every step."""
+        release = threading.Event()
+        warmup = Warmup({'llm': lambda: release.wait(5) and 'loaded', 'tts': lambda: 'ok'})
+        
+        warmup.start()
+        assert not warmup.ready
+        assert warmup.report()['llm']['state'] == WARMING
+        
+        release.set()
+        assert warmup.wait(5)
+        assert warmup.report()['llm']['state'] == READY
+
+
+@pytest.mark.django_db
+class TestReadinessViews:
+    """Test cases for health and readiness endpoints."""
+    
+    def test_readiness_gates_until_warm(self, api_client):
+        """Test readiness returns 503 while warming and 200 once done."""
+        release = threading.Event()
+        warmup = Warmup({'asr': lambda: release.wait(5) and 'ok'}).start()
+        
+        with patch('core.views.get_warmup', return_value=warmup):
+            response = api_client.get('/api/health/ready/')
+            assert response.status_code == 503
+            assert response.data['services']['asr']['state'] == WARMING
+            
+            # Liveness is unaffected
+            health = api_client.get('/api/health/')
+            assert health.status_code == 200
+            assert health.data['ready'] is False
+            
+            release.set()
+            warmup.wait(5)
+            response = api_client.get('/api/health/ready/')
+            assert response.status_code == 200
+            assert response.data['ready'] is True
+    
+    def test_readiness_fails_when_warm_up_failed(self, api_client):
+        """Test a worker whose model failed to load is not ready."""
+        warmup = Warmup({'asr': lambda: 'ok', 'tts': failing_step}, strict=True).start()
+        warmup.wait(5)
+        
+        with patch('core.views.get_warmup', return_value=warmup):
+            response = api_client.get('/api/health/ready/')
+        
+        assert response.status_code == 503
+        assert response.data['services']['tts']['state'] == FAILED
+
+
+@pytest.mark.django_db
+class TestServiceWarmUp:
+    """Test cases for per-service warm-up steps."""
+    
+    def test_llm_loads_model(self, fake_ollama):
+        """Test LLM warm-up sends an empty prompt to every backend."""
+        with override_settings(OLLAMA_BASE_URL=fake_ollama.url, LLM_MODEL_NAME='test-model', LLM_KEEP_ALIVE='30m'):
+            service = LLMService()
+            
+            assert service.warm_up() == 'test-model loaded on 1 backend(s)'
+            assert fake_ollama.requests == [
+                {'model': 'test-model', 'prompt': '', 'stream': False, 'keep_alive': '30m'}
+            ]
+            service.close()
+    
+    def test_asr_skipped_with_worker_pool(self):
+        """Test web processes don't load Whisper when the ASR worker pool serves it."""
+        from core.services.asr_service import ASRService
+        with override_settings(ASR_WORKER_ADDRESS='127.0.0.1:8765'):
+            service = ASRService()
+            
+            with patch.object(service, '_initialize_model') as load:
+                assert service.warm_up().startswith('served by ASR worker pool')
+        
+        load.assert_not_called()
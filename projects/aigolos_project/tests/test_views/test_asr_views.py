@@ -5,8 +5,13 @@ Tests for ASR views.
 import pytest
 from unittest.mock import patch, Mock
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
 from rest_framework import status
-from asr.models import Transcription
+from asr.models import Transcription, TranscriptionSegment
+from core.models import Job
+from core.services.asr_service import TranscribedSegment
+from core.view_services import ASRViewService
+from tests.test_services.test_asr_service import make_wav
 
 
 class TestTranscribeView:
@@ -128,3 +133,118 @@ class TestTranscriptionListView:
         
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
+
+
+class TestChunkedTranscription:
+    """Test cases for chunked transcription with segment progress."""
+    
+    def test_start_chunked_transcription(self, authenticated_client, user):
+        """Test that chunked transcription is queued as a job and returns immediately."""
+        audio_file = SimpleUploadedFile("long.wav", make_wav(seconds=1.0), content_type="audio/wav")
+        
+        with override_settings(JOB_WORKERS=0):
+            response = authenticated_client.post(
+                '/api/asr/transcribe/chunked/',
+                {'audio': audio_file},
+                format='multipart'
+            )
+        
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data['status'] == 'processing'
+        assert response.data['progress'] == 0.0
+        job = Job.objects.get(user=user)
+        assert job.kind == 'chunked'
+        assert job.status == 'queued'
+        assert job.params['transcription'] == response.data['id']
+    
+    def test_chunked_job_runs_transcription(self, user):
+        """Test that the job worker transcribes and links the transcription."""
+        from core.services.job_queue import claim
+        from core.services.job_workers import run_job
+        
+        audio_file = SimpleUploadedFile("long.wav", make_wav(seconds=1.0), content_type="audio/wav")
+        with override_settings(JOB_WORKERS=0):
+            transcription = ASRViewService.start_chunked_transcription(user, audio_file)
+        job = claim(Job.objects.get(user=user).id)
+        segments = [TranscribedSegment(0.0, 1.0, 'Hello', 'en', 1.0)]
+        
+        with patch('core.view_services.asr_service.transcribe_segments', return_value=iter(segments)):
+            job = run_job(job)
+        
+        assert job.status == 'completed'
+        assert job.result_id == transcription.id
+        transcription.refresh_from_db()
+        assert transcription.text == 'Hello'
+    
+    def test_process_persists_segments(self, user):
+        """Test that segments are persisted and the transcription completed."""
+        transcription = Transcription.objects.create(
+            user=user,
+            audio_file=SimpleUploadedFile("long.wav", make_wav(seconds=1.0)),
+            text='',
+            status='processing',
+            progress=0.0
+        )
+        segments = [
+            TranscribedSegment(0.0, 1.0, 'Hello', 'en', 0.5),
+            TranscribedSegment(1.0, 2.0, 'there', 'en', 0.5),
+            TranscribedSegment(2.0, 3.5, 'friend', 'en', 1.0),
+        ]
+        
+        with patch('core.view_services.asr_service.transcribe_segments', return_value=iter(segments)):
+            ASRViewService.process_chunked_transcription(transcription.id)
+        
+        transcription.refresh_from_db()
+        assert transcription.status == 'completed'
+        assert transcription.progress == 1.0
+        assert transcription.text == 'Hello there friend'
+        assert transcription.language == 'en'
+        assert transcription.duration == 3.5
+        assert list(transcription.segments.values_list('index', 'text')) == [
+            (0, 'Hello'), (1, 'there'), (2, 'friend')
+        ]
+    
+    def test_process_failure_marks_failed(self, user):
+        """Test that errors mark the transcription as failed."""
+        from core.exceptions import ASRServiceError
+        transcription = Transcription.objects.create(
+            user=user,
+            audio_file=SimpleUploadedFile("long.wav", make_wav(seconds=1.0)),
+            text='',
+            status='processing',
+            progress=0.0
+        )
+        
+        with patch('core.view_services.asr_service.transcribe_segments', side_effect=ASRServiceError('boom')):
+            with pytest.raises(ASRServiceError):
+                ASRViewService.process_chunked_transcription(transcription.id)
+        
+        transcription.refresh_from_db()
+        assert transcription.status == 'failed'
+    
+    def test_segments_view_after_cursor(self, authenticated_client, user):
+        """Test polling partial segments with the after cursor."""
+        transcription = Transcription.objects.create(
+            user=user, text='', status='processing', progress=0.4
+        )
+        for index, text in enumerate(['one', 'two', 'three']):
+            TranscriptionSegment.objects.create(
+                transcription=transcription, index=index, start=index, end=index + 1, text=text
+            )
+        
+        response = authenticated_client.get(
+            f'/api/asr/transcriptions/{transcription.id}/segments/?after=0'
+        )
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['status'] == 'processing'
+        assert response.data['progress'] == 0.4
+        assert [s['text'] for s in response.data['segments']] == ['two', 'three']
+    
+    def test_segments_view_other_user(self, authenticated_client, admin_user):
+        """Test that other users' transcriptions are not visible."""
+        transcription = Transcription.objects.create(user=admin_user, text='secret')
+        
+        response = authenticated_client.get(f'/api/asr/transcriptions/{transcription.id}/segments/')
+        
+        assert response.status_code == status.HTTP_404_NOT_FOUND
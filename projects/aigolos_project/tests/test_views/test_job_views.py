@@ -0,0 +1,148 @@
+"""
+Tests for background job views.
+"""
+
+import pytest
+from unittest.mock import patch
+from django.test import override_settings
+from rest_framework import status
+from core.models import Job
+from tests.conftest import UserFactory
+from tests.test_views.test_voice_assistant_views import parse_sse
+
+
+@pytest.fixture(autouse=True)
+def no_local_workers():
+    """Keep jobs queued: tests drive the workers themselves."""
+    with override_settings(JOB_WORKERS=0):
+        yield
+
+
+@pytest.mark.django_db
+class TestJobViews:
+    """Test cases for job submission, status and cancellation."""
+    
+    def test_submit_synthesis(self, authenticated_client, user):
+        """Test synthesis is queued and returned with 202."""
+        response = authenticated_client.post(
+            '/api/tts/synthesize/async/',
+            {'text': 'Hello world'},
+            format='json'
+        )
+        
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data['status'] == 'queued'
+        assert response.data['queue_ahead'] == 0
+        assert response.data['result'] is None
+        job = Job.objects.get(user=user)
+        assert job.params['text'] == 'Hello world'
+        
+        detail = authenticated_client.get(f'/api/jobs/{job.id}/')
+        assert detail.status_code == status.HTTP_200_OK
+        assert detail.data['kind'] == 'synthesis'
+        
+        listing = authenticated_client.get('/api/jobs/', {'status': 'queued'})
+        assert listing.status_code == status.HTTP_200_OK
+    
+    def test_cancel(self, authenticated_client, user):
+        """Test queued jobs can be cancelled once."""
+        authenticated_client.post('/api/tts/synthesize/async/', {'text': 'Hello'}, format='json')
+        job = Job.objects.get(user=user)
+        
+        response = authenticated_client.delete(f'/api/jobs/{job.id}/')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['status'] == 'cancelled'
+        
+        response = authenticated_client.delete(f'/api/jobs/{job.id}/')
+        assert response.status_code == status.HTTP_409_CONFLICT
+    
+    def test_queue_full(self, authenticated_client):
+        """Test submissions beyond the per-user limit are rejected."""
+        with override_settings(JOB_MAX_QUEUED_PER_USER=2):
+            statuses = [
+                authenticated_client.post('/api/tts/synthesize/async/', {'text': 'Hello'}, format='json').status_code
+                for _ in range(3)
+            ]
+        
+        assert statuses == [202, 202, 429]
+    
+    def test_other_users_job_not_found(self, authenticated_client):
+        """Test jobs of other users are not visible."""
+        other = Job.objects.create(user=UserFactory(), kind='synthesis', params={'text': 'Hi'})
+        
+        assert authenticated_client.get(f'/api/jobs/{other.id}/').status_code == status.HTTP_404_NOT_FOUND
+        assert authenticated_client.delete(f'/api/jobs/{other.id}/').status_code == status.HTTP_404_NOT_FOUND
+    
+    def test_priority_reserved_for_staff(self, authenticated_client):
+        """Test regular users cannot raise job priority."""
+        response = authenticated_client.post(
+            '/api/tts/synthesize/async/',
+            {'text': 'Hello', 'priority': 5},
+            format='json'
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'priority' in response.data
+    
+    def test_staff_priority(self, authenticated_admin_client):
+        """Test staff can raise job priority."""
+        response = authenticated_admin_client.post(
+            '/api/tts/synthesize/async/',
+            {'text': 'Hello', 'priority': 5},
+            format='json'
+        )
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data['priority'] == 5
+    
+    def test_requires_authentication(self, api_client):
+        """Test job endpoints require login."""
+        response = api_client.post('/api/tts/synthesize/async/', {'text': 'Hello'}, format='json')
+        assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
+
+
+@pytest.mark.django_db
+class TestJobEventsView:
+    """Test cases for the job event stream."""
+    
+    def test_done_event(self, authenticated_client, user):
+        """Test a finished job streams its result and ends."""
+        job = Job.objects.create(user=user, kind='synthesis', status='failed', error='boom', params={'text': 'Hi'})
+        
+        response = authenticated_client.get(f'/api/jobs/{job.id}/events/')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'text/event-stream'
+        events = parse_sse(response)
+        assert [event for event, _ in events] == ['done']
+        assert events[0][1]['error'] == 'boom'
+    
+    def test_stream_length_capped(self, authenticated_client, user):
+        """Test a waiting stream reports its status and ends with a timeout."""
+        job = Job.objects.create(user=user, kind='synthesis', params={'text': 'Hi'})
+        
+        with override_settings(JOB_EVENTS_TIMEOUT=0):
+            response = authenticated_client.get(f'/api/jobs/{job.id}/events/')
+            events = parse_sse(response)
+        
+        assert [event for event, _ in events] == ['status', 'timeout']
+        assert events[0][1]['status'] == 'queued'
+    
+    def test_requires_authentication(self, api_client):
+        """Test anonymous users get no stream."""
+        job = Job.objects.create(user=UserFactory(), kind='synthesis', params={'text': 'Hi'})
+        
+        assert api_client.get(f'/api/jobs/{job.id}/events/').status_code == status.HTTP_401_UNAUTHORIZED
+    
+    def test_other_users_job_not_found(self, authenticated_client):
+        """Test other users' jobs get no stream."""
+        other = Job.objects.create(user=UserFactory(), kind='synthesis', params={'text': 'Hi'})
+        
+        assert authenticated_client.get(f'/api/jobs/{other.id}/events/').status_code == status.HTTP_404_NOT_FOUND
+    
+    def test_throttled(self, authenticated_client, user):
+        """Test streams count against the job rate limit."""
+        job = Job.objects.create(user=user, kind='synthesis', status='completed', params={'text': 'Hi'})
+        
+        with patch('core.views.JobSubmitThrottle.allow_request', return_value=False):
+            response = authenticated_client.get(f'/api/jobs/{job.id}/events/')
+        
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
@@ -2,8 +2,10 @@
 Tests for LLM views.
 """
 
+import json
 import pytest
 from unittest.mock import patch
+from django.test import override_settings
 from rest_framework import status
 from llm.models import Conversation, Message
 
@@ -100,6 +102,75 @@ class TestChatView:
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
+def parse_sse(response):
+    """Parse a streamed Server-Sent Events response into (event, data) pairs."""
+    body = b''.join(response.streaming_content).decode()
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+class TestChatStreamView:
+    """Test cases for chat_stream_view."""
+    
+    def test_stream_success(self, authenticated_client, user, fake_ollama):
+        """Test tokens are streamed and assistant message saved once."""
+        from core.services import LLMService
+        service = LLMService()
+        service.base_url = fake_ollama.url
+        
+        with patch('core.view_services.llm_service', service):
+            response = authenticated_client.post(
+                '/api/llm/chat/stream/',
+                {'message': 'Hello'},
+                format='json'
+            )
+            assert response.status_code == status.HTTP_200_OK
+            assert response['Content-Type'] == 'text/event-stream'
+            events = parse_sse(response)
+        
+        names = [name for name, _ in events]
+        assert names[0] == 'start'
+        assert names[-1] == 'done'
+        tokens = [data['token'] for name, data in events if name == 'token']
+        assert tokens == fake_ollama.tokens()
+        
+        conversation = Conversation.objects.get(user=user)
+        assert events[-1][1]['conversation_id'] == conversation.id
+        assistant_messages = Message.objects.filter(conversation=conversation, role='assistant')
+        assert assistant_messages.count() == 1
+        assert assistant_messages.first().content == 'Hello there, how can I help?'
+        service.close()
+    
+    def test_stream_service_error(self, authenticated_client, user):
+        """Test that LLM errors are sent as an error event."""
+        from core.exceptions import LLMServiceError
+        with patch('core.view_services.llm_service.generate_stream') as mock_stream:
+            mock_stream.side_effect = LLMServiceError('Ollama down')
+            
+            response = authenticated_client.post(
+                '/api/llm/chat/stream/',
+                {'message': 'Hello'},
+                format='json'
+            )
+            events = parse_sse(response)
+        
+        assert events[-1] == ('error', {'error': 'Ollama down'})
+        assert not Message.objects.filter(conversation__user=user, role='assistant').exists()
+    
+    def test_stream_invalid_conversation(self, authenticated_client):
+        """Test streaming into a conversation the user does not own."""
+        response = authenticated_client.post(
+            '/api/llm/chat/stream/',
+            {'message': 'Hello', 'conversation_id': 999999},
+            format='json'
+        )
+        
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
 class TestConversationListView:
     """Test cases for ConversationListView."""
     
@@ -113,6 +184,39 @@ class TestConversationListView:
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data['results']) == 2
     
+    def test_list_summary(self, authenticated_client, user):
+        """Test conversations are listed with count and last message preview, not messages."""
+        conversation = Conversation.objects.create(user=user, title='Chat')
+        Message.objects.create(conversation=conversation, role='user', content='Hi')
+        Message.objects.create(conversation=conversation, role='assistant', content='x' * 500)
+        Conversation.objects.create(user=user, title='Empty')
+        
+        response = authenticated_client.get('/api/llm/conversations/', {'ordering': '-message_count'})
+        
+        first, second = response.data['results']
+        assert 'messages' not in first
+        assert first['message_count'] == 2
+        assert first['last_message']['role'] == 'assistant'
+        assert first['last_message']['preview'] == 'x' * 200
+        assert second['message_count'] == 0
+        assert second['last_message'] is None
+    
+    def test_list_queries_do_not_grow_with_messages(
+        self, authenticated_client, user, django_assert_max_num_queries
+    ):
+        """Test the list query count is independent of conversation length."""
+        for i in range(5):
+            conversation = Conversation.objects.create(user=user, title=f'Chat {i}')
+            Message.objects.bulk_create([
+                Message(conversation=conversation, role='user', content=f'Message {j}')
+                for j in range(30)
+            ])
+        
+        # Auth token, user, count and one page query
+        with django_assert_max_num_queries(4):
+            response = authenticated_client.get('/api/llm/conversations/')
+        assert len(response.data['results']) == 5
+    
     def test_list_empty(self, authenticated_client):
         """Test listing when no conversations exist."""
         response = authenticated_client.get('/api/llm/conversations/')
@@ -126,3 +230,35 @@ class TestConversationListView:
         
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
+
+
+class TestConversationMessagesView:
+    """Test cases for ConversationMessagesView."""
+    
+    def test_cursor_pagination(self, authenticated_client, user):
+        """Test messages are paged newest first with a cursor."""
+        conversation = Conversation.objects.create(user=user, title='Chat')
+        for i in range(5):
+            Message.objects.create(conversation=conversation, role='user', content=f'Message {i}')
+        url = f'/api/llm/conversations/{conversation.id}/messages/'
+        
+        response = authenticated_client.get(url, {'page_size': 2})
+        assert response.status_code == status.HTTP_200_OK
+        assert [m['content'] for m in response.data['results']] == ['Message 4', 'Message 3']
+        
+        contents = []
+        next_url = response.data['next']
+        while next_url:
+            response = authenticated_client.get(next_url)
+            contents += [m['content'] for m in response.data['results']]
+            next_url = response.data['next']
+        assert contents == ['Message 2', 'Message 1', 'Message 0']
+    
+    def test_other_users_conversation(self, authenticated_client):
+        """Test messages of another user's conversation are not found."""
+        from tests.conftest import UserFactory
+        conversation = Conversation.objects.create(user=UserFactory(), title='Private')
+        
+        response = authenticated_client.get(f'/api/llm/conversations/{conversation.id}/messages/')
+        
+        assert response.status_code == status.HTTP_404_NOT_FOUND
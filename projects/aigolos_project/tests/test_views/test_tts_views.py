@@ -0,0 +1,67 @@
+"""
+Tests for TTS views.
+"""
+
+import io
+import wave
+import pytest
+from unittest.mock import patch
+from rest_framework import status
+from tts.models import Synthesis
+from core.exceptions import TTSServiceError
+from tests.test_services.test_tts_service import make_sentence_wav
+
+
+class TestSynthesizeStreamView:
+    """Test cases for synthesize_stream_view."""
+    
+    def test_stream_success(self, authenticated_client, user):
+        """Test audio is streamed per sentence and the full file stored."""
+        text = "This is the first sentence. And this is the second one."
+        
+        with patch('core.view_services.tts_service.synthesize', side_effect=make_sentence_wav):
+            response = authenticated_client.post(
+                '/api/tts/synthesize/stream/',
+                {'text': text},
+                format='json'
+            )
+            assert response.status_code == status.HTTP_200_OK
+            assert response['Content-Type'] == 'audio/wav'
+            chunks = list(response.streaming_content)
+        
+        assert chunks[0].startswith(b'RIFF')
+        assert len(chunks) == 3  # header + one chunk per sentence
+        assert chunks[1].decode('utf-16-le') == 'This is the first sentence.'
+        
+        synthesis = Synthesis.objects.get(user=user)
+        with synthesis.audio_file.open('rb') as f, wave.open(io.BytesIO(f.read()), 'rb') as wav:
+            frames = wav.readframes(wav.getnframes()).decode('utf-16-le')
+        assert frames == 'This is the first sentence.And this is the second one.'
+    
+    def test_stream_cached_text(self, authenticated_client, user):
+        """Test previously synthesized text is streamed from storage."""
+        text = "Cached sentence for streaming."
+        
+        with patch('core.view_services.tts_service.synthesize', side_effect=make_sentence_wav) as mock:
+            for _ in range(2):
+                response = authenticated_client.post(
+                    '/api/tts/synthesize/stream/',
+                    {'text': text},
+                    format='json'
+                )
+                b''.join(response.streaming_content)
+        
+        assert mock.call_count == 1
+        assert Synthesis.objects.filter(user=user).count() == 2
+    
+    def test_stream_first_sentence_error(self, authenticated_client):
+        """Test that failing before any audio returns an error status."""
+        with patch('core.view_services.tts_service.synthesize', side_effect=TTSServiceError('Piper down')):
+            response = authenticated_client.post(
+                '/api/tts/synthesize/stream/',
+                {'text': 'Hello world.'},
+                format='json'
+            )
+        
+        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+        assert response.data['error'] == 'Piper down'
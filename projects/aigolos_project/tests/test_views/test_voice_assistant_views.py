@@ -0,0 +1,101 @@
+"""
+Tests for the voice assistant view.
+"""
+
+import json
+import pytest
+from asgiref.sync import async_to_sync
+from unittest.mock import patch
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework import status
+from llm.models import Conversation, Message
+from core.metrics import MetricsCollector
+from tests.test_services.test_asr_service import make_wav
+from tests.test_services.test_tts_service import make_sentence_wav
+
+
+def parse_sse(response):
+    """Parse a streamed SSE response (async iterator from an async view) into (event, data) tuples."""
+    async def read():
+        return b''.join([chunk async for chunk in response.streaming_content])
+    
+    # async_to_sync keeps sync_to_async DB calls on this thread (test transaction)
+    body = async_to_sync(read)().decode()
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.splitlines())
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+@pytest.fixture
+def audio_upload():
+    return SimpleUploadedFile('question.wav', make_wav(0.5), content_type='audio/wav')
+
+
+@pytest.fixture
+def fake_services(fake_ollama):
+    """ASR and TTS mocked, LLM served by the fake Ollama server."""
+    from core.services import LLMService
+    service = LLMService()
+    service.base_url = fake_ollama.url
+    with patch('core.view_services.llm_service', service), \
+            patch('core.view_services.asr_service.transcribe', return_value=('Hello?', 'en')), \
+            patch('core.view_services.tts_service.synthesize', side_effect=make_sentence_wav):
+        yield
+    service.close()
+
+
+class TestVoiceAssistantView:
+    """Test cases for voice_assistant_view."""
+    
+    def test_pipeline_success(self, authenticated_client, user, audio_upload, fake_services):
+        """Test transcript, reply tokens and audio are streamed and messages saved."""
+        response = authenticated_client.post(
+            '/api/assistant/voice/',
+            {'audio': audio_upload, 'language': 'en'},
+            format='multipart'
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'text/event-stream'
+        events = parse_sse(response)
+        
+        names = [name for name, _ in events]
+        assert names[0] == 'transcript'
+        assert 'audio' in names
+        assert names[-1] == 'done'
+        
+        conversation = Conversation.objects.get(user=user)
+        assert events[0][1]['conversation_id'] == conversation.id
+        assert list(Message.objects.filter(conversation=conversation).values_list('role', 'content')) == [
+            ('user', 'Hello?'),
+            ('assistant', 'Hello there, how can I help?'),
+        ]
+        
+        done = events[-1][1]
+        assert done['ai_message_id'] == Message.objects.get(role='assistant').id
+        assert 'asr' in done['timings'] and 'tts_first_audio' in done['timings']
+        assert MetricsCollector.get_pipeline_metrics()['count'] == 1
+    
+    def test_requires_authentication(self, api_client, audio_upload):
+        """Test anonymous requests are rejected."""
+        response = api_client.post('/api/assistant/voice/', {'audio': audio_upload}, format='multipart')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    
+    def test_missing_audio(self, authenticated_client):
+        """Test request without audio."""
+        response = authenticated_client.post('/api/assistant/voice/', {}, format='multipart')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_invalid_conversation(self, authenticated_client, audio_upload):
+        """Test another user's or unknown conversation returns 404 before streaming."""
+        response = authenticated_client.post(
+            '/api/assistant/voice/',
+            {'audio': audio_upload, 'conversation_id': 99999},
+            format='multipart'
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+    
+    def test_get_not_allowed(self, authenticated_client):
+        response = authenticated_client.get('/api/assistant/voice/')
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
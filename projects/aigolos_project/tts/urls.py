@@ -9,5 +9,7 @@ app_name = 'tts'
 
 urlpatterns = [
     path('synthesize/', views.synthesize_view, name='synthesize'),
+    path('synthesize/stream/', views.synthesize_stream_view, name='synthesize_stream'),
+    path('synthesize/async/', views.synthesize_async_view, name='synthesize_async'),
 ]
 
@@ -6,11 +6,13 @@ import logging
 from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
+from django.http import StreamingHttpResponse
 from django.core.files.base import ContentFile
 from core.services import tts_service
-from core.throttles import TTSThrottle
-from core.exceptions import TTSServiceError
-from core.view_services import TTSViewService
+from core.throttles import JobSubmitThrottle, TTSThrottle
+from core.exceptions import JobQueueFullError, TTSServiceError
+from core.serializers import JobSerializer, SynthesisJobRequestSerializer
+from core.view_services import JobViewService, TTSViewService
 from core.base_views import BaseAPIViewMixin
 from .models import Synthesis
 from .serializers import TTSRequestSerializer
@@ -60,3 +62,88 @@ def synthesize_view(request):
     except Exception as e:
         return BaseAPIViewMixin().handle_generic_error(e, "Internal server error")
 
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+@throttle_classes([JobSubmitThrottle])
+def synthesize_async_view(request):
+    """
+    Queue synthesis as a background job.
+    
+    Returns immediately (202) with the job; poll ``/api/jobs/<id>/`` or
+    subscribe to ``/api/jobs/<id>/events/``, then download the audio from
+    ``/api/jobs/<id>/audio/``.
+    
+    Rate limited to 200 requests per hour per user.
+    """
+    try:
+        request_serializer = SynthesisJobRequestSerializer(data=request.data, context={'request': request})
+        if not request_serializer.is_valid():
+            return Response(
+                request_serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        job = JobViewService.submit_synthesis(
+            user=request.user,
+            text=request_serializer.validated_data['text'],
+            voice=request_serializer.validated_data.get('voice'),
+            priority=request_serializer.validated_data['priority']
+        )
+        
+        serializer = JobSerializer(job, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+        
+    except JobQueueFullError as e:
+        return Response({'error': str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    except Exception as e:
+        return BaseAPIViewMixin().handle_generic_error(e, "Internal server error")
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+@throttle_classes([TTSThrottle])
+def synthesize_stream_view(request):
+    """
+    Synthesize text to speech, streaming WAV audio as sentences are ready.
+    
+    Playback can start after the first sentence; the complete file is stored
+    once synthesis finishes.
+    
+    Rate limited to 50 requests per hour per user.
+    """
+    try:
+        request_serializer = TTSRequestSerializer(data=request.data)
+        if not request_serializer.is_valid():
+            return Response(
+                request_serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        audio_stream = TTSViewService.stream_synthesis(
+            user=request.user,
+            text=request_serializer.validated_data['text'],
+            voice=request_serializer.validated_data.get('voice')
+        )
+        
+        # Synthesize the first sentence before responding so errors get a proper status
+        first_chunk = next(audio_stream)
+        
+        def stream():
+            yield first_chunk
+            try:
+                yield from audio_stream
+            except TTSServiceError as e:
+                # Headers are already sent; end the stream early
+                logger.error(f"TTS stream error: {e}")
+        
+        response = StreamingHttpResponse(stream(), content_type='audio/wav')
+        response['Content-Disposition'] = 'inline; filename="synthesis.wav"'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+        
+    except TTSServiceError as e:
+        return BaseAPIViewMixin().handle_service_error(e, "TTS error")
+    except Exception as e:
+        return BaseAPIViewMixin().handle_generic_error(e, "Internal server error")
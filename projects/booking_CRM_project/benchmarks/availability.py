@@ -0,0 +1,125 @@
+"""Benchmark: availability index vs. per-check ORM queries.
+
+Seeds a scratch SQLite database with `--properties` properties and
+`--bookings` bookings in total (back-to-back stays with random gaps), then
+times overlap checks, next-free-slot searches and a "which units are free"
+search, once with the ORM queries the index replaced and once with the index.
+
+Usage:
+    python -m benchmarks.availability [--properties 50] [--bookings 20000] [--queries 2000]
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.db import connection
+
+from benchmarks.common import EPOCH, QueryCounter, cleanup, seed
+from bookings.availability import AvailabilityIndex
+from bookings.models import Booking
+
+
+def orm_overlaps(property_id, check_in, check_out):
+    return Booking.overlaps_exist(property_id, check_in, check_out, exact=True)
+
+
+def orm_next_available(property_id, desired_start, nights):
+    """The per-conflict query loop `find_next_available_range` used before the index."""
+    candidate = desired_start
+    while True:
+        end = candidate + timedelta(days=nights)
+        conflict = (
+            Booking.objects.filter(property_id=property_id)
+            .filter(check_in__lt=end, check_out__gt=candidate)
+            .exclude(status=Booking.Status.CANCELLED)
+            .order_by("check_out")
+            .first()
+        )
+        if not conflict:
+            return candidate, end
+        candidate = max(conflict.check_out, candidate + timedelta(days=1))
+
+
+def orm_free_properties(property_ids, check_in, check_out):
+    return [pid for pid in property_ids if not orm_overlaps(pid, check_in, check_out)]
+
+
+def timed(label: str, func, cases) -> tuple[list, dict]:
+    results, latencies = [], []
+    queries = QueryCounter()
+    with connection.execute_wrapper(queries):
+        for args in cases:
+            started = time.perf_counter()
+            results.append(func(*args))
+            latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return results, {
+        "label": label,
+        "mean_us": statistics.fmean(latencies) * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+        "queries": queries.count / len(cases),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--properties", type=int, default=50)
+    parser.add_argument("--bookings", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    try:
+        property_ids = seed(args.properties, args.bookings, rng)
+        horizon = (
+            Booking.objects.order_by("-check_out").values_list("check_out", flat=True).first()
+            - EPOCH
+        ).days
+
+        def random_range(max_nights=7):
+            start = EPOCH + timedelta(days=rng.randint(0, horizon))
+            return start, start + timedelta(days=rng.randint(1, max_nights))
+
+        overlap_cases = [(rng.choice(property_ids), *random_range()) for _ in range(args.queries)]
+        next_cases = [
+            (rng.choice(property_ids), random_range()[0], rng.randint(3, 10))
+            for _ in range(args.queries)
+        ]
+        free_cases = [(property_ids, *random_range()) for _ in range(max(1, args.queries // 20))]
+
+        index = AvailabilityIndex(ttl=3600)
+        started = time.perf_counter()
+        index.calendars(property_ids)
+        load_ms = (time.perf_counter() - started) * 1000
+
+        report = []
+        for name, orm_func, index_func, cases in (
+            ("overlap", orm_overlaps, index.overlaps, overlap_cases),
+            ("next_available", orm_next_available, index.next_available, next_cases),
+            ("free_properties", orm_free_properties, index.free_properties, free_cases),
+        ):
+            expected, orm_stats = timed(f"{name} (orm)", orm_func, cases)
+            actual, index_stats = timed(f"{name} (index)", index_func, cases)
+            if expected != actual:
+                raise SystemExit(f"{name}: index results differ from the ORM")
+            report += [orm_stats, index_stats]
+    finally:
+        cleanup()
+
+    print(
+        f"{args.bookings} bookings over {args.properties} properties; index load {load_ms:.1f} ms"
+    )
+    print(f"{'query':<24} {'mean us':>10} {'p99 us':>10} {'queries':>8}")
+    for row in report:
+        print(
+            f"{row['label']:<24} {row['mean_us']:>10.1f} "
+            f"{row['p99_us']:>10.1f} {row['queries']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
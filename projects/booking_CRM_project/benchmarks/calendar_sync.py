@@ -0,0 +1,129 @@
+"""Benchmark: Google Calendar first sync and re-sync, per-event saves vs. the batched engine.
+
+Builds `--events` all-day events for one property (one guest email per ten
+events) and applies them twice on a scratch SQLite database: once with the
+per-event loop `upsert_events_deduplicated` used before, once with
+`integrations.sync.sync_events()`. Each is timed for a first sync and for a
+re-sync in which a tenth of the events moved.
+
+Usage:
+    python -m benchmarks.calendar_sync [--events 2500] [--batch-size 500]
+"""
+
+import argparse
+import time
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.db import connection, transaction
+
+from benchmarks.common import EPOCH, QueryCounter, cleanup
+from bookings.models import Booking
+from customers.models import Customer
+from integrations.models import CalendarEventLink
+from integrations.sync import extract_dates, sync_events
+from properties.models import Property
+
+
+def per_event_loop(calendar_id, events):
+    """The per-event implementation `upsert_events_deduplicated` used before the engine."""
+    prop = Property.objects.get(calendar_id=calendar_id)
+    for ev in events:
+        ical_uid = ev["iCalUID"]
+        check_in, check_out = extract_dates(ev)
+        email = ev["attendees"][0]["email"]
+        customer, _ = Customer.objects.get_or_create(
+            email=email, defaults={"first_name": email.split("@")[0]}
+        )
+        link = CalendarEventLink.objects.filter(ical_uid=ical_uid).first()
+        if link and link.booking:
+            b = link.booking
+            b.property = prop
+            b.customer = customer
+            b.check_in = check_in
+            b.check_out = check_out
+            b.source = "google"
+            b.save()
+        else:
+            b = Booking.objects.create(
+                property=prop,
+                customer=customer,
+                check_in=check_in,
+                check_out=check_out,
+                guests=1,
+                status=Booking.Status.CONFIRMED,
+                source="google",
+            )
+            CalendarEventLink.objects.update_or_create(
+                ical_uid=ical_uid,
+                defaults={"calendar_id": calendar_id, "booking": b},
+            )
+
+
+def make_events(count: int, shift_every: int = 0) -> list[dict]:
+    """Back-to-back two-night events; with `shift_every`, every n-th one moves a night earlier."""
+    events = []
+    for i in range(count):
+        check_in = EPOCH + timedelta(days=3 * i)
+        if shift_every and i % shift_every == 0:
+            check_in -= timedelta(days=1)
+        events.append(
+            {
+                "iCalUID": f"event-{i}@bench",
+                "start": {"date": str(check_in)},
+                "end": {"date": str(check_in + timedelta(days=2))},
+                "attendees": [{"email": f"guest{i // 10}@example.com"}],
+            }
+        )
+    return events
+
+
+def timed(label, func, *args):
+    queries = QueryCounter()
+    with connection.execute_wrapper(queries), transaction.atomic():
+        started = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed * 1000:>10.1f} {queries.count:>8}")
+    return result
+
+
+def reset():
+    Booking.objects.all().delete()
+    Customer.objects.all().delete()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=2500)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    try:
+        call_command("migrate", verbosity=0)
+        Property.objects.create(title="Synced unit", address="Street 1", calendar_id="bench")
+        first, moved = make_events(args.events), make_events(args.events, shift_every=10)
+
+        print(f"{args.events} events, batches of {args.batch_size}")
+        print(f"{'sync':<28} {'ms':>10} {'queries':>8}")
+        timed("per-event, first sync", per_event_loop, "bench", first)
+        timed("per-event, re-sync", per_event_loop, "bench", moved)
+        legacy = sorted(Booking.objects.values_list("check_in", "check_out"))
+        reset()
+        timed("batched, first sync", sync_events, "bench", first, args.batch_size)
+        result = timed("batched, re-sync", sync_events, "bench", moved, args.batch_size)
+
+        print(f"\n{'re-sync batch':<14} {'events':>7} {'prefetch':>9} {'diff':>7} {'write':>7}")
+        for i, batch in enumerate(result.batches):
+            print(
+                f"{i:<14} {batch['events']:>7} {batch['prefetch_ms']:>9.1f} "
+                f"{batch['diff_ms']:>7.1f} {batch['write_ms']:>7.1f}"
+            )
+        if legacy != sorted(Booking.objects.values_list("check_in", "check_out")):
+            raise SystemExit("batched sync differs from the per-event loop")
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Shared benchmark setup: a scratch database, seed data and a query counter.
+
+Importing this module configures Django against a scratch SQLite database
+(the project database is never touched) and calls `django.setup()`, so import
+it before any model.
+"""
+
+import os
+import random
+import shutil
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "rentmaster.settings_dev")
+
+from django.conf import settings  # noqa: E402
+
+WORKDIR = Path(tempfile.mkdtemp(prefix="rentmaster_bench_"))
+settings.DATABASES["default"] = {
+    "ENGINE": "django.db.backends.sqlite3",
+    "NAME": str(WORKDIR / "bench.sqlite3"),
+}
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from bookings.models import Booking  # noqa: E402
+from customers.models import Customer  # noqa: E402
+from properties.models import Property  # noqa: E402
+
+EPOCH = date(2024, 1, 1)
+
+
+def seed(properties: int, bookings: int, rng: random.Random) -> list[int]:
+    """Create properties with back-to-back stays (random gaps, 5% cancelled) from EPOCH on."""
+    call_command("migrate", verbosity=0)
+    customer = Customer.objects.create(first_name="Bench")
+    props = Property.objects.bulk_create(
+        [Property(title=f"Unit {i}", address=f"Street {i}") for i in range(properties)]
+    )
+    rows = []
+    per_property = bookings // properties
+    for prop in props:
+        day = EPOCH
+        for _ in range(per_property):
+            day += timedelta(days=rng.randint(0, 3))
+            nights = rng.randint(1, 7)
+            status = Booking.Status.CANCELLED if rng.random() < 0.05 else Booking.Status.CONFIRMED
+            rows.append(
+                Booking(
+                    property=prop,
+                    customer=customer,
+                    check_in=day,
+                    check_out=day + timedelta(days=nights),
+                    status=status,
+                )
+            )
+            day += timedelta(days=nights)
+    # bulk_create skips Booking.save()/full_clean(): the seed is overlap-free by construction
+    Booking.objects.bulk_create(rows, batch_size=2000)
+    return [p.id for p in props]
+
+
+def cleanup():
+    connection.close()
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+
+
+class QueryCounter:
+    """Counts queries (the DEBUG query log is capped, so it cannot count long runs).
+
+    Usage: `with connection.execute_wrapper(counter): ...`
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
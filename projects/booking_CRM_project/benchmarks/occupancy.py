@@ -0,0 +1,103 @@
+"""Benchmark: portfolio occupancy report, per-property queries vs. the occupancy engine.
+
+Seeds a scratch SQLite database with `--properties` properties (half with a
+rate plan) and `--bookings` bookings, then times a report over `--days` days:
+the per-property loop `occupancy_report` used before, `occupancy.compute()`
+without and with monthly buckets, and a cached `occupancy.report()`.
+
+Usage:
+    python -m benchmarks.occupancy [--properties 500] [--bookings 50000] [--days 365]
+"""
+
+import argparse
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+
+from benchmarks.common import EPOCH, QueryCounter, cleanup, seed
+from bookings.models import Booking
+from properties.models import Property
+from rates.models import RatePlan, SeasonalRate
+from reports import occupancy
+
+
+def per_property_loop(start, end):
+    """The N+1 implementation `occupancy_report` used before the engine."""
+    data = []
+    for prop in Property.objects.all().order_by("title"):
+        qs = (
+            Booking.objects.filter(property=prop, check_in__lt=end, check_out__gt=start)
+            .exclude(status=Booking.Status.CANCELLED)
+            .values("check_in", "check_out")
+        )
+        booked_days = 0
+        for b in qs:
+            booked_days += max(0, (min(b["check_out"], end) - max(b["check_in"], start)).days)
+        data.append({"property_id": prop.id, "booked_days": booked_days})
+    return data
+
+
+def timed(label, func, *args, repeat=3):
+    queries = QueryCounter()
+    best = None
+    with connection.execute_wrapper(queries):
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func(*args)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<28} {best * 1000:>10.1f} {queries.count / repeat:>8.0f}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--properties", type=int, default=500)
+    parser.add_argument("--bookings", type=int, default=50000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    try:
+        property_ids = seed(args.properties, args.bookings, rng)
+        RatePlan.objects.bulk_create(
+            [
+                RatePlan(property_id=pid, base_price=Decimal(100), weekend_price=Decimal(140))
+                for pid in property_ids[::2]
+            ]
+        )
+        SeasonalRate.objects.bulk_create(
+            [
+                SeasonalRate(
+                    property_id=pid,
+                    start_date=EPOCH + timedelta(days=180),
+                    end_date=EPOCH + timedelta(days=240),
+                    price=Decimal(180),
+                )
+                for pid in property_ids[::2]
+            ]
+        )
+        start, end = EPOCH, EPOCH + timedelta(days=args.days)
+
+        print(f"{args.bookings} bookings, {args.properties} properties, {args.days} days")
+        print(f"{'report':<28} {'best ms':>10} {'queries':>8}")
+        legacy = timed("per-property loop", per_property_loop, start, end)
+        totals = timed("engine", occupancy.compute, start, end)
+        timed("engine, monthly buckets", occupancy.compute, start, end, "month")
+        cache.clear()
+        timed("engine, cached", occupancy.report, start, end, "month")
+
+        expected = {row["property_id"]: row["booked_days"] for row in legacy}
+        if expected != {item["property_id"]: item["booked_days"] for item in totals["items"]}:
+            raise SystemExit("engine totals differ from the per-property loop")
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""In-memory availability index.
+
+Keeps the non-cancelled stays of each property in arrays sorted by check-in,
+with a running maximum of check-out dates. An overlap check is a binary
+search plus a walk back over the stays that can still reach the range, so
+overlap, next-free-slot and "which units are free" queries take microseconds
+instead of a query each.
+
+Calendars are loaded on demand (one query for any number of properties) and
+dropped by the booking save/delete signals (`bookings.signals`). Writes made
+by other processes are picked up after `AVAILABILITY_INDEX_TTL` seconds;
+`Booking.clean()` still checks the database before saving.
+"""
+
+import threading
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from django.conf import settings
+
+from .models import Booking
+
+
+@dataclass(frozen=True)
+class Stay:
+    check_in: date
+    check_out: date
+    booking_id: int
+    status: str
+
+
+class PropertyCalendar:
+    """Stays of one property sorted by check-in."""
+
+    def __init__(self, stays):
+        self.stays = sorted(stays, key=lambda s: (s.check_in, s.booking_id))
+        self.starts = [s.check_in for s in self.stays]
+        # max_end[i] = latest check-out among stays[:i + 1]
+        self.max_end = []
+        latest = None
+        for stay in self.stays:
+            if latest is None or stay.check_out > latest:
+                latest = stay.check_out
+            self.max_end.append(latest)
+
+    def __len__(self) -> int:
+        return len(self.stays)
+
+    def overlapping(self, check_in: date, check_out: date):
+        """Yield stays overlapping [check_in, check_out), latest check-in first."""
+        i = bisect_left(self.starts, check_out) - 1
+        while i >= 0 and self.max_end[i] > check_in:
+            stay = self.stays[i]
+            if stay.check_out > check_in:
+                yield stay
+            i -= 1
+
+    def overlaps(self, check_in: date, check_out: date, exclude_id: int | None = None) -> bool:
+        return any(s.booking_id != exclude_id for s in self.overlapping(check_in, check_out))
+
+    def next_available(self, desired_start: date, nights: int = 1) -> tuple[date, date]:
+        """Earliest start >= desired_start with `nights` free nights."""
+        candidate = desired_start
+        while True:
+            end = candidate + timedelta(days=nights)
+            # Every conflicting stay blocks all starts before its check-out
+            latest = max((s.check_out for s in self.overlapping(candidate, end)), default=None)
+            if latest is None:
+                return candidate, end
+            candidate = latest
+
+
+class StaySet:
+    """Mutable stays of one property, for applying many changes in memory.
+
+    Keys are booking ids, or any other hashable for stays not saved yet. An
+    overlap check walks back from the range end only as far as the longest
+    stay seen can reach.
+    """
+
+    def __init__(self):
+        self._items: list[tuple[date, date, object]] = []  # sorted by check-in
+        self._dates: dict[object, tuple[date, date]] = {}
+        self._longest = timedelta(0)
+
+    def __len__(self) -> int:
+        return len(self._dates)
+
+    def __contains__(self, key) -> bool:
+        return key in self._dates
+
+    def add(self, key, check_in: date, check_out: date):
+        self.discard(key)
+        insort(self._items, (check_in, check_out, key), key=lambda item: item[0])
+        self._dates[key] = (check_in, check_out)
+        self._longest = max(self._longest, check_out - check_in)
+
+    def discard(self, key):
+        dates = self._dates.pop(key, None)
+        if dates is None:
+            return
+        i = bisect_left(self._items, dates[0], key=lambda item: item[0])
+        while self._items[i][2] != key:
+            i += 1
+        del self._items[i]
+
+    def overlaps(self, check_in: date, check_out: date, exclude=None) -> bool:
+        i = bisect_left(self._items, check_out, key=lambda item: item[0]) - 1
+        reach = check_in - self._longest
+        while i >= 0 and self._items[i][0] >= reach:
+            _, end, key = self._items[i]
+            if end > check_in and key != exclude:
+                return True
+            i -= 1
+        return False
+
+
+class AvailabilityIndex:
+    """Per-property calendars shared by the whole process."""
+
+    def __init__(self, ttl: float | None = None):
+        self._ttl = ttl
+        self._calendars: dict[int, tuple[float, PropertyCalendar]] = {}
+        self._property_of: dict[int, int] = {}  # booking id -> property id of cached stays
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self) -> float:
+        if self._ttl is None:
+            return getattr(settings, "AVAILABILITY_INDEX_TTL", 60)
+        return self._ttl
+
+    def calendars(self, property_ids) -> dict[int, PropertyCalendar]:
+        """Calendars of the given properties, loading the missing ones in one query."""
+        now = time.monotonic()
+        found, missing = {}, []
+        with self._lock:
+            for property_id in set(property_ids):
+                entry = self._calendars.get(property_id)
+                if entry and now - entry[0] < self.ttl:
+                    found[property_id] = entry[1]
+                else:
+                    missing.append(property_id)
+            generation = self._generation
+        if missing:
+            found.update(self._load(missing, generation))
+        return found
+
+    def calendar(self, property_id: int) -> PropertyCalendar:
+        return self.calendars([property_id])[property_id]
+
+    def _load(self, property_ids, generation: int) -> dict[int, PropertyCalendar]:
+        rows = (
+            Booking.objects.filter(property_id__in=property_ids)
+            .exclude(status=Booking.Status.CANCELLED)
+            .values_list("property_id", "id", "check_in", "check_out", "status")
+        )
+        stays = {property_id: [] for property_id in property_ids}
+        for property_id, booking_id, check_in, check_out, status in rows.iterator(chunk_size=5000):
+            stays[property_id].append(Stay(check_in, check_out, booking_id, status))
+        calendars = {property_id: PropertyCalendar(s) for property_id, s in stays.items()}
+
+        loaded_at = time.monotonic()
+        with self._lock:
+            # A booking changed while loading: use the result once, do not cache it
+            if generation == self._generation:
+                for property_id, calendar in calendars.items():
+                    self._calendars[property_id] = (loaded_at, calendar)
+                    for stay in calendar.stays:
+                        self._property_of[stay.booking_id] = property_id
+        return calendars
+
+    def overlaps(
+        self, property_id: int, check_in: date, check_out: date, exclude_id: int | None = None
+    ) -> bool:
+        return self.calendar(property_id).overlaps(check_in, check_out, exclude_id)
+
+    def booked(self, property_id: int, start: date, end: date) -> list[Stay]:
+        """Stays overlapping [start, end), by check-in."""
+        return sorted(self.calendar(property_id).overlapping(start, end), key=lambda s: s.check_in)
+
+    def next_available(
+        self, property_id: int, desired_start: date, nights: int = 1
+    ) -> tuple[date, date]:
+        return self.calendar(property_id).next_available(desired_start, nights)
+
+    def free_properties(self, property_ids, check_in: date, check_out: date) -> list[int]:
+        """Ids of the properties with no stay overlapping [check_in, check_out)."""
+        property_ids = list(property_ids)
+        calendars = self.calendars(property_ids)
+        return [pid for pid in property_ids if not calendars[pid].overlaps(check_in, check_out)]
+
+    def invalidate(self, property_ids=None, booking_ids=()):
+        """Drop cached calendars (all of them when `property_ids` is None).
+
+        Calendars holding any of `booking_ids` are dropped as well, which
+        covers bookings moved to another property.
+        """
+        with self._lock:
+            self._generation += 1
+            if property_ids is None:
+                self._calendars.clear()
+                self._property_of.clear()
+                return
+            stale = set(property_ids)
+            stale.update(self._property_of[b] for b in booking_ids if b in self._property_of)
+            for property_id in stale:
+                entry = self._calendars.pop(property_id, None)
+                if entry:
+                    for stay in entry[1].stays:
+                        self._property_of.pop(stay.booking_id, None)
+
+
+availability_index = AvailabilityIndex()
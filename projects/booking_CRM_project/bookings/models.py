@@ -31,7 +31,18 @@ class Booking(models.Model):
         return f"#{self.pk} {self.property} {self.check_in}→{self.check_out}"
 
     @staticmethod
-    def overlaps_exist(property_id: int, check_in, check_out, exclude_id: int | None = None) -> bool:
+    def overlaps_exist(
+        property_id: int, check_in, check_out, exclude_id: int | None = None, exact: bool = False
+    ) -> bool:
+        """Whether a non-cancelled booking of the property overlaps the dates.
+
+        Answered from the in-memory availability index; `exact=True` queries
+        the database instead (used before saving, as other processes may have
+        written since the index was loaded).
+        """
+        if not exact:
+            from .availability import availability_index
+            return availability_index.overlaps(property_id, check_in, check_out, exclude_id)
         qs = Booking.objects.filter(property_id=property_id)
         if exclude_id:
             qs = qs.exclude(id=exclude_id)
@@ -43,7 +54,7 @@ class Booking(models.Model):
     def clean(self):
         if self.check_in >= self.check_out:
             raise ValidationError({"check_out": "check_out must be after check_in"})
-        if Booking.overlaps_exist(self.property_id, self.check_in, self.check_out, self.id):
+        if Booking.overlaps_exist(self.property_id, self.check_in, self.check_out, self.id, exact=True):
             raise ValidationError("Booking dates overlap with an existing booking for this property")
 
     def save(self, *args, **kwargs):
@@ -54,19 +65,7 @@ class Booking(models.Model):
     def find_next_available_range(property_id: int, desired_start, nights: int = 1):
         """Return the earliest start date >= desired_start where a block of given nights is free.
 
-        Naive O(n) over existing bookings; optimized by date index.
+        Served from the availability index: no query once the property is loaded.
         """
-        from datetime import timedelta
-        candidate = desired_start
-        end = lambda start: start + timedelta(days=nights)
-        while True:
-            conflict = (
-                Booking.objects.filter(property_id=property_id)
-                .filter(check_in__lt=end(candidate), check_out__gt=candidate)
-                .exclude(status=Booking.Status.CANCELLED)
-                .order_by("check_out")
-                .first()
-            )
-            if not conflict:
-                return candidate, end(candidate)
-            candidate = max(conflict.check_out, candidate + timedelta(days=1))
+        from .availability import availability_index
+        return availability_index.next_available(property_id, desired_start, nights)
@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .availability import availability_index
+from .models import Booking
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_availability(sender, instance, **kwargs):
+    """Drop cached calendars of the booking's property (and its previous one)."""
+
+    def invalidate():
+        availability_index.invalidate([instance.property_id], booking_ids=[instance.pk])
+
+    invalidate()
+    # Again after commit: a read inside the transaction may have cached uncommitted rows
+    transaction.on_commit(invalidate)
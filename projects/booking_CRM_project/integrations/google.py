@@ -0,0 +1,179 @@
+"""Google Calendar API client.
+
+All calls go through one `requests.Session` per process, so connections are
+pooled and reused. Connection errors, 429 and 5xx responses to idempotent
+requests are retried with exponential backoff (honouring `Retry-After`). The
+access token is refreshed with the account's refresh token shortly before it
+expires, and once more if Google still answers 401.
+
+Endpoints come from `GOOGLE_CALENDAR_API_URL` and `GOOGLE_TOKEN_URL`, which
+tests point at a local fake server.
+"""
+
+import logging
+import threading
+from collections.abc import Iterator
+from datetime import timedelta
+from urllib.parse import quote
+
+import requests
+from django.conf import settings
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .models import CalendarAccount
+
+logger = logging.getLogger(__name__)
+
+# Refresh this long before the recorded expiry (clock skew, slow requests)
+EXPIRY_MARGIN = timedelta(seconds=60)
+
+
+class GoogleAPIError(Exception):
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @classmethod
+    def from_response(cls, resp: requests.Response) -> "GoogleAPIError":
+        return cls(f"Google API {resp.status_code}: {resp.text[:500]}", resp.status_code)
+
+
+class GoogleAuthError(GoogleAPIError):
+    """The account's tokens were rejected and cannot be refreshed."""
+
+
+class SyncTokenExpired(GoogleAPIError):
+    """410 Gone: the sync token is no longer valid, a full sync is needed."""
+
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def session() -> requests.Session:
+    """Process-wide pooled session with retry and backoff."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=settings.GOOGLE_HTTP_RETRIES,
+                backoff_factor=settings.GOOGLE_HTTP_BACKOFF,
+                status_forcelist=(429, 500, 502, 503, 504),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=4, pool_maxsize=settings.GOOGLE_HTTP_POOL_SIZE, max_retries=retry
+            )
+            _session = requests.Session()
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def exchange_code(code: str) -> dict:
+    """Exchange an OAuth authorization code for tokens."""
+    resp = session().post(
+        settings.GOOGLE_TOKEN_URL,
+        data={
+            "code": code,
+            "client_id": settings.GOOGLE_CLIENT_ID,
+            "client_secret": settings.GOOGLE_CLIENT_SECRET,
+            "redirect_uri": settings.GOOGLE_REDIRECT_URI,
+            "grant_type": "authorization_code",
+        },
+        timeout=settings.GOOGLE_HTTP_TIMEOUT,
+    )
+    if resp.status_code != 200:
+        raise GoogleAuthError.from_response(resp)
+    return resp.json()
+
+
+def token_expiry(payload: dict):
+    return timezone.now() + timedelta(seconds=int(payload.get("expires_in", 3600)))
+
+
+class GoogleCalendarClient:
+    """Calendar API calls on behalf of one connected account."""
+
+    def __init__(self, account: CalendarAccount):
+        self.account = account
+
+    def refresh(self):
+        """Get a new access token with the refresh token and store it."""
+        acct = self.account
+        if not acct.refresh_token:
+            raise GoogleAuthError(f"{acct} has no refresh token; reconnect the account")
+        resp = session().post(
+            settings.GOOGLE_TOKEN_URL,
+            data={
+                "client_id": settings.GOOGLE_CLIENT_ID,
+                "client_secret": settings.GOOGLE_CLIENT_SECRET,
+                "refresh_token": acct.refresh_token,
+                "grant_type": "refresh_token",
+            },
+            timeout=settings.GOOGLE_HTTP_TIMEOUT,
+        )
+        if resp.status_code != 200:
+            raise GoogleAuthError.from_response(resp)
+        payload = resp.json()
+        acct.access_token = payload["access_token"]
+        acct.token_expiry = token_expiry(payload)
+        fields = ["access_token", "token_expiry", "updated_at"]
+        if payload.get("refresh_token"):
+            acct.refresh_token = payload["refresh_token"]
+            fields.append("refresh_token")
+        acct.save(update_fields=fields)
+        logger.info("Refreshed Google access token of %s", acct)
+
+    def _expired(self) -> bool:
+        expiry = self.account.token_expiry
+        return not self.account.access_token or (
+            expiry is not None and expiry - EXPIRY_MARGIN <= timezone.now()
+        )
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Authorized request to `GOOGLE_CALENDAR_API_URL` + path; raises on error responses."""
+        if self._expired() and self.account.refresh_token:
+            self.refresh()
+        url = settings.GOOGLE_CALENDAR_API_URL.rstrip("/") + path
+        kwargs.setdefault("timeout", settings.GOOGLE_HTTP_TIMEOUT)
+        for attempt in range(2):
+            headers = {"Authorization": f"Bearer {self.account.access_token}"}
+            resp = session().request(method, url, headers=headers, **kwargs)
+            if resp.status_code == 401 and attempt == 0 and self.account.refresh_token:
+                self.refresh()
+                continue
+            break
+        if resp.status_code == 410:
+            raise SyncTokenExpired.from_response(resp)
+        if resp.status_code == 401:
+            raise GoogleAuthError.from_response(resp)
+        if resp.status_code >= 400:
+            raise GoogleAPIError.from_response(resp)
+        return resp
+
+    def list_calendars(self) -> dict:
+        return self.request("GET", "/users/me/calendarList").json()
+
+    def event_pages(
+        self, calendar_id: str, sync_token: str = "", time_min: str = ""
+    ) -> Iterator[dict]:
+        """Pages of events.list, following `nextPageToken`.
+
+        With a sync token only the changes since then are listed. The last
+        page carries the `nextSyncToken` for the next delta sync.
+        """
+        params = {"singleEvents": True, "maxResults": settings.GOOGLE_SYNC_PAGE_SIZE}
+        if sync_token:
+            params["syncToken"] = sync_token
+        elif time_min:
+            params["timeMin"] = time_min
+        path = f"/calendars/{quote(calendar_id, safe='')}/events"
+        while True:
+            page = self.request("GET", path, params=params).json()
+            yield page
+            if not page.get("nextPageToken"):
+                return
+            params["pageToken"] = page["nextPageToken"]
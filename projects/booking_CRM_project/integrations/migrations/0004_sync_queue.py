@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("integrations", "0003_webhookevent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="calendarsyncstate",
+            name="last_error",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="calendarsyncstate",
+            name="sync_queued_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="calendarsyncstate",
+            name="sync_started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
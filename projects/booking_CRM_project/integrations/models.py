@@ -29,6 +29,10 @@ class CalendarSyncState(models.Model):
 
     For Google Calendar we store `sync_token` returned by events.list to perform
     delta syncs and avoid full scans. `last_synced_at` is informational.
+
+    Syncs run in the background (`integrations.tasks`): `sync_queued_at` is set
+    while a sync is queued and `sync_started_at` while one runs, so bursts of
+    notifications share one queued sync and a calendar never syncs twice at once.
     """
 
     account = models.ForeignKey(CalendarAccount, on_delete=models.CASCADE, related_name="sync_states")
@@ -36,6 +40,9 @@ class CalendarSyncState(models.Model):
     provider = models.CharField(max_length=20, default=CalendarAccount.PROVIDER_GOOGLE)
     sync_token = models.TextField(blank=True)
     last_synced_at = models.DateTimeField(null=True, blank=True)
+    sync_queued_at = models.DateTimeField(null=True, blank=True)
+    sync_started_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
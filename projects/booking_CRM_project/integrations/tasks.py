@@ -0,0 +1,126 @@
+"""Background Google Calendar sync.
+
+Push notifications and manual syncs call `enqueue_sync()`, which queues one
+`sync_calendar` task per calendar, delayed by `GOOGLE_SYNC_COALESCE_SECONDS`.
+Notifications that arrive while a sync is queued join it instead of queueing
+another. The task claims the calendar with a conditional update; if a sync of
+the same calendar is still running, it retries until that one finishes.
+
+A sync lists the changes since the stored sync token page by page (a full
+listing from now on when there is no token or Google expired it), applies
+each page with `integrations.sync.sync_events()` and stores the new sync
+token after the last page. A failed sync keeps the old token, so the next
+one lists the same changes again (applying them is idempotent).
+"""
+
+import logging
+from datetime import timedelta
+
+import requests
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .google import GoogleAPIError, GoogleAuthError, GoogleCalendarClient, SyncTokenExpired
+from .models import CalendarSyncState
+from .sync import SyncResult, sync_events
+
+logger = logging.getLogger(__name__)
+
+# Seconds before a sync that failed on a server or network error is tried again
+RETRY_DELAY = 60
+
+
+def enqueue_sync(state: CalendarSyncState, countdown: float | None = None) -> bool:
+    """Queue a sync of the state's calendar unless one is already queued.
+
+    Returns True when a task was queued, False when the sync joined a queued one.
+    """
+    now = timezone.now()
+    lost = now - timedelta(seconds=settings.GOOGLE_SYNC_TIMEOUT)  # queued but never ran
+    queued = (
+        CalendarSyncState.objects.filter(id=state.id)
+        .filter(Q(sync_queued_at__isnull=True) | Q(sync_queued_at__lt=lost))
+        .update(sync_queued_at=now)
+    )
+    if queued:
+        delay = settings.GOOGLE_SYNC_COALESCE_SECONDS if countdown is None else countdown
+        transaction.on_commit(lambda: sync_calendar.apply_async((state.id,), countdown=delay))
+    return bool(queued)
+
+
+def sync_state(state: CalendarSyncState) -> SyncResult:
+    """Apply the calendar's changes since its sync token (all pages) and store the new token."""
+    client = GoogleCalendarClient(state.account)
+    try:
+        result, token = _sync_pages(client, state, state.sync_token)
+    except SyncTokenExpired:
+        logger.info("Sync token of %s expired, running a full sync", state)
+        result, token = _sync_pages(client, state, "")
+    CalendarSyncState.objects.filter(id=state.id).update(
+        sync_token=token or state.sync_token,
+        last_synced_at=timezone.now(),
+        sync_started_at=None,
+        last_error="",
+    )
+    return result
+
+
+def _sync_pages(client: GoogleCalendarClient, state: CalendarSyncState, sync_token: str):
+    result = SyncResult()
+    next_token = ""
+    time_min = "" if sync_token else timezone.now().isoformat()
+    for page in client.event_pages(state.calendar_id, sync_token, time_min):
+        result.merge(sync_events(state.calendar_id, page.get("items", [])))
+        next_token = page.get("nextSyncToken", next_token)
+    return result, next_token
+
+
+def _retryable(exc: Exception) -> bool:
+    """Network errors, rate limits and server errors that outlasted the HTTP retries."""
+    if isinstance(exc, requests.RequestException):
+        return True
+    if isinstance(exc, GoogleAPIError) and not isinstance(exc, GoogleAuthError):
+        return exc.status_code == 429 or (exc.status_code or 0) >= 500
+    return False
+
+
+@shared_task(bind=True, max_retries=None)
+def sync_calendar(self, state_id: int) -> dict | None:
+    """Run a queued sync of one calendar."""
+    now = timezone.now()
+    dead = now - timedelta(seconds=settings.GOOGLE_SYNC_TIMEOUT)
+    queued = CalendarSyncState.objects.filter(id=state_id, sync_queued_at__isnull=False)
+    claimed = queued.filter(Q(sync_started_at__isnull=True) | Q(sync_started_at__lt=dead)).update(
+        sync_queued_at=None, sync_started_at=now
+    )
+    if not claimed:
+        if queued.exists():
+            # A sync of this calendar is running: follow it once it is done
+            raise self.retry(countdown=settings.GOOGLE_SYNC_COALESCE_SECONDS)
+        return None
+
+    state = CalendarSyncState.objects.select_related("account").get(id=state_id)
+    try:
+        result = sync_state(state)
+    except Exception as exc:
+        logger.exception("Calendar sync of %s failed", state)
+        CalendarSyncState.objects.filter(id=state_id).update(
+            sync_started_at=None, last_error=str(exc)[:2000]
+        )
+        if _retryable(exc):
+            enqueue_sync(state, countdown=RETRY_DELAY)
+        return None
+
+    logger.info(
+        "Calendar %s synced: %d created, %d updated, %d unlinked, %d conflicts in %d batches",
+        state.calendar_id,
+        result.created,
+        result.updated,
+        result.unlinked,
+        len(result.conflicts),
+        len(result.batches),
+    )
+    return result.as_dict()
@@ -1,16 +1,16 @@
 import os
 import json
 import urllib.parse
-from datetime import datetime, timedelta
 import requests
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.views.decorators.csrf import csrf_exempt
 from .models import CalendarAccount, CalendarSyncState, CalendarSubscription, CalendarEventLink, WebhookEvent
+from . import google
+from .sync import SyncResult, sync_events
+from .tasks import enqueue_sync
 from bookings.models import Booking
-from customers.models import Customer
-from properties.models import Property
 from django.conf import settings
 import uuid
 from icalendar import Calendar
@@ -44,25 +44,14 @@ def google_oauth_callback(request):
     if not code:
         return Response({"detail": "missing code"}, status=400)
 
-    client_id = os.getenv("GOOGLE_CLIENT_ID", "")
-    client_secret = os.getenv("GOOGLE_CLIENT_SECRET", "")
-    redirect_uri = os.getenv("GOOGLE_REDIRECT_URI", "http://localhost:8000/api/integrations/google/callback/")
-
-    token_resp = requests.post("https://oauth2.googleapis.com/token", data={
-        "code": code,
-        "client_id": client_id,
-        "client_secret": client_secret,
-        "redirect_uri": redirect_uri,
-        "grant_type": "authorization_code",
-    })
-    if token_resp.status_code != 200:
-        return Response({"detail": "token exchange failed", "raw": token_resp.text}, status=400)
+    try:
+        payload = google.exchange_code(code)
+    except google.GoogleAPIError as e:
+        return Response({"detail": "token exchange failed", "raw": str(e)}, status=400)
 
-    payload = token_resp.json()
     access_token = payload.get("access_token", "")
     refresh_token = payload.get("refresh_token", "")
-    expires_in = payload.get("expires_in", 3600)
-    token_expiry = datetime.utcnow() + timedelta(seconds=int(expires_in))
+    token_expiry = google.token_expiry(payload)
     id_token = payload.get("id_token", "")
 
     email = None
@@ -94,11 +83,10 @@ def google_list_calendars(request):
     except CalendarAccount.DoesNotExist:
         return Response({"detail": "no google account connected"}, status=404)
 
-    headers = {"Authorization": f"Bearer {acct.access_token}"}
-    resp = requests.get("https://www.googleapis.com/calendar/v3/users/me/calendarList", headers=headers)
-    if resp.status_code != 200:
-        return Response({"detail": "failed", "raw": resp.text}, status=resp.status_code)
-    return Response(resp.json())
+    try:
+        return Response(google.GoogleCalendarClient(acct).list_calendars())
+    except google.GoogleAPIError as e:
+        return Response({"detail": "failed", "raw": str(e)}, status=e.status_code or 502)
 
 @csrf_exempt
 @api_view(["POST"])  # Google sends POST notifications
@@ -108,8 +96,9 @@ def google_webhook(request):
     """Webhook endpoint for Google push notifications.
 
     In dev we accept all requests. In prod, validate channel token/header
-    against settings.GOOGLE_WEBHOOK_VERIFICATION_TOKEN and map resourceId to
-    a known subscription. Here we simply acknowledge receipt.
+    against settings.GOOGLE_WEBHOOK_VERIFICATION_TOKEN. The resourceId is
+    mapped to its subscriptions, and a delta sync of each subscribed calendar
+    is queued (bursts of notifications share one sync, see `integrations.tasks`).
     """
     token_header = request.headers.get("X-Goog-Channel-Token", "")
     expected = getattr(settings, "GOOGLE_WEBHOOK_VERIFICATION_TOKEN", "")
@@ -126,90 +115,33 @@ def google_webhook(request):
     except WebhookEvent.DoesNotExist:
         WebhookEvent.objects.create(provider="google", external_id=idem_key)
         created = True
-    # Mark subscription touched (optional)
-    CalendarSubscription.objects.filter(resource_id=resource_id).update(active=True)
-    return Response({"ok": True, "processed": created})
-
-# Placeholder sync function — to be wired into Celery later.
-def _extract_dates(google_event: dict):
-    start = google_event.get("start", {})
-    end = google_event.get("end", {})
-    # Prefer all-day date, else take dateTime and convert to date
-    from datetime import datetime
-    def to_date(v):
-        if not v:
-            return None
-        if v.get("date"):
-            return datetime.fromisoformat(v["date"]) .date()
-        if v.get("dateTime"):
-            # Strip timezone if present
-            return datetime.fromisoformat(v["dateTime"].replace("Z", "+00:00")).date()
-        return None
-    return to_date(start), to_date(end)
-
-
-def upsert_events_deduplicated(account: CalendarAccount, calendar_id: str, events: list[dict]) -> None:
+    subscriptions = CalendarSubscription.objects.filter(resource_id=resource_id)
+    channel_id = request.headers.get("X-Goog-Channel-Id", "")
+    if channel_id:
+        subscriptions = subscriptions.filter(channel_id=channel_id)
+    # Mark subscription touched
+    subscriptions.update(active=True)
+    queued = 0
+    # "sync" only confirms a new channel; "exists"/"not_exists" report changes
+    if created and request.headers.get("X-Goog-Resource-State", "") != "sync":
+        for sub in subscriptions.select_related("account"):
+            state, _ = CalendarSyncState.objects.get_or_create(
+                account=sub.account, calendar_id=sub.calendar_id
+            )
+            queued += enqueue_sync(state)
+    return Response({"ok": True, "processed": created, "queued": queued})
+
+def upsert_events_deduplicated(account: CalendarAccount, calendar_id: str, events: list[dict]) -> SyncResult:
     """Insert/update events with deduplication by iCalUID.
 
     - Resolves `Property` by `Property.calendar_id` matching provided calendar_id
     - Chooses customer from first attendee/organizer email, otherwise creates/uses "Calendar Guest"
     - Creates or updates `Booking` via `CalendarEventLink` keyed by event `iCalUID`
-    - Skips cancelled events
-    """
-    try:
-        prop = Property.objects.get(calendar_id=calendar_id)
-    except Property.DoesNotExist:
-        return
-
-    for ev in events:
-        if ev.get("status") == "cancelled":
-            ical = ev.get("iCalUID") or ev.get("id")
-            if ical:
-                CalendarEventLink.objects.filter(ical_uid=ical).delete()
-            continue
-
-        ical_uid = ev.get("iCalUID") or ev.get("id")
-        if not ical_uid:
-            continue
-
-        check_in, check_out = _extract_dates(ev)
-        if not check_in or not check_out:
-            continue
+    - Skips cancelled events (their link is removed)
 
-        # Resolve customer
-        email = None
-        if ev.get("attendees") and isinstance(ev["attendees"], list) and ev["attendees"]:
-            email = ev["attendees"][0].get("email")
-        if not email:
-            email = (ev.get("creator") or {}).get("email") or (ev.get("organizer") or {}).get("email")
-        if email:
-            customer, _ = Customer.objects.get_or_create(email=email, defaults={"first_name": email.split("@")[0]})
-        else:
-            customer, _ = Customer.objects.get_or_create(email="calendar-guest@example.invalid", defaults={"first_name": "Calendar", "last_name": "Guest"})
-
-        link = CalendarEventLink.objects.filter(ical_uid=ical_uid).first()
-        if link and link.booking:
-            b = link.booking
-            b.property = prop
-            b.customer = customer
-            b.check_in = check_in
-            b.check_out = check_out
-            b.source = "google"
-            b.save()
-        else:
-            b = Booking.objects.create(
-                property=prop,
-                customer=customer,
-                check_in=check_in,
-                check_out=check_out,
-                guests=1,
-                status=Booking.Status.CONFIRMED,
-                source="google",
-            )
-            CalendarEventLink.objects.update_or_create(
-                ical_uid=ical_uid,
-                defaults={"provider": CalendarEventLink.PROVIDER_GOOGLE, "calendar_id": calendar_id, "booking": b},
-            )
+    Applied in batches with bulk writes, see `integrations.sync`.
+    """
+    return sync_events(calendar_id, events)
 
 
 @api_view(["POST"])
@@ -228,20 +160,18 @@ def google_watch_start(request):
     channel_id = str(uuid.uuid4())
     token = getattr(settings, "GOOGLE_WEBHOOK_VERIFICATION_TOKEN", "")
     callback = request.build_absolute_uri("/api/integrations/google/webhook/")
-    headers = {"Authorization": f"Bearer {acct.access_token}", "Content-Type": "application/json"}
     data = {
         "id": channel_id,
         "type": "web_hook",
         "address": callback,
         "token": token,
     }
-    resp = requests.post(
-        f"https://www.googleapis.com/calendar/v3/calendars/{urllib.parse.quote(calendar_id)}/events/watch",
-        headers=headers,
-        json=data,
-    )
-    if resp.status_code != 200:
-        return Response({"detail": "watch failed", "raw": resp.text}, status=resp.status_code)
+    try:
+        resp = google.GoogleCalendarClient(acct).request(
+            "POST", f"/calendars/{urllib.parse.quote(calendar_id, safe='')}/events/watch", json=data
+        )
+    except google.GoogleAPIError as e:
+        return Response({"detail": "watch failed", "raw": str(e)}, status=e.status_code or 502)
 
     payload = resp.json()
     sub = CalendarSubscription.objects.create(
@@ -269,19 +199,22 @@ def google_watch_stop(request):
     except CalendarAccount.DoesNotExist:
         return Response({"detail": "no google account connected"}, status=404)
 
-    headers = {"Authorization": f"Bearer {acct.access_token}", "Content-Type": "application/json"}
     data = {"id": channel_id, "resourceId": resource_id}
-    resp = requests.post("https://www.googleapis.com/calendar/v3/channels/stop", headers=headers, json=data)
     CalendarSubscription.objects.filter(channel_id=channel_id, resource_id=resource_id).update(active=False)
-    if resp.status_code not in (200, 204):
-        return Response({"detail": "stop failed", "raw": resp.text}, status=resp.status_code)
+    try:
+        google.GoogleCalendarClient(acct).request("POST", "/channels/stop", json=data)
+    except google.GoogleAPIError as e:
+        return Response({"detail": "stop failed", "raw": str(e)}, status=e.status_code or 502)
     return Response({"ok": True})
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def google_sync_now(request):
-    """Manual one-shot sync for a calendar: first full load or delta by sync_token."""
+    """Queue a sync of a calendar: first full load or delta by sync_token.
+
+    Runs on the Celery worker; poll this state's `last_synced_at`/`last_error`.
+    """
     calendar_id = request.data.get("calendar_id")
     if not calendar_id:
         return Response({"detail": "calendar_id required"}, status=400)
@@ -292,29 +225,19 @@ def google_sync_now(request):
         return Response({"detail": "no google account connected"}, status=404)
 
     state, _ = CalendarSyncState.objects.get_or_create(account=acct, calendar_id=calendar_id)
-    headers = {"Authorization": f"Bearer {acct.access_token}"}
-    params = {"singleEvents": True, "maxResults": 2500}
-    if state.sync_token:
-        params["syncToken"] = state.sync_token
-    else:
-        params["timeMin"] = datetime.utcnow().isoformat() + "Z"
-
-    resp = requests.get(
-        f"https://www.googleapis.com/calendar/v3/calendars/{urllib.parse.quote(calendar_id)}/events",
-        headers=headers,
-        params=params,
+    queued = enqueue_sync(state, countdown=0)
+    state.refresh_from_db()
+    return Response(
+        {
+            "ok": True,
+            "queued": queued,
+            "state_id": state.id,
+            "running": state.sync_started_at is not None,
+            "last_synced_at": state.last_synced_at,
+            "last_error": state.last_error,
+        },
+        status=202,
     )
-    if resp.status_code != 200:
-        return Response({"detail": "events fetch failed", "raw": resp.text}, status=resp.status_code)
-    data = resp.json()
-    items = data.get("items", [])
-    upsert_events_deduplicated(acct, calendar_id, items)
-    new_token = data.get("nextSyncToken")
-    if new_token:
-        state.sync_token = new_token
-        state.last_synced_at = datetime.utcnow()
-        state.save()
-    return Response({"ok": True, "received": len(items), "has_next": bool(new_token)})
 
 
 @api_view(["POST"])
@@ -5,7 +5,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from .models import Property, Location
 from .serializers import PropertySerializer, LocationSerializer
-from bookings.models import Booking
+from bookings.availability import availability_index
 from datetime import datetime
 
 
@@ -69,9 +69,35 @@ class PropertyViewSet(viewsets.ModelViewSet):
 		except ValueError:
 			return Response({"detail": "invalid date format"}, status=400)
 
-		booked = (
-			Booking.objects.filter(property=prop, check_in__lt=end, check_out__gt=start)
-			.exclude(status=Booking.Status.CANCELLED)
-			.values("check_in", "check_out", "status")
+		booked = [
+			{"check_in": s.check_in, "check_out": s.check_out, "status": s.status}
+			for s in availability_index.booked(prop.id, start, end)
+		]
+		return Response({"property": prop.id, "booked": booked})
+
+	@action(detail=False, methods=["get"], url_path="available")
+	def available(self, request):
+		"""Return properties free for the whole date range.
+
+		Query params: `start=YYYY-MM-DD`, `end=YYYY-MM-DD`, optional `guests`
+		"""
+		start_str = request.query_params.get("start")
+		end_str = request.query_params.get("end")
+		if not start_str or not end_str:
+			return Response({"detail": "start and end are required"}, status=400)
+		try:
+			start = datetime.fromisoformat(start_str).date()
+			end = datetime.fromisoformat(end_str).date()
+			guests = int(request.query_params.get("guests", 1))
+		except ValueError:
+			return Response({"detail": "invalid date format"}, status=400)
+		if start >= end:
+			return Response({"detail": "end must be after start"}, status=400)
+
+		candidates = self.filter_queryset(self.get_queryset()).filter(capacity__gte=guests).exclude(
+			status=Property.Status.UNAVAILABLE
 		)
-		return Response({"property": prop.id, "booked": list(booked)})
+		props = list(candidates)
+		free = set(availability_index.free_properties([p.id for p in props], start, end))
+		serializer = self.get_serializer([p for p in props if p.id in free], many=True)
+		return Response({"start": str(start), "end": str(end), "items": serializer.data})
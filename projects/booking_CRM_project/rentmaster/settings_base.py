@@ -138,6 +138,19 @@ GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET", "")
 GOOGLE_REDIRECT_URI = os.getenv("GOOGLE_REDIRECT_URI", "http://localhost:8000/api/integrations/google/callback/")
 GOOGLE_PROJECT_ID = os.getenv("GOOGLE_PROJECT_ID", "")
 GOOGLE_WEBHOOK_VERIFICATION_TOKEN = os.getenv("GOOGLE_WEBHOOK_VERIFICATION_TOKEN", "")
+GOOGLE_CALENDAR_API_URL = os.getenv("GOOGLE_CALENDAR_API_URL", "https://www.googleapis.com/calendar/v3")
+GOOGLE_TOKEN_URL = os.getenv("GOOGLE_TOKEN_URL", "https://oauth2.googleapis.com/token")
+# Pooled HTTP session: timeout (s), retries with exponential backoff, connections kept per host
+GOOGLE_HTTP_TIMEOUT = float(os.getenv("GOOGLE_HTTP_TIMEOUT", "20"))
+GOOGLE_HTTP_RETRIES = int(os.getenv("GOOGLE_HTTP_RETRIES", "4"))
+GOOGLE_HTTP_BACKOFF = float(os.getenv("GOOGLE_HTTP_BACKOFF", "0.5"))
+GOOGLE_HTTP_POOL_SIZE = int(os.getenv("GOOGLE_HTTP_POOL_SIZE", "10"))
+# Background sync: events per page, and seconds to wait for more notifications of
+# the same calendar before syncing (bursts collapse into one sync)
+GOOGLE_SYNC_PAGE_SIZE = int(os.getenv("GOOGLE_SYNC_PAGE_SIZE", "250"))
+GOOGLE_SYNC_COALESCE_SECONDS = float(os.getenv("GOOGLE_SYNC_COALESCE_SECONDS", "5"))
+# A sync running longer than this is considered dead and may be taken over
+GOOGLE_SYNC_TIMEOUT = int(os.getenv("GOOGLE_SYNC_TIMEOUT", "900"))
 
 # Sentry (enabled when SENTRY_DSN present)
 SENTRY_DSN = os.getenv("SENTRY_DSN", "")
@@ -169,6 +182,17 @@ if LOG_JSON:
         "root": {"handlers": ["console"], "level": "INFO"},
     }
 
+# Bookings: seconds before the in-memory availability index reloads a property
+# (picks up bookings written by other processes)
+AVAILABILITY_INDEX_TTL = float(os.getenv("AVAILABILITY_INDEX_TTL", "60"))
+
+# Reports: seconds a cached occupancy report may be served (changes made in this
+# process invalidate it at once; use a shared CACHES backend for all processes)
+OCCUPANCY_CACHE_TTL = int(os.getenv("OCCUPANCY_CACHE_TTL", "300"))
+
+# Calendar events applied per batch (one prefetch and one set of bulk writes each)
+CALENDAR_SYNC_BATCH_SIZE = int(os.getenv("CALENDAR_SYNC_BATCH_SIZE", "500"))
+
 # Celery
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", CELERY_BROKER_URL)
@@ -1,3 +1,8 @@
 from django.contrib import admin
+from .models import BookingExport
 
-# Register your models here.
+
+@admin.register(BookingExport)
+class BookingExportAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "start", "end", "file_format", "status", "rows", "created_at")
+    list_filter = ("status", "file_format")
@@ -0,0 +1,198 @@
+"""Bookings export.
+
+Rows are read with `values_list(...).iterator()` (no model instances, a chunk
+of rows in memory at a time) and encoded as they go: CSV, gzip-compressed
+CSV, or XLSX. The XLSX writer streams a minimal SpreadsheetML workbook
+through `zipfile` (inline strings, no shared-string table), so no spreadsheet
+library is needed. The same generators feed streaming responses
+(`reports.views`) and background exports written to storage (`reports.tasks`).
+"""
+
+import csv
+import re
+import zipfile
+import zlib
+from collections.abc import Iterable, Iterator
+from xml.sax.saxutils import escape
+
+from bookings.models import Booking
+
+COLUMNS = ["id", "property", "customer", "check_in", "check_out", "status", "guests", "source"]
+CHUNK_SIZE = 2000
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "csv.gz": "application/gzip",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def booking_rows(start, end) -> Iterator[list]:
+    """Bookings overlapping [start, end) as export rows, ordered by property and check-in."""
+    rows = (
+        Booking.objects.filter(check_in__lt=end, check_out__gt=start)
+        .order_by("property_id", "check_in")
+        .values_list(
+            "id",
+            "property__title",
+            "customer_id",
+            "customer__first_name",
+            "customer__last_name",
+            "customer__email",
+            "customer__phone",
+            "check_in",
+            "check_out",
+            "status",
+            "guests",
+            "source",
+        )
+    )
+    for (
+        booking_id,
+        title,
+        customer_id,
+        first_name,
+        last_name,
+        email,
+        phone,
+        check_in,
+        check_out,
+        status,
+        guests,
+        source,
+    ) in rows.iterator(chunk_size=CHUNK_SIZE):
+        # Same text as str(Customer)
+        customer = (
+            f"{first_name} {last_name}".strip() or email or phone or f"Customer #{customer_id}"
+        )
+        yield [booking_id, title, customer, str(check_in), str(check_out), status, guests, source]
+
+
+class _Line:
+    """File-like object whose `write` returns the line csv.writer formatted."""
+
+    def write(self, value):
+        return value
+
+
+def csv_chunks(rows: Iterable[list], batch: int = 500) -> Iterator[bytes]:
+    writer = csv.writer(_Line())
+    lines = [writer.writerow(COLUMNS)]
+    for row in rows:
+        lines.append(writer.writerow(row))
+        if len(lines) >= batch:
+            yield "".join(lines).encode("utf-8")
+            lines = []
+    if lines:
+        yield "".join(lines).encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class _Sink:
+    """Unseekable write target for zipfile; written bytes are taken with drain()."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+# Characters XML 1.0 does not allow, even escaped
+_INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" '
+        'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Bookings" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+
+
+def _xlsx_row(values) -> str:
+    cells = []
+    for value in values:
+        if isinstance(value, int | float) and not isinstance(value, bool):
+            cells.append(f"<c><v>{value}</v></c>")
+        else:
+            text = escape(_INVALID_XML.sub("", str(value)))
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return "<row>" + "".join(cells) + "</row>"
+
+
+def xlsx_chunks(rows: Iterable[list], batch: int = 500) -> Iterator[bytes]:
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in _XLSX_PARTS.items():
+            workbook.writestr(name, content)
+        yield sink.drain()
+        with workbook.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b"<sheetData>" + _xlsx_row(COLUMNS).encode("utf-8")
+            )
+            lines = []
+            for row in rows:
+                lines.append(_xlsx_row(row))
+                if len(lines) >= batch:
+                    sheet.write("".join(lines).encode("utf-8"))
+                    lines = []
+                    yield sink.drain()
+            sheet.write(("".join(lines) + "</sheetData></worksheet>").encode("utf-8"))
+    yield sink.drain()
+
+
+def export_chunks(rows: Iterable[list], file_format: str) -> Iterator[bytes]:
+    """Encode export rows as `csv`, `csv.gz` or `xlsx`."""
+    if file_format == "xlsx":
+        return xlsx_chunks(rows)
+    chunks = csv_chunks(rows)
+    return gzip_chunks(chunks) if file_format == "csv.gz" else chunks
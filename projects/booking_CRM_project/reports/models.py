@@ -1,3 +1,36 @@
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+class BookingExport(models.Model):
+    """Bookings export generated in the background (`reports.tasks`) for large ranges."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "В очереди"
+        RUNNING = "running", "Формируется"
+        READY = "ready", "Готово"
+        FAILED = "failed", "Ошибка"
+
+    class Format(models.TextChoices):
+        CSV = "csv", "CSV"
+        CSV_GZ = "csv.gz", "CSV (gzip)"
+        XLSX = "xlsx", "XLSX"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="booking_exports"
+    )
+    start = models.DateField()
+    end = models.DateField()
+    file_format = models.CharField(max_length=10, choices=Format.choices, default=Format.CSV)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    file = models.FileField(upload_to="exports/", blank=True)
+    rows = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:
+        return f"export #{self.pk} {self.start}→{self.end} {self.file_format} ({self.status})"
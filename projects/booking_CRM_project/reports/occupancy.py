@@ -0,0 +1,271 @@
+"""Occupancy engine for reports.
+
+Booked nights, clipped to the report range, are summed for every property in
+one grouped SQL query. Date buckets (`day`, `week`, `month`) and revenue come
+from a single fetch of the overlapping stays. Revenue is priced from the
+property's `RatePlan`: a `SeasonalRate` covering the night, else
+`weekend_price` for Friday and Saturday nights, else `base_price`. ADR is
+revenue per booked night; RevPAR is revenue per night in the range.
+
+Reports are cached by range and bucket. Booking, property and rate changes
+bump a version key (`reports.signals`), which invalidates every cached
+report. Other processes see the change at once with a shared cache backend,
+or after `OCCUPANCY_CACHE_TTL` seconds with the default per-process cache.
+"""
+
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import DateField, Func, IntegerField, Sum, Value
+from django.db.models.functions import Greatest, Least
+
+from bookings.models import Booking
+from properties.models import Property
+from rates.models import RatePlan, SeasonalRate
+
+BUCKETS = ("day", "week", "month")
+VERSION_KEY = "reports:occupancy:version"
+CENTS = Decimal("0.01")
+
+
+def bucket_ranges(start: date, end: date, bucket: str) -> list[tuple[date, date]]:
+    """Split [start, end) into days, ISO weeks or calendar months (edges clipped)."""
+    ranges = []
+    cursor = start
+    while cursor < end:
+        if bucket == "day":
+            following = cursor + timedelta(days=1)
+        elif bucket == "week":
+            following = cursor + timedelta(days=7 - cursor.weekday())
+        else:
+            following = (cursor.replace(day=1) + timedelta(days=32)).replace(day=1)
+        following = min(following, end)
+        ranges.append((cursor, following))
+        cursor = following
+    return ranges
+
+
+def _overlapping(start: date, end: date):
+    return (
+        Booking.objects.filter(check_in__lt=end, check_out__gt=start)
+        .exclude(status=Booking.Status.CANCELLED)
+        .order_by()
+    )
+
+
+class Nights(Func):
+    """Whole days from the second date expression to the first."""
+
+    arity = 2
+    output_field = IntegerField()
+    template = "(%(expressions)s)"  # PostgreSQL/Oracle: date - date is a number of days
+    arg_joiner = " - "
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # Django's generic date subtraction calls back into Python for every row
+        return self.as_sql(
+            compiler,
+            connection,
+            template="CAST(julianday(%(expressions)s) AS INTEGER)",
+            arg_joiner=") - julianday(",
+            **extra_context,
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="DATEDIFF(%(expressions)s)",
+            arg_joiner=", ",
+            **extra_context,
+        )
+
+
+def booked_nights(start: date, end: date) -> dict[int, int]:
+    """Booked nights within [start, end) per property, in one grouped query."""
+    clipped = Nights(
+        Least("check_out", Value(end, output_field=DateField())),
+        Greatest("check_in", Value(start, output_field=DateField())),
+    )
+    rows = _overlapping(start, end).values("property_id").annotate(nights=Sum(clipped))
+    return {row["property_id"]: row["nights"] for row in rows}
+
+
+class NightlyRates:
+    """Nightly prices of one property from its rate plan and seasonal rates."""
+
+    def __init__(self, plan: RatePlan, seasonal: list[SeasonalRate]):
+        self.plan = plan
+        self.seasonal = sorted(seasonal, key=lambda s: s.start_date)
+
+    def cumulative(self, start: date, end: date) -> list[Decimal]:
+        """Running revenue: element i is the price of nights start .. start + i - 1."""
+        days = (end - start).days
+        base = self.plan.base_price
+        weekend = self.plan.weekend_price if self.plan.weekend_price is not None else base
+        first = start.weekday()
+        prices = [weekend if (first + i) % 7 in (4, 5) else base for i in range(days)]
+        # Later-starting seasons win where seasons overlap
+        for season in self.seasonal:
+            lo = max((season.start_date - start).days, 0)
+            hi = min((season.end_date - start).days + 1, days)
+            if lo < hi:
+                prices[lo:hi] = [season.price] * (hi - lo)
+        return list(accumulate(prices, initial=Decimal(0)))
+
+
+def _rates(start: date, end: date) -> dict[int, NightlyRates]:
+    """Rates of every property with a rate plan, with the seasons overlapping [start, end)."""
+    seasonal = defaultdict(list)
+    for season in SeasonalRate.objects.filter(start_date__lt=end, end_date__gte=start):
+        seasonal[season.property_id].append(season)
+    return {
+        plan.property_id: NightlyRates(plan, seasonal[plan.property_id])
+        for plan in RatePlan.objects.all()
+    }
+
+
+def _ratio(value, total) -> float:
+    return round(value / total, 4) if total else 0
+
+
+def _money(value: Decimal) -> float:
+    return float(value.quantize(CENTS))
+
+
+def _breakdown(start, end, bucket, rates):
+    """Booked nights and revenue per property and bucket from one fetch of the stays."""
+    ranges = bucket_ranges(start, end, bucket) if bucket else []
+    bucket_starts = [r[0] for r in ranges]
+    nights = defaultdict(lambda: [0] * len(ranges))
+    revenue = defaultdict(Decimal)
+    bucket_revenue = defaultdict(lambda: [Decimal(0)] * len(ranges))
+    cumulative = {}
+
+    stays = _overlapping(start, end)
+    if not bucket:
+        # Only revenue is needed: skip properties without a rate plan
+        stays = stays.filter(property_id__in=list(rates))
+    stays = stays.values_list("property_id", "check_in", "check_out")
+    for property_id, check_in, check_out in stays.iterator(chunk_size=5000):
+        check_in, check_out = max(check_in, start), min(check_out, end)
+        property_rates = rates.get(property_id)
+        if property_rates is not None:
+            if property_id not in cumulative:
+                cumulative[property_id] = property_rates.cumulative(start, end)
+            cum = cumulative[property_id]
+            revenue[property_id] += cum[(check_out - start).days] - cum[(check_in - start).days]
+        if not ranges:
+            continue
+        i = bisect_right(bucket_starts, check_in) - 1
+        while i < len(ranges) and ranges[i][0] < check_out:
+            lo, hi = max(check_in, ranges[i][0]), min(check_out, ranges[i][1])
+            nights[property_id][i] += (hi - lo).days
+            if property_rates is not None:
+                bucket_revenue[property_id][i] += cum[(hi - start).days] - cum[(lo - start).days]
+            i += 1
+    return ranges, nights, revenue, bucket_revenue
+
+
+def _with_revenue(item: dict, revenue: Decimal, nights: int, days: int) -> dict:
+    item["revenue"] = _money(revenue)
+    item["adr"] = _money(revenue / nights) if nights else None
+    item["revpar"] = _money(revenue / days) if days else None
+    return item
+
+
+def compute(start: date, end: date, bucket: str | None = None) -> dict:
+    """Occupancy per property (and per bucket) for [start, end), uncached."""
+    days_total = max(0, (end - start).days)
+    properties = list(Property.objects.order_by("title").values_list("id", "title"))
+    booked = booked_nights(start, end) if days_total else {}
+    rates = _rates(start, end)
+    ranges, nights, revenue, bucket_revenue = (
+        _breakdown(start, end, bucket, rates) if days_total else ([], {}, {}, {})
+    )
+
+    items = []
+    for property_id, title in properties:
+        booked_days = booked.get(property_id, 0)
+        item = {
+            "property_id": property_id,
+            "property": title,
+            "booked_days": booked_days,
+            "days_total": days_total,
+            "occupancy": _ratio(booked_days, days_total),
+        }
+        plan = rates.get(property_id)
+        if plan is not None:
+            item["currency"] = plan.plan.currency
+            _with_revenue(item, revenue.get(property_id, Decimal(0)), booked_days, days_total)
+        if bucket:
+            item["buckets"] = []
+            for i, (b_start, b_end) in enumerate(ranges):
+                b_days = (b_end - b_start).days
+                b_nights = nights[property_id][i] if property_id in nights else 0
+                entry = {
+                    "start": str(b_start),
+                    "end": str(b_end),
+                    "booked_days": b_nights,
+                    "days_total": b_days,
+                    "occupancy": _ratio(b_nights, b_days),
+                }
+                if plan is not None:
+                    b_revenue = (
+                        bucket_revenue[property_id][i]
+                        if property_id in bucket_revenue
+                        else Decimal(0)
+                    )
+                    _with_revenue(entry, b_revenue, b_nights, b_days)
+                item["buckets"].append(entry)
+        items.append(item)
+
+    total_booked = sum(booked.values())
+    total_days = days_total * len(properties)
+    result = {
+        "start": str(start),
+        "end": str(end),
+        "totals": {
+            "booked_days": total_booked,
+            "days_total": total_days,
+            "occupancy": _ratio(total_booked, total_days),
+        },
+        "items": items,
+    }
+    if bucket:
+        result["bucket"] = bucket
+    return result
+
+
+def _version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Never restart at a version whose reports may still be cached
+        version = int(time.time() * 1000)
+        cache.add(VERSION_KEY, version, None)
+        version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def invalidate():
+    """Invalidate all cached reports."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        _version()
+
+
+def report(start: date, end: date, bucket: str | None = None) -> dict:
+    """Cached `compute()`."""
+    key = f"reports:occupancy:{_version()}:{start}:{end}:{bucket or ''}"
+    result = cache.get(key)
+    if result is None:
+        result = compute(start, end, bucket)
+        cache.set(key, result, getattr(settings, "OCCUPANCY_CACHE_TTL", 300))
+    return result
@@ -0,0 +1,34 @@
+from django.urls import reverse
+from rest_framework import serializers
+
+from .models import BookingExport
+
+
+class BookingExportSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BookingExport
+        fields = [
+            "id",
+            "start",
+            "end",
+            "file_format",
+            "status",
+            "rows",
+            "error",
+            "created_at",
+            "finished_at",
+            "download_url",
+        ]
+        read_only_fields = ["status", "rows", "error", "created_at", "finished_at"]
+
+    def get_download_url(self, obj):
+        if obj.status != BookingExport.Status.READY:
+            return None
+        return reverse("booking-export-download", args=[obj.id])
+
+    def validate(self, attrs):
+        if attrs["start"] >= attrs["end"]:
+            raise serializers.ValidationError({"detail": "end must be after start"})
+        return attrs
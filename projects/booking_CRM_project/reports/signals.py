@@ -0,0 +1,24 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bookings.models import Booking
+from properties.models import Property
+from rates.models import RatePlan, SeasonalRate
+
+from . import occupancy
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+@receiver(post_save, sender=RatePlan)
+@receiver(post_delete, sender=RatePlan)
+@receiver(post_save, sender=SeasonalRate)
+@receiver(post_delete, sender=SeasonalRate)
+def invalidate_occupancy(sender, instance, **kwargs):
+    """Drop cached occupancy reports."""
+    occupancy.invalidate()
+    # Again after commit: a report built inside the transaction saw uncommitted rows
+    transaction.on_commit(occupancy.invalidate)
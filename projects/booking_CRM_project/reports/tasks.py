@@ -0,0 +1,45 @@
+import logging
+import tempfile
+
+from celery import shared_task
+from django.core.files import File
+from django.utils import timezone
+
+from . import exports
+from .models import BookingExport
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def generate_bookings_export(export_id: int) -> None:
+    """Write a bookings export to storage, streaming rows through a temporary file."""
+    claimed = BookingExport.objects.filter(
+        id=export_id, status=BookingExport.Status.PENDING
+    ).update(status=BookingExport.Status.RUNNING)
+    if not claimed:
+        return
+    export = BookingExport.objects.get(id=export_id)
+    rows = 0
+
+    def counted():
+        nonlocal rows
+        for row in exports.booking_rows(export.start, export.end):
+            rows += 1
+            yield row
+
+    try:
+        with tempfile.TemporaryFile() as tmp:
+            for chunk in exports.export_chunks(counted(), export.file_format):
+                tmp.write(chunk)
+            tmp.seek(0)
+            name = f"bookings_{export.start}_{export.end}_{export.id}.{export.file_format}"
+            export.file.save(name, File(tmp), save=False)
+        export.status = BookingExport.Status.READY
+        export.rows = rows
+    except Exception as exc:
+        logger.exception("Bookings export %s failed", export_id)
+        export.status = BookingExport.Status.FAILED
+        export.error = str(exc)
+    export.finished_at = timezone.now()
+    export.save()
@@ -4,6 +4,12 @@ from . import views
 urlpatterns = [
     path('occupancy/', views.occupancy_report),
     path('bookings.csv', views.bookings_csv_export),
+    path('bookings.xlsx', views.bookings_xlsx_export),
+    path('exports/', views.booking_exports),
+    path('exports/<int:pk>/', views.booking_export_detail),
+    path(
+        'exports/<int:pk>/download/',
+        views.booking_export_download,
+        name='booking-export-download',
+    ),
 ]
-
-
@@ -1,10 +1,15 @@
-from datetime import datetime, timedelta
-from django.http import HttpResponse
+from datetime import datetime
+from django.db import transaction
+from django.http import FileResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from bookings.models import Booking
-from properties.models import Property
+from . import exports, occupancy
+from .models import BookingExport
+from .serializers import BookingExportSerializer
+from .tasks import generate_bookings_export
+
 
 def _parse_date(s: str):
     return datetime.fromisoformat(s).date()
@@ -13,9 +18,10 @@ def _parse_date(s: str):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def occupancy_report(request):
-    """Return simple occupancy summary per property for a date range.
+    """Return occupancy per property for a date range.
 
-    Query: start=YYYY-MM-DD, end=YYYY-MM-DD
+    Query: start=YYYY-MM-DD, end=YYYY-MM-DD, optional bucket=day|week|month.
+    Properties with a rate plan also get revenue, ADR and RevPAR.
     """
     start_q = request.query_params.get("start")
     end_q = request.query_params.get("end")
@@ -26,78 +32,94 @@ def occupancy_report(request):
         end = _parse_date(end_q)
     except Exception:
         return Response({"detail": "invalid date format"}, status=400)
+    bucket = request.query_params.get("bucket") or None
+    if bucket and bucket not in occupancy.BUCKETS:
+        choices = ", ".join(occupancy.BUCKETS)
+        return Response({"detail": f"bucket must be one of: {choices}"}, status=400)
 
-    days_total = max(0, (end - start).days)
-    data = []
-    for prop in Property.objects.all().order_by("title"):
-        qs = (
-            Booking.objects.filter(property=prop, check_in__lt=end, check_out__gt=start)
-            .exclude(status=Booking.Status.CANCELLED)
-            .values("check_in", "check_out")
-        )
-        booked_days = 0
-        for b in qs:
-            s = max(b["check_in"], start)
-            e = min(b["check_out"], end)
-            booked_days += max(0, (e - s).days)
-        occ = (booked_days / days_total) if days_total else 0
-        data.append({
-            "property_id": prop.id,
-            "property": prop.title,
-            "booked_days": booked_days,
-            "days_total": days_total,
-            "occupancy": round(occ, 4),
-        })
-    return Response({"start": str(start), "end": str(end), "items": data})
+    return Response(occupancy.report(start, end, bucket))
 
 
-@api_view(["GET"])
-@permission_classes([IsAuthenticated])
-def bookings_csv_export(request):
-    """Export bookings as CSV for a date range (overlaps included)."""
+def _export_range(request):
+    """Parse start/end query params; returns (start, end, error response)."""
     start_q = request.query_params.get("start")
     end_q = request.query_params.get("end")
     if not start_q or not end_q:
-        return Response({"detail": "start and end are required"}, status=400)
+        return None, None, Response({"detail": "start and end are required"}, status=400)
     try:
-        start = _parse_date(start_q)
-        end = _parse_date(end_q)
+        return _parse_date(start_q), _parse_date(end_q), None
     except Exception:
-        return Response({"detail": "invalid date format"}, status=400)
+        return None, None, Response({"detail": "invalid date format"}, status=400)
+
+
+def _stream_export(start, end, file_format: str):
+    response = StreamingHttpResponse(
+        exports.export_chunks(exports.booking_rows(start, end), file_format),
+        content_type=exports.CONTENT_TYPES[file_format],
+    )
+    response["Content-Disposition"] = f"attachment; filename=bookings.{file_format}"
+    return response
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def bookings_csv_export(request):
+    """Export bookings as CSV for a date range (overlaps included).
+
+    Streamed as rows are read; `gzip=1` compresses it (bookings.csv.gz).
+    """
+    start, end, error = _export_range(request)
+    if error:
+        return error
+    file_format = "csv.gz" if request.query_params.get("gzip") in ("1", "true") else "csv"
+    return _stream_export(start, end, file_format)
 
-    qs = (
-        Booking.objects.select_related("property", "customer")
-        .filter(check_in__lt=end, check_out__gt=start)
-        .order_by("property_id", "check_in")
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def bookings_xlsx_export(request):
+    """Export bookings as an XLSX workbook for a date range (overlaps included)."""
+    start, end, error = _export_range(request)
+    if error:
+        return error
+    return _stream_export(start, end, "xlsx")
+
+
+@api_view(["GET", "POST"])
+@permission_classes([IsAuthenticated])
+def booking_exports(request):
+    """List the user's background exports, or queue one (for very large ranges).
+
+    POST body: {"start": "YYYY-MM-DD", "end": "YYYY-MM-DD", "file_format": "csv|csv.gz|xlsx"}
+    """
+    if request.method == "GET":
+        qs = BookingExport.objects.filter(user=request.user)[:50]
+        return Response(BookingExportSerializer(qs, many=True).data)
+
+    serializer = BookingExportSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    export = serializer.save(user=request.user)
+    transaction.on_commit(lambda: generate_bookings_export.delay(export.id))
+    return Response(BookingExportSerializer(export).data, status=202)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def booking_export_detail(request, pk):
+    """Status of a background export; `download_url` is set once it is ready."""
+    export = get_object_or_404(BookingExport, pk=pk, user=request.user)
+    return Response(BookingExportSerializer(export).data)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def booking_export_download(request, pk):
+    export = get_object_or_404(
+        BookingExport, pk=pk, user=request.user, status=BookingExport.Status.READY
+    )
+    return FileResponse(
+        export.file.open("rb"),
+        as_attachment=True,
+        filename=f"bookings_{export.start}_{export.end}.{export.file_format}",
+        content_type=exports.CONTENT_TYPES[export.file_format],
     )
-    rows = [
-        [
-            "id",
-            "property",
-            "customer",
-            "check_in",
-            "check_out",
-            "status",
-            "guests",
-            "source",
-        ]
-    ]
-    for b in qs:
-        rows.append([
-            b.id,
-            b.property.title,
-            str(b.customer),
-            str(b.check_in),
-            str(b.check_out),
-            b.status,
-            b.guests,
-            b.source,
-        ])
-    # Serialize to CSV
-    import csv
-    resp = HttpResponse(content_type="text/csv; charset=utf-8")
-    resp["Content-Disposition"] = "attachment; filename=bookings.csv"
-    writer = csv.writer(resp)
-    for r in rows:
-        writer.writerow(r)
-    return resp
@@ -0,0 +1,120 @@
+"""Local fake of the Google Calendar API (events.list, calendarList) and OAuth token endpoint.
+
+Serves over real HTTP on 127.0.0.1, so the pooled session, retries and token
+refresh in `integrations.google` run unchanged. Sync tokens are versions of
+the fake's change log: a delta listing returns the events changed since then.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+class FakeGoogle:
+    def __init__(self):
+        self.calendars: dict[str, dict[str, tuple[int, dict]]] = {}  # id -> uid -> (version, event)
+        self.version = 0
+        self.access_token = "access-1"
+        self.refresh_token = "refresh-1"
+        self.refreshes = 0
+        self.expired_sync_tokens: set[str] = set()
+        self.failures: list[int] = []  # statuses answered to the next event requests
+        self.requests: list[tuple[str, str, dict]] = []  # (method, path, query)
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self) -> "FakeGoogle":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def put_event(self, calendar_id: str, uid: str, start: str, end: str, **fields):
+        """Create or change an event (a new change-log version)."""
+        with self._lock:
+            self.version += 1
+            event = {"iCalUID": uid, "start": {"date": start}, "end": {"date": end}, **fields}
+            self.calendars.setdefault(calendar_id, {})[uid] = (self.version, event)
+
+    def cancel_event(self, calendar_id: str, uid: str):
+        with self._lock:
+            self.version += 1
+            self.calendars[calendar_id][uid] = (
+                self.version,
+                {"iCalUID": uid, "status": "cancelled"},
+            )
+
+    def event_requests(self) -> list[dict]:
+        return [query for method, path, query in self.requests if path.endswith("/events")]
+
+    def list_events(self, calendar_id: str, query: dict) -> tuple[int, dict]:
+        sync_token = query.get("syncToken", "")
+        if sync_token in self.expired_sync_tokens:
+            return 410, {"error": {"code": 410, "message": "Sync token is no longer valid"}}
+        since = int(sync_token[1:]) if sync_token else 0
+        with self._lock:
+            changes = sorted(
+                (version, event)
+                for version, event in self.calendars.get(calendar_id, {}).values()
+                if version > since and (sync_token or event.get("status") != "cancelled")
+            )
+            version = self.version
+        offset = int(query.get("pageToken", 0))
+        size = int(query.get("maxResults", 250))
+        page = {"items": [event for _, event in changes[offset : offset + size]]}
+        if offset + size < len(changes):
+            page["nextPageToken"] = str(offset + size)
+        else:
+            page["nextSyncToken"] = f"v{version}"
+        return 200, page
+
+
+def _handler(fake: FakeGoogle):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status: int, payload: dict | None = None):
+            body = json.dumps(payload or {}).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            length = int(self.headers.get("Content-Length", 0))
+            form = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode()).items()}
+            fake.requests.append(("POST", url.path, form))
+            if url.path != "/token":
+                return self._reply(404)
+            if (
+                form.get("grant_type") != "refresh_token"
+                or form.get("refresh_token") != fake.refresh_token
+            ):
+                return self._reply(400, {"error": "invalid_grant"})
+            fake.refreshes += 1
+            fake.access_token = f"access-{fake.refreshes + 1}"
+            self._reply(200, {"access_token": fake.access_token, "expires_in": 3600})
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            fake.requests.append(("GET", url.path, query))
+            if self.headers.get("Authorization") != f"Bearer {fake.access_token}":
+                return self._reply(401, {"error": {"code": 401, "message": "Invalid Credentials"}})
+            if url.path == "/calendar/v3/users/me/calendarList":
+                return self._reply(200, {"items": [{"id": cid} for cid in fake.calendars]})
+            parts = url.path.split("/")
+            if url.path.startswith("/calendar/v3/calendars/") and parts[-1] == "events":
+                if fake.failures:
+                    return self._reply(fake.failures.pop(0))
+                return self._reply(*fake.list_events(unquote(parts[-2]), query))
+            self._reply(404)
+
+    return Handler
@@ -0,0 +1,68 @@
+import datetime as dt
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from bookings.availability import PropertyCalendar, Stay
+from bookings.availability import availability_index as index
+from bookings.models import Booking
+
+from .factories import CustomerFactory, PropertyFactory
+
+
+def d(day: int) -> dt.date:
+    return dt.date(2025, 3, 1) + dt.timedelta(days=day)
+
+
+def test_calendar_overlap_and_next_available():
+    calendar = PropertyCalendar(
+        [
+            Stay(d(10), d(15), 2, "confirmed"),
+            Stay(d(0), d(30), 1, "confirmed"),  # long stay overlapping the others
+            Stay(d(40), d(42), 3, "confirmed"),
+        ]
+    )
+    assert calendar.overlaps(d(20), d(21))
+    assert not calendar.overlaps(d(20), d(21), exclude_id=1)
+    assert not calendar.overlaps(d(30), d(40))  # check-out day is free
+    assert calendar.next_available(d(5), nights=3) == (d(30), d(33))
+    assert calendar.next_available(d(30), nights=11) == (d(42), d(53))
+
+
+@pytest.mark.django_db
+def test_index_matches_database_and_tracks_changes():
+    prop, other = PropertyFactory(), PropertyFactory()
+    cust = CustomerFactory()
+    booking = Booking.objects.create(property=prop, customer=cust, check_in=d(0), check_out=d(5))
+    Booking.objects.create(
+        property=prop, customer=cust, check_in=d(5), check_out=d(8), status=Booking.Status.CANCELLED
+    )
+    index.invalidate()
+
+    assert index.overlaps(prop.id, d(4), d(6))
+    assert not index.overlaps(prop.id, d(5), d(8))  # cancelled stays do not block
+    assert index.free_properties([prop.id, other.id], d(1), d(2)) == [other.id]
+    with CaptureQueriesContext(connection) as queries:
+        assert index.next_available(prop.id, d(0), nights=2) == (d(5), d(7))
+    assert len(queries) == 0
+
+    # Signals drop cached calendars of the old and new property
+    booking.property = other
+    booking.save()
+    assert not index.overlaps(prop.id, d(1), d(2))
+    assert index.overlaps(other.id, d(1), d(2))
+
+    booking.delete()
+    assert index.free_properties([prop.id, other.id], d(1), d(2)) == [prop.id, other.id]
+
+
+@pytest.mark.django_db
+def test_find_next_available_range():
+    prop = PropertyFactory()
+    cust = CustomerFactory()
+    Booking.objects.create(property=prop, customer=cust, check_in=d(0), check_out=d(3))
+    Booking.objects.create(property=prop, customer=cust, check_in=d(4), check_out=d(6))
+
+    assert Booking.find_next_available_range(prop.id, d(1), nights=2) == (d(6), d(8))
+    assert Booking.find_next_available_range(prop.id, d(1), nights=1) == (d(3), d(4))
@@ -0,0 +1,118 @@
+import csv
+import datetime as dt
+import gzip
+import io
+import zipfile
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.http import StreamingHttpResponse
+from rest_framework.test import APIClient
+
+from bookings.models import Booking
+from reports.models import BookingExport
+from reports.tasks import generate_bookings_export
+
+from .factories import CustomerFactory, PropertyFactory
+
+
+@pytest.fixture
+def user(db):
+    return get_user_model().objects.create_user(username="exporter", password="x")
+
+
+@pytest.fixture
+def client(user):
+    api = APIClient()
+    api.force_authenticate(user)
+    return api
+
+
+@pytest.fixture
+def bookings(db):
+    prop = PropertyFactory(title="Sea View")
+    cust = CustomerFactory(first_name="Ann", last_name="Lee")
+    inside = Booking.objects.create(
+        property=prop, customer=cust, check_in=dt.date(2025, 5, 2), check_out=dt.date(2025, 5, 5)
+    )
+    Booking.objects.create(
+        property=prop, customer=cust, check_in=dt.date(2025, 7, 1), check_out=dt.date(2025, 7, 3)
+    )
+    return [inside]
+
+
+def body(response) -> bytes:
+    return b"".join(response.streaming_content)
+
+
+@pytest.mark.django_db
+def test_csv_export_streams_rows(client, bookings):
+    resp = client.get("/api/reports/bookings.csv", {"start": "2025-05-01", "end": "2025-06-01"})
+    assert resp.status_code == 200
+    assert isinstance(resp, StreamingHttpResponse)
+    assert resp["Content-Disposition"] == "attachment; filename=bookings.csv"
+    rows = list(csv.reader(io.StringIO(body(resp).decode())))
+    assert rows == [
+        ["id", "property", "customer", "check_in", "check_out", "status", "guests", "source"],
+        [
+            str(bookings[0].id),
+            "Sea View",
+            "Ann Lee",
+            "2025-05-02",
+            "2025-05-05",
+            "confirmed",
+            "1",
+            "crm",
+        ],
+    ]
+
+
+@pytest.mark.django_db
+def test_csv_export_gzip_and_xlsx_match(client, bookings):
+    params = {"start": "2025-05-01", "end": "2025-06-01"}
+    plain = body(client.get("/api/reports/bookings.csv", params))
+    gz = client.get("/api/reports/bookings.csv", {**params, "gzip": "1"})
+    assert gz["Content-Type"] == "application/gzip"
+    assert gzip.decompress(body(gz)) == plain
+
+    xlsx = client.get("/api/reports/bookings.xlsx", params)
+    assert xlsx.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(body(xlsx))) as workbook:
+        assert workbook.testzip() is None
+        sheet = workbook.read("xl/worksheets/sheet1.xml").decode()
+    assert sheet.count("<row>") == 2
+    assert "Sea View" in sheet and "Ann Lee" in sheet
+
+
+@pytest.mark.django_db
+def test_background_export_is_queued_and_downloadable(
+    client, bookings, settings, tmp_path, django_capture_on_commit_callbacks
+):
+    settings.MEDIA_ROOT = str(tmp_path)
+    with mock.patch("reports.views.generate_bookings_export.delay") as delay:
+        with django_capture_on_commit_callbacks(execute=True):
+            resp = client.post(
+                "/api/reports/exports/",
+                {"start": "2025-05-01", "end": "2025-06-01", "file_format": "csv.gz"},
+                format="json",
+            )
+    assert resp.status_code == 202
+    assert resp.data["status"] == "pending" and resp.data["download_url"] is None
+    export_id = resp.data["id"]
+    delay.assert_called_once_with(export_id)
+
+    generate_bookings_export(export_id)
+    export = BookingExport.objects.get(id=export_id)
+    assert export.status == BookingExport.Status.READY
+    assert export.rows == 1
+
+    detail = client.get(f"/api/reports/exports/{export_id}/").data
+    download = client.get(detail["download_url"])
+    assert download.status_code == 200
+    content = gzip.decompress(b"".join(download.streaming_content)).decode()
+    assert "Sea View" in content
+
+    other = APIClient()
+    other.force_authenticate(get_user_model().objects.create_user(username="other", password="x"))
+    assert other.get(detail["download_url"]).status_code == 404
@@ -0,0 +1,130 @@
+import datetime as dt
+
+import pytest
+
+from bookings.availability import StaySet, availability_index
+from bookings.models import Booking
+from customers.models import Customer
+from integrations.models import CalendarEventLink
+from integrations.sync import GUEST_EMAIL, sync_events
+
+from .factories import CustomerFactory, PropertyFactory
+
+
+def event(uid, start, end, email=None, **extra):
+    ev = {"iCalUID": uid, "start": {"date": start}, "end": {"date": end}, **extra}
+    if email:
+        ev["attendees"] = [{"email": email}]
+    return ev
+
+
+def test_stay_set_overlaps():
+    stays = StaySet()
+    stays.add(1, dt.date(2025, 1, 1), dt.date(2025, 1, 20))  # long stay reaching far right
+    stays.add(2, dt.date(2025, 1, 10), dt.date(2025, 1, 12))
+    assert stays.overlaps(dt.date(2025, 1, 15), dt.date(2025, 1, 16))
+    assert not stays.overlaps(dt.date(2025, 1, 15), dt.date(2025, 1, 16), exclude=1)
+    assert not stays.overlaps(dt.date(2025, 1, 20), dt.date(2025, 1, 22))
+    stays.discard(1)
+    assert len(stays) == 1 and 1 not in stays
+    assert not stays.overlaps(dt.date(2025, 1, 1), dt.date(2025, 1, 10))
+
+
+@pytest.mark.django_db
+def test_first_sync_uses_bulk_queries(django_assert_max_num_queries):
+    prop = PropertyFactory(calendar_id="cal-1")
+    events = [
+        event(
+            f"ev{i}",
+            str(dt.date(2025, 1, 1) + dt.timedelta(days=3 * i)),
+            str(dt.date(2025, 1, 3) + dt.timedelta(days=3 * i)),
+            email=f"guest{i % 7}@example.com",
+        )
+        for i in range(120)
+    ]
+    events.append(event("no-dates", None, None))
+    # property, stays, then per batch: links, customers, customer insert, booking and link inserts
+    with django_assert_max_num_queries(20):
+        result = sync_events("cal-1", events, batch_size=50)
+
+    assert (result.created, result.skipped, len(result.batches)) == (120, 1, 3)
+    assert {"prefetch_ms", "diff_ms", "write_ms"} <= result.batches[0].keys()
+    assert Booking.objects.filter(property=prop, source="google").count() == 120
+    assert CalendarEventLink.objects.count() == 120
+    assert Customer.objects.filter(email__endswith="@example.com").count() == 7
+    link = CalendarEventLink.objects.select_related("booking__customer").get(ical_uid="ev8")
+    assert link.booking.check_in == dt.date(2025, 1, 25)
+    assert link.booking.customer.email == "guest1@example.com"
+
+
+@pytest.mark.django_db
+def test_resync_updates_unlinks_and_skips_conflicts(django_capture_on_commit_callbacks):
+    prop = PropertyFactory(calendar_id="cal-1")
+    manual = Booking.objects.create(
+        property=prop,
+        customer=CustomerFactory(),
+        check_in=dt.date(2025, 3, 1),
+        check_out=dt.date(2025, 3, 5),
+    )
+    sync_events(
+        "cal-1",
+        [
+            event("a", "2025-01-01", "2025-01-05"),
+            event("b", "2025-02-01", "2025-02-03"),
+            event("c", "2025-02-10", "2025-02-12"),
+        ],
+    )
+    b = CalendarEventLink.objects.get(ical_uid="b").booking
+    assert availability_index.overlaps(prop.id, dt.date(2025, 1, 2), dt.date(2025, 1, 3))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        result = sync_events(
+            "cal-1",
+            [
+                event("a", "2025-01-01", "2025-01-05"),  # unchanged
+                event("b", "2025-03-03", "2025-03-08"),  # overlaps the manual booking
+                event("c", "2025-01-20", "2025-01-22", email="new@example.com"),
+                event("a", "", "", status="cancelled"),
+                event("d", "2025-02-09", "2025-02-12"),  # takes the dates c left
+                event("e", "2025-01-21", "2025-01-23"),  # overlaps c's new dates
+            ],
+        )
+
+    assert (result.created, result.updated, result.unchanged, result.unlinked) == (1, 1, 1, 1)
+    assert result.conflicts == ["b", "e"]
+    b.refresh_from_db()
+    assert b.check_in == dt.date(2025, 2, 1)
+    c = CalendarEventLink.objects.get(ical_uid="c").booking
+    assert (c.check_in, c.customer.email) == (dt.date(2025, 1, 20), "new@example.com")
+    assert not CalendarEventLink.objects.filter(ical_uid="a").exists()
+    # The booking of a cancelled event stays, as before
+    assert Booking.objects.filter(property=prop, check_in=dt.date(2025, 1, 1)).exists()
+    manual.refresh_from_db()
+    assert manual.check_out == dt.date(2025, 3, 5)
+    # Bulk writes send no signals: the index is refreshed on commit
+    assert availability_index.overlaps(prop.id, dt.date(2025, 1, 20), dt.date(2025, 1, 21))
+    assert not availability_index.overlaps(prop.id, dt.date(2025, 2, 5), dt.date(2025, 2, 9))
+
+
+@pytest.mark.django_db
+def test_repeated_uid_in_one_page_keeps_last_instance():
+    PropertyFactory(calendar_id="cal-1")
+    result = sync_events(
+        "cal-1",
+        [
+            event("rec", "2025-05-01", "2025-05-02"),
+            event("rec", "2025-05-08", "2025-05-09"),
+            event("solo", "2025-05-01", "2025-05-02"),  # free again once "rec" moved
+        ],
+    )
+    assert (result.created, result.updated, result.conflicts) == (2, 1, [])
+    booking = CalendarEventLink.objects.get(ical_uid="rec").booking
+    assert booking.check_in == dt.date(2025, 5, 8)
+    assert booking.customer.email == GUEST_EMAIL
+
+
+@pytest.mark.django_db
+def test_unknown_calendar_is_ignored():
+    result = sync_events("missing", [event("x", "2025-01-01", "2025-01-02")])
+    assert result.created == 0
+    assert not Booking.objects.exists()
@@ -0,0 +1,158 @@
+import datetime as dt
+from unittest import mock
+
+import pytest
+from celery.exceptions import Retry
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from bookings.models import Booking
+from integrations import google
+from integrations.models import (
+    CalendarAccount,
+    CalendarEventLink,
+    CalendarSubscription,
+    CalendarSyncState,
+)
+from integrations.tasks import enqueue_sync, sync_calendar
+
+from .factories import PropertyFactory
+from .fake_google import FakeGoogle
+
+CAL = "rentals@group.calendar.google.com"
+
+
+@pytest.fixture
+def fake(settings, monkeypatch):
+    server = FakeGoogle().start()
+    settings.GOOGLE_CALENDAR_API_URL = f"{server.url}/calendar/v3"
+    settings.GOOGLE_TOKEN_URL = f"{server.url}/token"
+    settings.GOOGLE_SYNC_PAGE_SIZE = 2
+    settings.GOOGLE_HTTP_BACKOFF = 0
+    monkeypatch.setattr(google, "_session", None)  # rebuilt with the settings above
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def state(db, fake):
+    user = get_user_model().objects.create_user(username="owner", password="x")
+    account = CalendarAccount.objects.create(
+        user=user,
+        access_token=fake.access_token,
+        refresh_token=fake.refresh_token,
+        token_expiry=timezone.now() + dt.timedelta(hours=1),
+    )
+    PropertyFactory(calendar_id=CAL)
+    return CalendarSyncState.objects.create(account=account, calendar_id=CAL)
+
+
+def run_sync(state):
+    CalendarSyncState.objects.filter(id=state.id).update(sync_queued_at=timezone.now())
+    return sync_calendar(state.id)
+
+
+@pytest.mark.django_db
+def test_sync_follows_pages_then_syncs_deltas(fake, state):
+    for i in range(5):
+        fake.put_event(CAL, f"ev{i}", f"2025-06-{1 + 3 * i:02d}", f"2025-06-{3 + 3 * i:02d}")
+
+    result = run_sync(state)
+    assert result["created"] == 5
+    assert [q.get("pageToken") for q in fake.event_requests()] == [None, "2", "4"]
+    state.refresh_from_db()
+    assert (state.sync_token, state.sync_started_at, state.sync_queued_at) == ("v5", None, None)
+    assert state.last_synced_at is not None
+
+    fake.put_event(CAL, "ev1", "2025-07-01", "2025-07-04")
+    fake.cancel_event(CAL, "ev2")
+    fake.requests.clear()
+    result = run_sync(state)
+    assert (result["created"], result["updated"], result["unlinked"]) == (0, 1, 1)
+    assert [q["syncToken"] for q in fake.event_requests()] == ["v5"]
+    assert CalendarEventLink.objects.get(ical_uid="ev1").booking.check_in == dt.date(2025, 7, 1)
+    assert not CalendarEventLink.objects.filter(ical_uid="ev2").exists()
+
+
+@pytest.mark.django_db
+def test_expired_token_is_refreshed_and_server_errors_retried(fake, state):
+    fake.put_event(CAL, "ev0", "2025-06-01", "2025-06-03")
+    CalendarAccount.objects.filter(id=state.account_id).update(token_expiry=timezone.now())
+    fake.failures = [503]
+
+    assert run_sync(state)["created"] == 1
+    assert fake.refreshes == 1
+    assert fake.requests[0][1] == "/token"
+    assert len(fake.event_requests()) == 2  # the 503, then its retry
+    assert CalendarAccount.objects.get(id=state.account_id).access_token == fake.access_token
+
+    # Revoked before its recorded expiry: the 401 triggers a refresh too
+    fake.access_token = "rotated"
+    fake.put_event(CAL, "ev1", "2025-06-05", "2025-06-07")
+    assert run_sync(state)["created"] == 1
+    assert fake.refreshes == 2
+
+
+@pytest.mark.django_db
+def test_expired_sync_token_falls_back_to_full_sync(fake, state):
+    fake.put_event(CAL, "ev0", "2025-06-01", "2025-06-03")
+    fake.expired_sync_tokens.add("v0-stale")
+    CalendarSyncState.objects.filter(id=state.id).update(sync_token="v0-stale")
+
+    assert run_sync(state)["created"] == 1
+    assert [q.get("syncToken") for q in fake.event_requests()] == ["v0-stale", None]
+    state.refresh_from_db()
+    assert state.sync_token == "v1"
+
+
+@pytest.mark.django_db
+def test_failed_sync_records_error_and_requeues(fake, state, django_capture_on_commit_callbacks):
+    fake.failures = [500] * 10
+    with mock.patch("integrations.tasks.sync_calendar.apply_async") as apply_async:
+        with django_capture_on_commit_callbacks(execute=True):
+            assert run_sync(state) is None
+    state.refresh_from_db()
+    assert "500" in state.last_error
+    assert state.sync_started_at is None and state.sync_queued_at is not None
+    apply_async.assert_called_once_with((state.id,), countdown=60)
+    assert not Booking.objects.exists()
+
+
+@pytest.mark.django_db
+def test_webhook_burst_queues_one_sync(fake, state, settings, django_capture_on_commit_callbacks):
+    settings.GOOGLE_WEBHOOK_VERIFICATION_TOKEN = ""
+    CalendarSubscription.objects.create(
+        account=state.account, calendar_id=CAL, channel_id="chan-1", resource_id="res-1"
+    )
+    client = APIClient()
+    with mock.patch("integrations.tasks.sync_calendar.apply_async") as apply_async:
+        with django_capture_on_commit_callbacks(execute=True):
+            states = ["sync", "exists", "exists", "exists"]
+            for number, resource_state in enumerate(states, start=1):
+                resp = client.post(
+                    "/api/integrations/google/webhook/",
+                    HTTP_X_GOOG_RESOURCE_ID="res-1",
+                    HTTP_X_GOOG_CHANNEL_ID="chan-1",
+                    HTTP_X_GOOG_MESSAGE_NUMBER=str(number),
+                    HTTP_X_GOOG_RESOURCE_STATE=resource_state,
+                )
+                assert resp.status_code == 200
+    apply_async.assert_called_once_with(
+        (state.id,), countdown=settings.GOOGLE_SYNC_COALESCE_SECONDS
+    )
+
+    fake.put_event(CAL, "ev0", "2025-06-01", "2025-06-03")
+    assert sync_calendar(state.id)["created"] == 1
+    # Nothing queued any more: a duplicate task does nothing
+    assert sync_calendar(state.id) is None
+    assert len(fake.event_requests()) == 1
+
+
+@pytest.mark.django_db
+def test_sync_waits_for_a_running_sync_of_the_same_calendar(state):
+    CalendarSyncState.objects.filter(id=state.id).update(sync_started_at=timezone.now())
+    assert enqueue_sync(state, countdown=0)
+    assert not enqueue_sync(state, countdown=0)
+    with pytest.raises(Retry):
+        sync_calendar(state.id)
@@ -0,0 +1,94 @@
+import datetime as dt
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from bookings.models import Booking
+from rates.models import RatePlan, SeasonalRate
+from reports import occupancy
+
+from .factories import CustomerFactory, PropertyFactory
+
+
+@pytest.fixture
+def client(db):
+    user = get_user_model().objects.create_user(username="reporter", password="x")
+    api = APIClient()
+    api.force_authenticate(user)
+    return api
+
+
+def book(prop, cust, check_in, check_out, **kwargs):
+    return Booking.objects.create(
+        property=prop, customer=cust, check_in=check_in, check_out=check_out, **kwargs
+    )
+
+
+def test_bucket_ranges():
+    assert occupancy.bucket_ranges(dt.date(2025, 1, 30), dt.date(2025, 3, 3), "month") == [
+        (dt.date(2025, 1, 30), dt.date(2025, 2, 1)),
+        (dt.date(2025, 2, 1), dt.date(2025, 3, 1)),
+        (dt.date(2025, 3, 1), dt.date(2025, 3, 3)),
+    ]
+    # 2025-01-01 is a Wednesday: the first week is clipped at Monday
+    weeks = occupancy.bucket_ranges(dt.date(2025, 1, 1), dt.date(2025, 1, 15), "week")
+    assert weeks[0] == (dt.date(2025, 1, 1), dt.date(2025, 1, 6))
+    assert len(weeks) == 3
+
+
+@pytest.mark.django_db
+def test_occupancy_report_single_query_totals(client):
+    prop, other = PropertyFactory(title="A"), PropertyFactory(title="B")
+    cust = CustomerFactory()
+    book(prop, cust, dt.date(2025, 1, 28), dt.date(2025, 2, 3))  # 3 nights in range
+    book(prop, cust, dt.date(2025, 2, 10), dt.date(2025, 2, 12))
+    book(other, cust, dt.date(2025, 2, 5), dt.date(2025, 2, 8), status=Booking.Status.CANCELLED)
+
+    with CaptureQueriesContext(connection) as queries:
+        res = client.get("/api/reports/occupancy/?start=2025-01-31&end=2025-03-01&bucket=month")
+    assert res.status_code == 200
+    data = res.json()
+    items = {i["property"]: i for i in data["items"]}
+    assert items["A"]["booked_days"] == 5
+    assert items["A"]["days_total"] == 29
+    assert [b["booked_days"] for b in items["A"]["buckets"]] == [1, 4]
+    assert items["B"]["booked_days"] == 0
+    assert data["totals"] == {"booked_days": 5, "days_total": 58, "occupancy": round(5 / 58, 4)}
+    assert len(queries) < 10  # independent of the number of properties
+
+    # Cached until a booking changes
+    book(other, cust, dt.date(2025, 2, 20), dt.date(2025, 2, 22))
+    res = client.get("/api/reports/occupancy/?start=2025-01-31&end=2025-03-01&bucket=month")
+    assert {i["property"]: i["booked_days"] for i in res.json()["items"]} == {"A": 5, "B": 2}
+
+
+@pytest.mark.django_db
+def test_occupancy_report_revenue(client):
+    prop = PropertyFactory()
+    cust = CustomerFactory()
+    RatePlan.objects.create(property=prop, base_price=Decimal("100"), weekend_price=Decimal("150"))
+    SeasonalRate.objects.create(
+        property=prop,
+        start_date=dt.date(2025, 3, 10),
+        end_date=dt.date(2025, 3, 10),
+        price=Decimal("300"),
+    )
+    # Nights: Thu 6 (100), Fri 7 (150), Sat 8 (150), Sun 9 (100), Mon 10 (seasonal 300)
+    book(prop, cust, dt.date(2025, 3, 6), dt.date(2025, 3, 11))
+
+    res = client.get("/api/reports/occupancy/?start=2025-03-01&end=2025-03-11&bucket=week")
+    item = res.json()["items"][0]
+    assert item["revenue"] == 800.0
+    assert item["adr"] == 160.0
+    assert item["revpar"] == 80.0
+    assert [b["revenue"] for b in item["buckets"]] == [0.0, 500.0, 300.0]
+
+
+@pytest.mark.django_db
+def test_occupancy_report_invalid_bucket(client):
+    res = client.get("/api/reports/occupancy/?start=2025-03-01&end=2025-03-11&bucket=year")
+    assert res.status_code == 400